@@ -0,0 +1,109 @@
+"""
+In-process TTL caches for SprintLens.
+
+Slowly changing upstream data (channel, project and calendar directories)
+is cached per process for a few minutes. Lookups are counted in the
+``sprintlens_cache_requests_total`` metric, and the startup warm-up fills
+the caches before the first request arrives. Entries are kept per tenant,
+so one tenant's lookups never see another's data. Expired entries are
+pruned as new ones are stored, so keys that are never read again (a
+tenant's, a past date window's) do not accumulate.
+"""
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import current_tenant
+from app.core.metrics import record_cache_lookup
+
+_caches: List["TTLCache"] = []
+
+# Entries a cache holds before it first prunes the expired ones
+PRUNE_MIN_ENTRIES = 64
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._prune_at = PRUNE_MIN_ENTRIES
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (hit, value) tuple; value is None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get((current_tenant(), key))
+        hit = entry is not None and entry[0] > time.monotonic()
+        record_cache_lookup(self.name, hit)
+        return (True, entry[1]) if hit else (False, None)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value for ``ttl`` seconds (default: the cache's ttl)."""
+        now = time.monotonic()
+        with self._lock:
+            self._entries[(current_tenant(), key)] = (now + (self.ttl if ttl is None else ttl), value)
+            if len(self._entries) >= self._prune_at:
+                # Once the cache has doubled since the last prune, so pruning is amortized per store
+                self._entries = {k: entry for k, entry in self._entries.items() if entry[0] > now}
+                self._prune_at = max(PRUNE_MIN_ENTRIES, 2 * len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._prune_at = PRUNE_MIN_ENTRIES
+
+def ttl_cached(name: str, ttl: Callable[[], float]):
+    """
+    Cache a function's results by its positional arguments.
+
+    Empty results are not cached, since the services return an empty list
+    when the upstream call fails. The wrapped function gains ``refresh``
+    (call and store, bypassing the cache) and ``cache`` attributes.
+
+    Args:
+        name: Cache name used in metrics
+        ttl: Callable returning the time to live in seconds, read per store
+    """
+    def decorator(func):
+        cache = TTLCache(name, ttl())
+
+        @wraps(func)
+        def wrapper(*args):
+            hit, value = cache.get(args)
+            if hit:
+                return value
+            return refresh(*args)
+
+        def refresh(*args):
+            value = func(*args)
+            if value:
+                cache.ttl = ttl()
+                cache.set(args, value)
+            return value
+
+        wrapper.refresh = refresh
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def clear_caches(name: Optional[str] = None) -> None:
+    """Empty every cache, or only the one with the given name."""
+    for cache in _caches:
+        if name is None or cache.name == name:
+            cache.clear()
@@ -0,0 +1,219 @@
+"""
+Lazily constructed integration clients.
+
+Client libraries (slack_sdk, openai, PyGithub, jira, googleapiclient) are
+imported inside the factories below, so an integration that is never used,
+or not configured, costs no import time or memory. Clients are built on
+first use, or at startup for configured integrations, and cached in a
+``ClientRegistry``. Each tenant being served has a registry of its own
+(see app/core/tenants.py), which ``get_client`` uses for its requests.
+"""
+import json
+import os
+import pickle
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from app.core.config import Settings, deployment_settings
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+
+logger = get_logger("clients")
+
+# If modifying these scopes, delete the file token.pickle.
+CALENDAR_SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+
+def _create_slack_client(config: Settings):
+    from slack_sdk import WebClient
+    return WebClient(token=config.SLACK_BOT_TOKEN, base_url=config.SLACK_API_URL)
+
+def _create_openai_client(config: Settings):
+    from openai import OpenAI
+    return OpenAI(api_key=config.OPENAI_API_KEY, base_url=config.OPENAI_BASE_URL or None)
+
+def _create_github_client(config: Settings):
+    from github import Github
+    return Github(config.GITHUB_TOKEN, base_url=config.GITHUB_API_URL)
+
+def _create_jira_client(config: Settings):
+    from jira import JIRA
+    with observe_upstream("jira", "server_info"):
+        return JIRA(
+            server=config.JIRA_SERVER,
+            basic_auth=(config.JIRA_EMAIL, config.JIRA_API_TOKEN)
+        )
+
+def _load_calendar_credentials():
+    """Load (and refresh or obtain) the Google OAuth credentials."""
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    creds = None
+
+    # The file token.pickle stores the user's access and refresh tokens.
+    if os.path.exists('token.pickle'):
+        try:
+            with open('token.pickle', 'rb') as token:
+                creds = pickle.load(token)
+        except Exception as e:
+            logger.warning(f"Error loading token.pickle: {e}")
+            creds = None
+
+    # If there are no (valid) credentials available, let the user log in.
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+            except Exception as e:
+                logger.warning(f"Error refreshing token: {e}")
+                creds = None
+
+        if not creds:
+            try:
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    'credentials.json', CALENDAR_SCOPES)
+                creds = flow.run_local_server(port=0)
+
+                # Save the credentials for the next run
+                with open('token.pickle', 'wb') as token:
+                    pickle.dump(creds, token)
+            except Exception as e:
+                raise Exception(f"Authentication failed: {e}")
+    return creds
+
+_calendar_document: Optional[Dict] = None
+
+def calendar_discovery_document() -> Dict:
+    """Return the parsed Calendar v3 discovery document, loading it once per process."""
+    global _calendar_document
+    if _calendar_document is None:
+        from googleapiclient.discovery_cache import get_static_doc
+        _calendar_document = json.loads(get_static_doc('calendar', 'v3'))
+    return _calendar_document
+
+def _create_calendar_service(config: Settings):
+    from googleapiclient.discovery import build_from_document
+
+    creds = _load_calendar_credentials()
+    # A custom endpoint points the client at a proxy or a local stand-in
+    client_options = {"api_endpoint": config.GOOGLE_CALENDAR_API_URL} if config.GOOGLE_CALENDAR_API_URL else None
+    with observe_upstream("calendar", "build"):
+        return build_from_document(calendar_discovery_document(), credentials=creds, client_options=client_options)
+
+class ClientSpec(NamedTuple):
+    """How to build one integration client."""
+    factory: Callable[[Settings], Any]
+    is_configured: Callable[[Settings], bool]
+    # httplib2-based clients (Calendar) are not thread-safe; build one per thread
+    thread_local: bool = False
+
+CLIENT_SPECS: Dict[str, ClientSpec] = {
+    "slack": ClientSpec(_create_slack_client, lambda c: bool(c.SLACK_BOT_TOKEN)),
+    "openai": ClientSpec(_create_openai_client, lambda c: bool(c.OPENAI_API_KEY)),
+    "github": ClientSpec(_create_github_client, lambda c: bool(c.GITHUB_TOKEN)),
+    "jira": ClientSpec(_create_jira_client, lambda c: bool(c.JIRA_SERVER and c.JIRA_EMAIL and c.JIRA_API_TOKEN)),
+    "calendar": ClientSpec(_create_calendar_service, lambda c: os.path.exists('credentials.json'), thread_local=True),
+}
+
+class ClientRegistry:
+    """Build integration clients on first use and cache them."""
+
+    def __init__(self, config: Settings, specs: Optional[Dict[str, ClientSpec]] = None):
+        self.config = config
+        self.specs = specs or CLIENT_SPECS
+        self._clients: Dict[str, Any] = {}
+        self._local = threading.local()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def is_configured(self, name: str) -> bool:
+        """Return True if the integration has the settings it needs."""
+        return self.specs[name].is_configured(self.config)
+
+    def configured(self) -> List[str]:
+        """Names of all configured integrations."""
+        return [name for name in self.specs if self.is_configured(name)]
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        Return the client for an integration, building it on first use.
+
+        Args:
+            name: Integration name (slack, openai, github, jira, calendar)
+
+        Returns:
+            The client, or None if the integration is not configured
+        """
+        spec = self.specs[name]
+        if spec.thread_local:
+            cached = getattr(self._local, name, None)
+            if cached is not None and cached[0] == self._generation:
+                return cached[1]
+        else:
+            client = self._clients.get(name)
+            if client is not None:
+                return client
+
+        if not spec.is_configured(self.config):
+            return None
+
+        if spec.thread_local:
+            generation = self._generation
+            client = spec.factory(self.config)
+            setattr(self._local, name, (generation, client))
+            return client
+
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = spec.factory(self.config)
+                self._clients[name] = client
+            return client
+
+    def is_loaded(self, name: str) -> bool:
+        """Return True if a shared client has already been built."""
+        return name in self._clients
+
+    def reset(self, *names: str) -> None:
+        """Drop cached clients (all of them if no names are given)."""
+        with self._lock:
+            for name in names or list(self._clients):
+                self._clients.pop(name, None)
+            self._generation += 1
+
+    def close(self) -> None:
+        """Close the shared clients' connection pools and drop every client."""
+        with self._lock:
+            clients = list(self._clients.values())
+        self.reset()
+        for client in clients:
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.warning(f"Error closing {type(client).__name__}: {e}")
+
+registry = ClientRegistry(deployment_settings())
+
+# Registry of the tenant whose request is being served
+_tenant_registry: ContextVar[Optional[ClientRegistry]] = ContextVar("tenant_registry", default=None)
+
+@contextmanager
+def tenant_clients(tenant_registry: ClientRegistry) -> Iterator[None]:
+    """Have ``get_client`` use a tenant's registry until the block exits."""
+    token = _tenant_registry.set(tenant_registry)
+    try:
+        yield
+    finally:
+        _tenant_registry.reset(token)
+
+def get_client(name: str) -> Optional[Any]:
+    """Return the client for an integration from the current tenant's registry, or the default one."""
+    return (_tenant_registry.get() or registry).get(name)
+
+def reset_clients(*names: str) -> None:
+    """Drop cached clients from the default registry."""
+    registry.reset(*names)
@@ -0,0 +1,156 @@
+"""
+Negotiated response compression for SprintLens.
+
+Responses above ``COMPRESSION_MIN_BYTES`` with a text or JSON content type
+are compressed with brotli or gzip, whichever the client prefers in
+``Accept-Encoding`` (brotli wins a tie). Levels default to the fast end:
+above that, compression costs more CPU than the smaller payload saves on
+the wire for multi-MB responses. Streaming responses are
+compressed chunk by chunk and flushed after each chunk, so NDJSON lines
+still reach the client as they are produced. The time spent compressing
+before the response starts (all of it, unless the response streams) is
+reported as the ``compress`` stage in ``Server-Timing``.
+"""
+import time
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.core.timing import get_request_timings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "application/problem+json",
+)
+
+def supported_encodings() -> List[str]:
+    """Content codings the server can produce, most preferred first."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Raw header value, e.g. ``"gzip, br;q=0.9"``
+
+    Returns:
+        "br", "gzip", or None for an uncompressed response
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in supported_encodings():
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class _Compressor:
+    """Incremental brotli or gzip compressor."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.GZIP_COMPRESSION_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.finish() if final else self._compressor.flush())
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large text and JSON responses."""
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+        compress_ms = 0.0
+
+        def record_stage():
+            timings = get_request_timings()
+            if timings is not None and compress_ms:
+                timings.add("compress", compress_ms)
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough, compress_ms
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if not content_type.startswith(COMPRESSIBLE_TYPES) or "content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Hold the start message until the first body chunk tells
+                    # us whether the response is large enough to compress
+                    start_message = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start_message is not None:
+                headers = MutableHeaders(scope=start_message)
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["content-length"]
+
+            started = time.perf_counter()
+            data = compressor.compress(body, final=not more_body)
+            compress_ms += (time.perf_counter() - started) * 1000
+
+            if start_message is not None:
+                if not more_body:
+                    MutableHeaders(scope=start_message)["Content-Length"] = str(len(data))
+                record_stage()
+                await send(start_message)
+                start_message = None
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,32 +1,151 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Tuple
 
 class Settings(BaseSettings):
     # Slack Configuration
     SLACK_BOT_TOKEN: str = ""
     SLACK_USER_TOKEN: str = ""
+    SLACK_API_URL: str = "https://slack.com/api/"
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""
+    OPENAI_BASE_URL: str = ""  # Empty uses the default OpenAI endpoint
     
     # GitHub Configuration
     GITHUB_TOKEN: str = ""
-    GITHUB_REPO: str = ""
+    GITHUB_REPO: str = ""  # Issue creation, release notes, flow metrics and pagination
+    GITHUB_REPOS: str = ""  # Comma-separated owner/name repositories aggregated in repository data and summaries
+    GITHUB_ORG: str = ""  # Without GITHUB_REPOS, aggregate this organization's repositories...
+    GITHUB_TOPIC: str = ""  # ...that have this topic (all of them if empty)
+    GITHUB_FETCH_WORKERS: int = 8  # Repositories fetched concurrently, across all requests
+    GITHUB_API_URL: str = "https://api.github.com"
+    GITHUB_WEBHOOK_SECRET: str = ""  # Enables /api/github/webhook and serving windows from the store
+    GITHUB_RECONCILE_SECONDS: float = 900.0  # Poll between webhooks for missed deliveries; 0 disables
+    GITHUB_RECONCILE_DAYS: int = 14  # Window re-fetched by each reconciliation
     
     # Jira Configuration
     JIRA_SERVER: str = ""
     JIRA_EMAIL: str = ""
     JIRA_API_TOKEN: str = ""
+    JIRA_STORY_POINTS_FIELD: str = "customfield_10016"
+    JIRA_WEBHOOK_SECRET: str = ""  # Enables /api/jira/webhook and serving issues and sprints from the index
+    JIRA_RECONCILE_SECONDS: float = 900.0  # Poll for issues updated since the last one; 0 disables
+    JIRA_RECONCILE_DAYS: int = 14  # Window of issues indexed by the first reconciliation of a project
     
     # Google Calendar Configuration
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:8001/api/calendar/auth/callback"
+    GOOGLE_CALENDAR_API_URL: str = ""  # Empty uses the default Calendar endpoint
     
     # Application Configuration
     DEBUG: bool = True
     LOG_LEVEL: str = "INFO"
+    LOG_DEBUG_SAMPLE_EVERY: int = 10  # Keep 1 in N DEBUG records per call site
+
+    # Startup warm-up and caching
+    WARMUP_ENABLED: bool = True
+    WARMUP_TIMEOUT_SECONDS: float = 30.0
+    DIRECTORY_CACHE_TTL_SECONDS: float = 300.0  # Channel, project and calendar lists
+    RELEASE_NOTES_CACHE_TTL_SECONDS: float = 604800.0  # Notes between tags or past dates
+
+    # Bot activity snapshots
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_REFRESH_SECONDS: float = 300.0
+    SNAPSHOT_DAYS: int = 7
+    SNAPSHOT_CHANNELS: str = ""  # Comma-separated channels always kept fresh
+    SNAPSHOT_IDLE_HOURS: float = 24.0  # Stop refreshing channels not mentioned for this long
+    SNAPSHOT_SUMMARIES: bool = True  # Regenerate summaries when activity changes
+
+    # Pull request flow metrics
+    FLOW_METRICS_DAYS: int = 90  # Window of pull requests kept per repository
+    FLOW_METRICS_SYNC_SECONDS: float = 60.0  # Minimum age before re-listing changed pull requests
+    FLOW_METRICS_REVIEW_WORKERS: int = 8  # Concurrent review listings during a sync
+
+    # Team meeting load (working hours are weekdays in WORK_TIMEZONE)
+    TEAM_CALENDAR_IDS: str = ""  # Comma-separated calendars, usually the members' emails
+    WORK_TIMEZONE: str = "UTC"
+    WORK_DAY_START_HOUR: int = 9
+    WORK_DAY_END_HOUR: int = 17
+    FOCUS_BLOCK_MINUTES: int = 120  # Shortest free stretch counted as focus time
+
+    # Local activity store (SQLite) of every fetched record
+    ACTIVITY_STORE_ENABLED: bool = True
+    ACTIVITY_STORE_PATH: str = "activity.db"
+    ACTIVITY_STORE_MAX_AGE_SECONDS: float = 300.0  # Reuse a fetched window this long; 0 always refetches
+    SEARCH_MAX_CANDIDATES: int = 2000  # Rank at most this many of the newest matches per search
+
+    # Summary prompt size: noise filtering (acknowledgements, repeated alerts, near-duplicates) and pre-summarization
+    NOISE_FILTER_ENABLED: bool = True
+    NEAR_DUPLICATE_SIMILARITY: float = 0.7  # Jaccard similarity of word 3-grams that makes a near-duplicate
+    PROMPT_TARGET_TOKENS: int = 2500  # Budget for messages and items picked by TextRank; 0 sends all messages
+
+    # Summary model routing (models in order of preference, each with its context window in tokens)
+    SUMMARY_MODELS: str = "gpt-3.5-turbo:16385"
+    SUMMARY_LATENCY_SLO_SECONDS: float = 30.0  # Deadline for the whole completion, fallbacks included
+    SUMMARY_MAX_TOKENS: int = 500
+    SUMMARY_TEMPERATURE: float = 0.7
+    SUMMARY_LOCAL_FALLBACK: bool = True  # Extractive summary when no model answers in time
+    MODEL_STATS_WINDOW: int = 50  # Recent calls per model considered for routing
+    MODEL_STATS_TTL_SECONDS: float = 600.0  # Older calls are forgotten, so demoted models are retried
+
+    # Response compression (brotli or gzip, negotiated per request)
+    COMPRESSION_MIN_BYTES: int = 1024
+    GZIP_COMPRESSION_LEVEL: int = 4
+    BROTLI_QUALITY: int = 4
+
+    # Profiling Configuration (requests opt in with X-Profile: 1 or ?profile=1)
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = "profiles"
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+
+    # Multi-tenant workspaces (requests name their tenant with X-Tenant-Key)
+    TENANTS_FILE: str = ""  # JSON registry of tenants and their settings; empty serves only these settings
+    TENANT_POOL_SIZE: int = 32  # Tenants whose clients are kept initialized (least recently used evicted)
+    TENANT_IDLE_SECONDS: float = 900.0  # Close a tenant's clients after this long without requests
+    TENANT_MAX_CONCURRENCY: int = 4  # Requests in flight per tenant, unless its entry sets max_concurrency
+    TENANT_QUEUE_SECONDS: float = 10.0  # Wait this long for a tenant's slot before answering 429
 
     model_config = SettingsConfigDict(env_file=".env")
 
-settings = Settings()
+# The tenant whose request is being served, with its settings
+_tenant: ContextVar[Optional[Tuple[str, Settings]]] = ContextVar("tenant", default=None)
+
+class SettingsProxy:
+    """
+    The settings in effect: inside a tenant's request the tenant's (see
+    app/core/tenants.py), otherwise the deployment's. Assignments change the
+    deployment's settings.
+    """
+
+    def __init__(self, base: Settings):
+        object.__setattr__(self, "_base", base)
+
+    def __getattr__(self, name: str):
+        tenant = _tenant.get()
+        return getattr(tenant[1] if tenant else self._base, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._base, name, value)
+
+settings = SettingsProxy(Settings())
+
+def deployment_settings() -> Settings:
+    """The deployment's own settings, whichever tenant is being served."""
+    return settings._base
+
+def current_tenant() -> Optional[str]:
+    """ID of the tenant whose request is being served, or None for the deployment's own."""
+    tenant = _tenant.get()
+    return tenant[0] if tenant else None
+
+@contextmanager
+def tenant_settings(tenant_id: str, config: Settings) -> Iterator[None]:
+    """Serve a tenant: ``settings`` reads its configuration until the block exits."""
+    token = _tenant.set((tenant_id, config))
+    try:
+        yield
+    finally:
+        _tenant.reset(token)
@@ -0,0 +1,61 @@
+"""
+Sparse fieldsets for the list endpoints.
+
+``fields=title,state`` limits each record to the named fields. Names are
+validated against the record models in ``app.models.schemas``; services use
+the parsed set both to prune records and, where the upstream API supports
+it, to request only the matching upstream fields.
+"""
+from typing import AbstractSet, Dict, FrozenSet, Iterable, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Keys kept on every record regardless of the fieldset (the record type of
+# mixed streams such as the GitHub repository records)
+ALWAYS_KEPT = frozenset({"type"})
+
+def model_fields(*models: Type[BaseModel]) -> FrozenSet[str]:
+    """Union of the field names of the given models."""
+    return frozenset(name for model in models for name in model.model_fields)
+
+def parse_fields(fields: Optional[str], *models: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Parse and validate a ``fields`` query parameter.
+
+    Args:
+        fields: Comma-separated field names, or None for all fields
+        models: Record models the names must belong to
+
+    Returns:
+        Set of field names, or None when no projection was requested
+
+    Raises:
+        HTTPException: 400 naming the unknown fields and the allowed ones
+    """
+    if fields is None:
+        return None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    if not requested:
+        return None
+    allowed = model_fields(*models)
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(sorted(allowed))}",
+        )
+    return requested
+
+def wants_any(fields: Optional[AbstractSet[str]], model: Type[BaseModel]) -> bool:
+    """True if a fieldset selects at least one field of ``model`` (or is None)."""
+    return fields is None or not fields.isdisjoint(model.model_fields)
+
+def project(record: Dict, fields: Optional[AbstractSet[str]]) -> Dict:
+    """Keep only the requested keys of a record."""
+    if fields is None:
+        return record
+    return {key: value for key, value in record.items() if key in fields or key in ALWAYS_KEPT}
+
+def project_all(records: Iterable[Dict], fields: Optional[AbstractSet[str]]) -> list:
+    return [project(record, fields) for record in records]
@@ -1,46 +1,147 @@
+"""
+Structured, non-blocking logging for SprintLens.
+
+Log calls only enqueue the record; a background ``QueueListener`` thread
+renders it as one JSON line (via structlog) and writes it to stdout, so a
+slow stdout pipe never stalls the event loop.
+"""
+import atexit
+import copy
+import itertools
 import logging
+import queue
 import sys
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+import structlog
+
 from app.core.config import settings
+from app.core.timing import get_request_id
+
+_listener: Optional[QueueListener] = None
+
+class _StructuredQueueHandler(QueueHandler):
+    """Queue handler that keeps extras and exception info for the listener."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, while they are still valid in the caller's
+        # thread, but leave formatting (and exc_info rendering) to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id to records emitted during a request."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            request_id = get_request_id()
+            if request_id:
+                record.request_id = request_id
+        return True
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep one in every ``every`` DEBUG records per call site."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: Dict[Tuple[str, int], itertools.count] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.every == 1:
+            return True
+        key = (record.pathname, record.lineno)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        return next(counter) % self.every == 0
+
+class IntegrationLogger(logging.LoggerAdapter):
+    """Logger adapter that tags every record with its integration name."""
+
+    def process(self, msg, kwargs):
+        kwargs["extra"] = {**self.extra, **(kwargs.get("extra") or {})}
+        return msg, kwargs
+
+def get_logger(integration: str) -> IntegrationLogger:
+    """
+    Return a logger for an integration or service module.
+
+    Args:
+        integration: Integration name added to every record (slack, github, ...)
+    """
+    return IntegrationLogger(logging.getLogger(f"sprintlens.{integration}"), {"integration": integration})
+
+def _build_formatter() -> logging.Formatter:
+    return structlog.stdlib.ProcessorFormatter(
+        foreign_pre_chain=[
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.ExtraAdder(),
+        ],
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(default=str),
+        ],
+    )
 
 def setup_logging(log_level: Optional[str] = None) -> logging.Logger:
     """
-    Set up application logging with proper formatting and handlers.
-    
+    Set up application logging with a queue handler and a background JSON writer.
+
+    Safe to call more than once; the previous listener is stopped first.
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-    
+
     Returns:
         Configured logger instance
     """
+    global _listener
+
     # Use environment log level or default to INFO
-    level = log_level or settings.LOG_LEVEL or "INFO"
-    
-    # Create logger
+    level = getattr(logging, (log_level or settings.LOG_LEVEL or "INFO").upper())
+
+    shutdown_logging()
+
+    # The listener thread does the formatting and the (possibly slow) write
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(_build_formatter())
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _StructuredQueueHandler(log_queue)
+    queue_handler.setLevel(level)
+    queue_handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_EVERY))
+    queue_handler.addFilter(RequestContextFilter())
+
     logger = logging.getLogger("sprintlens")
-    logger.setLevel(getattr(logging, level.upper()))
-    
-    # Remove existing handlers to avoid duplicates
+    logger.setLevel(level)
     logger.handlers.clear()
-    
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, level.upper()))
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(funcName)s:%(lineno)d - %(message)s'
-    )
-    console_handler.setFormatter(formatter)
-    
-    # Add handler to logger
-    logger.addHandler(console_handler)
-    
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+    _listener.start()
+
     # Set up third-party loggers
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("fastapi").setLevel(logging.INFO)
-    
+
     return logger
 
-# Create default logger instance
-logger = setup_logging() 
\ No newline at end of file
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
+# Application logger; handlers are attached by setup_logging() at startup
+logger = logging.getLogger("sprintlens")
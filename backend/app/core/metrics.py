@@ -0,0 +1,240 @@
+"""
+Lightweight Prometheus metrics for SprintLens.
+
+Metrics live in process memory and are rendered in the Prometheus text
+exposition format by the ``/metrics`` endpoint. Each metric guards its
+samples with a single lock that is only held for a dictionary update, so
+recording a sample costs well under a microsecond on the request path.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from fast cache hits up to slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: List["_Metric"] = []
+
+logger = logging.getLogger("sprintlens.metrics")
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    """Base class holding the name, help text and label names of a metric."""
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _check_labels(self, labels: Tuple[str, ...]) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the counter for the given label values."""
+        self._check_labels(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def get(self, *labels: str) -> float:
+        """Return the current value for the given label values."""
+        return self._values.get(labels, 0.0)
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+class Histogram(_Metric):
+    """Histogram with fixed upper bounds, rendered with cumulative buckets."""
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation for the given label values."""
+        self._check_labels(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[labels] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get_count(self, *labels: str) -> int:
+        """Return the number of observations for the given label values."""
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def _render_samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(state[0]), state[1], state[2]) for labels, state in self._values.items()]
+        lines = []
+        bucket_names = self.labelnames + ("le",)
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                label_str = _format_labels(bucket_names, labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+# Application metrics
+REQUEST_LATENCY = Histogram(
+    "sprintlens_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+UPSTREAM_LATENCY = Histogram(
+    "sprintlens_upstream_request_duration_seconds",
+    "Latency of calls to external integrations",
+    ("integration", "method"),
+)
+UPSTREAM_ERRORS = Counter(
+    "sprintlens_upstream_errors_total",
+    "Failed calls to external integrations",
+    ("integration", "method"),
+)
+OPENAI_TOKENS = Counter(
+    "sprintlens_openai_tokens_total",
+    "OpenAI tokens consumed",
+    ("model", "type"),
+)
+LLM_LATENCY = Histogram(
+    "sprintlens_llm_request_duration_seconds",
+    "Latency of summary completions by model and outcome",
+    ("model", "outcome"),
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0),
+)
+PROMPT_TOKENS_SAVED = Counter(
+    "sprintlens_prompt_tokens_saved_total",
+    "Estimated prompt tokens saved by filtering noise from messages",
+)
+WEBHOOK_EVENTS = Counter(
+    "sprintlens_webhook_events_total",
+    "Webhook deliveries by integration, event and outcome",
+    ("integration", "event", "outcome"),
+)
+CACHE_REQUESTS = Counter(
+    "sprintlens_cache_requests_total",
+    "Cache lookups by cache name and result",
+    ("cache", "result"),
+)
+TENANT_EVENTS = Counter(
+    "sprintlens_tenant_events_total",
+    "Tenant client pools built and evicted, and tenant requests rejected",
+    ("event",),
+)
+
+@contextmanager
+def observe_upstream(integration: str, method: str) -> Iterator[None]:
+    """
+    Time a call to an external integration and count it as an error if it raises.
+
+    Args:
+        integration: Integration name (slack, github, jira, calendar, openai)
+        method: Upstream method being called
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(integration, method)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_LATENCY.observe(elapsed, integration, method)
+        # High-volume event; sampled per call site by the logging pipeline
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"{integration}.{method} took {elapsed * 1000:.1f}ms",
+                extra={"integration": integration, "upstream_method": method, "duration_ms": round(elapsed * 1000, 1)},
+            )
+
+def record_token_usage(model: str, usage) -> None:
+    """Record prompt and completion token counts from an OpenAI usage object."""
+    if usage is None:
+        return
+    OPENAI_TOKENS.inc(model, "prompt", amount=getattr(usage, "prompt_tokens", 0) or 0)
+    OPENAI_TOKENS.inc(model, "completion", amount=getattr(usage, "completion_tokens", 0) or 0)
+
+def record_llm_call(model: str, latency: float, ok: bool) -> None:
+    """Record the latency and outcome of a summary completion (or local fallback)."""
+    LLM_LATENCY.observe(latency, model, "ok" if ok else "error")
+
+def record_prompt_savings(tokens: int) -> None:
+    """Count prompt tokens saved by the noise filter."""
+    PROMPT_TOKENS_SAVED.inc(amount=tokens)
+
+def record_webhook_event(integration: str, event: str, outcome: str) -> None:
+    """Count a webhook delivery (outcome: stored, applied, stale, duplicate, ignored or rejected)."""
+    WEBHOOK_EVENTS.inc(integration, event, outcome)
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache lookup as a hit or a miss."""
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+def record_tenant_event(event: str) -> None:
+    """Count a tenant event (built, evicted, unknown_key or throttled)."""
+    TENANT_EVENTS.inc(event)
+
+def render_latest() -> str:
+    """Render all registered metrics in the Prometheus text format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,143 @@
+"""
+Cursor pagination and NDJSON streaming for the list endpoints.
+
+Services expose a ``fetch_*_page(..., token)`` function returning one
+upstream page as a ``Page``; the token is whatever the upstream uses to
+address a page (a Slack cursor, a Jira ``startAt``, a Calendar page token,
+a GitHub page number). ``Paginator`` walks those pages lazily, so only one
+upstream page is held in memory at a time, and turns its position into an
+opaque cursor: the token of the current page plus the number of records of
+that page already returned. Tokens also pin the time window the first page
+was fetched with, so a window relative to "now" does not move while a
+client pages through it.
+"""
+import base64
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.logging import get_logger
+from app.core.responses import FastJSONResponse
+
+logger = get_logger("pagination")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+class Page(NamedTuple):
+    """One upstream page of records."""
+    items: List[Dict]
+    next_token: Any = None
+
+def encode_cursor(token: Any, offset: int) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps([token, offset])).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        token, offset = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError("negative offset")
+        return token, offset
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+class Paginator:
+    """
+    Iterate records across upstream pages, starting at a cursor.
+
+    Iteration stops after ``limit`` records (None for no limit); afterwards
+    ``next_cursor`` addresses the first record not returned, or is None when
+    the window is exhausted.
+    """
+
+    def __init__(self, fetch_page: Callable[[Any], Page], cursor: Optional[str] = None,
+                 limit: Optional[int] = None):
+        self.fetch_page = fetch_page
+        self.token, self.offset = decode_cursor(cursor) if cursor else (None, 0)
+        self.limit = limit
+        self.next_cursor: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Dict]:
+        token, offset, returned = self.token, self.offset, 0
+        while True:
+            page = self.fetch_page(token)
+            for index in range(offset, len(page.items)):
+                if self.limit is not None and returned >= self.limit:
+                    self.next_cursor = encode_cursor(token, index)
+                    return
+                yield page.items[index]
+                returned += 1
+            if page.next_token is None:
+                return
+            if self.limit is not None and returned >= self.limit:
+                self.next_cursor = encode_cursor(page.next_token, 0)
+                return
+            token, offset = page.next_token, 0
+
+def wants_ndjson(request: Request, format: Optional[str]) -> bool:
+    """True if the client asked for NDJSON via ``?format=ndjson`` or the Accept header."""
+    if format:
+        return format == "ndjson"
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def ndjson_response(paginator: Paginator) -> StreamingResponse:
+    """
+    Stream records as NDJSON while they are fetched.
+
+    If the stream stops at the limit, the last line is ``{"next_cursor": ...}``.
+    An upstream failure after the response has started cannot change the
+    status code, so it ends the stream with an ``{"error": ...}`` line.
+    """
+    def lines() -> Iterator[bytes]:
+        try:
+            for record in paginator:
+                yield orjson.dumps(record) + b"\n"
+        except Exception as e:
+            logger.error(f"Streaming failed: {e}")
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+            return
+        if paginator.next_cursor:
+            yield orjson.dumps({"next_cursor": paginator.next_cursor}) + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+def is_paginated(request: Request, limit: Optional[int], cursor: Optional[str], format: Optional[str]) -> bool:
+    """True if the request uses pagination or streaming rather than the full document."""
+    return limit is not None or cursor is not None or wants_ndjson(request, format)
+
+def paginated_response(request: Request, fetch_page: Callable[[Any], Page], key: str,
+                       limit: Optional[int], cursor: Optional[str], format: Optional[str],
+                       collect: Optional[Callable[[Iterable[Dict]], Dict]] = None):
+    """
+    Answer a list request with one page of JSON or an NDJSON stream.
+
+    Args:
+        request: Incoming request, for content negotiation
+        fetch_page: Service function fetching one upstream page by token
+        key: Name of the record list in the JSON document
+        limit: Maximum records; defaults to DEFAULT_PAGE_LIMIT for JSON and
+            to the whole window for NDJSON
+        cursor: Cursor from a previous page
+        format: "json" or "ndjson" (overrides the Accept header)
+        collect: Builds the JSON document from the records, for endpoints
+            whose document is not a single ``{key: [...]}`` list
+
+    Returns:
+        FastJSONResponse with ``next_cursor``, or a streaming NDJSON response
+    """
+    ndjson = wants_ndjson(request, format)
+    paginator = Paginator(fetch_page, cursor, limit if limit is not None or ndjson else DEFAULT_PAGE_LIMIT)
+    if ndjson:
+        return ndjson_response(paginator)
+    document = collect(paginator) if collect else {key: list(paginator)}
+    document["next_cursor"] = paginator.next_cursor
+    return FastJSONResponse(document)
@@ -0,0 +1,159 @@
+"""
+On-demand request profiling for SprintLens.
+
+When ``PROFILING_ENABLED`` is set, a request carrying an ``X-Profile: 1``
+header or a ``profile=1`` query parameter runs under a sampling profiler.
+The sampler walks the stacks of every thread, so it also covers service
+calls running in the threadpool, and keeps only stacks that pass through
+application code. The result is stored as collapsed stacks (the input
+format of flamegraph.pl and speedscope) next to a JSON file describing the
+route, the names of the query parameters and the timings; request bodies
+and query values are not stored, since they can hold tokens and user
+content. Stopping the sampler and writing the files happen in a worker
+thread, so a profiled request does not stall the event loop. When
+profiling is disabled the middleware is not installed at all.
+"""
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.timing import get_request_id
+
+logger = get_logger("profiling")
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+class StackSampler:
+    """Background thread sampling the stacks of all other threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sprintlens-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample_count += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(APP_DIR):
+                        in_app = True
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                # Idle workers and the event loop waiting on I/O are noise
+                if in_app:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Render the samples as collapsed stacks, one ``stack count`` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def profile_path(profile_id: str, extension: str) -> Optional[str]:
+    """Return the file path of a stored profile, or None for an invalid id."""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    return os.path.join(settings.PROFILE_DIR, f"{profile_id}.{extension}")
+
+def _profiling_requested(scope) -> bool:
+    if Headers(scope=scope).get("x-profile", "").lower() in ("1", "true", "yes"):
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return query.get("profile", [""])[0].lower() in ("1", "true", "yes")
+
+class ProfilingMiddleware:
+    """ASGI middleware running flagged requests under the stack sampler."""
+
+    def __init__(self, app):
+        self.app = app
+        # One profiled request at a time keeps the samples attributable
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not self._lock.acquire(blocking=False):
+            logger.warning("Profiling request skipped: another profile is in progress")
+            await self.app(scope, receive, send)
+            return
+
+        request_id = get_request_id()
+        profile_id = request_id if request_id and PROFILE_ID_PATTERN.match(request_id) else uuid.uuid4().hex
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            route = scope.get("route")
+            metadata = {
+                "profile_id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "query_parameters": sorted(parse_qs(scope.get("query_string", b"").decode("latin-1"))),
+                "duration_ms": round(duration_ms, 1),
+                "interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+                "format": "collapsed",
+            }
+            # Joining the sampler and writing files would block the event loop
+            await anyio.to_thread.run_sync(self._finish, profile_id, sampler, metadata)
+
+    def _finish(self, profile_id: str, sampler: StackSampler, metadata: Dict) -> None:
+        """Stop the sampler, store its profile and let the next profiled request in."""
+        try:
+            sampler.stop()
+            metadata["samples"] = sampler.sample_count
+            self._store(profile_id, sampler, metadata)
+        finally:
+            self._lock.release()
+
+    def _store(self, profile_id: str, sampler: StackSampler, metadata: Dict) -> None:
+        try:
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            with open(profile_path(profile_id, "collapsed"), "w") as f:
+                f.write(sampler.collapsed())
+            with open(profile_path(profile_id, "json"), "w") as f:
+                json.dump(metadata, f, indent=2, default=str)
+            logger.info(
+                f"Stored profile {profile_id} for {metadata['method']} {metadata['path']}",
+                extra={"profile_id": profile_id, "route": metadata["route"], "samples": metadata["samples"]},
+            )
+        except OSError as e:
+            logger.error(f"Failed to store profile {profile_id}: {e}")
@@ -0,0 +1,25 @@
+"""
+Response classes for SprintLens.
+
+``FastJSONResponse`` serializes with orjson and is the app's default
+response class. FastAPI still runs ``jsonable_encoder`` over values a route
+returns, which for large lists of dicts costs several times the
+serialization itself, so routes returning large payloads construct the
+response directly and skip it. Values orjson cannot serialize natively
+(pydantic models, sets) fall back to ``jsonable_encoder``.
+"""
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=jsonable_encoder,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
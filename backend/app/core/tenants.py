@@ -0,0 +1,314 @@
+"""
+Multi-tenant workspaces.
+
+One deployment can serve many teams, each with its own Slack, GitHub, Jira
+and OpenAI credentials. TENANTS_FILE registers them as JSON:
+
+    {"payments": {"api_key": "...", "max_concurrency": 2,
+                  "settings": {"SLACK_BOT_TOKEN": "xoxb-...", "GITHUB_TOKEN": "ghp_...",
+                               "GITHUB_REPOS": "acme/pay-api,acme/pay-web"}}}
+
+A request names its tenant with the tenant's key in the X-Tenant-Key
+header. ``TenantMiddleware`` resolves the key and serves the request with
+the tenant's settings and its own client registry. A tenant inherits the
+deployment's tuning settings, but none of its credentials or integrations
+(``TENANT_PRIVATE_SETTINGS``): those are empty unless the entry sets them,
+and the deployment's Google Calendar credential files are never used.
+Requests without a key are served with the deployment's settings. The file is re-read when it changes.
+
+Initialized tenants (settings, clients and their connection pools) are kept
+in a ``TenantPool`` of at most TENANT_POOL_SIZE tenants, evicting the least
+recently used; a tenant without requests for TENANT_IDLE_SECONDS has its
+clients closed. A tenant has at most TENANT_MAX_CONCURRENCY requests in
+flight (or its entry's max_concurrency); further requests wait up to
+TENANT_QUEUE_SECONDS for a slot and are then answered 429. Routes do their
+blocking upstream calls in the threadpool (plain ``def`` endpoints or
+``run_in_threadpool``), never on the event loop, so this bounds the worker
+threads one team's large summaries can hold; it cannot help against a route
+that blocks the loop, which stalls every tenant.
+
+Each tenant has its own activity store (ACTIVITY_STORE_PATH suffixed with
+the tenant id, unless its settings name one), and caches are kept per
+tenant. The bot's snapshots of pooled tenants are refreshed with their own
+settings; webhooks, reconciliation and the startup warm-up serve the
+deployment's.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from app.core.clients import CLIENT_SPECS, ClientRegistry, tenant_clients
+from app.core.config import Settings, deployment_settings, tenant_settings
+from app.core.logging import get_logger
+from app.core.metrics import record_tenant_event
+
+logger = get_logger("tenants")
+
+TENANT_HEADER = "x-tenant-key"
+# Tenant ids also name their activity store files
+TENANT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+class TenantConfig(NamedTuple):
+    """A tenant's entry in TENANTS_FILE."""
+    id: str
+    overrides: Dict[str, Any]
+    max_concurrency: Optional[int] = None
+
+def _key_digest(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+# Credentials, and the repositories, projects, channels and calendars they
+# reach: a tenant never inherits the deployment's
+TENANT_PRIVATE_SETTINGS = frozenset({
+    "SLACK_BOT_TOKEN", "SLACK_USER_TOKEN", "OPENAI_API_KEY",
+    "GITHUB_TOKEN", "GITHUB_REPO", "GITHUB_REPOS", "GITHUB_ORG", "GITHUB_TOPIC", "GITHUB_WEBHOOK_SECRET",
+    "JIRA_SERVER", "JIRA_EMAIL", "JIRA_API_TOKEN", "JIRA_WEBHOOK_SECRET",
+    "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "TEAM_CALENDAR_IDS", "SNAPSHOT_CHANNELS", "TENANTS_FILE",
+})
+
+# Calendar credentials are the deployment's credentials.json and token.pickle
+TENANT_CLIENT_SPECS = {**CLIENT_SPECS, "calendar": CLIENT_SPECS["calendar"]._replace(is_configured=lambda c: False)}
+
+def build_settings(config: TenantConfig) -> Settings:
+    """
+    A tenant's settings: the deployment's tuning settings, its private
+    settings left empty, overridden by its entry, with its own activity store.
+    """
+    base = deployment_settings()
+    values = base.model_dump()
+    for name in TENANT_PRIVATE_SETTINGS:
+        values[name] = Settings.model_fields[name].default
+    values.update(config.overrides)
+    if "ACTIVITY_STORE_PATH" not in config.overrides:
+        root, ext = os.path.splitext(base.ACTIVITY_STORE_PATH)
+        values["ACTIVITY_STORE_PATH"] = f"{root}-{config.id}{ext}"
+    return Settings(**values)
+
+def load_tenants(path: str) -> Dict[str, TenantConfig]:
+    """
+    Read a tenants file, skipping (and logging) invalid entries.
+
+    Args:
+        path: JSON file of tenant id -> {"api_key", "settings", "max_concurrency"}
+
+    Returns:
+        Tenants by the SHA-256 digest of their key
+    """
+    with open(path) as f:
+        entries = json.load(f)
+    tenants = {}
+    for tenant_id, entry in entries.items():
+        if not TENANT_ID_PATTERN.fullmatch(tenant_id) or not entry.get("api_key"):
+            logger.error(f"Skipping tenant {tenant_id!r}: ids are letters, digits, - and _, and an api_key is required")
+            continue
+        config = TenantConfig(tenant_id, dict(entry.get("settings") or {}), entry.get("max_concurrency"))
+        try:
+            build_settings(config)
+        except Exception as e:
+            logger.error(f"Skipping tenant {tenant_id!r}: invalid settings: {e}")
+            continue
+        tenants[_key_digest(entry["api_key"])] = config
+    return tenants
+
+class TenantRegistry:
+    """The tenants of TENANTS_FILE, re-read when the file changes."""
+
+    def __init__(self):
+        self._source = None
+        self._tenants: Dict[str, TenantConfig] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, key: str) -> Optional[TenantConfig]:
+        """The tenant with an API key, or None."""
+        self._refresh()
+        return self._tenants.get(_key_digest(key))
+
+    def _refresh(self) -> None:
+        path = deployment_settings().TENANTS_FILE
+        try:
+            source = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            source = (path, None)
+        if source == self._source:
+            return
+        with self._lock:
+            if source == self._source:
+                return
+            if source[1] is None:
+                logger.error(f"Tenants file {path} not found")
+                self._tenants = {}
+            else:
+                try:
+                    self._tenants = load_tenants(path)
+                    logger.info(f"Loaded {len(self._tenants)} tenants from {path}")
+                except Exception as e:
+                    # Keep serving the tenants loaded before
+                    logger.error(f"Error loading tenants from {path}: {e}")
+            self._source = source
+
+class Tenant:
+    """An initialized tenant: settings, client registry and request slots."""
+
+    def __init__(self, config: TenantConfig):
+        self.config = config
+        self.settings = build_settings(config)
+        self.clients = ClientRegistry(self.settings, TENANT_CLIENT_SPECS)
+        self.slots = asyncio.Semaphore(max(1, config.max_concurrency or deployment_settings().TENANT_MAX_CONCURRENCY))
+        self.active = 0
+        self.last_used = time.monotonic()
+
+    @contextmanager
+    def scope(self) -> Iterator[None]:
+        """Serve this tenant: its settings and clients are used until the block exits."""
+        with tenant_settings(self.config.id, self.settings), tenant_clients(self.clients):
+            yield
+
+    def close(self) -> None:
+        self.clients.close()
+        record_tenant_event("evicted")
+        logger.info(f"Closed clients of tenant {self.config.id}")
+
+class TenantPool:
+    """
+    Initialized tenants, least recently used first.
+
+    Tenants with requests in flight are never evicted, so the pool can
+    briefly exceed its size. The pool isolates settings, clients and request
+    slots; CPU, the event loop and the threadpool remain shared.
+    """
+
+    def __init__(self):
+        self._tenants: "OrderedDict[str, Tenant]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def checkout(self, config: TenantConfig) -> Tenant:
+        """Get (or initialize) a tenant for a request; hand it back with ``release``."""
+        closing = []
+        with self._lock:
+            tenant = self._tenants.get(config.id)
+            if tenant is not None and tenant.config != config:
+                # The tenants file changed the entry
+                del self._tenants[config.id]
+                if tenant.active == 0:
+                    closing.append(tenant)
+                tenant = None
+            if tenant is None:
+                tenant = Tenant(config)
+                self._tenants[config.id] = tenant
+                record_tenant_event("built")
+            self._tenants.move_to_end(config.id)
+            tenant.active += 1
+            tenant.last_used = time.monotonic()
+            closing.extend(self._evict())
+        for evicted in closing:
+            evicted.close()
+        return tenant
+
+    def release(self, tenant: Tenant) -> None:
+        with self._lock:
+            tenant.active -= 1
+            tenant.last_used = time.monotonic()
+
+    def _evict(self) -> List[Tenant]:
+        """Remove idle tenants, and inactive ones beyond the pool size (least recently used first)."""
+        config = deployment_settings()
+        now = time.monotonic()
+        evicted = []
+        for tenant_id, tenant in list(self._tenants.items()):
+            if tenant.active:
+                continue
+            if len(self._tenants) > config.TENANT_POOL_SIZE or now - tenant.last_used > config.TENANT_IDLE_SECONDS:
+                del self._tenants[tenant_id]
+                evicted.append(tenant)
+        return evicted
+
+    @contextmanager
+    def serve(self, tenant_id: str) -> Iterator[bool]:
+        """
+        Serve a pooled tenant outside a request, e.g. in a background refresh.
+
+        Yields False, serving nothing, if the tenant is not in the pool. The
+        tenant cannot be evicted meanwhile, and does not count as used.
+        """
+        with self._lock:
+            tenant = self._tenants.get(tenant_id)
+            if tenant is not None:
+                tenant.active += 1
+        if tenant is None:
+            yield False
+            return
+        try:
+            with tenant.scope():
+                yield True
+        finally:
+            with self._lock:
+                tenant.active -= 1
+
+    def tenants(self) -> List[str]:
+        """IDs of the initialized tenants, least recently used first."""
+        with self._lock:
+            return list(self._tenants)
+
+    def clear(self) -> None:
+        with self._lock:
+            tenants = list(self._tenants.values())
+            self._tenants.clear()
+        for tenant in tenants:
+            tenant.clients.close()
+
+tenant_registry = TenantRegistry()
+tenant_pool = TenantPool()
+
+class TenantMiddleware:
+    """
+    ASGI middleware serving each request as the tenant named by its X-Tenant-Key.
+
+    Unknown keys are answered 401, and requests that find no free slot of
+    their tenant within TENANT_QUEUE_SECONDS 429. Without TENANTS_FILE
+    every request is served with the deployment's settings.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        config = deployment_settings()
+        key = Headers(scope=scope).get(TENANT_HEADER) if scope["type"] == "http" and config.TENANTS_FILE else None
+        if not key:
+            await self.app(scope, receive, send)
+            return
+        tenant_config = tenant_registry.resolve(key)
+        if tenant_config is None:
+            record_tenant_event("unknown_key")
+            await JSONResponse({"detail": "Unknown tenant key"}, status_code=401)(scope, receive, send)
+            return
+
+        tenant = tenant_pool.checkout(tenant_config)
+        try:
+            try:
+                await asyncio.wait_for(tenant.slots.acquire(), config.TENANT_QUEUE_SECONDS)
+            except asyncio.TimeoutError:
+                record_tenant_event("throttled")
+                response = JSONResponse({"detail": f"Too many concurrent requests for tenant {tenant_config.id}"},
+                                        status_code=429,
+                                        headers={"Retry-After": str(max(1, math.ceil(config.TENANT_QUEUE_SECONDS)))})
+                await response(scope, receive, send)
+                return
+            try:
+                with tenant.scope():
+                    await self.app(scope, receive, send)
+            finally:
+                tenant.slots.release()
+        finally:
+            tenant_pool.release(tenant)
@@ -0,0 +1,77 @@
+"""
+Request-scoped stage timings for SprintLens.
+
+The request timing middleware opens a ``RequestTimings`` context for every
+HTTP request. Services record their stages (``slack_fetch``, ``llm``, ...)
+into it with ``timed_stage``; the middleware then reports them in the
+``Server-Timing`` header and the access log. Outside a request the stages
+are not recorded.
+"""
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+class RequestTimings:
+    """Accumulated stage durations (in milliseconds) for one request."""
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id or uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, duration_ms: float) -> None:
+        """Add a duration to a stage; repeated stages are summed."""
+        # Stages may be recorded from worker threads running in parallel
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + duration_ms
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the request started."""
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing_header(self) -> str:
+        """Format the stages and total time as a Server-Timing header value."""
+        entries = [f"{stage};dur={duration:.1f}" for stage, duration in self.stages.items()]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request_timings(request_id: Optional[str] = None) -> RequestTimings:
+    """Open a timing context for the current request."""
+    timings = RequestTimings(request_id)
+    _current_timings.set(timings)
+    return timings
+
+def get_request_timings() -> Optional[RequestTimings]:
+    """Return the timing context of the current request, if any."""
+    return _current_timings.get()
+
+def get_request_id() -> Optional[str]:
+    """Return the id of the current request, if any."""
+    timings = _current_timings.get()
+    return timings.request_id if timings else None
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """
+    Record the duration of a stage in the current request's timing context.
+
+    Can be used as a context manager or as a function decorator.
+
+    Args:
+        stage: Stage name reported in the Server-Timing header
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,130 @@
+"""
+Startup warm-up for SprintLens.
+
+The first request after a deploy would otherwise pay for importing the
+client libraries, TCP/TLS handshakes to every upstream, Jira server-info
+negotiation, the Calendar discovery document and the directory lookups.
+``run_warmup`` does that work for the configured integrations concurrently
+while the app starts, and ``/health/ready`` reports not-ready until it has
+finished, so a load balancer never routes traffic to a cold instance.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from app.core.clients import calendar_discovery_document, get_client, registry
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+
+logger = get_logger("warmup")
+
+def _warm_slack() -> None:
+    from app.services.slack_service import list_channels
+    list_channels.refresh()
+
+def _warm_openai() -> None:
+    client = get_client("openai")
+    # Opens a pooled keep-alive connection to the API
+    with observe_upstream("openai", "models.list"):
+        client.models.list()
+
+def _warm_github() -> None:
+    from app.services.github_service import configured_repositories
+    client = get_client("github")
+    # The aggregated repositories (listing GITHUB_ORG's), and GITHUB_REPO for issues and release notes
+    names = list(dict.fromkeys(configured_repositories() + ([settings.GITHUB_REPO] if settings.GITHUB_REPO else [])))
+
+    def warm(name: str) -> None:
+        with observe_upstream("github", "get_repo"):
+            client.get_repo(name)
+    with ThreadPoolExecutor(max_workers=max(1, min(len(names), settings.GITHUB_FETCH_WORKERS))) as pool:
+        list(pool.map(warm, names))
+
+def _warm_jira() -> None:
+    from app.services.jira_service import get_projects
+    get_client("jira")
+    get_projects.refresh()
+
+def _warm_calendar() -> None:
+    calendar_discovery_document()
+    # Without a stored token, building the service would start the
+    # interactive OAuth flow; leave that to setup_calendar.py
+    if not os.path.exists('token.pickle'):
+        return
+    from app.services.calendar_service import get_calendar_list
+    get_calendar_list.refresh()
+
+WARMUP_TASKS: Dict[str, Callable[[], None]] = {
+    "slack": _warm_slack,
+    "openai": _warm_openai,
+    "github": _warm_github,
+    "jira": _warm_jira,
+    "calendar": _warm_calendar,
+}
+
+class WarmupState:
+    """Progress of the startup warm-up, reported by the readiness probe."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.integrations: Dict[str, Dict] = {}
+        self.duration_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "complete"
+
+    def as_dict(self) -> Dict:
+        return {"status": self.status, "duration_ms": self.duration_ms, "integrations": self.integrations}
+
+warmup_state = WarmupState()
+
+async def _warm(name: str, task: Callable[[], None], state: WarmupState) -> None:
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(task)
+        state.integrations[name] = {"status": "ok"}
+    except Exception as e:
+        # A failing upstream must not keep the instance out of rotation;
+        # requests will report the error as they do today
+        logger.warning(f"Warm-up of {name} failed: {e}")
+        state.integrations[name] = {"status": "error", "error": str(e)}
+    state.integrations[name]["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+async def run_warmup(state: Optional[WarmupState] = None, timeout: Optional[float] = None) -> WarmupState:
+    """
+    Warm up every configured integration concurrently.
+
+    Args:
+        state: State object to report progress into (defaults to ``warmup_state``)
+        timeout: Seconds to wait before giving up on slow integrations
+
+    Returns:
+        The completed warm-up state
+    """
+    state = state or warmup_state
+    timeout = settings.WARMUP_TIMEOUT_SECONDS if timeout is None else timeout
+    state.status = "running"
+    start = time.perf_counter()
+    names = [name for name in registry.configured() if name in WARMUP_TASKS]
+    for name in names:
+        state.integrations[name] = {"status": "running"}
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(_warm(name, WARMUP_TASKS[name], state) for name in names)), timeout)
+    except asyncio.TimeoutError:
+        for name in names:
+            if state.integrations[name]["status"] == "running":
+                logger.warning(f"Warm-up of {name} did not finish within {timeout}s")
+                state.integrations[name]["status"] = "timeout"
+    state.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+    state.status = "complete"
+    logger.info(f"Warm-up finished in {state.duration_ms}ms", extra={"integrations": state.integrations})
+    return state
+
+def skip_warmup(state: Optional[WarmupState] = None) -> None:
+    """Mark the instance ready without warming up (WARMUP_ENABLED=False)."""
+    (state or warmup_state).status = "complete"
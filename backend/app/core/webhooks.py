@@ -0,0 +1,63 @@
+"""
+Webhook delivery checks shared by the integration receivers.
+
+GitHub (X-Hub-Signature-256) and Jira (X-Hub-Signature) sign deliveries
+the same way: "sha256=" and the hex HMAC-SHA256 of the raw body under the
+webhook's secret. Both also retry deliveries under the same delivery id,
+which ``DeliveryLog`` remembers once the delivery is applied, so a retry
+of an applied delivery is skipped while a retry of a failed one is not.
+"""
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Delivery ids remembered per receiver
+DELIVERY_LOG_SIZE = 10000
+
+def signature_matches(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """
+    Check a delivery's signature header.
+
+    Args:
+        secret: Webhook secret (an empty secret matches nothing)
+        body: Raw request body
+        signature: Header value ("sha256=" and the hex HMAC of the body)
+
+    Returns:
+        True if the signature matches
+    """
+    if not secret or not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+class DeliveryLog:
+    """The most recent delivery ids seen by a receiver."""
+
+    def __init__(self, size: int = DELIVERY_LOG_SIZE):
+        self.size = size
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, delivery_id: Optional[str]) -> bool:
+        """True if a delivery id was applied before (deliveries without one never were)."""
+        if not delivery_id:
+            return False
+        with self._lock:
+            return delivery_id in self._ids
+
+    def record(self, delivery_id: Optional[str]) -> None:
+        """Remember a delivery once it has been applied, so a failed one is applied again when retried."""
+        if not delivery_id:
+            return
+        with self._lock:
+            self._ids[delivery_id] = None
+            self._ids.move_to_end(delivery_id)
+            if len(self._ids) > self.size:
+                self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
@@ -4,11 +4,24 @@ AI-powered sprint summary tool with integrations for Slack, GitHub, Jira, and Go
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.datastructures import Headers, MutableHeaders
 from contextlib import asynccontextmanager
+import asyncio
+import os
 from app.core.config import settings
-from app.core.logging import logger, setup_logging
+from app.core.logging import logger, setup_logging, shutdown_logging
 from app.core.exceptions import SprintLensException, APIError
+from app.core.metrics import REQUEST_LATENCY
+from app.core.timing import start_request_timings
+from app.core.compression import CompressionMiddleware
+from app.core.profiling import ProfilingMiddleware, profile_path
+from app.core.tenants import TenantMiddleware, tenant_pool
+from app.core.responses import FastJSONResponse
+from app.core.warmup import run_warmup, skip_warmup
+from app.services.snapshot_service import run_refresher
+from app.services.github_webhook_service import run_reconciler as run_github_reconciler
+from app.services.jira_webhook_service import run_reconciler as run_jira_reconciler
 from app.routers.slack import router as slack_router
 from app.routers.summary import router as summary_router
 from app.routers.github import router as github_router
@@ -16,6 +29,9 @@ from app.routers.jira import router as jira_router
 from app.routers.bot import router as bot_router
 from app.routers.calendar import router as calendar_router
 from app.routers.health import router as health_router
+from app.routers.metrics import router as metrics_router
+from app.routers.activity import router as activity_router
+from app.routers.search import router as search_router
 
 # Setup logging
 setup_logging(settings.LOG_LEVEL)
@@ -33,10 +49,43 @@ async def lifespan(app: FastAPI):
     if not settings.SLACK_BOT_TOKEN:
         logger.warning("Slack bot token not configured")
     
+    # Warm up in the background; /health/ready reports not-ready until done
+    warmup_task = None
+    if settings.WARMUP_ENABLED:
+        warmup_task = asyncio.create_task(run_warmup())
+    else:
+        skip_warmup()
+    
+    # Keep the bot's per-channel activity snapshots fresh
+    refresher_task = None
+    if settings.SNAPSHOT_ENABLED and settings.SLACK_BOT_TOKEN:
+        refresher_task = asyncio.create_task(run_refresher())
+    
+    # With webhooks keeping the activity store current, poll only to catch missed deliveries
+    reconciler_tasks = []
+    if settings.GITHUB_WEBHOOK_SECRET and settings.GITHUB_TOKEN and settings.GITHUB_RECONCILE_SECONDS > 0:
+        reconciler_tasks.append(asyncio.create_task(run_github_reconciler()))
+    if settings.JIRA_WEBHOOK_SECRET and settings.JIRA_API_TOKEN and settings.JIRA_RECONCILE_SECONDS > 0:
+        reconciler_tasks.append(asyncio.create_task(run_jira_reconciler()))
+    
     yield
     
     # Shutdown
     logger.info("Shutting down SprintLens API...")
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    if refresher_task is not None:
+        refresher_task.cancel()
+    for task in reconciler_tasks:
+        task.cancel()
+    tenant_pool.clear()
+    shutdown_logging()
+
+ALLOWED_ORIGINS = [
+    "http://localhost:5173",  # Vite dev server
+    "http://localhost:3000",  # React dev server
+    "http://localhost:8080",  # Alternative dev server
+]
 
 # Create FastAPI app
 app = FastAPI(
@@ -45,20 +94,97 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
+access_logger = logger.getChild("access")
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware timing every request.
+
+    Opens the request-scoped timing context that services record their stages
+    into, then reports the stages and total time in a ``Server-Timing`` header,
+    the per-route latency histogram and one structured access-log line.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        request_id = request_headers.get("x-request-id")
+        if not request_id or len(request_id) > 128 or not request_id.isprintable():
+            request_id = None
+        timings = start_request_timings(request_id)
+        origin = request_headers.get("origin")
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing_header())
+                headers.append("X-Request-ID", timings.request_id)
+                if origin in ALLOWED_ORIGINS:
+                    # Lets the dashboard read the timings from another origin
+                    headers.append("Timing-Allow-Origin", origin)
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = timings.elapsed_ms()
+            # The router stores the matched route in the scope; use its path
+            # template so that path parameters don't explode label cardinality.
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(duration_ms / 1000, scope["method"], route_path, str(status_code))
+            access_logger.info(
+                f'{scope["method"]} {scope["path"]} {status_code} {duration_ms:.1f}ms',
+                extra={
+                    "request_id": timings.request_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": route_path,
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 1),
+                    "response_bytes": response_bytes,
+                    "stages": {stage: round(duration, 1) for stage, duration in timings.stages.items()},
+                },
+            )
+
+# Compression is innermost so the timing middleware logs the bytes actually
+# sent and reports the compress stage
+app.add_middleware(CompressionMiddleware)
+
+# Requests are served as their tenant (X-Tenant-Key) from here in; throttled
+# and refused requests are still timed and logged
+app.add_middleware(TenantMiddleware)
+
+# Profiling runs inside the timing middleware so it can reuse the request id;
+# it is not installed at all unless enabled.
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",  # Vite dev server
-        "http://localhost:3000",  # React dev server
-        "http://localhost:8080",  # Alternative dev server
-    ],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
 # Global exception handlers
@@ -95,12 +221,15 @@ async def general_exception_handler(request, exc):
 
 # Include routers
 app.include_router(health_router, tags=["health"])
+app.include_router(metrics_router, tags=["metrics"])
 app.include_router(slack_router, prefix="/api/slack", tags=["slack"])
 app.include_router(summary_router, prefix="/api/summary", tags=["summary"])
 app.include_router(github_router, prefix="/api/github", tags=["github"])
 app.include_router(jira_router, prefix="/api/jira", tags=["jira"])
 app.include_router(bot_router, prefix="/api/bot", tags=["bot"])
 app.include_router(calendar_router, prefix="/api/calendar", tags=["calendar"])
+app.include_router(activity_router, prefix="/api/activity", tags=["activity"])
+app.include_router(search_router, prefix="/api/search", tags=["search"])
 
 @app.get("/", tags=["root"])
 async def root():
@@ -127,6 +256,7 @@ async def api_info():
         ],
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "slack": "/api/slack",
             "github": "/api/github",
             "jira": "/api/jira",
@@ -147,6 +277,19 @@ def debug_config():
         "openai_configured": bool(settings.OPENAI_API_KEY),
         "github_configured": bool(settings.GITHUB_TOKEN),
         "github_repo": settings.GITHUB_REPO,
+        "github_repos": settings.GITHUB_REPOS,
+        "github_org": settings.GITHUB_ORG,
         "jira_configured": bool(settings.JIRA_SERVER and settings.JIRA_EMAIL and settings.JIRA_API_TOKEN),
         "calendar_configured": bool(settings.GOOGLE_CLIENT_ID and settings.GOOGLE_CLIENT_SECRET)
     }
+
+@app.get("/debug/profiles/{profile_id}", tags=["debug"], response_class=PlainTextResponse)
+def debug_profile(profile_id: str):
+    """Return a stored request profile as collapsed stacks."""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling disabled")
+    path = profile_path(profile_id, "collapsed")
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return PlainTextResponse(f.read())
@@ -21,10 +21,9 @@ class SummaryResponse(BaseModel):
 
 # Slack Models
 class SlackMessage(BaseModel):
-    user: str
-    text: str
+    user: Optional[str] = None
+    text: Optional[str] = None
     timestamp: str
-    channel: str
 
 class SlackChannel(BaseModel):
     id: str
@@ -50,7 +49,7 @@ class GitHubPullRequest(BaseModel):
     number: int
     title: str
     state: str
-    author: str
+    user: str
     created_at: str
     merged_at: Optional[str] = None
     url: str
@@ -59,15 +58,23 @@ class GitHubIssue(BaseModel):
     number: int
     title: str
     state: str
-    author: str
+    user: str
     created_at: str
     labels: List[str] = []
     url: str
 
+class GitHubRelease(BaseModel):
+    tag_name: str
+    name: Optional[str] = None
+    body: Optional[str] = None
+    created_at: str
+    url: str
+
 class GitHubRepositoryData(BaseModel):
     commits: List[GitHubCommit] = []
     pull_requests: List[GitHubPullRequest] = []
     issues: List[GitHubIssue] = []
+    releases: List[GitHubRelease] = []
     total_commits: int = 0
     total_prs: int = 0
     total_issues: int = 0
@@ -93,6 +100,8 @@ class JiraIssue(BaseModel):
     created: str
     updated: str
     issue_type: str
+    reporter: Optional[str] = None
+    url: Optional[str] = None
 
 class JiraProjectsResponse(BaseModel):
     projects: List[JiraProject]
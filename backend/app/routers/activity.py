@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Query, HTTPException
+from app.core.pagination import MAX_PAGE_LIMIT
+from app.core.responses import FastJSONResponse
+from app.services.activity_store import query_activity, to_timestamp
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+router = APIRouter()
+
+@router.get("")
+def get_activity(days: int = Query(7, ge=1, description="Number of days to look back"),
+                 since: Optional[datetime] = Query(None, description="Start of the window (overrides days)"),
+                 until: Optional[datetime] = Query(None, description="End of the window (default: now)"),
+                 source: Optional[str] = Query(None, pattern="^(slack|github|jira|calendar)$", description="Integration"),
+                 kind: Optional[str] = Query(None, description="Record kind, e.g. message, pull_request, commit, issue, event"),
+                 author: Optional[str] = Query(None, description="Author name or login"),
+                 container: Optional[str] = Query(None, description="Channel, repository, project key or calendar"),
+                 limit: int = Query(100, ge=1, le=MAX_PAGE_LIMIT, description="Maximum number of records")):
+    """
+    Activity from the local store, newest first.
+    
+    Every record the integrations fetch is stored in one schema, so any
+    window is answered with an indexed range scan and no upstream calls.
+    """
+    try:
+        until = until or datetime.now(timezone.utc)
+        since = since or until - timedelta(days=days)
+        activity = query_activity(source, kind, to_timestamp(since), to_timestamp(until), author, container, limit)
+        return FastJSONResponse({"activity": activity})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading activity: {str(e)}")
+
+__all__ = ["router"]
@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
 from pydantic import BaseModel
-from app.services.calendar_service import get_calendar_events, get_calendar_list, get_busy_times, create_calendar_event
+from app.core.fieldsets import parse_fields
+from app.core.pagination import MAX_PAGE_LIMIT, is_paginated, paginated_response
+from app.core.responses import FastJSONResponse
+from app.models.schemas import CalendarEvent
+from app.services.calendar_service import get_calendar_events, fetch_event_page, get_calendar_list, get_busy_times, create_calendar_event
+from app.services.meeting_load_service import get_meeting_load
+from datetime import date
 from typing import List, Optional
 
 router = APIRouter()
@@ -14,14 +20,29 @@ class CalendarEventRequest(BaseModel):
     attendees: Optional[List[str]] = None
 
 @router.get("/events")
-def get_events(days: int = Query(7, description="Number of days to look back"),
-               calendar_id: str = Query("primary", description="Calendar ID")):
+def get_events(request: Request,
+               days: int = Query(7, description="Number of days to look back"),
+               calendar_id: str = Query("primary", description="Calendar ID"),
+               limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size; enables cursor pagination"),
+               cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+               format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="ndjson streams records as they are fetched"),
+               fields: Optional[str] = Query(None, description="Comma-separated record fields to return")):
     """
     Fetch calendar events for the specified period.
+    
+    Supports cursor pagination (``limit``, ``cursor``) and NDJSON streaming
+    (``format=ndjson``) like the other list endpoints. ``fields`` limits each event to the
+    named fields and is sent to the Calendar API as a partial response.
     """
+    fieldset = parse_fields(fields, CalendarEvent)
     try:
-        events = get_calendar_events(days, calendar_id)
-        return {"events": events}
+        if is_paginated(request, limit, cursor, format):
+            return paginated_response(request, lambda token: fetch_event_page(days, calendar_id, token, fieldset),
+                                      "events", limit, cursor, format)
+        events = get_calendar_events(days, calendar_id, fieldset)
+        return FastJSONResponse({"events": events})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching calendar events: {str(e)}")
 
@@ -48,6 +69,26 @@ def get_busy_times_endpoint(days: int = Query(7, description="Number of days to
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching busy times: {str(e)}")
 
+@router.get("/meeting-load")
+def get_meeting_load_endpoint(days: int = Query(7, ge=1, le=90, description="Number of days from start"),
+                              start: Optional[date] = Query(None, description="First day (default: today)"),
+                              calendars: Optional[str] = Query(None, description="Comma-separated calendar IDs (default: TEAM_CALENDAR_IDS)")):
+    """
+    Team meeting load: per-person and team meeting hours, focus time and a
+    weekday/hour heatmap of the share of the team in meetings.
+    
+    The calendars' free/busy is fetched in batched queries.
+    """
+    try:
+        load = get_meeting_load(days, start, calendars)
+        if "error" in load:
+            raise HTTPException(status_code=400, detail=load["error"])
+        return FastJSONResponse(load)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing meeting load: {str(e)}")
+
 @router.post("/events")
 def create_event(request: CalendarEventRequest):
     """
@@ -75,7 +116,6 @@ def get_auth_url():
     """
     try:
         from google_auth_oauthlib.flow import InstalledAppFlow
-        from app.core.config import settings
         
         flow = InstalledAppFlow.from_client_secrets_file(
             'credentials.json',
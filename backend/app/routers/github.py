@@ -1,6 +1,21 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from app.services.github_service import get_repository_data, create_issue, generate_release_notes
+from app.core.config import settings
+from app.core.fieldsets import parse_fields
+from app.core.pagination import MAX_PAGE_LIMIT, is_paginated, paginated_response
+from app.core.responses import FastJSONResponse
+from app.models.schemas import GitHubCommit, GitHubIssue, GitHubPullRequest, GitHubRelease
+from app.services.github_service import (
+    get_repository_data, open_repository, fetch_repository_page, group_repository_records,
+    create_issue, generate_release_notes,
+)
+from app.services.flow_metrics_service import get_flow_metrics
+from app.services.github_webhook_service import handle_event, verify_signature
+from app.core.metrics import record_webhook_event
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+import json
 
 router = APIRouter()
 
@@ -10,15 +25,47 @@ class IssueRequest(BaseModel):
     labels: list[str] | None = None
 
 @router.get("/repository")
-def get_github_data(days: int = Query(7, description="Number of days to look back")):
+def get_github_data(request: Request,
+                    days: int = Query(7, description="Number of days to look back"),
+                    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size; enables cursor pagination"),
+                    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+                    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="ndjson streams records as they are fetched"),
+                    fields: Optional[str] = Query(None, description="Comma-separated record fields to return"),
+                    repos: Optional[str] = Query(None, description="Comma-separated owner/name repositories (default: the configured ones)")):
     """
     Fetch comprehensive GitHub repository data.
+    
+    Several repositories are fetched concurrently and aggregated, with each
+    record tagged with its ``repo`` and per-repository and total counts in
+    ``repositories`` and ``totals``. Pagination covers one repository
+    (``repos`` naming one, or GITHUB_REPO, else the first configured one).
+    
+    With ``limit`` or ``cursor`` the records are paged across the pull
+    request, issue, commit and release sections in that order; with
+    ``format=ndjson`` each record is streamed as a line tagged with its
+    ``type``. ``fields`` limits each record to the named fields; sections
+    with none of them are not fetched.
     """
+    fieldset = parse_fields(fields, GitHubPullRequest, GitHubIssue, GitHubCommit, GitHubRelease)
+    names = [name.strip() for name in repos.split(",") if name.strip()] if repos else None
     try:
-        data = get_repository_data(days)
+        if is_paginated(request, limit, cursor, format):
+            if names and len(names) > 1:
+                raise HTTPException(status_code=400, detail="Pagination covers one repository at a time")
+            repo = open_repository(names[0] if names else None)
+            if repo is None:
+                raise HTTPException(status_code=400, detail="GitHub credentials not configured")
+            return paginated_response(request, lambda token: fetch_repository_page(repo, days, token, fieldset),
+                                      "records", limit, cursor, format,
+                                      collect=lambda records: group_repository_records(repo, records, fieldset))
+        data = get_repository_data(days, fieldset, names)
         if "error" in data:
             raise HTTPException(status_code=400, detail=data["error"])
-        return data
+        return FastJSONResponse(data)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching GitHub data: {str(e)}")
 
@@ -36,14 +83,73 @@ def create_github_issue(request: IssueRequest):
         raise HTTPException(status_code=500, detail=f"Error creating GitHub issue: {str(e)}")
 
 @router.get("/release-notes")
-def get_release_notes(days: int = Query(7, description="Number of days to look back")):
+def get_release_notes(days: int = Query(7, description="Number of days to look back"),
+                      since: Optional[datetime] = Query(None, description="Start of the window (overrides days)"),
+                      until: Optional[datetime] = Query(None, description="End of the window (default: now)"),
+                      base: Optional[str] = Query(None, description="Tag, branch or SHA to compare from"),
+                      head: Optional[str] = Query(None, description="Tag, branch or SHA to compare to (default: default branch)")):
     """
-    Generate release notes from recent repository activity.
+    Generate release notes between two refs or for a date window.
+    
+    Notes for ranges that can no longer change (between tags, or a window
+    that has ended) are cached.
     """
+    if head and not base:
+        raise HTTPException(status_code=400, detail="head requires base")
     try:
-        notes = generate_release_notes()
+        if since is None and not base:
+            since = (until or datetime.now(timezone.utc)) - timedelta(days=days)
+        notes = generate_release_notes(since, until, base, head)
+        if notes.startswith("Error: "):
+            raise HTTPException(status_code=400, detail=notes[len("Error: "):])
         return {"release_notes": notes}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating release notes: {str(e)}")
 
+@router.get("/metrics")
+def get_github_metrics(days: int = Query(30, ge=1, description="Number of days to look back")):
+    """
+    Pull request flow metrics: lead time, time to first review, time to merge
+    (p50/p90 hours), weekly throughput and the age of open pull requests.
+    
+    Only pull requests changed since the previous sync are fetched.
+    """
+    try:
+        metrics = get_flow_metrics(days)
+        if "error" in metrics:
+            raise HTTPException(status_code=400, detail=metrics["error"])
+        return metrics
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing GitHub metrics: {str(e)}")
+
+@router.post("/webhook")
+async def github_webhook(request: Request):
+    """
+    Receive GitHub webhook deliveries (push, pull_request, issues, release).
+    
+    Deliveries must be signed with GITHUB_WEBHOOK_SECRET and sent as
+    application/json. Their records are stored in the activity store, so
+    repository reads need no GitHub calls; other events are acknowledged
+    and ignored.
+    """
+    if not settings.GITHUB_WEBHOOK_SECRET:
+        raise HTTPException(status_code=400, detail="GitHub webhook secret not configured")
+    event = request.headers.get("X-GitHub-Event", "unknown")
+    body = await request.body()
+    if not verify_signature(body, request.headers.get("X-Hub-Signature-256")):
+        record_webhook_event("github", event, "rejected")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook payload must be JSON")
+    try:
+        return await run_in_threadpool(handle_event, event, payload, request.headers.get("X-GitHub-Delivery"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing GitHub webhook: {str(e)}")
+
 __all__ = ["router"] 
\ No newline at end of file
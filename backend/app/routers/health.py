@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException
 from app.models.schemas import HealthResponse
 from app.core.logging import logger
 from app.core.config import settings
-import requests
+from app.core.warmup import warmup_state
 from typing import Dict
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -63,6 +63,8 @@ async def health_check():
 async def readiness_check():
     """
     Readiness check for Kubernetes deployments.
+    
+    Reports not-ready until the startup warm-up has finished.
     """
     try:
         # Check if essential services are configured
@@ -72,8 +74,11 @@ async def readiness_check():
         if not settings.SLACK_BOT_TOKEN:
             raise HTTPException(status_code=503, detail="Slack API not configured")
         
+        if not warmup_state.ready:
+            raise HTTPException(status_code=503, detail=f"Warm-up {warmup_state.status}")
+        
         logger.info("Readiness check passed")
-        return {"status": "ready"}
+        return {"status": "ready", "warmup": warmup_state.as_dict()}
         
     except HTTPException:
         raise
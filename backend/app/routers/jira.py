@@ -1,6 +1,17 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from app.services.jira_service import get_projects, get_project_issues, get_sprints, create_jira_issue, get_sprint_issues
+from app.core.config import settings
+from app.core.fieldsets import parse_fields
+from app.core.pagination import MAX_PAGE_LIMIT, is_paginated, paginated_response
+from app.core.responses import FastJSONResponse
+from app.models.schemas import JiraIssue
+from app.services.analytics_service import get_sprint_analytics, get_velocity
+from app.services.jira_service import get_projects, get_project_issues, fetch_issue_page, get_sprints, create_jira_issue, get_sprint_issues
+from app.services.jira_webhook_service import handle_event, verify_signature
+from app.core.metrics import record_webhook_event
+from typing import Optional
+import json
 
 router = APIRouter()
 
@@ -22,14 +33,30 @@ def get_jira_projects():
         raise HTTPException(status_code=500, detail=f"Error fetching Jira projects: {str(e)}")
 
 @router.get("/issues")
-def get_jira_issues(project_key: str = Query(..., description="Jira project key"), 
-                   days: int = Query(7, description="Number of days to look back")):
+def get_jira_issues(request: Request,
+                   project_key: str = Query(..., description="Jira project key"), 
+                   days: int = Query(7, description="Number of days to look back"),
+                   limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size; enables cursor pagination"),
+                   cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+                   format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="ndjson streams records as they are fetched"),
+                   fields: Optional[str] = Query(None, description="Comma-separated record fields to return")):
     """
     Fetch recent issues from a specific Jira project.
+    
+    With ``limit`` or ``cursor`` the issues are returned a page at a time
+    with a ``next_cursor``; with ``format=ndjson`` (or ``Accept:
+    application/x-ndjson``) they are streamed one JSON object per line. ``fields`` limits each
+    issue to the named fields and is passed on to the Jira search.
     """
+    fieldset = parse_fields(fields, JiraIssue)
     try:
-        issues = get_project_issues(project_key, days)
-        return {"issues": issues}
+        if is_paginated(request, limit, cursor, format):
+            return paginated_response(request, lambda token: fetch_issue_page(project_key, days, token, fieldset),
+                                      "issues", limit, cursor, format)
+        issues = get_project_issues(project_key, days, fieldset)
+        return FastJSONResponse({"issues": issues})
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching Jira issues: {str(e)}")
 
@@ -55,6 +82,38 @@ def get_sprint_issues_endpoint(sprint_id: int):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sprint issues: {str(e)}")
 
+@router.get("/sprints/{sprint_id}/analytics")
+def get_sprint_analytics_endpoint(sprint_id: int):
+    """
+    Burndown, burnup, scope change and cycle time of a sprint, from its
+    issues' changelogs.
+    """
+    try:
+        analytics = get_sprint_analytics(sprint_id)
+        if "error" in analytics:
+            raise HTTPException(status_code=400, detail=analytics["error"])
+        return FastJSONResponse(analytics)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing sprint analytics: {str(e)}")
+
+@router.get("/velocity")
+def get_velocity_endpoint(project_key: str = Query(..., description="Jira project key"),
+                          sprints: int = Query(6, ge=1, le=50, description="Number of closed sprints")):
+    """
+    Committed and completed story points of the last closed sprints.
+    """
+    try:
+        velocity = get_velocity(project_key, sprints)
+        if "error" in velocity:
+            raise HTTPException(status_code=400, detail=velocity["error"])
+        return velocity
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing velocity: {str(e)}")
+
 @router.post("/issues")
 def create_jira_issue_endpoint(request: JiraIssueRequest):
     """
@@ -68,4 +127,28 @@ def create_jira_issue_endpoint(request: JiraIssueRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating Jira issue: {str(e)}")
 
+@router.post("/webhook")
+async def jira_webhook(request: Request):
+    """
+    Receive Jira webhook deliveries (issue created/updated/deleted, sprint events).
+    
+    Deliveries must be signed with JIRA_WEBHOOK_SECRET. Changes older than
+    what the index holds, and retried deliveries, are acknowledged without
+    being applied.
+    """
+    if not settings.JIRA_WEBHOOK_SECRET:
+        raise HTTPException(status_code=400, detail="Jira webhook secret not configured")
+    body = await request.body()
+    if not verify_signature(body, request.headers.get("X-Hub-Signature")):
+        record_webhook_event("jira", "unknown", "rejected")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook payload must be JSON")
+    try:
+        return await run_in_threadpool(handle_event, payload, request.headers.get("X-Atlassian-Webhook-Identifier"))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing Jira webhook: {str(e)}")
+
 __all__ = ["router"] 
\ No newline at end of file
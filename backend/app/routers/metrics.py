@@ -0,0 +1,17 @@
+"""
+Prometheus metrics endpoint for SprintLens API.
+"""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.core.metrics import render_latest, CONTENT_TYPE_LATEST
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Expose request, upstream, token and cache metrics in Prometheus text format.
+    """
+    return PlainTextResponse(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+__all__ = ["router"]
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Query, HTTPException
+from app.core.responses import FastJSONResponse
+from app.services.activity_store import search_activity, to_timestamp
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+router = APIRouter()
+
+MAX_SEARCH_LIMIT = 100
+
+@router.get("")
+def search(q: str = Query(..., min_length=1, description="Words to look for; word* matches a prefix"),
+           days: Optional[int] = Query(None, ge=1, description="Only search the last N days"),
+           since: Optional[datetime] = Query(None, description="Start of the window (overrides days)"),
+           until: Optional[datetime] = Query(None, description="End of the window"),
+           source: Optional[str] = Query(None, pattern="^(slack|github|jira|calendar)$", description="Integration"),
+           kind: Optional[str] = Query(None, description="Record kind, e.g. message, pull_request, commit, issue, event"),
+           author: Optional[str] = Query(None, description="Author name or login"),
+           container: Optional[str] = Query(None, description="Channel, repository, project key or calendar"),
+           limit: int = Query(20, ge=1, le=MAX_SEARCH_LIMIT, description="Maximum number of results")):
+    """
+    Full-text search over all ingested activity, best match first.
+
+    Searches Slack messages, pull request, issue and commit text, Jira
+    summaries and descriptions and calendar event titles in the local
+    activity store; each result has a snippet and a link to the source.
+    """
+    try:
+        if since is None and days is not None:
+            since = (until or datetime.now(timezone.utc)) - timedelta(days=days)
+        results = search_activity(q, source, kind, to_timestamp(since), to_timestamp(until), author, container, limit)
+        return FastJSONResponse({"query": q, "results": results})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching activity: {str(e)}")
+
+__all__ = ["router"]
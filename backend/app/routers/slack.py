@@ -1,5 +1,10 @@
-from fastapi import APIRouter, Query
-from app.services.slack_service import fetch_channel_messages, list_channels
+from fastapi import APIRouter, Query, Request
+from app.core.fieldsets import parse_fields
+from app.core.pagination import MAX_PAGE_LIMIT, is_paginated, paginated_response
+from app.core.responses import FastJSONResponse
+from app.models.schemas import SlackMessage
+from app.services.slack_service import fetch_channel_messages, fetch_message_page, list_channels
+from typing import Optional
 
 router = APIRouter()
 
@@ -10,11 +15,20 @@ def connect_slack():
 
 @router.get("/messages")
 def get_slack_messages(
+    request: Request,
     channel_id: str = Query(..., description="Slack channel ID"),
-    days: int = Query(7, description="Number of days to look back")
+    days: int = Query(7, description="Number of days to look back"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's next_cursor"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="ndjson streams records as they are fetched"),
+    fields: Optional[str] = Query(None, description="Comma-separated record fields to return"),
 ):
-    messages = fetch_channel_messages(channel_id, days)
-    return {"messages": messages}
+    fieldset = parse_fields(fields, SlackMessage)
+    if is_paginated(request, limit, cursor, format):
+        return paginated_response(request, lambda token: fetch_message_page(channel_id, days, token, fieldset),
+                                  "messages", limit, cursor, format)
+    messages = fetch_channel_messages(channel_id, days, fieldset)
+    return FastJSONResponse({"messages": messages})
 
 @router.get("/channels")
 def get_channels():
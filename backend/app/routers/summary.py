@@ -2,9 +2,18 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from app.services.slack_service import fetch_channel_messages
 from app.services.github_service import get_repository_data
+from app.services.flow_metrics_service import get_flow_metrics
 from app.services.jira_service import get_project_issues, get_sprints
 from app.services.calendar_service import get_calendar_events, get_busy_times
+from app.services.meeting_load_service import get_meeting_load
 from app.services.ai_service import generate_summary
+from app.services.model_router import configured_models, model_stats
+from app.services.activity_store import read_window
+from app.core.config import settings
+from app.core.logging import get_logger
+import time
+
+logger = get_logger("summary")
 
 router = APIRouter()
 
@@ -12,18 +21,28 @@ class SummaryRequest(BaseModel):
     channel_id: str
     days: int = 7
     include_github: bool = False
+    github_repos: list[str] | None = None  # Default: the configured repositories
     include_jira: bool = False
     include_calendar: bool = False
     jira_project_key: str | None = None
 
+def _stored_window(source: str, container: str, days: int, future_days: int = 0):
+    """Records of the last ``days`` days from the activity store, or None if they must be fetched."""
+    now = time.time()
+    return read_window(source, container, now - days * 86400, now + future_days * 86400)
+
 @router.post("/generate")
-async def generate_sprint_summary(request: SummaryRequest):
+def generate_sprint_summary(request: SummaryRequest):
     """
     Generate a comprehensive sprint summary from Slack, GitHub, and Jira data using AI.
+
+    A plain function, so FastAPI runs it (and its blocking upstream calls) in
+    the threadpool rather than on the event loop.
     """
     try:
-        # Fetch messages from Slack
-        messages = fetch_channel_messages(request.channel_id, request.days)
+        # Fetch messages from Slack (windows fetched recently are read from the activity store)
+        stored = _stored_window("slack", request.channel_id, request.days)
+        messages = stored.get("message", []) if stored is not None else fetch_channel_messages(request.channel_id, request.days)
         
         github_data = None
         jira_data = None
@@ -31,10 +50,17 @@ async def generate_sprint_summary(request: SummaryRequest):
         
         # Fetch GitHub data if requested
         if request.include_github:
-            github_data = get_repository_data(request.days)
+            # Read from the activity store when the window is held there
+            github_data = get_repository_data(request.days, repositories=request.github_repos)
+            if "error" not in github_data:
+                # Flow metrics over the pull requests of every repository aggregated
+                entries = github_data.get("repositories", [github_data])
+                names = [entry["repository"]["full_name"] for entry in entries if "error" not in entry]
+                github_data["flow_metrics"] = get_flow_metrics(request.days, names)
         
         # Fetch Jira data if requested
         if request.include_jira and request.jira_project_key:
+            # Read from the issue index when the window is held there
             jira_issues = get_project_issues(request.jira_project_key, request.days)
             jira_sprints = get_sprints(request.jira_project_key)
             jira_data = {
@@ -45,14 +71,17 @@ async def generate_sprint_summary(request: SummaryRequest):
         # Fetch Calendar data if requested
         if request.include_calendar:
             try:
-                calendar_events = get_calendar_events(request.days)
+                stored = _stored_window("calendar", "primary", request.days // 2, request.days // 2)
+                calendar_events = stored.get("event", [])[::-1] if stored is not None else get_calendar_events(request.days)
                 calendar_busy = get_busy_times(request.days)
                 calendar_data = {
                     "events": calendar_events,
                     "busy_times": calendar_busy
                 }
+                if settings.TEAM_CALENDAR_IDS:
+                    calendar_data["meeting_load"] = get_meeting_load(request.days)
             except Exception as e:
-                print(f"Calendar error: {e}")
+                logger.warning(f"Calendar error: {e}")
                 calendar_data = {
                     "events": [],
                     "busy_times": []
@@ -73,4 +102,19 @@ async def generate_sprint_summary(request: SummaryRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating summary: {str(e)}")
 
+@router.get("/models")
+def get_summary_models():
+    """
+    Configured summary models with the recent call statistics that drive routing.
+    """
+    try:
+        stats = model_stats()
+        return {
+            "latency_slo_seconds": settings.SUMMARY_LATENCY_SLO_SECONDS,
+            "models": [{"name": model.name, "context_tokens": model.context_tokens, **stats.get(model.name, {"calls": 0})}
+                       for model in configured_models()],
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading model statistics: {str(e)}")
+
 __all__ = ["router"] 
\ No newline at end of file
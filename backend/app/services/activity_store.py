@@ -0,0 +1,540 @@
+"""
+Local activity store: every fetched record in one indexed SQLite table.
+
+Slack messages, GitHub pull requests, issues, commits and releases, Jira
+issues and calendar events are normalized into one activity schema (source,
+kind, time, author, container, title, body, link) and upserted as the
+services fetch them, next to the record as the API returned it. Indexes on
+(source, timestamp), (author, timestamp) and (container, timestamp) make
+any window a single range scan.
+
+Each complete fetch of a window is also recorded as coverage, so a reader
+can tell whether the store holds everything for a window it asks about and
+use it instead of calling the upstream again (see ``read_window``).
+
+Titles and bodies are indexed for full-text search by an FTS5 table that
+uses the activity table as external content; triggers keep it in step with
+every insert, update and delete, so the index is updated at ingest time
+without storing the text twice. Source, kind, author and container are
+indexed too, so search filters are intersections of posting lists rather
+than lookups of every match (see ``search_activity``).
+Webhook receivers write to the store as well, and remove records deleted
+upstream; records with an upstream version (Jira's update time) are only
+replaced by newer versions, so late or repeated deliveries change nothing.
+Ingestion failures are logged and never fail the request that fetched the
+records. Writes take the write lock when their transaction begins (BEGIN
+IMMEDIATE), so concurrent ingests wait for each other instead of failing
+when a deferred transaction cannot be upgraded.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger("activity_store")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    author TEXT,
+    container TEXT,
+    title TEXT,
+    body TEXT,
+    url TEXT,
+    state TEXT,
+    record TEXT NOT NULL,
+    ingested_at REAL NOT NULL,
+    UNIQUE (source, kind, external_id)
+);
+CREATE INDEX IF NOT EXISTS activity_source_time ON activity (source, timestamp);
+CREATE INDEX IF NOT EXISTS activity_author_time ON activity (author, timestamp);
+CREATE INDEX IF NOT EXISTS activity_container_time ON activity (container, timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS activity_fts USING fts5 (
+    title, body, source, kind, author, container,
+    content = 'activity', content_rowid = 'id', tokenize = 'porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS activity_fts_insert AFTER INSERT ON activity BEGIN
+    INSERT INTO activity_fts (rowid, title, body, source, kind, author, container)
+    VALUES (new.id, new.title, new.body, new.source, new.kind, new.author, new.container);
+END;
+CREATE TRIGGER IF NOT EXISTS activity_fts_delete AFTER DELETE ON activity BEGIN
+    INSERT INTO activity_fts (activity_fts, rowid, title, body, source, kind, author, container)
+    VALUES ('delete', old.id, old.title, old.body, old.source, old.kind, old.author, old.container);
+END;
+CREATE TRIGGER IF NOT EXISTS activity_fts_update AFTER UPDATE OF title, body, source, kind, author, container ON activity BEGIN
+    INSERT INTO activity_fts (activity_fts, rowid, title, body, source, kind, author, container)
+    VALUES ('delete', old.id, old.title, old.body, old.source, old.kind, old.author, old.container);
+    INSERT INTO activity_fts (rowid, title, body, source, kind, author, container)
+    VALUES (new.id, new.title, new.body, new.source, new.kind, new.author, new.container);
+END;
+CREATE TABLE IF NOT EXISTS versions (
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    external_id TEXT NOT NULL,
+    version REAL NOT NULL,
+    deleted INTEGER NOT NULL,
+    PRIMARY KEY (source, kind, external_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    source TEXT NOT NULL,
+    container TEXT NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    max_age REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, container, start, end)
+);
+"""
+
+UPSERT = """
+INSERT INTO activity (source, kind, external_id, timestamp, author, container, title, body, url, state, record, ingested_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, kind, external_id) DO UPDATE SET
+    timestamp = excluded.timestamp, author = excluded.author, container = excluded.container,
+    title = excluded.title, body = excluded.body, url = excluded.url, state = excluded.state,
+    record = excluded.record, ingested_at = excluded.ingested_at
+"""
+
+class Activity(NamedTuple):
+    """One normalized record; ``record`` is the record as the API returned it."""
+    source: str
+    kind: str
+    external_id: str
+    timestamp: float
+    author: Optional[str]
+    container: Optional[str]
+    title: Optional[str]
+    body: Optional[str]
+    url: Optional[str]
+    state: Optional[str]
+    record: Dict
+
+def to_timestamp(value) -> Optional[float]:
+    """Epoch seconds of an ISO 8601 string or datetime (naive means UTC)."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+_local = threading.local()
+_connections: List[sqlite3.Connection] = []
+_initialized = set()
+# Bumped by reset_activity_store() so every thread drops its closed connections
+_generation = 0
+_lock = threading.Lock()
+
+def _connection() -> sqlite3.Connection:
+    """This thread's connection to the configured database, created on first use."""
+    path = os.path.abspath(settings.ACTIVITY_STORE_PATH)
+    if getattr(_local, "generation", None) != _generation:
+        _local.generation = _generation
+        _local.connections = {}
+    connections = _local.connections
+    connection = connections.get(path)
+    if connection is None:
+        connection = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with _lock:
+            if path not in _initialized:
+                indexed = connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'activity_fts'").fetchone()
+                connection.executescript(SCHEMA)
+                columns = {row[1] for row in connection.execute("PRAGMA table_info(coverage)")}
+                if "max_age" not in columns:
+                    # Stores created before coverage kept its max age: their coverage is pruned on the next write
+                    connection.execute("ALTER TABLE coverage ADD COLUMN max_age REAL NOT NULL DEFAULT 0")
+                if indexed is None:
+                    # Stores created before the search index: index what they already hold
+                    connection.execute("INSERT INTO activity_fts (activity_fts) VALUES ('rebuild')")
+                _initialized.add(path)
+            _connections.append(connection)
+        connections[path] = connection
+    return connection
+
+def reset_activity_store() -> None:
+    """Close every connection; the next use reconnects (and re-creates the schema)."""
+    global _generation
+    with _lock:
+        _generation += 1
+        for connection in _connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        _connections.clear()
+        _initialized.clear()
+
+def upsert(activities: Iterable[Activity], strict: bool = False) -> int:
+    """
+    Insert or update normalized records.
+
+    Args:
+        activities: Records to store
+        strict: Raise store errors rather than logging them, as in ``upsert_versioned``
+
+    Returns:
+        Number of records written (0 if the store is disabled or failed)
+    """
+    if not settings.ACTIVITY_STORE_ENABLED:
+        return 0
+    try:
+        now = time.time()
+        rows = [(*activity[:10], json.dumps(activity.record, default=str), now) for activity in activities
+                if activity.timestamp is not None]
+        if not rows:
+            return 0
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(UPSERT, rows)
+        return len(rows)
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Activity store ingest failed: {e}")
+        return 0
+
+def upsert_versioned(versioned: Iterable[Tuple[Activity, float]], strict: bool = False) -> int:
+    """
+    Insert or update records that carry an upstream version (last update time).
+
+    Webhooks can arrive late, twice or out of order, and a poll can return a
+    record older than a delivery applied while it ran, so a record is only
+    written if its version is newer than the last one seen for it, deletions
+    included.
+
+    Args:
+        versioned: (record, version) pairs
+        strict: Raise store errors rather than logging them, for webhook
+            deliveries that must not be acknowledged unless stored
+
+    Returns:
+        Number of records written (0 if the store is disabled or failed)
+    """
+    if not settings.ACTIVITY_STORE_ENABLED:
+        return 0
+    try:
+        pairs = [(activity, version) for activity, version in versioned if activity.timestamp is not None]
+        if not pairs:
+            return 0
+        now = time.time()
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            rows, versions = [], []
+            for activity, version in pairs:
+                current = connection.execute(
+                    "SELECT version FROM versions WHERE source = ? AND kind = ? AND external_id = ?",
+                    activity[:3]).fetchone()
+                if current is None or current[0] < version:
+                    rows.append((*activity[:10], json.dumps(activity.record, default=str), now))
+                    versions.append((*activity[:3], version, 0))
+            connection.executemany(UPSERT, rows)
+            connection.executemany("INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?)", versions)
+        return len(rows)
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Activity store ingest failed: {e}")
+        return 0
+
+def delete_versioned(source: str, kind: str, external_id: str, version: float, strict: bool = False) -> bool:
+    """
+    Remove a record deleted upstream at ``version``, unless a newer version was already seen.
+
+    The deletion is remembered, so a late update of the record cannot bring
+    it back. ``strict`` raises store errors as in ``upsert_versioned``.
+
+    Returns:
+        True if the deletion was applied
+    """
+    if not settings.ACTIVITY_STORE_ENABLED:
+        return False
+    try:
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            current = connection.execute(
+                "SELECT version FROM versions WHERE source = ? AND kind = ? AND external_id = ?",
+                (source, kind, external_id)).fetchone()
+            if current is not None and current[0] >= version:
+                return False
+            connection.execute("DELETE FROM activity WHERE source = ? AND kind = ? AND external_id = ?",
+                               (source, kind, external_id))
+            connection.execute("INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, 1)", (source, kind, external_id, version))
+        return True
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Activity store delete failed: {e}")
+        return False
+
+def delete(source: str, kind: str, external_ids: Iterable[str], strict: bool = False) -> int:
+    """
+    Remove records deleted upstream.
+
+    Args:
+        source: slack, github, jira or calendar
+        kind: Record kind within the source
+        external_ids: Upstream ids of the records
+        strict: Raise store errors rather than logging them, as in ``upsert_versioned``
+
+    Returns:
+        Number of records removed (0 if the store is disabled or failed)
+    """
+    if not settings.ACTIVITY_STORE_ENABLED:
+        return 0
+    try:
+        rows = [(source, kind, external_id) for external_id in external_ids]
+        if not rows:
+            return 0
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            cursor = connection.executemany("DELETE FROM activity WHERE source = ? AND kind = ? AND external_id = ?", rows)
+            return cursor.rowcount
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Activity store delete failed: {e}")
+        return 0
+
+def record_coverage(source: str, container: str, start: float, end: float, max_age: Optional[float] = None) -> None:
+    """
+    Note that every record of ``source``/``container`` in [start, end] was just fetched.
+
+    Each row keeps the ``max_age`` its readers pass to ``read_window``
+    (default ACTIVITY_STORE_MAX_AGE_SECONDS) and is pruned only after that,
+    so coverage that webhooks keep valid for longer survives other sources'
+    writes.
+    """
+    if not settings.ACTIVITY_STORE_ENABLED:
+        return
+    max_age = settings.ACTIVITY_STORE_MAX_AGE_SECONDS if max_age is None else max_age
+    try:
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # Older coverage can no longer satisfy read_window()
+            connection.execute("DELETE FROM coverage WHERE fetched_at + max_age < ?", (now,))
+            connection.execute("INSERT OR REPLACE INTO coverage (source, container, start, end, fetched_at, max_age) "
+                               "VALUES (?, ?, ?, ?, ?, ?)", (source, container, start, end, now, max_age))
+    except Exception as e:
+        logger.warning(f"Activity store coverage update failed: {e}")
+
+def extend_coverage(source: str, container: str, fetched_since: float, until: float,
+                    max_age: Optional[float] = None) -> None:
+    """
+    Extend coverage to ``until`` after fetching every record changed since ``fetched_since``.
+
+    Coverage fetched at or after ``fetched_since`` was current then, and the
+    changes since have just been stored, so it is current now (and kept for
+    ``max_age``, as in ``record_coverage``).
+    """
+    if not settings.ACTIVITY_STORE_ENABLED:
+        return
+    max_age = settings.ACTIVITY_STORE_MAX_AGE_SECONDS if max_age is None else max_age
+    try:
+        connection = _connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "UPDATE OR REPLACE coverage SET end = MAX(end, ?), fetched_at = ?, max_age = ? "
+                "WHERE source = ? AND container = ? AND fetched_at >= ?",
+                (until, time.time(), max_age, source, container, fetched_since))
+    except Exception as e:
+        logger.warning(f"Activity store coverage update failed: {e}")
+
+def _row(row) -> Dict:
+    source, kind, external_id, timestamp, author, container, title, url, state, record = row
+    return {
+        "source": source,
+        "kind": kind,
+        "id": external_id,
+        "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+        "author": author,
+        "container": container,
+        "title": title,
+        "url": url,
+        "state": state,
+        "record": json.loads(record),
+    }
+
+def query_activity(source: Optional[str] = None, kind: Optional[str] = None, since: Optional[float] = None,
+                   until: Optional[float] = None, author: Optional[str] = None, container: Optional[str] = None,
+                   limit: Optional[int] = None) -> List[Dict]:
+    """
+    Stored activity in a window, newest first.
+
+    Args:
+        source: slack, github, jira or calendar
+        kind: Record kind within the source (message, pull_request, issue, ...)
+        since, until: Window bounds in epoch seconds
+        author: Author name or login
+        container: Channel, repository, project key or calendar
+        limit: Maximum number of records
+
+    Returns:
+        Normalized records, each with the original under "record"
+    """
+    clauses, params = [], []
+    for column, value in (("source", source), ("kind", kind), ("author", author), ("container", container)):
+        if value is not None:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        clauses.append("timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("timestamp <= ?")
+        params.append(until)
+    sql = "SELECT source, kind, external_id, timestamp, author, container, title, url, state, record FROM activity"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY timestamp DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [_row(row) for row in _connection().execute(sql, params)]
+
+def read_window(source: str, container: str, since: float, until: float,
+                max_age: Optional[float] = None) -> Optional[Dict[str, List[Dict]]]:
+    """
+    A window's records by kind, if the store holds all of them.
+
+    The window counts as held when a complete fetch covering it (up to
+    ``max_age`` of newer activity) happened within the last ``max_age``
+    seconds.
+
+    Args:
+        source: slack, github, jira or calendar
+        container: Channel, repository, project key or calendar
+        since, until: Window bounds in epoch seconds
+        max_age: Seconds a fetch stays valid (default ACTIVITY_STORE_MAX_AGE_SECONDS;
+            longer for sources whose webhooks keep the store current)
+
+    Returns:
+        Original records by kind, newest first, or None to fetch from the upstream
+    """
+    max_age = settings.ACTIVITY_STORE_MAX_AGE_SECONDS if max_age is None else max_age
+    if not settings.ACTIVITY_STORE_ENABLED or max_age <= 0:
+        return None
+    try:
+        connection = _connection()
+        covered = connection.execute(
+            "SELECT 1 FROM coverage WHERE source = ? AND container = ? AND start <= ? AND end >= ? AND fetched_at >= ? LIMIT 1",
+            (source, container, since, until - max_age, time.time() - max_age)).fetchone()
+        if covered is None:
+            return None
+        records: Dict[str, List[Dict]] = {}
+        for kind, record in connection.execute(
+                "SELECT kind, record FROM activity WHERE container = ? AND timestamp BETWEEN ? AND ? AND source = ? "
+                "ORDER BY timestamp DESC", (container, since, until, source)):
+            records.setdefault(kind, []).append(json.loads(record))
+        return records
+    except Exception as e:
+        logger.warning(f"Activity store read failed: {e}")
+        return None
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 query matching records that contain every word of ``query``.
+
+    Words are quoted, so punctuation in user input is never FTS5 syntax; a
+    trailing ``*`` keeps its meaning as a prefix match.
+
+    Returns:
+        The expression, or None if ``query`` has no words
+    """
+    terms = [f'"{word}"' + ("*" if star else "") for word, star in re.findall(r"(\w+)(\*?)", query)]
+    return " ".join(terms) if terms else None
+
+def _phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+def search_activity(query: str, source: Optional[str] = None, kind: Optional[str] = None,
+                    since: Optional[float] = None, until: Optional[float] = None, author: Optional[str] = None,
+                    container: Optional[str] = None, limit: int = 20) -> List[Dict]:
+    """
+    Stored activity matching a full-text query, best match first.
+
+    The words are looked for in titles and bodies, titles weighing twice as
+    much in the BM25 ranking. Only the SEARCH_MAX_CANDIDATES most recently
+    stored matches that pass the filters are ranked, which bounds the cost
+    of words that occur in much of the store.
+
+    Args:
+        query: Words to look for (all must match; ``word*`` matches a prefix)
+        source, kind, since, until, author, container: Filters as in ``query_activity``
+        limit: Maximum number of results
+
+    Returns:
+        Normalized records (without the original record) with a "snippet"
+        marking the matched words in [brackets] and a "score"
+    """
+    words = match_expression(query)
+    if words is None:
+        return []
+    # The words match titles and bodies only; the other columns are indexed for the filters below
+    text = f"{{title body}} : ({words})"
+    expression = text
+    clauses, params = [], []
+    for column, value in (("source", source), ("kind", kind), ("author", author), ("container", container)):
+        if value is not None:
+            # The index narrows by the value's words; the comparison makes the filter exact
+            expression += f" AND {column} : {_phrase(value)}"
+            clauses.append(f"activity.{column} = ?")
+            params.append(value)
+    if since is not None:
+        clauses.append("activity.timestamp >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("activity.timestamp <= ?")
+        params.append(until)
+    where = ' AND '.join(clauses) or '1'
+    connection = _connection()
+    # Scoring touches every match, so rank only the newest ones that pass the filters: a scan down the
+    # index's rowids finds the floor
+    floor = connection.execute(
+        "SELECT activity_fts.rowid FROM activity_fts JOIN activity ON activity.id = activity_fts.rowid "
+        f"WHERE activity_fts MATCH ? AND {where} ORDER BY activity_fts.rowid DESC LIMIT 1 OFFSET ?",
+        (expression, *params, settings.SEARCH_MAX_CANDIDATES - 1)).fetchone()
+    rows = connection.execute(
+        "WITH ranked AS (SELECT rowid AS id, bm25(activity_fts, 2.0, 1.0, 0.0, 0.0, 0.0, 0.0) AS score "
+        "FROM activity_fts WHERE activity_fts MATCH ? AND rowid >= ?) "
+        "SELECT activity.id, activity.source, activity.kind, activity.external_id, activity.timestamp, activity.author, "
+        "activity.container, activity.title, activity.url, activity.state, ranked.score "
+        "FROM ranked JOIN activity ON activity.id = ranked.id "
+        f"WHERE {where} ORDER BY ranked.score LIMIT ?",
+        (expression, floor[0] if floor else 0, *params, limit)).fetchall()
+    if not rows:
+        return []
+    # Snippets of the returned records only, highlighting the query's words
+    snippets = dict(connection.execute(
+        f"SELECT rowid, snippet(activity_fts, -1, '[', ']', '...', 16) FROM activity_fts "
+        f"WHERE activity_fts MATCH ? AND rowid IN ({', '.join('?' * len(rows))})",
+        (text, *(row[0] for row in rows))))
+    results = []
+    for row in rows:
+        result = _row((*row[1:10], "null"))
+        del result["record"]
+        result["snippet"] = snippets.get(row[0])
+        # BM25 is smaller for better matches; report it so that larger is better
+        result["score"] = round(-row[10], 3)
+        results.append(result)
+    return results
@@ -1,31 +1,70 @@
-from openai import OpenAI
+from app.core.clients import get_client
 from app.core.config import settings
-from typing import List, Dict, Optional
-
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream, record_llm_call, record_token_usage
+from app.core.timing import timed_stage
+from app.services.model_router import MIN_ATTEMPT_SECONDS, attempt_timeout, record_call, route
+from app.services.noise_filter import estimate_tokens, prompt_lines
+from app.services.presummarizer import item_lines, local_summary, select_lines
+from typing import List, Dict, Optional, Tuple
+import time
+
+logger = get_logger("openai")
+
+# Model label of local extractive summaries in the metrics
+LOCAL_MODEL = "local-extractive"
+
+def _format_flow_metrics(flow: Dict) -> str:
+    """One line per flow metric, skipping those without data."""
+    scope = f", {len(flow['repositories'])} repositories" if flow.get("repositories") else ""
+    lines = [f"**Pull Request Flow (last {flow['days']} days{scope}):** {flow['opened']} opened, {flow['merged']} merged "
+             f"({flow['throughput']['per_week']} per week)"]
+    for key, label in (("lead_time_hours", "Lead time"), ("time_to_first_review_hours", "Time to first review"),
+                       ("time_to_merge_hours", "Review to merge")):
+        if flow[key]["count"]:
+            lines.append(f"- {label}: median {flow[key]['p50']}h, p90 {flow[key]['p90']}h")
+    open_prs = flow["open_pull_requests"]
+    if open_prs["count"]:
+        lines.append(f"- Open PRs: {open_prs['count']}, median age {open_prs['age_days_p50']} days, "
+                     f"oldest {open_prs['oldest_days']} days")
+    return "\n".join(lines)
+
+def _format_repositories(repositories: List[Dict]) -> str:
+    """One line per aggregated repository with its counts, or why it is missing."""
+    lines = ["**Repositories:**"]
+    for entry in repositories:
+        name = entry["repository"]["full_name"]
+        if "error" in entry:
+            lines.append(f"- {name}: unavailable")
+            continue
+        counts = entry["counts"]
+        lines.append(f"- {name}: {counts.get('pull_requests', 0)} PRs, {counts.get('issues', 0)} issues, "
+                     f"{counts.get('commits', 0)} commits")
+    return "\n".join(lines)
 
-def generate_summary(messages: List[Dict], github_data: Optional[Dict] = None, jira_data: Optional[Dict] = None, calendar_data: Optional[Dict] = None) -> str:
+@timed_stage("prompt_build")
+def build_summary_prompt(messages: List[Dict], github_data: Optional[Dict] = None, jira_data: Optional[Dict] = None, calendar_data: Optional[Dict] = None) -> Optional[Tuple[str, str]]:
     """
-    Generate a comprehensive sprint summary from Slack messages, GitHub data, and Jira data using OpenAI GPT.
+    Build the system and user prompts for a sprint summary.
     
     Args:
         messages: List of message dicts with 'user', 'timestamp', 'text' keys
         github_data: Optional GitHub repository data
         jira_data: Optional Jira project data
+        calendar_data: Optional calendar events and busy times
     
     Returns:
-        Generated summary string
+        (system_prompt, user_prompt) tuple, or None if there is no data to summarize
     """
-    if not messages and not github_data and not jira_data and not calendar_data:
-        return "No data found for the specified time period."
-
-    # Format messages for the prompt
-    formatted_messages = []
-    for msg in messages:
-        # Skip system messages like "user joined channel"
-        if "has joined the channel" in msg.get("text", ""):
-            continue
-        formatted_messages.append(f"- {msg.get('text', '')}")
+    # Format messages for the prompt, without joins, acknowledgements and repeats
+    formatted_messages = prompt_lines(messages)
+    # Within the token budget, the most informative messages, pull requests, issues and commits
+    items: Dict[str, List[str]] = {"github": [], "jira": []}
+    if settings.PROMPT_TARGET_TOKENS > 0:
+        selected = select_lines({"slack": formatted_messages, **item_lines(github_data, jira_data)},
+                                settings.PROMPT_TARGET_TOKENS)
+        formatted_messages = selected.pop("slack")
+        items = selected
 
     # Build comprehensive context
     context_parts = []
@@ -43,6 +82,13 @@ def generate_summary(messages: List[Dict], github_data: Optional[Dict] = None, j
             github_context.append(f"**Issues:** {len(github_data['issues'])} issues")
         if github_data.get("commits"):
             github_context.append(f"**Commits:** {len(github_data['commits'])} commits")
+        if github_data.get("repositories"):
+            github_context.append(_format_repositories(github_data["repositories"]))
+        if items["github"]:
+            github_context.append(f"**Notable GitHub Activity:**\n{chr(10).join(items['github'])}")
+        flow = github_data.get("flow_metrics")
+        if flow and "error" not in flow:
+            github_context.append(_format_flow_metrics(flow))
         if github_context:
             context_parts.append("\n".join(github_context))
 
@@ -51,6 +97,8 @@ def generate_summary(messages: List[Dict], github_data: Optional[Dict] = None, j
         jira_context = []
         if jira_data.get("issues"):
             jira_context.append(f"**Jira Issues:** {len(jira_data['issues'])} issues")
+        if items["jira"]:
+            jira_context.append(f"**Notable Jira Issues:**\n{chr(10).join(items['jira'])}")
         if jira_data.get("sprints"):
             jira_context.append(f"**Sprints:** {len(jira_data['sprints'])} sprints")
         if jira_context:
@@ -71,12 +119,18 @@ def generate_summary(messages: List[Dict], github_data: Optional[Dict] = None, j
                     calendar_context.append(f"  Description: {description}")
         if calendar_data.get("busy_times"):
             calendar_context.append(f"**Busy Times:** {len(calendar_data['busy_times'])} time slots")
+        load = calendar_data.get("meeting_load")
+        if load and "error" not in load and load["team"]["people"]:
+            team = load["team"]
+            calendar_context.append(f"**Team Meeting Load ({team['people']} people):** "
+                                    f"{team['average_meeting_hours']}h of meetings and {team['average_focus_hours']}h "
+                                    f"of focus time per person, {team['shared_focus_hours']}h of shared focus time")
         if calendar_context:
             context_parts.append("\n".join(calendar_context))
 
-    # If no data at all, return early
+    # If no data at all, there is nothing to prompt with
     if not context_parts:
-        return "No data found for the specified time period."
+        return None
 
     full_context = "\n\n".join(context_parts)
 
@@ -95,19 +149,79 @@ def generate_summary(messages: List[Dict], github_data: Optional[Dict] = None, j
 
     Please provide a comprehensive, actionable summary that would be useful for sprint planning and team coordination."""
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=500,
-            temperature=0.7
-        )
+    return system_prompt, user_prompt
+
+def generate_summary(messages: List[Dict], github_data: Optional[Dict] = None, jira_data: Optional[Dict] = None, calendar_data: Optional[Dict] = None) -> str:
+    """
+    Generate a comprehensive sprint summary from Slack messages, GitHub data, and Jira data using OpenAI GPT.
+
+    The model is picked by the model router from the prompt size and the
+    latency objective; if it fails or misses the deadline the router's
+    fallbacks are tried in turn, and as a last resort (or without an OpenAI
+    key) the summary is extracted locally (SUMMARY_LOCAL_FALLBACK).
+    
+    Args:
+        messages: List of message dicts with 'user', 'timestamp', 'text' keys
+        github_data: Optional GitHub repository data
+        jira_data: Optional Jira project data
+    
+    Returns:
+        Generated summary string
+    """
+    if not messages and not github_data and not jira_data and not calendar_data:
+        return "No data found for the specified time period."
+
+    prompts = build_summary_prompt(messages, github_data, jira_data, calendar_data)
+    if prompts is None:
+        return "No data found for the specified time period."
+    system_prompt, user_prompt = prompts
+
+    client = get_client("openai")
+    prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+    deadline = time.monotonic() + settings.SUMMARY_LATENCY_SLO_SECONDS
+    if client is None:
+        # Without a key no model is available; the local fallback still is
+        models, errors = [], ["OpenAI API key not configured"]
+    else:
+        models = route(prompt_tokens, settings.SUMMARY_MAX_TOKENS, settings.SUMMARY_LATENCY_SLO_SECONDS)
+        errors = [] if models else [f"no model in SUMMARY_MODELS fits a prompt of ~{prompt_tokens} tokens"]
+    for position, model in enumerate(models):
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_ATTEMPT_SECONDS:
+            errors.append(f"{model}: latency objective exhausted")
+            break
+        fallback = models[position + 1] if position + 1 < len(models) else None
+        # The client's retries and backoff could run past the deadline; the fallbacks stand in for them
+        attempt = client.with_options(timeout=attempt_timeout(remaining, fallback), max_retries=0)
+        start = time.perf_counter()
+        try:
+            with timed_stage("llm"), observe_upstream("openai", "chat.completions"):
+                response = attempt.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    max_tokens=settings.SUMMARY_MAX_TOKENS,
+                    temperature=settings.SUMMARY_TEMPERATURE
+                )
+        except Exception as e:
+            record_call(model, time.perf_counter() - start, prompt_tokens, 0, False)
+            logger.error(f"OpenAI API error ({model}): {e}")
+            errors.append(f"{model}: {e}")
+            continue
+        usage = response.usage
+        record_call(model, time.perf_counter() - start, getattr(usage, "prompt_tokens", None) or prompt_tokens,
+                    getattr(usage, "completion_tokens", None) or 0, True)
+        record_token_usage(model, usage)
         content = response.choices[0].message.content
         return content.strip() if content else "No summary generated."
 
-    except Exception as e:
-        print(f"OpenAI API error: {e}")
-        return f"Error generating summary: {str(e)}" 
\ No newline at end of file
+    if settings.SUMMARY_LOCAL_FALLBACK:
+        logger.warning(f"Falling back to a local summary: {'; '.join(errors)}")
+        start = time.perf_counter()
+        with timed_stage("local_summary"):
+            summary = local_summary(messages, github_data, jira_data, settings.SUMMARY_MAX_TOKENS)
+        record_llm_call(LOCAL_MODEL, time.perf_counter() - start, True)
+        return summary
+    return f"Error generating summary: {'; '.join(errors)}"
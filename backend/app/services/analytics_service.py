@@ -0,0 +1,306 @@
+"""
+Sprint analytics from Jira issue changelogs.
+
+Each issue's history is flattened into compact event arrays (issue index,
+time, kind, value before and after): one event per status transition, one
+per sprint membership change, and one for the issue's creation. The state
+of every issue after every event is then forward-filled and differenced
+with NumPy, so scope, completed points and cycle times for a sprint of
+thousands of issues take milliseconds once the changelogs are fetched.
+Only flattening the JSON is a Python loop.
+
+The issues come from a ``sprint = N`` search, which only returns issues
+still in the sprint: an issue removed mid-sprint (and not re-added) is never
+fetched. Its removal cannot be counted, and it is missing from the committed
+scope if it was planned in. So scope change reports additions only, with a
+note in the response; removals show up in the events only for issues that
+are back in the sprint.
+
+NumPy is imported on first use, like the integration client libraries.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.jira_service import get_sprint_changelogs, get_sprints, get_status_categories
+
+logger = get_logger("analytics")
+
+# Event kinds and status category codes in the event arrays
+STATUS_EVENT, SPRINT_EVENT = 0, 1
+TODO, IN_PROGRESS, DONE = 0, 1, 2
+CATEGORY_CODES = {"new": TODO, "indeterminate": IN_PROGRESS, "done": DONE}
+# Status names treated as done when the status list is unavailable
+DONE_STATUS_NAMES = {"done", "closed", "resolved"}
+DAY_SECONDS = 86400.0
+# Returned with every scope change, since the search cannot see removed issues
+SCOPE_CHANGE_NOTE = ("Issues removed from the sprint are not returned by Jira's sprint search, so removals are "
+                     "not totalled and the committed scope counts only issues still in the sprint.")
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+def _status_code(status_id: Optional[str], name: Optional[str], categories: Dict[str, str]) -> int:
+    if status_id is not None and str(status_id) in categories:
+        return CATEGORY_CODES.get(categories[str(status_id)], TODO)
+    return DONE if (name or "").lower() in DONE_STATUS_NAMES else TODO
+
+def _in_sprint(value: Optional[str], sprint_id: str) -> int:
+    return int(sprint_id in [part.strip() for part in (value or "").split(",")])
+
+class SprintEvents:
+    """
+    Changelogs of a sprint's issues as flat arrays.
+
+    Attributes:
+        keys: Issue keys, indexed by the ``issue`` array
+        points: Story points per issue (0 when unestimated)
+        issue, time, kind, before, after: One entry per event
+        status_now: Current status code per issue
+    """
+
+    def __init__(self, issues: List[Dict], sprint_id: int, categories: Dict[str, str]):
+        import numpy as np
+
+        sprint_key = str(sprint_id)
+        points_field = settings.JIRA_STORY_POINTS_FIELD
+        self.keys = [issue["key"] for issue in issues]
+        points, status_now = [], []
+        event_issue, event_time, event_kind, event_before, event_after = [], [], [], [], []
+        event_creation = []
+        for index, issue in enumerate(issues):
+            fields = issue["fields"]
+            points.append(fields.get(points_field) or 0.0)
+            status = fields.get("status") or {}
+            status_now.append(_status_code(status.get("id"), status.get("name"), categories))
+            created = _timestamp(fields["created"])
+            # An issue is in the sprint from creation unless its first sprint
+            # change says otherwise (returned issues are in the sprint now)
+            in_sprint_at_creation = None
+            for history in (issue.get("changelog") or {}).get("histories", []):
+                when = _timestamp(history["created"])
+                for item in history.get("items", []):
+                    field = item.get("field")
+                    if field == "status":
+                        event_issue.append(index)
+                        event_time.append(when)
+                        event_kind.append(STATUS_EVENT)
+                        event_before.append(_status_code(item.get("from"), item.get("fromString"), categories))
+                        event_after.append(_status_code(item.get("to"), item.get("toString"), categories))
+                        event_creation.append(False)
+                    elif field == "Sprint":
+                        before, after = _in_sprint(item.get("from"), sprint_key), _in_sprint(item.get("to"), sprint_key)
+                        if in_sprint_at_creation is None:
+                            in_sprint_at_creation = before
+                        event_issue.append(index)
+                        event_time.append(when)
+                        event_kind.append(SPRINT_EVENT)
+                        event_before.append(before)
+                        event_after.append(after)
+                        event_creation.append(False)
+            event_issue.append(index)
+            event_time.append(created)
+            event_kind.append(SPRINT_EVENT)
+            event_before.append(0)
+            event_after.append(1 if in_sprint_at_creation is None else in_sprint_at_creation)
+            event_creation.append(True)
+
+        self.points = np.asarray(points, dtype=np.float64)
+        self.status_now = np.asarray(status_now, dtype=np.int8)
+        # Sorted by issue, then time; creation sorts first among equal times
+        issue = np.asarray(event_issue, dtype=np.int32)
+        time = np.asarray(event_time, dtype=np.float64)
+        order = np.lexsort((~np.asarray(event_creation), time, issue))
+        self.issue = issue[order]
+        self.time = time[order]
+        self.kind = np.asarray(event_kind, dtype=np.int8)[order]
+        self.before = np.asarray(event_before, dtype=np.int8)[order]
+        self.after = np.asarray(event_after, dtype=np.int8)[order]
+
+    def _state_after(self, kind: int, initial):
+        """Value of one kind of state after each event, forward-filled per issue."""
+        import numpy as np
+
+        positions = np.arange(len(self.issue))
+        last = np.maximum.accumulate(np.where(self.kind == kind, positions, -1))
+        same_issue = (last >= 0) & (self.issue[np.maximum(last, 0)] == self.issue)
+        return np.where(same_issue, self.after[np.maximum(last, 0)], initial[self.issue])
+
+    def _initial_status(self):
+        """Status of each issue before its first transition (its current status if none)."""
+        import numpy as np
+
+        initial = self.status_now.copy()
+        is_status = self.kind == STATUS_EVENT
+        issues, first = np.unique(self.issue[is_status], return_index=True)
+        initial[issues] = self.before[is_status][first]
+        return initial
+
+    def deltas(self):
+        """
+        Change in sprint scope and completed points caused by each event.
+
+        Returns:
+            (time, scope delta, done delta) arrays sorted by time
+        """
+        import numpy as np
+
+        in_sprint = self._state_after(SPRINT_EVENT, np.zeros(len(self.keys), dtype=np.int8))
+        status = self._state_after(STATUS_EVENT, self._initial_status())
+        scope_after = in_sprint.astype(np.float64)
+        done_after = scope_after * (status == DONE)
+        # The state before an event is the state after the previous event of the issue
+        first = np.ones(len(self.issue), dtype=bool)
+        first[1:] = self.issue[1:] != self.issue[:-1]
+        scope_before = np.where(first, 0.0, np.roll(scope_after, 1))
+        done_before = np.where(first, 0.0, np.roll(done_after, 1))
+        weight = self.points[self.issue]
+        order = np.argsort(self.time, kind="stable")
+        return (self.time[order], ((scope_after - scope_before) * weight)[order],
+                ((done_after - done_before) * weight)[order])
+
+    def cycle_times(self):
+        """
+        Days from first entering an in-progress status to last entering done.
+
+        Returns:
+            Array of cycle times of the issues that are done now
+        """
+        import numpy as np
+
+        started = np.full(len(self.keys), np.inf)
+        finished = np.full(len(self.keys), -np.inf)
+        is_status = self.kind == STATUS_EVENT
+        starts = is_status & (self.after == IN_PROGRESS)
+        np.minimum.at(started, self.issue[starts], self.time[starts])
+        ends = is_status & (self.after == DONE)
+        np.maximum.at(finished, self.issue[ends], self.time[ends])
+        valid = (self.status_now == DONE) & np.isfinite(started) & np.isfinite(finished) & (finished >= started)
+        return (finished[valid] - started[valid]) / DAY_SECONDS
+
+def _cumulative_at(times, deltas, samples):
+    """Running total of ``deltas`` at each sample time."""
+    import numpy as np
+
+    totals = np.concatenate(([0.0], np.cumsum(deltas)))
+    return totals[np.searchsorted(times, samples, side="right")]
+
+def _round(values) -> List[float]:
+    return [round(float(value), 2) for value in values]
+
+def _sprint_window(sprint: Dict):
+    start = _timestamp(sprint["start_date"])
+    end = _timestamp(sprint.get("complete_date") or sprint["end_date"])
+    if sprint.get("state") == "active":
+        end = min(end, datetime.now(timezone.utc).timestamp())
+    return start, max(start, end)
+
+def compute_sprint_analytics(sprint: Dict, issues: List[Dict], categories: Dict[str, str]) -> Dict:
+    """
+    Burndown, burnup, scope change and cycle time of one sprint.
+
+    Args:
+        sprint: Sprint as returned by get_sprints()
+        issues: Raw issues with expanded changelogs
+        categories: Status category by status ID
+
+    Returns:
+        Analytics document
+    """
+    import numpy as np
+
+    events = SprintEvents(issues, sprint["id"], categories)
+    times, scope_deltas, done_deltas = events.deltas()
+    start, end = _sprint_window(sprint)
+    samples = np.append(np.arange(start, end, DAY_SECONDS), end)
+    scope = _cumulative_at(times, scope_deltas, samples)
+    done = _cumulative_at(times, done_deltas, samples)
+
+    in_window = (times > start) & (times <= end)
+    added = in_window & (scope_deltas > 0)
+    removed = in_window & (scope_deltas < 0)
+    cycle = events.cycle_times()
+    ordered_issues = events.issue[np.argsort(events.time, kind="stable")]
+
+    return {
+        "sprint": sprint,
+        "issue_count": len(events.keys),
+        "series": {
+            "dates": [datetime.fromtimestamp(sample, timezone.utc).isoformat() for sample in samples],
+            "scope": _round(scope),
+            "completed": _round(done),
+            "remaining": _round(scope - done),
+            "ideal": _round(np.linspace(scope[0], 0.0, len(samples))),
+        },
+        "scope_change": {
+            "committed": round(float(scope[0]), 2),
+            "added": round(float(scope_deltas[added].sum()), 2),
+            "events": [
+                {"key": events.keys[ordered_issues[index]],
+                 "time": datetime.fromtimestamp(times[index], timezone.utc).isoformat(),
+                 "points": round(float(scope_deltas[index]), 2)}
+                for index in np.flatnonzero(added | removed)
+            ],
+            "note": SCOPE_CHANGE_NOTE,
+        },
+        "completed": round(float(done[-1]), 2),
+        "cycle_time_days": {
+            "count": int(cycle.size),
+            "mean": round(float(cycle.mean()), 2) if cycle.size else None,
+            "p50": round(float(np.percentile(cycle, 50)), 2) if cycle.size else None,
+            "p85": round(float(np.percentile(cycle, 85)), 2) if cycle.size else None,
+        },
+    }
+
+def get_sprint_analytics(sprint_id: int) -> Dict:
+    """
+    Fetch a sprint's changelogs and compute its analytics.
+
+    Args:
+        sprint_id: Jira sprint ID
+
+    Returns:
+        Analytics document, or {"error": ...}
+    """
+    try:
+        data = get_sprint_changelogs(sprint_id)
+        if data is None:
+            return {"error": "Jira client not configured"}
+        if not data["sprint"].get("start_date"):
+            return {"error": f"Sprint {sprint_id} has not started"}
+        return compute_sprint_analytics(data["sprint"], data["issues"], get_status_categories())
+    except Exception as e:
+        logger.error(f"Sprint analytics error: {e}")
+        return {"error": f"Failed to compute sprint analytics: {str(e)}"}
+
+def get_velocity(project_key: str, count: int = 6) -> Dict:
+    """
+    Committed and completed story points of the last closed sprints.
+
+    Args:
+        project_key: Jira project key
+        count: Number of closed sprints
+
+    Returns:
+        {"sprints": [...], "average_completed": ...}, or {"error": ...}
+    """
+    sprints = [sprint for sprint in get_sprints(project_key) if sprint["state"] == "closed" and sprint.get("start_date")]
+    sprints = sorted(sprints, key=lambda sprint: sprint["start_date"])[-count:]
+    velocity = []
+    for sprint in sprints:
+        analytics = get_sprint_analytics(sprint["id"])
+        if "error" in analytics:
+            return analytics
+        velocity.append({
+            "id": sprint["id"],
+            "name": sprint["name"],
+            "committed": analytics["scope_change"]["committed"],
+            "added": analytics["scope_change"]["added"],
+            "completed": analytics["completed"],
+        })
+    completed = [entry["completed"] for entry in velocity]
+    return {
+        "sprints": velocity,
+        "average_completed": round(sum(completed) / len(completed), 2) if completed else None,
+    }
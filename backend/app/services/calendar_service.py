@@ -1,105 +1,139 @@
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from app.core.cache import ttl_cached
+from app.core.clients import get_client
 from app.core.config import settings
-from typing import List, Dict, Optional
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+from app.core.pagination import Page
+from app.core.timing import timed_stage
+from app.services.activity_store import Activity, record_coverage, to_timestamp, upsert
+from typing import AbstractSet, Dict, List, Optional
 from datetime import datetime, timedelta
-import os
-import pickle
 
-# If modifying these scopes, delete the file token.pickle.
-SCOPES = ['https://www.googleapis.com/auth/calendar.readonly']
+logger = get_logger("calendar")
+
+# Events per events.list call when paginating (the API maximum is 2500)
+EVENT_PAGE_SIZE = 250
+# Calendars per freebusy.query call (the API's calendarExpansionMax limit)
+FREEBUSY_MAX_CALENDARS = 50
+
+def _event_window(days: int):
+    """Time range of the events endpoints: days // 2 either side of now."""
+    now = datetime.utcnow()
+    time_min = (now - timedelta(days=days//2)).isoformat() + 'Z'  # Past events
+    time_max = (now + timedelta(days=days//2)).isoformat() + 'Z'  # Future events
+    return time_min, time_max
+
+# Response field -> (partial response selector, value getter)
+EVENT_FIELDS = {
+    'id': ('id', lambda event: event['id']),
+    'summary': ('summary', lambda event: event.get('summary', 'No Title')),
+    'description': ('description', lambda event: event.get('description', '')),
+    'start': ('start', lambda event: event['start'].get('dateTime', event['start'].get('date'))),
+    'end': ('end', lambda event: event['end'].get('dateTime', event['end'].get('date'))),
+    'location': ('location', lambda event: event.get('location', '')),
+    'attendees': ('attendees(email)', lambda event: [attendee.get('email') for attendee in event.get('attendees', [])]),
+    'organizer': ('organizer(email)', lambda event: event.get('organizer', {}).get('email', '')),
+    'html_link': ('htmlLink', lambda event: event.get('htmlLink', '')),
+}
+
+def _format_event(event: Dict, fields: Optional[AbstractSet[str]] = None) -> Dict:
+    return {name: getter(event) for name, (_, getter) in EVENT_FIELDS.items() if fields is None or name in fields}
+
+def _event_activity(calendar_id: str, event: Dict) -> Activity:
+    return Activity("calendar", "event", f"{calendar_id}:{event['id']}",
+                    to_timestamp(event['start'].get('dateTime', event['start'].get('date'))),
+                    event.get('organizer', {}).get('email'), calendar_id, event.get('summary'),
+                    event.get('description'), event.get('htmlLink'), event.get('status'), _format_event(event))
+
+def _partial_response(fields: Optional[AbstractSet[str]]) -> Optional[str]:
+    """Calendar ``fields`` parameter returning only what the fieldset needs."""
+    if fields is None:
+        return None
+    selectors = ",".join(EVENT_FIELDS[name][0] for name in EVENT_FIELDS if name in fields)
+    return f"nextPageToken,items({selectors})"
 
 def get_calendar_service():
     """Get Google Calendar service with proper authentication."""
-    creds = None
-    
-    # Check if credentials.json exists
-    if not os.path.exists('credentials.json'):
+    service = get_client("calendar")
+    if service is None:
         raise FileNotFoundError("credentials.json not found. Please download from Google Cloud Console.")
-    
-    # The file token.pickle stores the user's access and refresh tokens.
-    if os.path.exists('token.pickle'):
-        try:
-            with open('token.pickle', 'rb') as token:
-                creds = pickle.load(token)
-        except Exception as e:
-            print(f"Error loading token.pickle: {e}")
-            creds = None
-    
-    # If there are no (valid) credentials available, let the user log in.
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-            except Exception as e:
-                print(f"Error refreshing token: {e}")
-                creds = None
-        
-        if not creds:
-            try:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    'credentials.json', SCOPES)
-                creds = flow.run_local_server(port=0)
-                
-                # Save the credentials for the next run
-                with open('token.pickle', 'wb') as token:
-                    pickle.dump(creds, token)
-            except Exception as e:
-                raise Exception(f"Authentication failed: {e}")
-
-    service = build('calendar', 'v3', credentials=creds)
     return service
 
-def get_calendar_events(days: int = 7, calendar_id: str = 'primary') -> List[Dict]:
-    """Fetch calendar events for the specified number of days (past and future)."""
+@timed_stage("calendar_fetch")
+def get_calendar_events(days: int = 7, calendar_id: str = 'primary',
+                        fields: Optional[AbstractSet[str]] = None) -> List[Dict]:
+    """Fetch calendar events for the specified number of days (past and future), optionally only some fields."""
     try:
         service = get_calendar_service()
         
         # Calculate time range - include past and future events
-        now = datetime.utcnow()
-        time_min = (now - timedelta(days=days//2)).isoformat() + 'Z'  # Past events
-        time_max = (now + timedelta(days=days//2)).isoformat() + 'Z'  # Future events
+        time_min, time_max = _event_window(days)
+        
+        with observe_upstream("calendar", "events.list"):
+            events_result = service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                singleEvents=True,
+                orderBy='startTime',
+                fields=_partial_response(fields)
+            ).execute()
+        
+        events = events_result.get('items', [])
+        # Partial responses lack fields the store needs
+        if fields is None:
+            upsert(_event_activity(calendar_id, event) for event in events)
+            if not events_result.get('nextPageToken'):
+                record_coverage("calendar", calendar_id, to_timestamp(time_min), to_timestamp(time_max))
         
+        return [_format_event(event, fields) for event in events]
+        
+    except Exception as e:
+        logger.error(f"Google Calendar API error: {e}")
+        return []
+
+def fetch_event_page(days: int = 7, calendar_id: str = 'primary', token=None,
+                     fields: Optional[AbstractSet[str]] = None) -> Page:
+    """
+    Fetch one page of calendar events for cursor pagination.
+    
+    Args:
+        days: Window size in days (ignored when resuming from a token)
+        calendar_id: Calendar ID
+        token: [timeMin, timeMax, pageToken] from the previous page, or None to start
+        fields: Response fields to fetch and return (None for all)
+    
+    Returns:
+        Page of event dictionaries; upstream errors are raised
+    """
+    service = get_calendar_service()
+    time_min, time_max, page_token = token or (*_event_window(days), None)
+    with observe_upstream("calendar", "events.list"):
         events_result = service.events().list(
             calendarId=calendar_id,
             timeMin=time_min,
             timeMax=time_max,
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            maxResults=EVENT_PAGE_SIZE,
+            pageToken=page_token,
+            fields=_partial_response(fields)
         ).execute()
-        
-        events = events_result.get('items', [])
-        
-        formatted_events = []
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-            
-            formatted_events.append({
-                'id': event['id'],
-                'summary': event.get('summary', 'No Title'),
-                'description': event.get('description', ''),
-                'start': start,
-                'end': end,
-                'location': event.get('location', ''),
-                'attendees': [attendee.get('email') for attendee in event.get('attendees', [])],
-                'organizer': event.get('organizer', {}).get('email', ''),
-                'html_link': event.get('htmlLink', '')
-            })
-        
-        return formatted_events
-        
-    except Exception as e:
-        print(f"Google Calendar API error: {e}")
-        return []
+    next_token = events_result.get('nextPageToken')
+    if fields is None:
+        upsert(_event_activity(calendar_id, event) for event in events_result.get('items', []))
+    return Page(
+        [_format_event(event, fields) for event in events_result.get('items', [])],
+        [time_min, time_max, next_token] if next_token else None,
+    )
 
+@ttl_cached("calendar_list", lambda: settings.DIRECTORY_CACHE_TTL_SECONDS)
 def get_calendar_list() -> List[Dict]:
     """Get list of available calendars."""
     try:
         service = get_calendar_service()
-        calendar_list = service.calendarList().list().execute()
+        with observe_upstream("calendar", "calendarList.list"):
+            calendar_list = service.calendarList().list().execute()
         
         calendars = []
         for calendar in calendar_list.get('items', []):
@@ -114,9 +148,10 @@ def get_calendar_list() -> List[Dict]:
         return calendars
         
     except Exception as e:
-        print(f"Google Calendar API error: {e}")
+        logger.error(f"Google Calendar API error: {e}")
         return []
 
+@timed_stage("calendar_fetch")
 def get_busy_times(days: int = 7, calendar_id: str = 'primary') -> List[Dict]:
     """Get busy time slots for the specified period."""
     try:
@@ -133,15 +168,49 @@ def get_busy_times(days: int = 7, calendar_id: str = 'primary') -> List[Dict]:
             'items': [{'id': calendar_id}]
         }
         
-        events_result = service.freebusy().query(body=body).execute()
+        with observe_upstream("calendar", "freebusy.query"):
+            events_result = service.freebusy().query(body=body).execute()
         busy_times = events_result['calendars'][calendar_id]['busy']
         
         return busy_times
         
     except Exception as e:
-        print(f"Google Calendar API error: {e}")
+        logger.error(f"Google Calendar API error: {e}")
         return []
 
+@timed_stage("calendar_fetch")
+def get_team_busy_times(calendar_ids: List[str], time_min: str, time_max: str) -> Dict:
+    """
+    Busy intervals of many calendars, FREEBUSY_MAX_CALENDARS per freebusy query.
+    
+    Args:
+        calendar_ids: Calendar IDs (usually the team members' emails)
+        time_min: Start of the window (RFC 3339)
+        time_max: End of the window (RFC 3339)
+    
+    Returns:
+        {"busy": {calendar_id: [{"start", "end"}, ...]}, "errors": {calendar_id: reason}};
+        upstream errors are raised
+    """
+    service = get_calendar_service()
+    busy, errors = {}, {}
+    for offset in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+        chunk = calendar_ids[offset:offset + FREEBUSY_MAX_CALENDARS]
+        body = {
+            'timeMin': time_min,
+            'timeMax': time_max,
+            'items': [{'id': calendar_id} for calendar_id in chunk]
+        }
+        with observe_upstream("calendar", "freebusy.query"):
+            result = service.freebusy().query(body=body).execute()
+        for calendar_id in chunk:
+            calendar = result.get('calendars', {}).get(calendar_id, {})
+            if calendar.get('errors'):
+                errors[calendar_id] = calendar['errors'][0].get('reason', 'unknown')
+            else:
+                busy[calendar_id] = calendar.get('busy', [])
+    return {"busy": busy, "errors": errors}
+
 def create_calendar_event(summary: str, description: str, start_time: str, end_time: str, 
                          calendar_id: str = 'primary', attendees: Optional[List[str]] = None) -> Dict:
     """Create a new calendar event."""
@@ -164,7 +233,8 @@ def create_calendar_event(summary: str, description: str, start_time: str, end_t
         if attendees:
             event['attendees'] = [{'email': email} for email in attendees]
         
-        event = service.events().insert(calendarId=calendar_id, body=event).execute()
+        with observe_upstream("calendar", "events.insert"):
+            event = service.events().insert(calendarId=calendar_id, body=event).execute()
         
         return {
             'id': event['id'],
@@ -175,5 +245,5 @@ def create_calendar_event(summary: str, description: str, start_time: str, end_t
         }
         
     except Exception as e:
-        print(f"Google Calendar API error: {e}")
+        logger.error(f"Google Calendar API error: {e}")
         return {"error": f"Failed to create event: {str(e)}"} 
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+Pull request flow metrics: lead time, review latency, throughput, open age.
+
+The pull requests of the last FLOW_METRICS_DAYS days are kept per repository
+as one row of timestamps each (created, first review, merged, closed). A sync
+lists pull requests by last update and stops where the previous sync started,
+so after the first one only new and changed pull requests are fetched, and
+their reviews only until a first review is known. The metrics are computed
+over the timestamp columns with NumPy, so a window of tens of thousands of
+pull requests takes milliseconds once synced. Tables are kept per tenant, so
+a tenant only sees pull requests its own token has listed.
+
+NumPy is imported on first use, like the integration client libraries.
+"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import current_tenant, settings
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+from app.core.timing import timed_stage
+from app.services.github_service import get_github_client
+
+logger = get_logger("flow_metrics")
+
+HOUR_SECONDS = 3600.0
+DAY_SECONDS = 86400.0
+WEEK_SECONDS = 7 * DAY_SECONDS
+# Review states that count as a review (pending reviews are unsubmitted drafts)
+REVIEW_STATES = {"APPROVED", "CHANGES_REQUESTED", "COMMENTED", "DISMISSED"}
+# Syncs overlap by this much: GitHub times have second resolution and clocks drift
+SYNC_OVERLAP = timedelta(minutes=1)
+
+# (created, first review, merged, closed) in epoch seconds, NaN when missing
+Row = Tuple[float, float, float, float]
+
+def _timestamp(value: Optional[datetime]) -> float:
+    """Epoch seconds of a PyGithub datetime (naive UTC), NaN for None."""
+    if value is None:
+        return math.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class PullRequestTimes:
+    """Timestamp rows of one repository's pull requests, by number."""
+
+    def __init__(self, repo_name: str):
+        self.repo_name = repo_name
+        self.rows: Dict[int, Row] = {}
+        self.synced_at: Optional[datetime] = None
+        self.synced_monotonic: Optional[float] = None
+        self.lock = threading.Lock()
+        self._columns = None
+
+    @property
+    def is_stale(self) -> bool:
+        return (self.synced_monotonic is None
+                or time.monotonic() - self.synced_monotonic > settings.FLOW_METRICS_SYNC_SECONDS)
+
+    def first_review(self, number: int) -> float:
+        row = self.rows.get(number)
+        return row[1] if row is not None else math.nan
+
+    def update(self, rows: Dict[int, Row], synced_at: datetime, horizon: float) -> None:
+        """Upsert changed rows and drop pull requests closed before the horizon."""
+        self.rows.update(rows)
+        if rows or self.synced_at is None:
+            self.rows = {number: row for number, row in self.rows.items() if not row[3] < horizon}
+            self._columns = None
+        self.synced_at = synced_at
+        self.synced_monotonic = time.monotonic()
+
+    def mark_stale(self) -> None:
+        """Make the next read sync, e.g. after a webhook says something changed."""
+        self.synced_monotonic = None
+
+    def columns(self):
+        """
+        The rows as arrays, rebuilt only after a sync changed them.
+
+        Returns:
+            (created, first_review, merged, closed) float64 arrays
+        """
+        import numpy as np
+
+        if self._columns is None:
+            table = np.array(list(self.rows.values()), dtype=np.float64).reshape(-1, 4)
+            self._columns = tuple(np.ascontiguousarray(table[:, column]) for column in range(4))
+        return self._columns
+
+_tables: Dict[Tuple[Optional[str], str], PullRequestTimes] = {}
+_tables_lock = threading.Lock()
+
+def _table(repo_name: str) -> PullRequestTimes:
+    """The current tenant's table of a repository."""
+    key = (current_tenant(), repo_name)
+    with _tables_lock:
+        if key not in _tables:
+            _tables[key] = PullRequestTimes(repo_name)
+        return _tables[key]
+
+def mark_stale(repo_name: Optional[str] = None) -> None:
+    """Make the next metrics read of a repository (default: all), by any tenant, sync first."""
+    with _tables_lock:
+        tables = [table for (_, name), table in _tables.items() if repo_name in (None, name)]
+    for table in tables:
+        table.mark_stale()
+
+def reset_flow_metrics() -> None:
+    """Forget every synced repository."""
+    with _tables_lock:
+        _tables.clear()
+
+def _first_review(pr) -> float:
+    """Time of the first submitted review by someone other than the author."""
+    author = pr.user.login if pr.user else None
+    with observe_upstream("github", "get_reviews"):
+        times = [_timestamp(review.submitted_at) for review in pr.get_reviews()
+                 if review.state in REVIEW_STATES and review.submitted_at is not None
+                 and (review.user is None or review.user.login != author)]
+    return min(times, default=math.nan)
+
+def sync_pull_requests(repo, table: PullRequestTimes) -> int:
+    """
+    Fetch the pull requests updated since the table's last sync.
+
+    Args:
+        repo: Repository
+        table: Rows of the repository, updated in place
+
+    Returns:
+        Number of new or changed pull requests
+    """
+    started = datetime.now(timezone.utc)
+    horizon = started - timedelta(days=settings.FLOW_METRICS_DAYS)
+    since = max(table.synced_at - SYNC_OVERLAP, horizon) if table.synced_at else horizon
+    changed = []
+    with observe_upstream("github", "get_pulls"):
+        for pr in repo.get_pulls(state="all", sort="updated", direction="desc"):
+            if _timestamp(pr.updated_at) < since.timestamp():
+                break
+            changed.append(pr)
+
+    # A first review never changes, so reviews are listed only until one is found
+    unreviewed = [pr for pr in changed if math.isnan(table.first_review(pr.number))]
+    first_reviews = {}
+    if unreviewed:
+        with ThreadPoolExecutor(max_workers=max(1, settings.FLOW_METRICS_REVIEW_WORKERS)) as pool:
+            first_reviews = dict(zip((pr.number for pr in unreviewed), pool.map(_first_review, unreviewed)))
+
+    rows = {
+        pr.number: (_timestamp(pr.created_at),
+                    first_reviews.get(pr.number, table.first_review(pr.number)),
+                    _timestamp(pr.merged_at),
+                    _timestamp(pr.closed_at))
+        for pr in changed
+    }
+    table.update(rows, started, horizon.timestamp())
+    return len(changed)
+
+def _distribution(values, scale: float) -> Dict:
+    import numpy as np
+
+    if values.size == 0:
+        return {"count": 0, "p50": None, "p90": None}
+    p50, p90 = np.percentile(values / scale, [50, 90])
+    return {"count": int(values.size), "p50": round(float(p50), 2), "p90": round(float(p90), 2)}
+
+def compute_flow_metrics(created, first_review, merged, closed, now: float, days: int) -> Dict:
+    """
+    Flow metrics of the pull requests in a window ending now.
+
+    Lead time runs from opening to merge, time to first review from opening
+    to the first review by someone other than the author, and time to merge
+    from that review to the merge. Durations are reported for the pull
+    requests merged (or, for review latency, opened) in the window.
+
+    Args:
+        created, first_review, merged, closed: Epoch-second arrays, NaN when missing
+        now: End of the window (epoch seconds)
+        days: Length of the window
+
+    Returns:
+        Metrics document
+    """
+    import numpy as np
+
+    start = now - days * DAY_SECONDS
+    # Comparisons with NaN are false, so missing timestamps drop out of every mask
+    merged_in = (merged >= start) & (merged <= now)
+    opened_in = (created >= start) & (created <= now)
+    reviewed = opened_in & (first_review >= created)
+    reviewed_merged = merged_in & (first_review <= merged)
+    is_open = np.isnan(closed) & (created <= now)
+
+    weeks = math.ceil(days / 7)
+    week_index = ((merged[merged_in] - start) // WEEK_SECONDS).astype(np.int64)
+    per_week = np.bincount(np.minimum(week_index, weeks - 1), minlength=weeks)
+    week_starts = start + np.arange(weeks) * WEEK_SECONDS
+    open_age = (now - created[is_open]) / DAY_SECONDS
+
+    return {
+        "days": days,
+        "opened": int(opened_in.sum()),
+        "merged": int(merged_in.sum()),
+        "closed_unmerged": int(((closed >= start) & (closed <= now) & np.isnan(merged)).sum()),
+        "lead_time_hours": _distribution(merged[merged_in] - created[merged_in], HOUR_SECONDS),
+        "time_to_first_review_hours": _distribution(first_review[reviewed] - created[reviewed], HOUR_SECONDS),
+        "time_to_merge_hours": _distribution(merged[reviewed_merged] - first_review[reviewed_merged], HOUR_SECONDS),
+        "throughput": {
+            "per_week": round(float(merged_in.sum()) / (days / 7), 2),
+            "weeks": [{"week_start": datetime.fromtimestamp(week, timezone.utc).isoformat(), "merged": int(count)}
+                      for week, count in zip(week_starts, per_week)],
+        },
+        "open_pull_requests": {
+            "count": int(open_age.size),
+            "age_days_p50": round(float(np.percentile(open_age, 50)), 2) if open_age.size else None,
+            "age_days_p90": round(float(np.percentile(open_age, 90)), 2) if open_age.size else None,
+            "oldest_days": round(float(open_age.max()), 2) if open_age.size else None,
+        },
+    }
+
+def _synced_columns(client, repo_name: str):
+    """A repository's timestamp columns, syncing its table first if stale."""
+    table = _table(repo_name)
+    with table.lock:
+        if table.is_stale:
+            start = time.perf_counter()
+            with observe_upstream("github", "get_repo"):
+                repo = client.get_repo(repo_name)
+            changed = sync_pull_requests(repo, table)
+            logger.info(f"Synced {changed} changed pull requests of {table.repo_name} "
+                        f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return table.columns()
+
+@timed_stage("github_fetch")
+def get_flow_metrics(days: int = 30, repositories: Optional[List[str]] = None) -> Dict:
+    """
+    Flow metrics of the configured repository (or of ``repositories`` together),
+    syncing each first if stale.
+
+    Args:
+        days: Length of the window (at most FLOW_METRICS_DAYS)
+        repositories: Repository full names whose pull requests are pooled
+            (default: GITHUB_REPO)
+
+    Returns:
+        Metrics document, or {"error": ...}
+    """
+    import numpy as np
+
+    if days > settings.FLOW_METRICS_DAYS:
+        return {"error": f"days must be at most {settings.FLOW_METRICS_DAYS}"}
+    names = list(repositories or ([settings.GITHUB_REPO] if settings.GITHUB_REPO else []))
+    client = get_github_client()
+    if not client or not names:
+        return {"error": "GitHub credentials not configured"}
+    try:
+        tables = [_synced_columns(client, name) for name in names]
+        columns = [np.concatenate(column) for column in zip(*tables)]
+        scope = {"repository": names[0]} if len(names) == 1 else {"repositories": names}
+        return {**scope, **compute_flow_metrics(*columns, time.time(), days)}
+    except Exception as e:
+        logger.error(f"Flow metrics error: {e}")
+        return {"error": f"Failed to compute flow metrics: {str(e)}"}
@@ -1,28 +1,324 @@
-from github import Github
-from app.core.config import settings
-from typing import List, Dict
-from datetime import datetime, timedelta
+"""
+GitHub repository activity, release notes and issue creation.
 
-# Initialize GitHub client
-github_client = None
+Teams usually span several repositories: GITHUB_REPOS lists them, or
+GITHUB_ORG (with GITHUB_TOPIC) has them discovered from an organization.
+get_repository_data() fetches the window of every configured repository
+concurrently and aggregates the records, with per-repository and total
+counts. A request's latency tracks its slowest repository rather than the
+sum. A token's fetches share its rate limit, so at most
+GITHUB_FETCH_WORKERS of them run at once across all requests (per tenant,
+each with its own token), and once GitHub reports the rate limit exhausted
+further fetches fail fast until it resets.
+GITHUB_REPO is the repository for issue creation, release notes, flow
+metrics and pagination.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.cache import TTLCache, ttl_cached
+from app.core.clients import get_client
+from app.core.config import current_tenant, settings
+from app.core.fieldsets import project, wants_any
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+from app.core.pagination import Page
+from app.core.timing import timed_stage
+from app.models.schemas import GitHubCommit, GitHubIssue, GitHubPullRequest, GitHubRelease
+from app.services.activity_store import (
+    Activity, read_window, record_coverage, to_timestamp, upsert, upsert_versioned,
+)
+from typing import AbstractSet, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import re
+import time
+
+logger = get_logger("github")
 
 def get_github_client():
-    """Initialize and return GitHub client."""
-    global github_client
-    if github_client is None and settings.GITHUB_TOKEN:
+    """Return the shared GitHub client, or None if not configured."""
+    try:
+        return get_client("github")
+    except Exception as e:
+        logger.error(f"GitHub connection error: {e}")
+        return None
+
+# Sections of /api/github/repository in order, with the record type of each
+REPOSITORY_SECTIONS = ("pull_requests", "issues", "commits", "releases")
+SECTION_TYPES = {"pull_requests": "pull_request", "issues": "issue", "commits": "commit", "releases": "release"}
+SECTION_MODELS = {"pull_requests": GitHubPullRequest, "issues": GitHubIssue, "commits": GitHubCommit, "releases": GitHubRelease}
+# PyGithub's default per_page; a shorter page is the last one of its section
+GITHUB_PAGE_SIZE = 30
+# Commits listed in release notes
+RELEASE_NOTES_COMMITS = 10
+
+# Per tenant (None for the deployment's token): repository fetch slots shared
+# by all requests, and the epoch seconds until which the rate limit is exhausted
+_fetch_slots: Dict[Optional[str], threading.BoundedSemaphore] = {}
+_rate_limited_until: Dict[Optional[str], float] = {}
+_limits_lock = threading.Lock()
+
+_release_notes_cache = TTLCache("release_notes", settings.RELEASE_NOTES_CACHE_TTL_SECONDS)
+# Repository details by full name, so windows read from the activity store need no get_repo call
+_repository_cache = TTLCache("github_repository", settings.DIRECTORY_CACHE_TTL_SECONDS)
+
+def _format_pull_request(pr) -> Dict:
+    return {
+        "number": pr.number,
+        "title": pr.title,
+        "state": pr.state,
+        "created_at": pr.created_at.isoformat(),
+        "merged_at": pr.merged_at.isoformat() if pr.merged_at else None,
+        "user": pr.user.login,
+        "url": pr.html_url
+    }
+
+def _format_issue(issue) -> Dict:
+    return {
+        "number": issue.number,
+        "title": issue.title,
+        "state": issue.state,
+        "created_at": issue.created_at.isoformat(),
+        "user": issue.user.login,
+        "labels": [label.name for label in issue.labels],
+        "url": issue.html_url
+    }
+
+def _format_commit(commit) -> Dict:
+    return {
+        "sha": commit.sha[:7],
+        "message": commit.commit.message,
+        "author": commit.commit.author.name,
+        "date": commit.commit.author.date.isoformat(),
+        "url": commit.html_url
+    }
+
+def _format_release(release) -> Dict:
+    return {
+        "tag_name": release.tag_name,
+        "name": release.title,
+        "body": release.body,
+        "created_at": release.created_at.isoformat(),
+        "url": release.html_url
+    }
+
+def _activity(repo, section: str, raw, record: Dict) -> Optional[Activity]:
+    """Normalized activity of a fetched record; issues that are pull requests are left to the PR listing."""
+    name = repo.full_name
+    if section == "pull_requests":
+        return Activity("github", "pull_request", f"{name}#{raw.number}", to_timestamp(raw.created_at), record["user"],
+                        name, raw.title, raw.body, raw.html_url, "merged" if raw.merged_at else raw.state, record)
+    if section == "issues":
+        if "/pull/" in (raw.html_url or ""):
+            return None
+        return Activity("github", "issue", f"{name}#{raw.number}", to_timestamp(raw.created_at), record["user"],
+                        name, raw.title, raw.body, raw.html_url, raw.state, record)
+    if section == "commits":
+        message = record["message"] or ""
+        # Forks and mirrors share SHAs, so commits are keyed by repository too
+        return Activity("github", "commit", f"{name}@{raw.sha}", to_timestamp(raw.commit.author.date), record["author"],
+                        name, message.split("\n", 1)[0], message, raw.html_url, None, record)
+    return Activity("github", "release", f"{name}@{raw.tag_name}", to_timestamp(raw.created_at), None, name,
+                    raw.title or raw.tag_name, raw.body, raw.html_url, None, record)
+
+def _version(section: str, raw) -> Optional[float]:
+    """A fetched pull request's or issue's version for out-of-order handling: its last update time."""
+    if section in ("pull_requests", "issues"):
+        return to_timestamp(raw.updated_at)
+    return None
+
+def store_records(versioned: Iterable[Tuple[Optional[Activity], Optional[float]]], strict: bool = False) -> int:
+    """
+    Store fetched or delivered records.
+
+    Pull requests and issues carry a version (their last update time) and
+    keep any newer version already stored, so a late delivery or a poll that
+    overlapped a delivery cannot overwrite newer state. Commits never change,
+    and releases have no update time, so theirs are written as they come.
+
+    Args:
+        versioned: (record or None, version or None) pairs
+        strict: Raise store errors rather than logging them (webhook deliveries)
+
+    Returns:
+        Number of records written
+    """
+    pairs = [(activity, version) for activity, version in versioned if activity is not None]
+    return (upsert_versioned([(activity, version) for activity, version in pairs if version is not None], strict)
+            + upsert([activity for activity, version in pairs if version is None], strict))
+
+def _format_repository(repo) -> Dict:
+    return {
+        "name": repo.name,
+        "full_name": repo.full_name,
+        "description": repo.description,
+        "url": repo.html_url
+    }
+
+def remember_repository(details: Dict) -> None:
+    """Keep a repository's details (as formatted for /api/github/repository) for store reads."""
+    _repository_cache.set(details["full_name"], details, store_max_age())
+
+def store_max_age() -> float:
+    """
+    How long a fetched GitHub window may be served from the activity store.
+    
+    With webhooks configured (GITHUB_WEBHOOK_SECRET) the store is kept
+    current by deliveries and the reconciliation poll, so a window stays
+    valid until two reconciliations have been missed.
+    """
+    if settings.GITHUB_WEBHOOK_SECRET and settings.GITHUB_RECONCILE_SECONDS > 0:
+        return max(settings.ACTIVITY_STORE_MAX_AGE_SECONDS, 2 * settings.GITHUB_RECONCILE_SECONDS)
+    return settings.ACTIVITY_STORE_MAX_AGE_SECONDS
+
+def repositories_configured() -> bool:
+    """True if any repository (GITHUB_REPO, GITHUB_REPOS or GITHUB_ORG) is configured."""
+    return bool(settings.GITHUB_REPO or settings.GITHUB_REPOS or settings.GITHUB_ORG)
+
+@ttl_cached("github_org_repositories", lambda: settings.DIRECTORY_CACHE_TTL_SECONDS)
+def organization_repositories(org: str, topic: str = "") -> List[str]:
+    """
+    Full names of an organization's unarchived repositories, optionally only those with a topic.
+    
+    Raises:
+        Exception: upstream errors
+    """
+    client = get_github_client()
+    if not client:
+        return []
+    with observe_upstream("github", "get_repos"):
+        return [repo.full_name for repo in client.get_organization(org).get_repos(type="all")
+                if not repo.archived and (not topic or topic in (repo.topics or []))]
+
+def configured_repositories() -> List[str]:
+    """
+    Repositories aggregated by get_repository_data(): GITHUB_REPOS, else the
+    GITHUB_ORG repositories tagged GITHUB_TOPIC, else GITHUB_REPO.
+    """
+    if settings.GITHUB_REPOS:
+        return [name.strip() for name in settings.GITHUB_REPOS.split(",") if name.strip()]
+    if settings.GITHUB_ORG:
         try:
-            github_client = Github(settings.GITHUB_TOKEN)
+            return organization_repositories(settings.GITHUB_ORG, settings.GITHUB_TOPIC)
         except Exception as e:
-            print(f"GitHub connection error: {e}")
-            return None
-    return github_client
+            logger.error(f"GitHub API error listing {settings.GITHUB_ORG} repositories: {e}")
+            return []
+    return [settings.GITHUB_REPO] if settings.GITHUB_REPO else []
 
-def get_repository_data(days: int = 7) -> Dict:
+def _note_rate_limit(error: Exception) -> None:
+    """Make further fetches fail fast if GitHub reported the rate limit exhausted."""
+    from github import RateLimitExceededException
+    if not isinstance(error, RateLimitExceededException):
+        return
+    headers = {key.lower(): value for key, value in (getattr(error, "headers", None) or {}).items()}
+    if headers.get("x-ratelimit-reset"):
+        until = float(headers["x-ratelimit-reset"])
+    else:
+        until = time.time() + float(headers.get("retry-after") or 60)
+    with _limits_lock:
+        _rate_limited_until[current_tenant()] = max(_rate_limited_until.get(current_tenant(), 0.0), until)
+    logger.warning(f"GitHub rate limit exhausted for {until - time.time():.0f}s")
+
+def _stored_repository_data(name: str, days: int, fields: Optional[AbstractSet[str]]) -> Optional[Dict]:
+    """The window's sections from the activity store, or None if it must be fetched."""
+    hit, repository = _repository_cache.get(name)
+    if not hit:
+        return None
+    now = time.time()
+    stored = read_window("github", name, now - days * 86400, now, store_max_age())
+    if stored is None:
+        return None
+    data = {section: [project(record, fields) for record in stored.get(SECTION_TYPES[section], [])]
+            for section in REPOSITORY_SECTIONS if wants_any(fields, SECTION_MODELS[section])}
+    data["repository"] = repository
+    return data
+
+def _repository_window(name: str, days: int, fields: Optional[AbstractSet[str]], refresh: bool) -> Dict:
+    """One repository's window, from the activity store unless ``refresh`` or not held there."""
+    if not refresh:
+        stored = _stored_repository_data(name, days, fields)
+        if stored is not None:
+            return stored
+    tenant = current_tenant()
+    with _limits_lock:
+        slot = _fetch_slots.setdefault(tenant, threading.BoundedSemaphore(max(1, settings.GITHUB_FETCH_WORKERS)))
+    with slot:
+        wait = _rate_limited_until.get(tenant, 0.0) - time.time()
+        if wait > 0:
+            return {"error": f"GitHub rate limit exhausted; retry in {wait:.0f}s"}
+        return fetch_repository_data(days, fields, name)
+
+def _aggregate(names: List[str], documents: List[Dict], fields: Optional[AbstractSet[str]]) -> Dict:
+    """Merge per-repository documents, tagging each record with its ``repo``."""
+    sections = [section for section in REPOSITORY_SECTIONS if wants_any(fields, SECTION_MODELS[section])]
+    data: Dict = {section: [] for section in sections}
+    repositories = []
+    for name, document in zip(names, documents):
+        if "error" in document:
+            repositories.append({"repository": {"full_name": name}, "error": document["error"]})
+            continue
+        for section in sections:
+            data[section].extend({**record, "repo": name} for record in document[section])
+        repositories.append({"repository": document["repository"],
+                             "counts": {section: len(document[section]) for section in sections}})
+    failed = [entry for entry in repositories if "error" in entry]
+    if len(failed) == len(repositories):
+        return {"error": "; ".join(f"{entry['repository']['full_name']}: {entry['error']}" for entry in failed)}
+    data["repositories"] = repositories
+    data["totals"] = {section: len(data[section]) for section in sections}
+    return data
+
+@timed_stage("github_fetch")
+def get_repository_data(days: int = 7, fields: Optional[AbstractSet[str]] = None,
+                        repositories: Optional[List[str]] = None, refresh: bool = False) -> Dict:
     """
-    Fetch comprehensive repository data for the specified time period.
+    Repository data for the specified time period.
+    
+    Windows fetched recently, or kept current by webhooks, are read from the
+    activity store without any GitHub call; others are fetched. Several
+    repositories are fetched concurrently and aggregated: each section lists
+    the records of all of them, tagged with their ``repo``, and
+    ``repositories`` and ``totals`` give the per-repository and total
+    counts. A repository that fails is reported in ``repositories`` with its
+    error; only if all fail is the result an error.
     
     Args:
         days: Number of days to look back
+        fields: Record fields to return (None for all)
+        repositories: Full names of the repositories (default: configured_repositories())
+        refresh: Fetch from GitHub even if the window is held in the store
+    
+    Returns:
+        Dictionary containing PRs, issues, commits, and releases
+    """
+    client = get_github_client()
+    if not client:
+        return {"error": "GitHub credentials not configured"}
+    names = repositories or configured_repositories()
+    if not names:
+        return {"error": "No GitHub repository configured (GITHUB_REPO, GITHUB_REPOS or GITHUB_ORG)"}
+    if len(names) == 1:
+        return _repository_window(names[0], days, fields, refresh)
+    # Each task runs in a copy of the request's context, so its tenant, logs and timings carry over
+    with ThreadPoolExecutor(max_workers=min(len(names), max(1, settings.GITHUB_FETCH_WORKERS))) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _repository_window, name, days, fields, refresh)
+                   for name in names]
+        documents = [future.result() for future in futures]
+    return _aggregate(names, documents, fields)
+
+def fetch_repository_data(days: int = 7, fields: Optional[AbstractSet[str]] = None, name: Optional[str] = None) -> Dict:
+    """
+    Fetch comprehensive repository data for the specified time period from GitHub.
+    
+    GitHub's REST API has no field selection, so a fieldset prunes the
+    records and skips fetching sections with none of the requested fields.
+    A complete fetch is recorded as activity store coverage.
+    
+    Args:
+        days: Number of days to look back
+        fields: Record fields to return (None for all)
+        name: Repository full name (default: GITHUB_REPO)
     
     Returns:
         Dictionary containing PRs, issues, commits, and releases
@@ -32,88 +328,202 @@ def get_repository_data(days: int = 7) -> Dict:
         return {"error": "GitHub credentials not configured"}
     
     try:
-        repo = client.get_repo(settings.GITHUB_REPO)
+        with observe_upstream("github", "get_repo"):
+            repo = client.get_repo(name or settings.GITHUB_REPO)
         since_date = datetime.now() - timedelta(days=days)
+        data = {}
+        activities = []
+        # Whether every section was fetched in full, so the store holds the whole window
+        complete = fields is None
         
         # Fetch recent pull requests
-        pull_requests = []
-        try:
-            for pr in repo.get_pulls(state='all'):
-                if pr.created_at >= since_date:
-                    pull_requests.append({
-                        "number": pr.number,
-                        "title": pr.title,
-                        "state": pr.state,
-                        "created_at": pr.created_at.isoformat(),
-                        "user": pr.user.login,
-                        "url": pr.html_url
-                    })
-        except Exception as e:
-            print(f"Error fetching pull requests: {e}")
+        if wants_any(fields, GitHubPullRequest):
+            pull_requests = []
+            try:
+                with observe_upstream("github", "get_pulls"):
+                    for pr in repo.get_pulls(state='all'):
+                        if pr.created_at >= since_date:
+                            record = _format_pull_request(pr)
+                            activities.append((_activity(repo, "pull_requests", pr, record), _version("pull_requests", pr)))
+                            pull_requests.append(project(record, fields))
+            except Exception as e:
+                complete = False
+                _note_rate_limit(e)
+                logger.warning(f"Error fetching pull requests: {e}")
+            data["pull_requests"] = pull_requests
         
         # Fetch recent issues
-        issues = []
-        try:
-            for issue in repo.get_issues(state='all'):
-                if issue.created_at >= since_date:
-                    issues.append({
-                        "number": issue.number,
-                        "title": issue.title,
-                        "state": issue.state,
-                        "created_at": issue.created_at.isoformat(),
-                        "user": issue.user.login,
-                        "labels": [label.name for label in issue.labels],
-                        "url": issue.html_url
-                    })
-        except Exception as e:
-            print(f"Error fetching issues: {e}")
+        if wants_any(fields, GitHubIssue):
+            issues = []
+            try:
+                with observe_upstream("github", "get_issues"):
+                    for issue in repo.get_issues(state='all'):
+                        if issue.created_at >= since_date:
+                            record = _format_issue(issue)
+                            activities.append((_activity(repo, "issues", issue, record), _version("issues", issue)))
+                            issues.append(project(record, fields))
+            except Exception as e:
+                complete = False
+                _note_rate_limit(e)
+                logger.warning(f"Error fetching issues: {e}")
+            data["issues"] = issues
         
         # Fetch recent commits
-        commits = []
-        try:
-            for commit in repo.get_commits(since=since_date):
-                commits.append({
-                    "sha": commit.sha[:7],
-                    "message": commit.commit.message,
-                    "author": commit.commit.author.name,
-                    "date": commit.commit.author.date.isoformat(),
-                    "url": commit.html_url
-                })
-        except Exception as e:
-            if "Git Repository is empty" in str(e):
-                print("Repository is empty - no commits to fetch")
-            else:
-                print(f"Error fetching commits: {e}")
+        if wants_any(fields, GitHubCommit):
+            commits = []
+            try:
+                with observe_upstream("github", "get_commits"):
+                    for commit in repo.get_commits(since=since_date):
+                        record = _format_commit(commit)
+                        activities.append((_activity(repo, "commits", commit, record), _version("commits", commit)))
+                        commits.append(project(record, fields))
+            except Exception as e:
+                if "Git Repository is empty" in str(e):
+                    logger.info("Repository is empty - no commits to fetch")
+                else:
+                    complete = False
+                    _note_rate_limit(e)
+                    logger.warning(f"Error fetching commits: {e}")
+            data["commits"] = commits
         
         # Fetch recent releases
-        releases = []
-        for release in repo.get_releases():
-            if release.created_at >= since_date:
-                releases.append({
-                    "tag_name": release.tag_name,
-                    "name": release.title,
-                    "body": release.body,
-                    "created_at": release.created_at.isoformat(),
-                    "url": release.html_url
-                })
+        if wants_any(fields, GitHubRelease):
+            releases = []
+            with observe_upstream("github", "get_releases"):
+                for release in repo.get_releases():
+                    if release.created_at >= since_date:
+                        record = _format_release(release)
+                        activities.append((_activity(repo, "releases", release, record), _version("releases", release)))
+                        releases.append(project(record, fields))
+            data["releases"] = releases
         
-        return {
-            "pull_requests": pull_requests,
-            "issues": issues,
-            "commits": commits,
-            "releases": releases,
-            "repository": {
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "url": repo.html_url
-            }
-        }
+        data["repository"] = _format_repository(repo)
+        store_records(activities)
+        remember_repository(data["repository"])
+        if complete:
+            record_coverage("github", repo.full_name, time.time() - days * 86400, time.time(), store_max_age())
+        return data
         
     except Exception as e:
-        print(f"GitHub API error: {e}")
+        _note_rate_limit(e)
+        logger.error(f"GitHub API error: {e}")
         return {"error": f"Failed to fetch GitHub data: {str(e)}"}
 
+def open_repository(name: Optional[str] = None):
+    """
+    Return a repository for cursor pagination.
+    
+    Args:
+        name: Repository full name (default: GITHUB_REPO, else the first
+            repository of GITHUB_REPOS or GITHUB_ORG)
+    
+    Returns:
+        PyGithub Repository, or None if GitHub is not configured
+    
+    Raises:
+        ValueError: no repository is named or configured
+    """
+    client = get_github_client()
+    if not client:
+        return None
+    name = name or settings.GITHUB_REPO or next(iter(configured_repositories()), None)
+    if not name:
+        raise ValueError("No GitHub repository to page: pass repos or configure GITHUB_REPO, GITHUB_REPOS or GITHUB_ORG")
+    with observe_upstream("github", "get_repo"):
+        return client.get_repo(name)
+
+def _wanted_section(index: int, fields: Optional[AbstractSet[str]]) -> Optional[int]:
+    """First section at or after ``index`` with a requested field, or None."""
+    for candidate in range(index, len(REPOSITORY_SECTIONS)):
+        if wants_any(fields, SECTION_MODELS[REPOSITORY_SECTIONS[candidate]]):
+            return candidate
+    return None
+
+def fetch_repository_page(repo, days: int = 7, token=None, fields: Optional[AbstractSet[str]] = None) -> Page:
+    """
+    Fetch one upstream page of repository activity for cursor pagination.
+    
+    Walks pull requests, issues, commits and releases in that order, one
+    GitHub page at a time, tagging each record with its ``type``. Pull
+    requests, issues and releases are listed newest first, so a section
+    ends at the first record older than the window. Sections with none of
+    the requested fields are not fetched.
+    
+    Args:
+        repo: Repository from open_repository()
+        days: Number of days to look back (ignored when resuming from a token)
+        token: [since, section index, page number] from the previous page, or None to start
+        fields: Record fields to return (None for all)
+    
+    Returns:
+        Page of tagged record dictionaries; upstream errors are raised
+    """
+    since, section_index, page_number = token or ((datetime.now() - timedelta(days=days)).isoformat(), 0, 0)
+    since_date = datetime.fromisoformat(since)
+    section_index = _wanted_section(section_index, fields)
+    if section_index is None:
+        return Page([])
+    section = REPOSITORY_SECTIONS[section_index]
+    
+    with observe_upstream("github", f"get_{section}"):
+        try:
+            if section == "pull_requests":
+                raw = repo.get_pulls(state='all').get_page(page_number)
+            elif section == "issues":
+                raw = repo.get_issues(state='all').get_page(page_number)
+            elif section == "commits":
+                raw = repo.get_commits(since=since_date).get_page(page_number)
+            else:
+                raw = repo.get_releases().get_page(page_number)
+        except Exception as e:
+            if section != "commits" or "Git Repository is empty" not in str(e):
+                raise
+            raw = []
+    
+    items = []
+    activities = []
+    section_done = len(raw) < GITHUB_PAGE_SIZE
+    formatter = {"pull_requests": _format_pull_request, "issues": _format_issue,
+                 "commits": _format_commit, "releases": _format_release}[section]
+    for item in raw:
+        if section != "commits" and item.created_at < since_date:
+            section_done = True
+            break
+        record = formatter(item)
+        activities.append((_activity(repo, section, item, record), _version(section, item)))
+        items.append({"type": SECTION_TYPES[section], **project(record, fields)})
+    store_records(activities)
+    
+    next_section = _wanted_section(section_index + 1, fields)
+    if not section_done:
+        next_token = [since, section_index, page_number + 1]
+    elif next_section is not None:
+        next_token = [since, next_section, 0]
+    else:
+        next_token = None
+    return Page(items, next_token)
+
+def group_repository_records(repo, records: Iterable[Dict], fields: Optional[AbstractSet[str]] = None) -> Dict:
+    """
+    Rebuild the sectioned get_repository_data() document from tagged page records.
+    
+    Args:
+        repo: Repository from open_repository()
+        records: Records from fetch_repository_page()
+        fields: Fieldset the records were fetched with; sections without
+            a requested field are left out, as in get_repository_data()
+    
+    Returns:
+        Dictionary of section lists plus the repository details
+    """
+    document = {section: [] for section in REPOSITORY_SECTIONS if wants_any(fields, SECTION_MODELS[section])}
+    section_of = {record_type: section for section, record_type in SECTION_TYPES.items()}
+    for record in records:
+        record = dict(record)
+        document[section_of[record.pop("type")]].append(record)
+    document["repository"] = _format_repository(repo)
+    return document
+
 def create_issue(title: str, body: str, labels: List[str] | None = None) -> Dict:
     """
     Create a new GitHub issue.
@@ -131,12 +541,14 @@ def create_issue(title: str, body: str, labels: List[str] | None = None) -> Dict
         return {"error": "GitHub credentials not configured"}
     
     try:
-        repo = client.get_repo(settings.GITHUB_REPO)
-        issue = repo.create_issue(
-            title=title,
-            body=body,
-            labels=labels if labels else []
-        )
+        with observe_upstream("github", "get_repo"):
+            repo = client.get_repo(settings.GITHUB_REPO)
+        with observe_upstream("github", "create_issue"):
+            issue = repo.create_issue(
+                title=title,
+                body=body,
+                labels=labels if labels else []
+            )
         
         return {
             "number": issue.number,
@@ -146,49 +558,172 @@ def create_issue(title: str, body: str, labels: List[str] | None = None) -> Dict
         }
         
     except Exception as e:
-        print(f"GitHub API error: {e}")
+        logger.error(f"GitHub API error: {e}")
         return {"error": f"Failed to create issue: {str(e)}"}
 
-def generate_release_notes(since_date: datetime | None = None) -> str:
+def _is_fixed_ref(repo, ref: str) -> bool:
+    """True if a ref is a commit SHA or a tag, i.e. not a moving branch."""
+    if re.fullmatch(r"[0-9a-f]{40}", ref):
+        return True
+    try:
+        with observe_upstream("github", "get_git_ref"):
+            repo.get_git_ref(f"tags/{ref}")
+        return True
+    except Exception:
+        return False
+
+def _merged_pull_requests(repo, since: datetime, until: datetime, merge_shas: Optional[AbstractSet[str]] = None) -> List:
     """
-    Generate release notes from recent commits and PRs.
+    Pull requests merged in a window, from the closed listing sorted by update.
+    
+    A merged pull request is last updated no earlier than its merge, so the
+    listing stops at the first one updated before ``since``.
     
     Args:
-        since_date: Date to look back from (default: last 7 days)
+        repo: Repository
+        since: Start of the window
+        until: End of the window
+        merge_shas: If given, only pull requests whose merge commit is in this set
     
     Returns:
-        Formatted release notes
+        Merged pull requests, most recently updated first
     """
-    if since_date is None:
-        since_date = datetime.now() - timedelta(days=7)
-    
-    repo_data = get_repository_data()
-    if "error" in repo_data:
-        return f"Error: {repo_data['error']}"
-    
+    pulls = []
+    with observe_upstream("github", "get_pulls"):
+        for pr in repo.get_pulls(state="closed", sort="updated", direction="desc"):
+            if pr.updated_at < since:
+                break
+            if pr.merged_at is None:
+                continue
+            if merge_shas is not None:
+                if pr.merge_commit_sha in merge_shas:
+                    pulls.append(pr)
+            elif since <= pr.merged_at <= until:
+                pulls.append(pr)
+    return pulls
+
+def _closed_bugs(repo, since: datetime, until: datetime) -> List:
+    """Issues labelled bug that were closed in a window."""
+    bugs = []
+    with observe_upstream("github", "get_issues"):
+        for issue in repo.get_issues(state="closed", labels=["bug"], sort="updated", direction="desc", since=since):
+            if issue.updated_at < since:
+                break
+            # The issues listing includes pull requests; checking
+            # issue.pull_request would fetch every plain issue again
+            if "/pull/" in issue.html_url or issue.closed_at is None or not since <= issue.closed_at <= until:
+                continue
+            if "bug" in [label.name.lower() for label in issue.labels]:
+                bugs.append(issue)
+    return bugs
+
+def _render_release_notes(pulls: List, bugs: List, commits: List[Dict]) -> str:
     notes = []
     notes.append("# Release Notes\n")
     
     # Add new features from merged PRs
-    new_features = [pr for pr in repo_data["pull_requests"] if pr["state"] == "closed"]
-    if new_features:
+    if pulls:
         notes.append("## New Features")
-        for pr in new_features:
-            notes.append(f"- {pr['title']} (#{pr['number']})")
+        for pr in pulls:
+            notes.append(f"- {pr.title} (#{pr.number})")
         notes.append("")
     
     # Add bug fixes from issues
-    bug_fixes = [issue for issue in repo_data["issues"] if issue["state"] == "closed" and "bug" in [label.lower() for label in issue["labels"]]]
-    if bug_fixes:
+    if bugs:
         notes.append("## Bug Fixes")
-        for issue in bug_fixes:
-            notes.append(f"- {issue['title']} (#{issue['number']})")
+        for issue in bugs:
+            notes.append(f"- {issue.title} (#{issue.number})")
         notes.append("")
     
     # Add recent commits
-    if repo_data["commits"]:
+    if commits:
         notes.append("## Recent Commits")
-        for commit in repo_data["commits"][:10]:  # Last 10 commits
+        for commit in commits[:RELEASE_NOTES_COMMITS]:
             notes.append(f"- {commit['message'].split('\n')[0]} ({commit['sha']})")
     
-    return "\n".join(notes) 
\ No newline at end of file
+    return "\n".join(notes)
+
+def _notes_between_refs(repo, base: str, head: str) -> str:
+    with observe_upstream("github", "compare"):
+        comparison = repo.compare(base, head)
+        commits = list(comparison.commits)
+        since = comparison.merge_base_commit.commit.author.date
+    if not commits:
+        return _render_release_notes([], [], [])
+    until = commits[-1].commit.author.date
+    pulls = _merged_pull_requests(repo, since, until, merge_shas={commit.sha for commit in commits})
+    bugs = _closed_bugs(repo, since, until)
+    return _render_release_notes(pulls, bugs, [_format_commit(commit) for commit in reversed(commits)])
+
+def _notes_between_dates(repo, since: datetime, until: datetime) -> str:
+    commits = []
+    with observe_upstream("github", "get_commits"):
+        for commit in repo.get_commits(since=since, until=until):
+            commits.append(_format_commit(commit))
+            if len(commits) >= RELEASE_NOTES_COMMITS:
+                break
+    return _render_release_notes(_merged_pull_requests(repo, since, until), _closed_bugs(repo, since, until), commits)
+
+def generate_release_notes(since_date: datetime | None = None, until_date: datetime | None = None,
+                           base: str | None = None, head: str | None = None) -> str:
+    """
+    Generate release notes from the PRs, bug fixes and commits of a range.
+    
+    The range is either two refs (tags, branches or SHAs), read with the
+    compare API, or a date window. Notes are memoized per range: ranges
+    between tags or SHAs and windows that ended in the past cannot change,
+    so they are kept for RELEASE_NOTES_CACHE_TTL_SECONDS; a range ending at
+    a branch only for DIRECTORY_CACHE_TTL_SECONDS. A window ending now is
+    not memoized.
+    
+    Args:
+        since_date: Start of the window (default: 7 days ago)
+        until_date: End of the window (default: now)
+        base: Ref to compare from; takes precedence over the window
+        head: Ref to compare to (default: the default branch)
+    
+    Returns:
+        Formatted release notes
+    """
+    client = get_github_client()
+    if not client:
+        return "Error: GitHub credentials not configured"
+    
+    # PyGithub returns naive UTC datetimes
+    since_date, until_date = (
+        value.astimezone(timezone.utc).replace(tzinfo=None) if value and value.tzinfo else value
+        for value in (since_date, until_date)
+    )
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # The repository is part of the key, and TTLCache keeps each tenant's entries apart
+    if base:
+        key = ("refs", settings.GITHUB_REPO, base, head)
+    elif until_date is not None and until_date < now:
+        since_date = since_date or until_date - timedelta(days=7)
+        key = ("dates", settings.GITHUB_REPO, since_date.isoformat(), until_date.isoformat())
+    else:
+        key = None
+    if key is not None:
+        hit, notes = _release_notes_cache.get(key)
+        if hit:
+            return notes
+    
+    try:
+        with observe_upstream("github", "get_repo"):
+            repo = client.get_repo(settings.GITHUB_REPO)
+        if base:
+            head = head or repo.default_branch
+            notes = _notes_between_refs(repo, base, head)
+            fixed = _is_fixed_ref(repo, base) and _is_fixed_ref(repo, head)
+        else:
+            until_date = until_date or now
+            notes = _notes_between_dates(repo, since_date or until_date - timedelta(days=7), until_date)
+            fixed = True
+    except Exception as e:
+        logger.error(f"GitHub API error: {e}")
+        return f"Error: {str(e)}"
+    
+    if key is not None:
+        ttl = settings.RELEASE_NOTES_CACHE_TTL_SECONDS if fixed else settings.DIRECTORY_CACHE_TTL_SECONDS
+        _release_notes_cache.set(key, notes, ttl)
+    return notes
@@ -0,0 +1,231 @@
+"""
+GitHub webhook ingestion and reconciliation.
+
+Rather than polling GitHub on every request, the repository's webhook
+delivers push, pull_request, issues and release events to
+/api/github/webhook. Each delivery is verified against GITHUB_WEBHOOK_SECRET
+(the X-Hub-Signature-256 HMAC of the body), and its records are upserted into
+the activity store in the same shape as the records get_repository_data()
+fetches, so repository windows are served from the store (see
+``store_max_age``). A delivery also wakes the bot's snapshot refresher,
+makes the next flow metrics read of the repository sync, and drops cached
+release notes. A redelivery (same X-GitHub-Delivery) of an applied
+delivery is skipped; a delivery that failed is remembered only once a
+redelivery applies it. Deliveries are not ordered, so pull requests and
+issues are versioned by their ``updated_at`` (see ``store_records``), and
+a deleted issue stays deleted.
+
+Deliveries can be missed (the service was down, GitHub gave up retrying),
+so while webhooks are configured a reconciliation poll re-fetches the last
+GITHUB_RECONCILE_DAYS days of every configured repository every
+GITHUB_RECONCILE_SECONDS as a safety net. An organization webhook covers
+all of an organization's repositories.
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.cache import clear_caches
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import record_webhook_event
+from app.core.webhooks import DeliveryLog, signature_matches
+from app.services.activity_store import Activity, delete, delete_versioned, to_timestamp
+from app.services.flow_metrics_service import mark_stale
+from app.services.github_service import get_repository_data, remember_repository, store_records
+from app.services.snapshot_service import request_refresh
+
+logger = get_logger("github_webhooks")
+
+# Events whose records are stored; others (ping included) are acknowledged and ignored
+EVENTS = ("push", "pull_request", "issues", "release")
+# Issue actions after which the issue no longer belongs to the repository
+REMOVED_ISSUE_ACTIONS = ("deleted", "transferred")
+
+deliveries = DeliveryLog()
+
+def verify_signature(body: bytes, signature: Optional[str]) -> bool:
+    """Check a delivery's X-Hub-Signature-256 header against GITHUB_WEBHOOK_SECRET."""
+    return signature_matches(settings.GITHUB_WEBHOOK_SECRET, body, signature)
+
+def _github_time(value: Optional[str]) -> Optional[str]:
+    """A webhook timestamp formatted as PyGithub's (naive UTC) datetimes are."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat()
+
+def _version(item: Dict) -> Optional[float]:
+    """A delivered pull request's or issue's version: its last update time."""
+    return to_timestamp(_github_time(item.get("updated_at")))
+
+def _repository(payload: Dict) -> Dict:
+    repository = payload["repository"]
+    return {
+        "name": repository["name"],
+        "full_name": repository["full_name"],
+        "description": repository.get("description"),
+        "url": repository["html_url"]
+    }
+
+def _pull_request(name: str, pr: Dict) -> Activity:
+    record = {
+        "number": pr["number"],
+        "title": pr["title"],
+        "state": pr["state"],
+        "created_at": _github_time(pr["created_at"]),
+        "merged_at": _github_time(pr.get("merged_at")),
+        "user": pr["user"]["login"],
+        "url": pr["html_url"]
+    }
+    return Activity("github", "pull_request", f"{name}#{pr['number']}", to_timestamp(record["created_at"]),
+                    record["user"], name, pr["title"], pr.get("body"), pr["html_url"],
+                    "merged" if record["merged_at"] else pr["state"], record)
+
+def _issue(name: str, issue: Dict) -> Activity:
+    record = {
+        "number": issue["number"],
+        "title": issue["title"],
+        "state": issue["state"],
+        "created_at": _github_time(issue["created_at"]),
+        "user": issue["user"]["login"],
+        "labels": [label["name"] for label in issue.get("labels") or []],
+        "url": issue["html_url"]
+    }
+    return Activity("github", "issue", f"{name}#{issue['number']}", to_timestamp(record["created_at"]),
+                    record["user"], name, issue["title"], issue.get("body"), issue["html_url"], issue["state"], record)
+
+def _commit(name: str, commit: Dict) -> Activity:
+    record = {
+        "sha": commit["id"][:7],
+        "message": commit["message"],
+        "author": commit["author"]["name"],
+        "date": _github_time(commit["timestamp"]),
+        "url": commit["url"]
+    }
+    return Activity("github", "commit", f"{name}@{commit['id']}", to_timestamp(record["date"]), record["author"],
+                    name, commit["message"].split("\n", 1)[0], commit["message"], commit["url"], None, record)
+
+def _release(name: str, release: Dict) -> Activity:
+    record = {
+        "tag_name": release["tag_name"],
+        "name": release.get("name"),
+        "body": release.get("body"),
+        "created_at": _github_time(release["created_at"]),
+        "url": release["html_url"]
+    }
+    return Activity("github", "release", f"{name}@{release['tag_name']}", to_timestamp(record["created_at"]), None,
+                    name, release.get("name") or release["tag_name"], release.get("body"), release["html_url"], None,
+                    record)
+
+def handle_event(event: str, payload: Dict, delivery_id: Optional[str] = None) -> Dict:
+    """
+    Store the records of a verified webhook delivery.
+
+    Pushes count only on the default branch, which is what the commits
+    listing shows; issues that are pull requests are left to the
+    pull_request events, as in the polled listings.
+
+    Args:
+        event: X-GitHub-Event header
+        payload: Decoded delivery body
+        delivery_id: X-GitHub-Delivery header, shared by redeliveries
+
+    Returns:
+        Event and action with the number of records stored and deleted, or
+        the reason the delivery was ignored
+    """
+    action = payload.get("action")
+    if event not in EVENTS or "repository" not in payload:
+        record_webhook_event("github", event, "ignored")
+        return {"event": event, "action": action, "ignored": "event not stored"}
+    if deliveries.seen(delivery_id):
+        record_webhook_event("github", event, "duplicate")
+        return {"event": event, "action": action, "ignored": "duplicate delivery"}
+    repository = _repository(payload)
+    name = repository["full_name"]
+    remember_repository(repository)
+
+    stored: List[Tuple[Activity, Optional[float]]] = []
+    removed: List[str] = []
+    kind = None
+    if event == "push":
+        default_branch = payload["repository"].get("default_branch") or payload["repository"].get("master_branch")
+        if payload.get("ref") != f"refs/heads/{default_branch}":
+            record_webhook_event("github", event, "ignored")
+            return {"event": event, "action": action, "ignored": "not the default branch"}
+        stored = [(_commit(name, commit), None) for commit in payload.get("commits") or []]
+    elif event == "pull_request":
+        pr = payload["pull_request"]
+        stored = [(_pull_request(name, pr), _version(pr))]
+    elif event == "issues":
+        issue = payload["issue"]
+        if "pull_request" in issue:
+            record_webhook_event("github", event, "ignored")
+            return {"event": event, "action": action, "ignored": "issue is a pull request"}
+        if action in REMOVED_ISSUE_ACTIONS:
+            kind, removed = "issue", [f"{name}#{issue['number']}"]
+        else:
+            stored = [(_issue(name, issue), _version(issue))]
+    else:
+        release = payload["release"]
+        if action == "deleted":
+            kind, removed = "release", [f"{name}@{release['tag_name']}"]
+        else:
+            stored = [(_release(name, release), None)]
+
+    written = store_records(stored, strict=True)
+    if kind == "issue":
+        # Remembered as the newest version, so a late update does not bring the issue back
+        deleted = int(delete_versioned("github", "issue", removed[0], max(time.time(), _version(issue) or 0.0),
+                                       strict=True))
+    else:
+        deleted = delete("github", kind, removed, strict=True) if removed else 0
+    if event == "pull_request":
+        mark_stale(name)
+    clear_caches("release_notes")
+    request_refresh()
+    # Only now, so that GitHub's redelivery of a delivery that failed is applied
+    deliveries.record(delivery_id)
+    record_webhook_event("github", event, "stored")
+    logger.info(f"GitHub {event} ({action or 'no action'}) for {name}: {written} stored, {deleted} deleted",
+                extra={"webhook_event": event, "action": action, "repository": name, "stored": written, "deleted": deleted})
+    return {"event": event, "action": action, "stored": written, "deleted": deleted}
+
+def reconcile() -> Dict:
+    """
+    Re-fetch the last GITHUB_RECONCILE_DAYS days of every configured
+    repository, catching up on missed deliveries.
+
+    Returns:
+        The fetched repository data (with "error" if every fetch failed)
+    """
+    data = get_repository_data(settings.GITHUB_RECONCILE_DAYS, refresh=True)
+    for entry in data.get("repositories", [data]):
+        if "error" not in entry:
+            mark_stale(entry["repository"]["full_name"])
+    return data
+
+async def run_reconciler(interval: Optional[float] = None) -> None:
+    """
+    Reconcile the store with GitHub until cancelled.
+
+    Args:
+        interval: Seconds between reconciliations (defaults to GITHUB_RECONCILE_SECONDS)
+    """
+    interval = settings.GITHUB_RECONCILE_SECONDS if interval is None else interval
+    while True:
+        start = time.perf_counter()
+        try:
+            data = await asyncio.to_thread(reconcile)
+            if "error" in data:
+                logger.warning(f"GitHub reconciliation failed: {data['error']}")
+            else:
+                records = sum(len(data.get(section, [])) for section in ("pull_requests", "issues", "commits", "releases"))
+                logger.info(f"Reconciled {records} GitHub records in {(time.perf_counter() - start) * 1000:.0f}ms")
+        except Exception as e:
+            logger.error(f"GitHub reconciliation failed: {e}")
+        await asyncio.sleep(interval)
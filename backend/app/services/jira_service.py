@@ -1,25 +1,183 @@
-from jira import JIRA
-from app.core.config import settings
-from typing import List, Dict
+from app.core.cache import ttl_cached
+from app.core.clients import get_client
+from app.core.config import current_tenant, settings
+from app.core.fieldsets import project
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+from app.core.pagination import Page
+from app.core.timing import timed_stage
+from app.services.activity_store import (
+    Activity, extend_coverage, read_window, record_coverage, to_timestamp, upsert_versioned,
+)
+from typing import AbstractSet, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+import math
+import threading
+import time
 
-# Initialize Jira client
-jira_client = None
+logger = get_logger("jira")
+
+# Issues per search call when paginating (Jira Cloud caps maxResults at 100)
+ISSUE_PAGE_SIZE = 100
+# Reconciliations overlap the previous one by this much (clock drift, minute-resolution JQL dates)
+RECONCILE_OVERLAP_SECONDS = 60.0
+
+# Response field -> (Jira field to request, value getter)
+ISSUE_FIELDS = {
+    "key": (None, lambda issue: issue.key),
+    "summary": ("summary", lambda issue: issue.fields.summary),
+    "status": ("status", lambda issue: issue.fields.status.name),
+    "priority": ("priority", lambda issue: issue.fields.priority.name if issue.fields.priority else "None"),
+    "assignee": ("assignee", lambda issue: issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned"),
+    "reporter": ("reporter", lambda issue: issue.fields.reporter.displayName if getattr(issue.fields, "reporter", None) else None),
+    "created": ("created", lambda issue: issue.fields.created),
+    "updated": ("updated", lambda issue: issue.fields.updated),
+    "issue_type": ("issuetype", lambda issue: issue.fields.issuetype.name),
+    "url": (None, lambda issue: f"{settings.JIRA_SERVER}/browse/{issue.key}"),
+}
+
+def _format_issue(issue, fields: Optional[AbstractSet[str]] = None) -> Dict:
+    return {
+        name: getter(issue)  # type: ignore
+        for name, (_, getter) in ISSUE_FIELDS.items()
+        if fields is None or name in fields
+    }
+
+def _issue_activity(project_key: str, issue) -> Activity:
+    record = _format_issue(issue)
+    return Activity("jira", "issue", issue.key, to_timestamp(record["created"]),
+                    record["reporter"], project_key,
+                    record["summary"], getattr(issue.fields, "description", None), record["url"], record["status"], record)
+
+def issue_version(issue) -> float:
+    """An issue's version for out-of-order handling: its last update time."""
+    return to_timestamp(getattr(issue.fields, "updated", None)) or 0.0
+
+def store_issues(project_key: str, issues, strict: bool = False) -> int:
+    """Store fetched or delivered issues, keeping any newer version already stored."""
+    return upsert_versioned(((_issue_activity(project_key, issue), issue_version(issue)) for issue in issues), strict)
+
+def issue_from_json(raw: Dict):
+    """A jira Issue resource around raw issue JSON (a JSON search result or a webhook payload)."""
+    from jira.resources import Issue
+    return Issue({"server": settings.JIRA_SERVER}, None, raw=raw)
+
+def sprint_from_json(raw: Dict):
+    """A jira Sprint resource around raw sprint JSON."""
+    from jira.resources import Sprint
+    return Sprint({"server": settings.JIRA_SERVER, "agile_rest_path": "agile", "agile_rest_api_version": "1.0"},
+                  None, raw=raw)
+
+def store_max_age() -> float:
+    """
+    How long fetched Jira issues and sprints may be served from the index.
+    
+    With webhooks configured (JIRA_WEBHOOK_SECRET) the index is kept current
+    by deliveries and the reconciliation poll, so a fetch stays valid until
+    two reconciliations have been missed.
+    """
+    if settings.JIRA_WEBHOOK_SECRET and settings.JIRA_RECONCILE_SECONDS > 0:
+        return max(settings.ACTIVITY_STORE_MAX_AGE_SECONDS, 2 * settings.JIRA_RECONCILE_SECONDS)
+    return settings.ACTIVITY_STORE_MAX_AGE_SECONDS
+
+class SprintIndex:
+    """
+    Sprints by board, each with the version (epoch seconds) of its last change.
+    
+    Deleted sprints are kept as tombstones (no record), so a late delivery of
+    an older change cannot bring them back. Boards are kept per tenant, whose
+    Jira sites number their boards independently.
+    """
+
+    def __init__(self):
+        self.boards: Dict[Tuple[Optional[str], int], Dict[int, Tuple[float, Optional[Dict]]]] = {}
+        self.synced_at: Dict[Tuple[Optional[str], int], float] = {}
+        self.lock = threading.Lock()
+
+    def apply(self, board_id: int, sprint_id: int, record: Optional[Dict], version: float) -> bool:
+        """Set (or with no record, delete) a sprint unless a newer version is known."""
+        with self.lock:
+            sprints = self.boards.setdefault((current_tenant(), board_id), {})
+            current = sprints.get(sprint_id)
+            if current is not None and current[0] >= version:
+                return False
+            sprints[sprint_id] = (version, record)
+            return True
+
+    def replace(self, board_id: int, records: List[Dict], version: float) -> None:
+        """Replace a board's sprints with a listing made at ``version``, keeping newer changes."""
+        board = (current_tenant(), board_id)
+        with self.lock:
+            current = self.boards.get(board, {})
+            sprints = {record["id"]: (version, record) for record in records}
+            for sprint_id, entry in current.items():
+                if entry[0] > version:
+                    sprints[sprint_id] = entry
+            self.boards[board] = sprints
+            self.synced_at[board] = time.time()
+
+    def sprints(self, board_id: int, max_age: float) -> Optional[List[Dict]]:
+        """A board's sprints in listing order, or None if it was not listed within ``max_age``."""
+        board = (current_tenant(), board_id)
+        with self.lock:
+            synced_at = self.synced_at.get(board)
+            if synced_at is None or time.time() - synced_at > max_age:
+                return None
+            return [record for _, record in self.boards.get(board, {}).values() if record is not None]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.boards.clear()
+            self.synced_at.clear()
+
+sprint_index = SprintIndex()
+
+# Projects whose issues are kept indexed, with the reconciliation watermark
+# (epoch seconds; None until the project's first reconciliation)
+_projects: Dict[str, Optional[float]] = {}
+_projects_lock = threading.Lock()
+
+def track_project(project_key: str) -> None:
+    """Keep a project's issues reconciled from now on (only the deployment's own Jira is reconciled)."""
+    if current_tenant() is not None:
+        return
+    with _projects_lock:
+        _projects.setdefault(project_key, None)
+
+def tracked_projects() -> List[str]:
+    with _projects_lock:
+        return list(_projects)
+
+def reset_jira_index() -> None:
+    """Forget indexed sprints and tracked projects (stored issues stay in the activity store)."""
+    sprint_index.clear()
+    with _projects_lock:
+        _projects.clear()
+
+def index_sprint(board_id: int, raw: Dict, version: float, deleted: bool = False) -> bool:
+    """Apply a delivered sprint change (raw sprint JSON) to the sprint index, unless it is stale."""
+    return sprint_index.apply(board_id, raw["id"], None if deleted else _format_sprint(sprint_from_json(raw)), version)
+
+def _search_fields(fields: Optional[AbstractSet[str]]) -> str:
+    """Jira ``fields`` parameter fetching only what the fieldset needs."""
+    if fields is None:
+        return "*all"
+    jira_fields = [ISSUE_FIELDS[name][0] for name in ISSUE_FIELDS if name in fields and ISSUE_FIELDS[name][0]]
+    # The key is always returned; asking for it alone fetches no fields
+    return ",".join(jira_fields) or "key"
+
+def _recent_issues_jql(project_key: str, since: str) -> str:
+    return f"project = {project_key} AND created >= '{since}' ORDER BY created DESC"
 
 def get_jira_client():
-    """Initialize and return Jira client."""
-    global jira_client
-    if jira_client is None and settings.JIRA_SERVER and settings.JIRA_EMAIL and settings.JIRA_API_TOKEN:
-        try:
-            jira_client = JIRA(
-                server=settings.JIRA_SERVER,
-                basic_auth=(settings.JIRA_EMAIL, settings.JIRA_API_TOKEN)
-            )
-        except Exception as e:
-            print(f"Jira connection error: {e}")
-            return None
-    return jira_client
+    """Return the shared Jira client, or None if not configured."""
+    try:
+        return get_client("jira")
+    except Exception as e:
+        logger.error(f"Jira connection error: {e}")
+        return None
 
+@ttl_cached("jira_projects", lambda: settings.DIRECTORY_CACHE_TTL_SECONDS)
 def get_projects() -> List[Dict]:
     """
     Fetch all accessible Jira projects.
@@ -32,7 +190,8 @@ def get_projects() -> List[Dict]:
         return []
     
     try:
-        projects = client.projects()
+        with observe_upstream("jira", "projects"):
+            projects = client.projects()
         return [
             {
                 "key": project.key,
@@ -42,16 +201,21 @@ def get_projects() -> List[Dict]:
             for project in projects
         ]
     except Exception as e:
-        print(f"Jira API error: {e}")
+        logger.error(f"Jira API error: {e}")
         return []
 
-def get_project_issues(project_key: str, days: int = 7) -> List[Dict]:
+@timed_stage("jira_fetch")
+def get_project_issues(project_key: str, days: int = 7, fields: Optional[AbstractSet[str]] = None) -> List[Dict]:
     """
     Fetch recent issues from a specific project.
     
+    Windows fetched recently, or kept current by webhooks, are read from
+    the activity store without a search.
+    
     Args:
         project_key: Jira project key
         days: Number of days to look back
+        fields: Response fields to fetch and return (None for all)
     
     Returns:
         List of issue dictionaries
@@ -62,33 +226,93 @@ def get_project_issues(project_key: str, days: int = 7) -> List[Dict]:
     
     try:
         since_date = datetime.now() - timedelta(days=days)
-        jql = f"project = {project_key} AND created >= '{since_date.strftime('%Y-%m-%d')}' ORDER BY created DESC"
+        track_project(project_key)
+        stored = read_window("jira", project_key, since_date.timestamp(), time.time(), store_max_age())
+        if stored is not None:
+            return [project(record, fields) for record in stored.get("issue", [])]
+        jql = _recent_issues_jql(project_key, since_date.strftime('%Y-%m-%d'))
         
-        issues = client.search_issues(jql, maxResults=50)
+        with observe_upstream("jira", "search_issues"):
+            issues = client.search_issues(jql, maxResults=50, fields=_search_fields(fields))
+        # Issues fetched with a fieldset lack fields the store needs
+        if fields is None:
+            store_issues(project_key, issues)
+            if len(issues) >= getattr(issues, "total", len(issues)):
+                record_coverage("jira", project_key, since_date.timestamp(), datetime.now().timestamp(), store_max_age())
         
-        return [
-            {
-                "key": issue.key,  # type: ignore
-                "summary": issue.fields.summary,  # type: ignore
-                "status": issue.fields.status.name,  # type: ignore
-                "priority": issue.fields.priority.name if issue.fields.priority else "None",  # type: ignore
-                "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",  # type: ignore
-                "reporter": issue.fields.reporter.displayName,  # type: ignore
-                "created": issue.fields.created,  # type: ignore
-                "updated": issue.fields.updated,  # type: ignore
-                "issue_type": issue.fields.issuetype.name,  # type: ignore
-                "url": f"{settings.JIRA_SERVER}/browse/{issue.key}"  # type: ignore
-            }
-            for issue in issues
-        ]
+        return [_format_issue(issue, fields) for issue in issues]
     except Exception as e:
-        print(f"Jira API error: {e}")
+        logger.error(f"Jira API error: {e}")
         return []
 
+def fetch_issue_page(project_key: str, days: int = 7, token=None,
+                     fields: Optional[AbstractSet[str]] = None) -> Page:
+    """
+    Fetch one page of recent project issues for cursor pagination.
+    
+    Args:
+        project_key: Jira project key
+        days: Number of days to look back (ignored when resuming from a token)
+        token: [since date, startAt] from the previous page, or None to start
+        fields: Response fields to fetch and return (None for all)
+    
+    Returns:
+        Page of issue dictionaries; upstream errors are raised
+    """
+    client = get_jira_client()
+    if not client:
+        return Page([])
+    since, start_at = token or ((datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d'), 0)
+    with observe_upstream("jira", "search_issues"):
+        issues = client.search_issues(_recent_issues_jql(project_key, since), startAt=start_at,
+                                      maxResults=ISSUE_PAGE_SIZE, fields=_search_fields(fields))
+    next_start = start_at + len(issues)
+    if fields is None:
+        store_issues(project_key, issues)
+    return Page(
+        [_format_issue(issue, fields) for issue in issues],
+        [since, next_start] if issues and next_start < issues.total else None,
+    )
+
+@ttl_cached("jira_boards", lambda: settings.DIRECTORY_CACHE_TTL_SECONDS)
+def get_project_board(project_key: str) -> Optional[int]:
+    """
+    ID of a project's board (the first one), or None.
+    
+    Raises:
+        Exception: upstream errors
+    """
+    client = get_jira_client()
+    if not client:
+        return None
+    with observe_upstream("jira", "boards"):
+        boards = client.boards(projectKeyOrID=project_key)
+    return boards[0].id if boards else None
+
+def sync_sprints(board_id: int) -> List[Dict]:
+    """
+    List a board's sprints into the sprint index.
+    
+    Raises:
+        Exception: upstream errors
+    """
+    client = get_jira_client()
+    if not client:
+        return []
+    started = time.time()
+    with observe_upstream("jira", "sprints"):
+        sprints = client.sprints(board_id)
+    sprint_index.replace(board_id, [_format_sprint(sprint) for sprint in sprints], started)
+    return sprint_index.sprints(board_id, math.inf) or []
+
+@timed_stage("jira_fetch")
 def get_sprints(project_key: str) -> List[Dict]:
     """
     Fetch sprints for a specific project.
     
+    Sprints listed recently, or kept current by webhooks, are read from the
+    sprint index.
+    
     Args:
         project_key: Jira project key
     
@@ -100,27 +324,15 @@ def get_sprints(project_key: str) -> List[Dict]:
         return []
     
     try:
-        # Get the board for the project
-        boards = client.boards(projectKeyOrID=project_key)
-        if not boards:
+        board_id = get_project_board(project_key)
+        if board_id is None:
             return []
-        
-        board = boards[0]  # Use the first board
-        sprints = client.sprints(board.id)
-        
-        return [
-            {
-                "id": sprint.id,
-                "name": sprint.name,
-                "state": sprint.state,
-                "start_date": sprint.startDate,
-                "end_date": sprint.endDate,
-                "goal": sprint.goal
-            }
-            for sprint in sprints
-        ]
+        sprints = sprint_index.sprints(board_id, store_max_age())
+        if sprints is not None:
+            return sprints
+        return sync_sprints(board_id)
     except Exception as e:
-        print(f"Jira API error: {e}")
+        logger.error(f"Jira API error: {e}")
         return []
 
 def create_jira_issue(project_key: str, summary: str, description: str, issue_type: str = "Task") -> Dict:
@@ -148,7 +360,8 @@ def create_jira_issue(project_key: str, summary: str, description: str, issue_ty
             'issuetype': {'name': issue_type},
         }
         
-        new_issue = client.create_issue(fields=issue_dict)
+        with observe_upstream("jira", "create_issue"):
+            new_issue = client.create_issue(fields=issue_dict)
         
         return {
             "key": new_issue.key,
@@ -158,9 +371,71 @@ def create_jira_issue(project_key: str, summary: str, description: str, issue_ty
         }
         
     except Exception as e:
-        print(f"Jira API error: {e}")
+        logger.error(f"Jira API error: {e}")
         return {"error": f"Failed to create Jira issue: {str(e)}"}
 
+def _search_all(client, jql: str, fields: str, expand: Optional[str] = None) -> List[Dict]:
+    """Raw JSON of every issue matching a JQL query, fetched ISSUE_PAGE_SIZE at a time."""
+    issues: List[Dict] = []
+    while True:
+        with observe_upstream("jira", "search_issues"):
+            page = client.search_issues(jql, startAt=len(issues), maxResults=ISSUE_PAGE_SIZE,
+                                        fields=fields, expand=expand, json_result=True)
+        batch = page.get("issues", [])
+        issues.extend(batch)
+        if not batch or len(issues) >= page.get("total", 0):
+            return issues
+
+def _format_sprint(sprint) -> Dict:
+    return {
+        "id": sprint.id,
+        "name": sprint.name,
+        "state": sprint.state,
+        "start_date": getattr(sprint, "startDate", None),
+        "end_date": getattr(sprint, "endDate", None),
+        "complete_date": getattr(sprint, "completeDate", None),
+        "goal": getattr(sprint, "goal", None),
+    }
+
+def reconcile_project(project_key: str) -> int:
+    """
+    Index the issues of a project changed since its last reconciliation.
+    
+    The first reconciliation indexes every issue created in the last
+    JIRA_RECONCILE_DAYS days and records the window as covered; later ones
+    search ``updated >= watermark`` (as a relative date, which Jira
+    evaluates in its own time zone) and extend the coverage to now. Deleted
+    issues are only seen by webhooks.
+    
+    Returns:
+        Number of issues fetched
+    
+    Raises:
+        Exception: upstream errors
+    """
+    client = get_jira_client()
+    if not client:
+        return 0
+    started = time.time()
+    with _projects_lock:
+        watermark = _projects.get(project_key)
+    if watermark is None:
+        since = datetime.now() - timedelta(days=settings.JIRA_RECONCILE_DAYS)
+        jql = _recent_issues_jql(project_key, since.strftime('%Y-%m-%d'))
+    else:
+        minutes = math.ceil((started - watermark) / 60)
+        jql = f"project = {project_key} AND updated >= '-{minutes}m' ORDER BY updated ASC"
+    issues = [issue_from_json(raw) for raw in _search_all(client, jql, "*all")]
+    store_issues(project_key, issues)
+    if watermark is None:
+        record_coverage("jira", project_key, since.timestamp(), started, store_max_age())
+    else:
+        extend_coverage("jira", project_key, watermark, started, store_max_age())
+    with _projects_lock:
+        _projects[project_key] = started - RECONCILE_OVERLAP_SECONDS
+    return len(issues)
+
+@timed_stage("jira_fetch")
 def get_sprint_issues(sprint_id: int) -> List[Dict]:
     """
     Fetch all issues in a specific sprint.
@@ -176,20 +451,66 @@ def get_sprint_issues(sprint_id: int) -> List[Dict]:
         return []
     
     try:
-        sprint = client.sprint(sprint_id)
-        issues = client.search_issues(f"sprint = {sprint_id}")
-        
+        points_field = settings.JIRA_STORY_POINTS_FIELD
+        issues = _search_all(client, f"sprint = {sprint_id}", f"summary,status,assignee,{points_field}")
         return [
             {
-                "key": issue.key,  # type: ignore
-                "summary": issue.fields.summary,  # type: ignore
-                "status": issue.fields.status.name,  # type: ignore
-                "assignee": issue.fields.assignee.displayName if issue.fields.assignee else "Unassigned",  # type: ignore
-                "story_points": issue.fields.customfield_10016 if hasattr(issue.fields, 'customfield_10016') else None,  # type: ignore
-                "url": f"{settings.JIRA_SERVER}/browse/{issue.key}"  # type: ignore
+                "key": issue["key"],
+                "summary": issue["fields"].get("summary"),
+                "status": issue["fields"]["status"]["name"],
+                "assignee": (issue["fields"].get("assignee") or {}).get("displayName", "Unassigned"),
+                "story_points": issue["fields"].get(points_field),
+                "url": f"{settings.JIRA_SERVER}/browse/{issue['key']}"
             }
             for issue in issues
         ]
     except Exception as e:
-        print(f"Jira API error: {e}")
-        return [] 
\ No newline at end of file
+        logger.error(f"Jira API error: {e}")
+        return []
+
+@ttl_cached("jira_statuses", lambda: settings.DIRECTORY_CACHE_TTL_SECONDS)
+def get_status_categories() -> Dict[str, str]:
+    """
+    Map every status ID to its category key ("new", "indeterminate" or "done").
+    
+    Returns:
+        Category key by status ID, or an empty dict on error
+    """
+    client = get_jira_client()
+    if not client:
+        return {}
+    try:
+        with observe_upstream("jira", "statuses"):
+            statuses = client.statuses()
+        return {str(status.id): status.statusCategory.key for status in statuses}
+    except Exception as e:
+        logger.error(f"Jira API error: {e}")
+        return {}
+
+@timed_stage("jira_fetch")
+def get_sprint_changelogs(sprint_id: int) -> Optional[Dict]:
+    """
+    Fetch a sprint with the status and sprint history of all its issues.
+    
+    Changelogs are expanded inside the paginated search rather than fetched
+    per issue. Jira inlines at most 100 history entries per issue; older
+    entries of longer histories are not included. The search only returns
+    issues still in the sprint, so issues removed from it are missing.
+    
+    Args:
+        sprint_id: Jira sprint ID
+    
+    Returns:
+        {"sprint": ..., "issues": [raw issue JSON]} or None if Jira is not configured
+    
+    Raises:
+        Exception: upstream errors
+    """
+    client = get_jira_client()
+    if not client:
+        return None
+    with observe_upstream("jira", "sprint"):
+        sprint = client.sprint(sprint_id)
+    fields = f"summary,status,created,{settings.JIRA_STORY_POINTS_FIELD}"
+    issues = _search_all(client, f"sprint = {sprint_id}", fields, expand="changelog")
+    return {"sprint": _format_sprint(sprint), "issues": issues}
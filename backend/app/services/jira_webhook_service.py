@@ -0,0 +1,132 @@
+"""
+Jira webhook ingestion and reconciliation.
+
+Jira-backed endpoints and summaries used to run a JQL search and list the
+board's sprints on every request. A Jira webhook delivers issue
+(jira:issue_created, jira:issue_updated, jira:issue_deleted) and sprint
+(sprint_created, sprint_updated, sprint_started, sprint_closed,
+sprint_deleted) events to /api/jira/webhook instead. Each delivery is
+verified against JIRA_WEBHOOK_SECRET (the X-Hub-Signature HMAC of the body)
+and applied to the issue index (the activity store) or the sprint index,
+from which get_project_issues() and get_sprints() are served.
+
+Jira retries deliveries and does not order them, so a delivery applied
+before (by X-Atlassian-Webhook-Identifier) is skipped, and a change is only
+applied if it is newer than what the index holds: an issue's version is
+its ``updated`` time, a sprint's the delivery's ``timestamp``. Deletions
+are remembered the same way, so a late update does not bring a deleted
+issue or sprint back.
+
+Deliveries can be missed, so while webhooks are configured every tracked
+project is reconciled every JIRA_RECONCILE_SECONDS with a search for the
+issues updated since the previous reconciliation, and its sprints listed
+again.
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import record_webhook_event
+from app.core.webhooks import DeliveryLog, signature_matches
+from app.services.activity_store import delete_versioned
+from app.services.jira_service import (
+    get_project_board, index_sprint, issue_from_json, issue_version, reconcile_project, store_issues,
+    sync_sprints, track_project, tracked_projects,
+)
+
+logger = get_logger("jira_webhooks")
+
+ISSUE_EVENTS = ("jira:issue_created", "jira:issue_updated", "jira:issue_deleted")
+SPRINT_EVENTS = ("sprint_created", "sprint_updated", "sprint_started", "sprint_closed", "sprint_deleted")
+
+deliveries = DeliveryLog()
+
+def verify_signature(body: bytes, signature: Optional[str]) -> bool:
+    """Check a delivery's X-Hub-Signature header against JIRA_WEBHOOK_SECRET."""
+    return signature_matches(settings.JIRA_WEBHOOK_SECRET, body, signature)
+
+def handle_event(payload: Dict, delivery_id: Optional[str] = None) -> Dict:
+    """
+    Apply a verified webhook delivery to the issue or sprint index.
+
+    Args:
+        payload: Decoded delivery body
+        delivery_id: X-Atlassian-Webhook-Identifier header, shared by retries
+
+    Returns:
+        The event and whether it changed the index ("applied"), or why it
+        was skipped
+    """
+    event = payload.get("webhookEvent") or "unknown"
+    if event not in ISSUE_EVENTS + SPRINT_EVENTS:
+        record_webhook_event("jira", event, "ignored")
+        return {"event": event, "ignored": "event not indexed"}
+    if deliveries.seen(delivery_id):
+        record_webhook_event("jira", event, "duplicate")
+        return {"event": event, "ignored": "duplicate delivery"}
+    # Delivery time in epoch seconds (Jira sends milliseconds)
+    delivered = (payload.get("timestamp") or time.time() * 1000) / 1000
+
+    if event in ISSUE_EVENTS:
+        issue = issue_from_json(payload["issue"])
+        key = issue.fields.project.key
+        track_project(key)
+        if event == "jira:issue_deleted":
+            applied = delete_versioned("jira", "issue", issue.key, max(delivered, issue_version(issue)), strict=True)
+        else:
+            applied = store_issues(key, [issue], strict=True) > 0
+        subject = issue.key
+    else:
+        sprint = payload["sprint"]
+        board_id = sprint.get("originBoardId")
+        if board_id is None:
+            record_webhook_event("jira", event, "ignored")
+            return {"event": event, "ignored": "sprint without a board"}
+        applied = index_sprint(board_id, sprint, delivered, deleted=event == "sprint_deleted")
+        subject = f"sprint {sprint['id']} of board {board_id}"
+
+    # Only now, so that Jira's retry of a delivery that failed is applied
+    deliveries.record(delivery_id)
+    record_webhook_event("jira", event, "applied" if applied else "stale")
+    logger.info(f"Jira {event} for {subject}: {'applied' if applied else 'older than the index, skipped'}",
+                extra={"webhook_event": event, "subject": subject, "applied": applied})
+    return {"event": event, "applied": applied}
+
+def reconcile() -> Dict[str, int]:
+    """
+    Reconcile every tracked project's issues and sprints with Jira.
+
+    Returns:
+        Issues fetched per project
+    """
+    fetched = {}
+    for project_key in tracked_projects():
+        try:
+            fetched[project_key] = reconcile_project(project_key)
+            board_id = get_project_board(project_key)
+            if board_id is not None:
+                sync_sprints(board_id)
+        except Exception as e:
+            logger.warning(f"Jira reconciliation of {project_key} failed: {e}")
+    return fetched
+
+async def run_reconciler(interval: Optional[float] = None) -> None:
+    """
+    Reconcile the indexes with Jira until cancelled.
+
+    Args:
+        interval: Seconds between reconciliations (defaults to JIRA_RECONCILE_SECONDS)
+    """
+    interval = settings.JIRA_RECONCILE_SECONDS if interval is None else interval
+    while True:
+        start = time.perf_counter()
+        try:
+            fetched = await asyncio.to_thread(reconcile)
+            if fetched:
+                logger.info(f"Reconciled {sum(fetched.values())} Jira issues of {len(fetched)} projects "
+                            f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+        except Exception as e:
+            logger.error(f"Jira reconciliation failed: {e}")
+        await asyncio.sleep(interval)
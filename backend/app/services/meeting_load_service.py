@@ -0,0 +1,236 @@
+"""
+Team meeting load from the members' free/busy calendars.
+
+The busy intervals of every member come from batched freebusy queries. They
+are merged per person with a running maximum over the intervals sorted by
+start, then swept together with the working-hours windows: after sorting all
+interval boundaries by person and time, cumulative sums give each person's
+working and busy state on every segment between boundaries, so meeting hours,
+focus time (free working stretches of at least FOCUS_BLOCK_MINUTES) and the
+team's shared focus time are sums over segments. The overlap heatmap
+integrates the number of people in meetings over each local hour. Everything
+after parsing is array arithmetic, so a 50-person month takes milliseconds.
+
+NumPy is imported on first use, like the integration client libraries.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.calendar_service import get_team_busy_times
+
+logger = get_logger("meeting_load")
+
+HOUR_SECONDS = 3600.0
+DAY_SECONDS = 86400.0
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+def team_calendar_ids(calendars: Optional[str] = None) -> List[str]:
+    """Calendar IDs from a comma-separated list, defaulting to TEAM_CALENDAR_IDS."""
+    value = settings.TEAM_CALENDAR_IDS if calendars is None else calendars
+    return list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+
+def work_windows(start: date, days: int, tz: ZoneInfo) -> List[Tuple[float, float]]:
+    """Working hours of each weekday in the window, as epoch-second intervals."""
+    windows = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        if day.weekday() < 5:
+            windows.append((datetime.combine(day, time(settings.WORK_DAY_START_HOUR), tz).timestamp(),
+                            datetime.combine(day, time(0), tz).timestamp() + settings.WORK_DAY_END_HOUR * HOUR_SECONDS))
+    return windows
+
+def merge_intervals(person, start, end):
+    """
+    Union of each person's busy intervals.
+
+    Args:
+        person, start, end: One entry per interval
+
+    Returns:
+        (person, start, end) of the merged intervals, sorted by person and start
+    """
+    import numpy as np
+
+    keep = end > start
+    person, start, end = person[keep], start[keep], end[keep]
+    if person.size == 0:
+        return person, start, end
+    order = np.lexsort((start, person))
+    person, start, end = person[order], start[order], end[order]
+    # Shift each person's times past the previous person's so one running max serves everyone
+    shift = (person * (end.max() - start.min() + 1.0))
+    reach = np.maximum.accumulate(end + shift)
+    new_run = np.ones(person.size, dtype=bool)
+    new_run[1:] = start[1:] + shift[1:] > reach[:-1]
+    first = np.flatnonzero(new_run)
+    return person[first], start[first], np.maximum.reduceat(end + shift, first) - shift[first]
+
+def sweep(person, start, end, windows, people: int, focus_seconds: float):
+    """
+    Working, meeting and focus seconds per person.
+
+    Args:
+        person, start, end: Merged busy intervals
+        windows: Working-hours intervals shared by everyone
+        people: Number of people
+        focus_seconds: Shortest free working stretch counted as focus
+
+    Returns:
+        (working, meeting, focus) arrays indexed by person
+    """
+    import numpy as np
+
+    bounds = np.asarray(windows, dtype=np.float64).reshape(-1, 2)
+    window_start, window_end = bounds[:, 0], bounds[:, 1]
+    everyone = np.repeat(np.arange(people), window_start.size)
+    times = np.concatenate((start, end, np.tile(window_start, people), np.tile(window_end, people)))
+    owner = np.concatenate((person, person, everyone, everyone))
+    busy_delta = np.concatenate((np.ones(start.size), -np.ones(end.size), np.zeros(2 * everyone.size)))
+    work_delta = np.concatenate((np.zeros(2 * start.size), np.ones(everyone.size), -np.ones(everyone.size)))
+    order = np.lexsort((times, owner))
+    times, owner = times[order], owner[order]
+    # Every person's deltas sum to zero, so global running sums are per-person states
+    busy = np.cumsum(busy_delta[order]) > 0
+    work = np.cumsum(work_delta[order]) > 0
+    length = np.zeros(times.size)
+    same = owner[1:] == owner[:-1]
+    length[:-1] = np.where(same, times[1:] - times[:-1], 0.0)
+    # Boundaries that change nothing (touching work windows, a meeting ending as
+    # a window starts) split a free stretch into segments; a stretch runs until
+    # a segment that is not free and not empty, or the next person
+    is_free = work & ~busy
+    breaks = (~is_free & (length > 0)) | np.append(~same, True)
+    stretch = np.cumsum(breaks)
+    free = np.bincount(stretch, length * is_free)
+    stretch_owner = np.zeros(free.size, dtype=np.int64)
+    stretch_owner[stretch[is_free]] = owner[is_free]
+    return (np.bincount(owner, length * work, minlength=people),
+            np.bincount(owner, length * (work & busy), minlength=people),
+            np.bincount(stretch_owner, np.where(free >= focus_seconds, free, 0.0), minlength=people))
+
+def overlap_heatmap(start, end, window_start: float, days: int, tz: ZoneInfo, people: int) -> Dict:
+    """Average share of the team in meetings per local weekday and hour."""
+    import numpy as np
+
+    times = np.concatenate((start, end))
+    deltas = np.concatenate((np.ones(start.size), -np.ones(end.size)))
+    order = np.argsort(times, kind="stable")
+    times, concurrent = times[order], np.cumsum(deltas[order])
+    # Person-seconds in meetings up to each boundary; linear in between
+    integral = np.concatenate(([0.0], np.cumsum(concurrent[:-1] * np.diff(times)))) if times.size else np.zeros(0)
+    edges = window_start + np.arange(days * 24 + 1) * HOUR_SECONDS
+    busy = np.diff(np.interp(edges, times, integral)) if times.size else np.zeros(days * 24)
+    local = [datetime.fromtimestamp(edge, tz) for edge in edges[:-1]]
+    slot = np.array([moment.weekday() * 24 + moment.hour for moment in local])
+    totals = np.bincount(slot, busy, minlength=7 * 24)
+    counts = np.bincount(slot, minlength=7 * 24)
+    share = np.divide(totals, counts * HOUR_SECONDS * max(people, 1), out=np.zeros(7 * 24), where=counts > 0)
+    return {
+        "weekdays": list(WEEKDAYS),
+        "hours": list(range(24)),
+        "busy_share": [[round(float(value), 3) for value in row] for row in share.reshape(7, 24)],
+        "max_concurrent": int(concurrent.max()) if concurrent.size else 0,
+    }
+
+def compute_meeting_load(busy: Dict[str, Sequence[Dict]], start: date, days: int, tz: ZoneInfo) -> Dict:
+    """
+    Per-person and team meeting load over ``days`` days from ``start``.
+
+    Args:
+        busy: Busy intervals ({"start", "end"} RFC 3339 strings) by calendar ID
+        start: First local day of the window
+        days: Length of the window
+        tz: Time zone of the working hours and heatmap
+
+    Returns:
+        Meeting load document
+    """
+    import numpy as np
+
+    calendar_ids = list(busy)
+    people = len(calendar_ids)
+    window_start = datetime.combine(start, time(0), tz).timestamp()
+    window_end = window_start + days * DAY_SECONDS
+    person, starts, ends = [], [], []
+    for index, calendar_id in enumerate(calendar_ids):
+        for interval in busy[calendar_id]:
+            person.append(index)
+            starts.append(_timestamp(interval["start"]))
+            ends.append(_timestamp(interval["end"]))
+    person = np.asarray(person, dtype=np.int64)
+    starts = np.clip(np.asarray(starts, dtype=np.float64), window_start, window_end)
+    ends = np.clip(np.asarray(ends, dtype=np.float64), window_start, window_end)
+    person, starts, ends = merge_intervals(person, starts, ends)
+
+    # The team as one more person, busy whenever anyone is: its focus time is shared focus time
+    team_person, team_start, team_end = merge_intervals(np.full(starts.size, people), starts, ends)
+    windows = work_windows(start, days, tz)
+    working, meeting, focus = sweep(np.concatenate((person, team_person)), np.concatenate((starts, team_start)),
+                                    np.concatenate((ends, team_end)), windows, people + 1,
+                                    settings.FOCUS_BLOCK_MINUTES * 60.0)
+    total = np.bincount(person, ends - starts, minlength=people)
+
+    def hours(seconds) -> float:
+        return round(float(seconds) / HOUR_SECONDS, 2)
+
+    members = [{
+        "calendar_id": calendar_id,
+        "meeting_hours": hours(meeting[index]),
+        "meeting_hours_outside_work": hours(total[index] - meeting[index]),
+        "focus_hours": hours(focus[index]),
+        "working_hours": hours(working[index]),
+        "meeting_share": round(float(meeting[index] / working[index]), 3) if working[index] else None,
+    } for index, calendar_id in enumerate(calendar_ids)]
+    return {
+        "window": {
+            "start": datetime.fromtimestamp(window_start, tz).isoformat(),
+            "end": datetime.fromtimestamp(window_end, tz).isoformat(),
+            "timezone": str(tz),
+            "work_hours": f"{settings.WORK_DAY_START_HOUR:02d}:00-{settings.WORK_DAY_END_HOUR:02d}:00",
+        },
+        "people": members,
+        "team": {
+            "people": people,
+            "meeting_hours": hours(meeting[:people].sum()),
+            "focus_hours": hours(focus[:people].sum()),
+            "average_meeting_hours": hours(meeting[:people].mean()) if people else None,
+            "average_focus_hours": hours(focus[:people].mean()) if people else None,
+            "shared_focus_hours": hours(focus[people]) if people else None,
+        },
+        "heatmap": overlap_heatmap(starts, ends, window_start, days, tz, people),
+    }
+
+def get_meeting_load(days: int = 7, start: Optional[date] = None, calendars: Optional[str] = None) -> Dict:
+    """
+    Fetch the team's free/busy and compute its meeting load.
+
+    Args:
+        days: Length of the window
+        start: First day of the window (default: today in WORK_TIMEZONE)
+        calendars: Comma-separated calendar IDs (default: TEAM_CALENDAR_IDS)
+
+    Returns:
+        Meeting load document (with "errors" for calendars that could not be read), or {"error": ...}
+    """
+    calendar_ids = team_calendar_ids(calendars)
+    if not calendar_ids:
+        return {"error": "No team calendars given or configured (TEAM_CALENDAR_IDS)"}
+    try:
+        tz = ZoneInfo(settings.WORK_TIMEZONE)
+        start = start or datetime.now(tz).date()
+        window_start = datetime.combine(start, time(0), tz).astimezone(timezone.utc)
+        window_end = window_start + timedelta(days=days)
+        result = get_team_busy_times(calendar_ids, window_start.isoformat().replace("+00:00", "Z"),
+                                     window_end.isoformat().replace("+00:00", "Z"))
+        load = compute_meeting_load(result["busy"], start, days, tz)
+        load["errors"] = result["errors"]
+        return load
+    except Exception as e:
+        logger.error(f"Meeting load error: {e}")
+        return {"error": f"Failed to compute meeting load: {str(e)}"}
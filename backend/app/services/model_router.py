@@ -0,0 +1,169 @@
+"""
+Model routing for summary completions.
+
+SUMMARY_MODELS lists the models a summary may use in order of preference,
+each with its context window in tokens (``gpt-4o:128000,gpt-3.5-turbo:16385``).
+For each request the router keeps the models whose context window holds the
+prompt and the completion, and picks the first whose recent p90 latency fits
+in SUMMARY_LATENCY_SLO_SECONDS (a model without recent calls is assumed to
+fit); if none does, the fastest. The other models follow as fallbacks,
+fastest first, for when the chosen one errors or runs past the deadline.
+
+Every attempt but the last keeps back the next model's expected latency from
+the time left, so a slow primary cannot use up the fallbacks' time.
+
+Latency, token counts and outcome of the last MODEL_STATS_WINDOW calls (of
+the last MODEL_STATS_TTL_SECONDS) are kept per tenant and model to drive
+these choices, since tenants call models with their own keys and limits.
+A failed call counts as never answering, so a model that fails more than one
+call in ten is routed around until its failures expire. The same calls are
+exported in /metrics.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import current_tenant, settings
+from app.core.metrics import record_llm_call
+
+# Context window assumed for models listed without one
+DEFAULT_CONTEXT_TOKENS = 16385
+# Shortest timeout worth giving an attempt
+MIN_ATTEMPT_SECONDS = 1.0
+
+class Model(NamedTuple):
+    name: str
+    context_tokens: int
+
+def configured_models() -> List[Model]:
+    """Models of SUMMARY_MODELS, in order of preference."""
+    models = []
+    for entry in settings.SUMMARY_MODELS.split(","):
+        name, _, context = entry.strip().partition(":")
+        if name:
+            models.append(Model(name, int(context) if context else DEFAULT_CONTEXT_TOKENS))
+    return models
+
+class ModelStats:
+    """Latency, tokens and outcome of a model's recent calls."""
+
+    def __init__(self, window: int):
+        # (monotonic time, latency seconds, prompt tokens, completion tokens, succeeded)
+        self.calls: Deque[Tuple[float, float, int, int, bool]] = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, latency: float, prompt_tokens: int, completion_tokens: int, ok: bool) -> None:
+        with self.lock:
+            self.calls.append((time.monotonic(), latency, prompt_tokens, completion_tokens, ok))
+
+    def recent(self) -> List[Tuple[float, float, int, int, bool]]:
+        """Calls within the last MODEL_STATS_TTL_SECONDS, so a demoted model is tried again later."""
+        horizon = time.monotonic() - settings.MODEL_STATS_TTL_SECONDS
+        with self.lock:
+            return [call for call in self.calls if call[0] >= horizon]
+
+    def p90_latency(self) -> Optional[float]:
+        """p90 latency of recent calls, failures counting as never answering (infinite)."""
+        latencies = sorted(call[1] if call[4] else float("inf") for call in self.recent())
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(0.9 * len(latencies)))]
+
+    def snapshot(self) -> Dict:
+        calls = self.recent()
+        succeeded = [call for call in calls if call[4]]
+        p90 = self.p90_latency()
+        return {
+            "calls": len(calls),
+            "error_rate": round(1 - len(succeeded) / len(calls), 3) if calls else None,
+            # Not finite when recent calls failed (reported as None, with the error rate)
+            "p90_latency_seconds": round(p90, 3) if p90 is not None and p90 != float("inf") else None,
+            "average_prompt_tokens": round(sum(call[2] for call in succeeded) / len(succeeded)) if succeeded else None,
+            "average_completion_tokens": round(sum(call[3] for call in succeeded) / len(succeeded)) if succeeded else None,
+        }
+
+_stats: Dict[Tuple[Optional[str], str], ModelStats] = {}
+_stats_lock = threading.Lock()
+
+def _model_stats(model: str) -> ModelStats:
+    """The current tenant's statistics of a model."""
+    key = (current_tenant(), model)
+    with _stats_lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = ModelStats(settings.MODEL_STATS_WINDOW)
+        return stats
+
+def record_call(model: str, latency: float, prompt_tokens: int, completion_tokens: int, ok: bool) -> None:
+    """
+    Record a completion call for routing and metrics.
+
+    Args:
+        model: Model called
+        latency: Seconds until the response or the failure
+        prompt_tokens, completion_tokens: Token usage (estimated prompt tokens for failures)
+        ok: Whether the call returned a completion
+    """
+    _model_stats(model).record(latency, prompt_tokens, completion_tokens, ok)
+    record_llm_call(model, latency, ok)
+
+def model_stats() -> Dict[str, Dict]:
+    """The current tenant's recent call statistics per model."""
+    tenant = current_tenant()
+    with _stats_lock:
+        models = {model: stats for (owner, model), stats in _stats.items() if owner == tenant}
+    return {model: stats.snapshot() for model, stats in models.items()}
+
+def reset_model_stats() -> None:
+    """Forget all recorded calls."""
+    with _stats_lock:
+        _stats.clear()
+
+def predicted_latency(model: str) -> float:
+    """Expected latency of a call to ``model``: its recent p90, or 0 if unknown."""
+    latency = _model_stats(model).p90_latency()
+    return 0.0 if latency is None else latency
+
+def attempt_timeout(remaining: float, fallback: Optional[str]) -> float:
+    """
+    Time to give an attempt, keeping enough of ``remaining`` for the fallback.
+
+    Args:
+        remaining: Seconds left before the deadline
+        fallback: Model tried next if this attempt fails, if any
+
+    Returns:
+        Timeout in seconds for the attempt
+    """
+    if fallback is None:
+        return remaining
+    reserve = predicted_latency(fallback)
+    if reserve == 0.0:
+        # Nothing known about the fallback: split what is left
+        reserve = remaining / 2
+    elif reserve == float("inf"):
+        # The fallback has been failing; there is no point in waiting for it
+        reserve = 0.0
+    return max(min(remaining, MIN_ATTEMPT_SECONDS), remaining - reserve)
+
+def route(prompt_tokens: int, max_tokens: int, slo_seconds: float) -> List[str]:
+    """
+    Models to try for a completion, in order.
+
+    Args:
+        prompt_tokens: Estimated prompt size
+        max_tokens: Completion size requested
+        slo_seconds: Latency objective of the whole completion
+
+    Returns:
+        The chosen model followed by its fallbacks (empty if no context window is large enough)
+    """
+    fitting = [model for model in configured_models() if model.context_tokens >= prompt_tokens + max_tokens]
+    if not fitting:
+        return []
+    latency = {model.name: predicted_latency(model.name) for model in fitting}
+    chosen = next((model for model in fitting if latency[model.name] <= slo_seconds),
+                  min(fitting, key=lambda model: latency[model.name]))
+    fallbacks = sorted((model for model in fitting if model != chosen), key=lambda model: latency[model.name])
+    return [chosen.name] + [model.name for model in fallbacks]
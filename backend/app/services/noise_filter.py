@@ -0,0 +1,206 @@
+"""
+Noise filtering of Slack messages before they are put in a summary prompt.
+
+Three kinds of messages spend prompt tokens without telling the model
+anything new:
+
+- low-information messages: joins and leaves, acknowledgements ("+1",
+  "thanks", "lgtm") and messages that are only emoji, mentions or links;
+- repeated alerts, whose text differs only in numbers, IDs and links;
+- near-duplicates, such as a stack trace pasted again with another line
+  number.
+
+Low-information messages are dropped. The others are folded into their first
+occurrence, which is kept with a count. Each message is normalized once
+(lower case, mentions and links masked, digits dropped), so
+repeated alerts become identical. Short messages are then compared exactly;
+longer ones by the Jaccard similarity of their sets of word 3-grams, where
+NEAR_DUPLICATE_SIMILARITY or more counts as a near-duplicate. Candidates
+come from a MinHash signature of each set split into bands (locality
+sensitive hashing): only messages sharing a band are compared, so the whole
+filter stays linear in the number of messages.
+
+NumPy is imported on first use, like the integration client libraries.
+"""
+import re
+from typing import Dict, List, Set, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import record_prompt_savings
+
+logger = get_logger("noise_filter")
+
+MENTION = re.compile(r"<[@#!][^>]*>")
+LINK = re.compile(r"<?https?://[^\s>]+>?")
+EMOJI = re.compile(r":[a-z0-9_+'\-]+:")
+PUNCTUATION = re.compile(r"[^\w\s+]")
+WORD = re.compile(r"\w+")
+# Digits are dropped, so numbers, IDs, hosts and timestamps no longer tell repeats apart
+DIGITS = str.maketrans("", "", "0123456789")
+SYSTEM_MESSAGES = ("has joined the channel", "has left the channel")
+ACKNOWLEDGEMENTS = frozenset({
+    "+1", "ack", "agreed", "ok", "okay", "k", "kk", "thanks", "thank you", "thanks a lot", "thx", "ty", "lgtm",
+    "yes", "yep", "yeah", "no", "nope", "nice", "cool", "great", "awesome", "done", "same", "same here",
+    "sounds good", "will do", "on it", "np", "no problem", "sure", "got it", "looking", "ship it",
+})
+SHINGLE_WORDS = 3
+# Longer than any acknowledgement, even with a mention or two
+MAX_ACKNOWLEDGEMENT_LENGTH = 64
+# Messages with fewer normalized words than this are compared exactly
+MIN_SHINGLED_WORDS = 8
+# MinHash signature: BANDS bands of ROWS hashes; similar sets share a band with high probability
+BANDS = 8
+ROWS = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough OpenAI token count of ``text`` (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def is_low_information(text: str) -> bool:
+    """True for joins, acknowledgements and messages with no words of their own."""
+    if any(marker in text for marker in SYSTEM_MESSAGES):
+        return True
+    text = EMOJI.sub(" ", LINK.sub(" ", MENTION.sub(" ", text.lower())))
+    if len(text) > MAX_ACKNOWLEDGEMENT_LENGTH:
+        return WORD.search(text) is None
+    plain = " ".join(PUNCTUATION.sub(" ", text).split())
+    return not any(char.isalnum() for char in plain) or plain in ACKNOWLEDGEMENTS
+
+def normalized_words(text: str) -> List[str]:
+    """Lower-case words of ``text`` with mentions and links masked and digits dropped."""
+    return WORD.findall(LINK.sub(" url ", MENTION.sub(" @ ", text.lower())).translate(DIGITS))
+
+def shingles(words: List[str]) -> Set[int]:
+    """Hashes of the word 3-grams of ``words`` (stable within a process)."""
+    return {hash(" ".join(words[index:index + SHINGLE_WORDS])) for index in range(len(words) - SHINGLE_WORDS + 1)}
+
+def minhash_bands(sets: List[Set[int]]) -> List[List[int]]:
+    """
+    Band keys of each set's MinHash signature.
+
+    Args:
+        sets: Non-empty sets of 64-bit hashes
+
+    Returns:
+        BANDS keys per set; sets with Jaccard similarity J share at least
+        one key with probability 1 - (1 - J**ROWS)**BANDS
+    """
+    import numpy as np
+
+    if not sets:
+        return []
+    counts = np.array([len(values) for values in sets])
+    hashes = np.fromiter((value for values in sets for value in values), dtype=np.int64,
+                         count=int(counts.sum())).view(np.uint64)
+    rng = np.random.default_rng(0)
+    masks = rng.integers(0, 2 ** 63, BANDS * ROWS, dtype=np.uint64)
+    multipliers = rng.integers(0, 2 ** 63, (2, BANDS * ROWS), dtype=np.uint64) | np.uint64(1)
+    # One permutation per column (xor, then multiply modulo 2**64), minimum per set
+    permuted = (hashes[:, None] ^ masks) * multipliers[0]
+    signatures = np.minimum.reduceat(permuted, np.concatenate(([0], np.cumsum(counts)[:-1])), axis=0)
+    # Each band's rows mixed into one key; the per-column multipliers keep the bands' keys apart
+    keys = np.bitwise_xor.reduce((signatures * multipliers[1]).reshape(len(sets), BANDS, ROWS), axis=2)
+    return keys.tolist()
+
+def filter_messages(messages: List[Dict]) -> Tuple[List[Dict], Dict]:
+    """
+    Drop low-information messages and fold repeats into their first occurrence.
+
+    Args:
+        messages: Message dicts with a 'text' key
+
+    Returns:
+        (kept messages, each with "repeats" if others were folded into it;
+        statistics including the estimated prompt tokens saved)
+    """
+    candidates, dropped = [], 0
+    for message in messages:
+        text = message.get("text") or ""
+        if is_low_information(text):
+            dropped += 1
+        else:
+            candidates.append((message, normalized_words(text)))
+
+    # Identical once normalized (repeated alerts, re-pasted text): folded without shingling
+    exact: Dict[str, int] = {}
+    first: List[int] = []
+    for index, (_, words) in enumerate(candidates):
+        first.append(exact.setdefault(" ".join(words), index))
+    distinct = [index for index in range(len(candidates)) if first[index] == index]
+    long_messages = [index for index in distinct if len(candidates[index][1]) >= MIN_SHINGLED_WORDS]
+    sets = {index: shingles(candidates[index][1]) for index in long_messages}
+    keys = dict(zip(long_messages, minhash_bands([sets[index] for index in long_messages])))
+
+    buckets: Dict[int, List[int]] = {}
+    # Index in ``kept`` of each candidate that was kept or folded
+    position: Dict[int, int] = {}
+    kept: List[Dict] = []
+    repeats: List[int] = []
+    for index, (message, _) in enumerate(candidates):
+        match = position.get(first[index])
+        if match is None and index in keys:
+            own = sets[index]
+            for key in keys[index]:
+                for other in buckets.get(key, ()):
+                    theirs = sets[other]
+                    if len(own & theirs) >= settings.NEAR_DUPLICATE_SIMILARITY * len(own | theirs):
+                        match = position[other]
+                        break
+                if match is not None:
+                    break
+            if match is None:
+                for key in keys[index]:
+                    buckets.setdefault(key, []).append(index)
+        if match is None:
+            match = len(kept)
+            kept.append(message)
+            repeats.append(0)
+        position[index] = match
+        repeats[match] += 1
+
+    kept = [{**message, "repeats": count} if count > 1 else message for message, count in zip(kept, repeats)]
+    tokens_before = sum(estimate_tokens(format_message(message)) for message in messages)
+    tokens_after = sum(estimate_tokens(format_message(message)) for message in kept)
+    stats = {
+        "messages": len(messages),
+        "kept": len(kept),
+        "low_information": dropped,
+        "duplicates": len(candidates) - len(kept),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+    }
+    return kept, stats
+
+def format_message(message: Dict) -> str:
+    """A message's prompt line, with its count if repeats were folded into it."""
+    line = f"- {message.get('text') or ''}"
+    if message.get("repeats", 1) > 1:
+        line += f" (posted {message['repeats']} times)"
+    return line
+
+def prompt_lines(messages: List[Dict]) -> List[str]:
+    """
+    Prompt lines of the messages worth summarizing.
+
+    Noise filtering is skipped when NOISE_FILTER_ENABLED is off (join and
+    leave messages are still dropped). Savings are logged and counted in
+    the prompt token savings metric.
+
+    Args:
+        messages: Message dicts with a 'text' key
+
+    Returns:
+        One line per kept message
+    """
+    if not settings.NOISE_FILTER_ENABLED:
+        return [format_message(message) for message in messages
+                if not any(marker in (message.get("text") or "") for marker in SYSTEM_MESSAGES)]
+    kept, stats = filter_messages(messages)
+    if stats["tokens_saved"] > 0:
+        record_prompt_savings(stats["tokens_saved"])
+        logger.info(
+            f"Noise filter kept {stats['kept']} of {stats['messages']} messages, saving ~{stats['tokens_saved']} "
+            f"prompt tokens", extra={key: value for key, value in stats.items() if key != "messages"})
+    return [format_message(message) for message in kept]
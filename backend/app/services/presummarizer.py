@@ -0,0 +1,172 @@
+"""
+Extractive pre-summarization: pick the most informative prompt lines.
+
+For large windows the Slack messages, pull requests, issues, commits and
+Jira issues do not all fit in a prompt, and sending them all makes the
+completion slow and expensive. This stage ranks the candidate lines with
+TextRank and keeps the best ones that fit in PROMPT_TARGET_TOKENS, in their
+original order.
+
+Each line is a TF-IDF vector over its words (normalized as by the noise
+filter, without stop words). The TextRank graph links every pair of lines
+by the cosine similarity of their vectors, but is never built: with X the
+sparse matrix of L2-normalized vectors, the similarity matrix is X Xᵀ, so
+each power iteration is two sparse matrix-vector products (X (Xᵀ v)) and
+costs time linear in the number of non-zero entries instead of the square
+of the number of lines. It runs on the CPU with NumPy alone.
+"""
+from typing import Dict, List, Sequence
+
+from app.core.logging import get_logger
+from app.services.noise_filter import estimate_tokens, filter_messages, format_message, normalized_words
+
+logger = get_logger("presummarizer")
+
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+STOP_WORDS = frozenset("""
+a an and are as at be been but by can could did do does for from had has have he her his i if in into is it its
+just me my no not of on or our she so that the their them then there they this to too was we were what when which
+who will with would you your url
+""".split())
+
+def textrank(texts: Sequence[str]):
+    """
+    TextRank score of each text over the TF-IDF cosine similarity graph.
+
+    Args:
+        texts: Texts to rank
+
+    Returns:
+        NumPy array of scores summing to 1 (higher is more central)
+    """
+    import numpy as np
+
+    count = len(texts)
+    if count == 0:
+        return np.zeros(0)
+    vocabulary: Dict[str, int] = {}
+    rows, columns = [], []
+    for row, text in enumerate(texts):
+        for word in set(normalized_words(text)):
+            if len(word) > 1 and word not in STOP_WORDS:
+                rows.append(row)
+                columns.append(vocabulary.setdefault(word, len(vocabulary)))
+    rows = np.asarray(rows, dtype=np.int64)
+    columns = np.asarray(columns, dtype=np.int64)
+    # Binary term frequency (lines are short) times smoothed inverse document frequency
+    document_frequency = np.bincount(columns, minlength=len(vocabulary))
+    values = np.log((1 + count) / (1 + document_frequency[columns])) + 1.0
+    norms = np.sqrt(np.bincount(rows, values ** 2, minlength=count))
+    values = values / norms[rows]
+
+    def similarity(vector):
+        # (X Xᵀ - I) v: similarities to every other line, without self-loops
+        projected = np.bincount(columns, values * vector[rows], minlength=len(vocabulary))
+        return np.bincount(rows, values * projected[columns], minlength=count) - np.where(norms > 0, vector, 0.0)
+
+    degree = similarity(np.ones(count))
+    linked = degree > 1e-12
+    scores = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        flow = similarity(np.where(linked, scores / np.where(linked, degree, 1.0), 0.0))
+        # Lines similar to nothing spread their score evenly, as in PageRank
+        updated = (1 - DAMPING) / count + DAMPING * (flow + scores[~linked].sum() / count)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+def select_lines(sections: Dict[str, List[str]], target_tokens: int) -> Dict[str, List[str]]:
+    """
+    The highest-ranked lines of all sections that fit in ``target_tokens``.
+
+    Lines are ranked together, so a pull request discussed in many messages
+    ranks high. Each section gets a share of the budget in proportion to its
+    size, so long messages cannot crowd out short titles, and budget a
+    section leaves unused goes to the best remaining lines of any section.
+    Selected lines keep their original order.
+
+    Args:
+        sections: Candidate lines by section
+        target_tokens: Estimated token budget for all selected lines
+
+    Returns:
+        Selected lines by section (every section present, possibly empty)
+    """
+    import numpy as np
+
+    lines = [(name, line) for name, section in sections.items() for line in section]
+    costs = [estimate_tokens(line) for _, line in lines]
+    total = sum(costs)
+    if total <= target_tokens:
+        return {name: list(section) for name, section in sections.items()}
+    order = np.argsort(-textrank([line for _, line in lines]), kind="stable")
+    section_costs: Dict[str, int] = {}
+    for (name, _), cost in zip(lines, costs):
+        section_costs[name] = section_costs.get(name, 0) + cost
+    shares = {name: target_tokens * cost // total for name, cost in section_costs.items()}
+    chosen, used = set(), 0
+    for position in order:
+        name = lines[position][0]
+        if costs[position] <= shares[name]:
+            shares[name] -= costs[position]
+            chosen.add(position)
+            used += costs[position]
+    for position in order:
+        if position not in chosen and used + costs[position] <= target_tokens:
+            chosen.add(position)
+            used += costs[position]
+    selected: Dict[str, List[str]] = {name: [] for name in sections}
+    for position in sorted(chosen):
+        name, line = lines[position]
+        selected[name].append(line)
+    logger.info(f"Pre-summarization kept {len(chosen)} of {len(lines)} lines (~{used} of {total} tokens)",
+                extra={"kept": len(chosen), "lines": len(lines), "tokens_kept": used, "tokens_total": total})
+    return selected
+
+def item_lines(github_data, jira_data) -> Dict[str, List[str]]:
+    """Prompt lines of pull requests, issues, commits (named with their repo when aggregated) and Jira issues."""
+    lines: Dict[str, List[str]] = {"github": [], "jira": []}
+    if github_data and "error" not in github_data:
+        for pr in github_data.get("pull_requests") or []:
+            if pr.get("title"):
+                state = "merged" if pr.get("merged_at") else pr.get("state")
+                lines["github"].append(f"- PR {pr.get('repo', '')}#{pr.get('number')} ({state}): {pr['title']}")
+        for issue in github_data.get("issues") or []:
+            if issue.get("title"):
+                lines["github"].append(f"- Issue {issue.get('repo', '')}#{issue.get('number')} ({issue.get('state')}): {issue['title']}")
+        for commit in github_data.get("commits") or []:
+            if commit.get("message"):
+                where = f"{commit['repo']}@" if commit.get("repo") else ""
+                lines["github"].append(f"- Commit {where}{commit.get('sha')}: {commit['message'].splitlines()[0]}")
+    if jira_data and "error" not in jira_data:
+        for issue in jira_data.get("issues") or []:
+            if issue.get("summary"):
+                lines["jira"].append(f"- {issue.get('key')} ({issue.get('status')}): {issue['summary']}")
+    return lines
+
+def local_summary(messages: List[Dict], github_data=None, jira_data=None, target_tokens: int = 500) -> str:
+    """
+    An extractive summary made without a language model: the top-ranked lines.
+
+    Args:
+        messages: Slack message dicts with a 'text' key
+        github_data: Optional GitHub repository data
+        jira_data: Optional Jira project data
+        target_tokens: Estimated size of the summary
+
+    Returns:
+        Markdown summary, or a notice if there is nothing to summarize
+    """
+    kept, _ = filter_messages(messages)
+    selected = select_lines({"slack": [format_message(message) for message in kept],
+                             **item_lines(github_data, jira_data)}, target_tokens)
+    parts = [f"**{title}:**\n" + "\n".join(selected[name])
+             for name, title in (("slack", "Slack Highlights"), ("github", "GitHub"), ("jira", "Jira"))
+             if selected[name]]
+    if not parts:
+        return "No data found for the specified time period."
+    return "**Key Activity** (extractive summary; the language model did not respond in time)\n\n" + "\n\n".join(parts)
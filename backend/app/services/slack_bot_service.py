@@ -1,12 +1,14 @@
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+from app.core.clients import get_client
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
 from app.services.ai_service import generate_summary
 from app.services.slack_service import fetch_channel_messages
-from app.services.github_service import get_repository_data
+from app.services.github_service import get_repository_data, repositories_configured
 from app.services.jira_service import get_project_issues, get_sprints
+from app.services.snapshot_service import ChannelSnapshot, current_snapshot, refresh_channel, snapshots
 
-client = WebClient(token=settings.SLACK_BOT_TOKEN)
+logger = get_logger("slack")
 
 def post_summary_to_channel(channel_id: str, summary: str) -> bool:
     """
@@ -19,15 +21,21 @@ def post_summary_to_channel(channel_id: str, summary: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    client = get_client("slack")
+    if client is None:
+        logger.warning("Slack bot token not configured")
+        return False
+    from slack_sdk.errors import SlackApiError
     try:
-        response = client.chat_postMessage(
-            channel=channel_id,
-            text=f"📊 *Sprint Summary*\n\n{summary}",
-            unfurl_links=False
-        )
+        with observe_upstream("slack", "chat_postMessage"):
+            response = client.chat_postMessage(
+                channel=channel_id,
+                text=f"📊 *Sprint Summary*\n\n{summary}",
+                unfurl_links=False
+            )
         return bool(response.get("ok", False))
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
+        logger.error(f"Slack API error: {e.response['error']}")
         return False
 
 def post_weekly_summary(channel_id: str, days: int = 7) -> bool:
@@ -47,7 +55,7 @@ def post_weekly_summary(channel_id: str, days: int = 7) -> bool:
         
         # Fetch GitHub data if configured
         github_data = None
-        if settings.GITHUB_TOKEN and settings.GITHUB_REPO:
+        if settings.GITHUB_TOKEN and repositories_configured():
             github_data = get_repository_data(days)
         
         # Generate summary
@@ -57,7 +65,7 @@ def post_weekly_summary(channel_id: str, days: int = 7) -> bool:
         return post_summary_to_channel(channel_id, summary)
         
     except Exception as e:
-        print(f"Error posting weekly summary: {e}")
+        logger.error(f"Error posting weekly summary: {e}")
         return False
 
 def respond_to_mention(channel_id: str, user_id: str, text: str) -> str:
@@ -75,15 +83,15 @@ def respond_to_mention(channel_id: str, user_id: str, text: str) -> str:
     try:
         # Parse the command
         text_lower = text.lower()
+        # Mentioned channels get their snapshot kept fresh in the background
+        snapshots.touch(channel_id)
         
         if "summary" in text_lower or "report" in text_lower:
-            # Generate summary for the current channel
-            messages = fetch_channel_messages(channel_id, 7)
-            github_data = None
-            if settings.GITHUB_TOKEN and settings.GITHUB_REPO:
-                github_data = get_repository_data(7)
-            
-            summary = generate_summary(messages, github_data)
+            # Answer from the channel's snapshot; build it on a cold mention
+            snapshot = current_snapshot(channel_id)
+            if snapshot is None or not snapshot.has_current_summary:
+                snapshot = refresh_channel(channel_id, summarize=True)
+            summary = snapshot.summary or "Error generating summary. Please try again."
             return f"📊 *Here's your summary:*\n\n{summary}"
         
         elif "help" in text_lower:
@@ -112,12 +120,12 @@ def respond_to_mention(channel_id: str, user_id: str, text: str) -> str:
             return f"Hi <@{user_id}>! I'm SprintLens, your AI teammate. Type `@SprintLens help` to see what I can do."
             
     except Exception as e:
-        print(f"Error responding to mention: {e}")
+        logger.error(f"Error responding to mention: {e}")
         return "❌ Sorry, I encountered an error. Please try again."
 
 def get_project_status(channel_id: str) -> str:
     """
-    Get current project status from various sources.
+    Get current project status from the channel's activity snapshot.
     
     Args:
         channel_id: Slack channel ID
@@ -126,34 +134,40 @@ def get_project_status(channel_id: str) -> str:
         Status message
     """
     try:
-        status_parts = []
-        
-        # Get GitHub status
-        if settings.GITHUB_TOKEN and settings.GITHUB_REPO:
-            github_data = get_repository_data(7)
-            if github_data and "error" not in github_data:
-                status_parts.append(f"📊 *GitHub Activity (7 days):*")
-                if github_data.get("commits"):
-                    status_parts.append(f"• {len(github_data['commits'])} commits")
-                if github_data.get("pull_requests"):
-                    status_parts.append(f"• {len(github_data['pull_requests'])} pull requests")
-                if github_data.get("issues"):
-                    status_parts.append(f"• {len(github_data['issues'])} issues")
-        
-        # Get Slack activity
-        messages = fetch_channel_messages(channel_id, 7)
-        if messages:
-            status_parts.append(f"💬 *Slack Activity:* {len(messages)} messages in the last 7 days")
-        
-        if status_parts:
-            return "\n".join(status_parts)
-        else:
-            return "📊 *Project Status:* No recent activity found."
-            
+        snapshot = current_snapshot(channel_id) or refresh_channel(channel_id)
+        return _format_status(snapshot)
     except Exception as e:
-        print(f"Error getting project status: {e}")
+        logger.error(f"Error getting project status: {e}")
         return "❌ Error retrieving project status."
 
+def _format_status(snapshot: ChannelSnapshot) -> str:
+    status_parts = []
+    
+    # GitHub status
+    github = snapshot.github
+    if github:
+        status_parts.append(f"📊 *GitHub Activity ({snapshot.days} days):*")
+        if github["commits"]:
+            status_parts.append(f"• {github['commits']} commits")
+        if github["pull_requests"]:
+            status_parts.append(f"• {github['pull_requests']} pull requests")
+            for pr in snapshot.recent_pull_requests:
+                status_parts.append(f"    ◦ #{pr['number']} {pr['title']} ({pr['state']})")
+        if github["issues"]:
+            status_parts.append(f"• {github['issues']} issues")
+            for issue in snapshot.recent_issues:
+                status_parts.append(f"    ◦ #{issue['number']} {issue['title']} ({issue['state']})")
+    
+    # Slack activity
+    if snapshot.message_count:
+        status_parts.append(f"💬 *Slack Activity:* {snapshot.message_count} messages from "
+                            f"{snapshot.active_users} people in the last {snapshot.days} days")
+    
+    if status_parts:
+        status_parts.append(f"_Updated {snapshot.refreshed_at.strftime('%H:%M UTC')}_")
+        return "\n".join(status_parts)
+    return "📊 *Project Status:* No recent activity found."
+
 def post_status_update(channel_id: str, status: str, details: str = "") -> bool:
     """
     Post a status update to a Slack channel.
@@ -166,17 +180,23 @@ def post_status_update(channel_id: str, status: str, details: str = "") -> bool:
     Returns:
         True if successful, False otherwise
     """
+    client = get_client("slack")
+    if client is None:
+        logger.warning("Slack bot token not configured")
+        return False
+    from slack_sdk.errors import SlackApiError
     try:
         message = f"🔄 *Status Update:* {status}"
         if details:
             message += f"\n\n{details}"
         
-        response = client.chat_postMessage(
-            channel=channel_id,
-            text=message,
-            unfurl_links=False
-        )
+        with observe_upstream("slack", "chat_postMessage"):
+            response = client.chat_postMessage(
+                channel=channel_id,
+                text=message,
+                unfurl_links=False
+            )
         return bool(response.get("ok", False))
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
+        logger.error(f"Slack API error: {e.response['error']}")
         return False 
\ No newline at end of file
@@ -1,40 +1,109 @@
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+from app.core.cache import ttl_cached
+from app.core.clients import get_client
 from app.core.config import settings
+from app.core.fieldsets import project
+from app.core.logging import get_logger
+from app.core.metrics import observe_upstream
+from app.core.pagination import Page
+from app.core.timing import timed_stage
+from app.services.activity_store import Activity, record_coverage, upsert
+import time
 
-client = WebClient(token=settings.SLACK_BOT_TOKEN)
+logger = get_logger("slack")
 
-def fetch_channel_messages(channel_id: str, days: int = 7):
+# Messages per conversations.history call when paginating
+MESSAGE_PAGE_SIZE = 200
+
+def _window_start(days: int) -> str:
     from datetime import datetime, timedelta
-    import time
+    return str(time.mktime((datetime.now() - timedelta(days=days)).timetuple()))
+
+def _format_message(msg: dict, fields=None) -> dict:
+    # Slack has no field selection; the fieldset only prunes the response
+    return project({
+        "user": msg.get("user"),
+        "timestamp": msg.get("ts"),
+        "text": msg.get("text")
+    }, fields)
+
+def _message_activity(channel_id: str, msg: dict) -> Activity:
+    ts = msg.get("ts")
+    return Activity("slack", "message", f"{channel_id}:{ts}", float(ts) if ts else None, msg.get("user"), channel_id,
+                    None, msg.get("text"), f"https://slack.com/archives/{channel_id}/p{(ts or '').replace('.', '')}",
+                    None, _format_message(msg))
+
+@timed_stage("slack_fetch")
+def fetch_channel_messages(channel_id: str, days: int = 7, fields=None):
     messages = []
-    oldest = str(time.mktime((datetime.now() - timedelta(days=days)).timetuple()))
+    client = get_client("slack")
+    if client is None:
+        logger.warning("Slack bot token not configured")
+        return messages
+    from slack_sdk.errors import SlackApiError
+    oldest = _window_start(days)
     try:
-        response = client.conversations_history(
-            channel=channel_id,
-            oldest=oldest,
-            limit=200
-        )
+        with observe_upstream("slack", "conversations_history"):
+            response = client.conversations_history(
+                channel=channel_id,
+                oldest=oldest,
+                limit=200
+            )
+        kept = []
         for msg in response.get("messages", []) or []:
             # Filter out bot messages
             if msg.get("subtype") == "bot_message":
                 continue
-            messages.append({
-                "user": msg.get("user"),
-                "timestamp": msg.get("ts"),
-                "text": msg.get("text")
-            })
+            kept.append(msg)
+            messages.append(_format_message(msg, fields))
+        upsert(_message_activity(channel_id, msg) for msg in kept)
+        if not response.get("has_more"):
+            record_coverage("slack", channel_id, float(oldest), time.time())
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
+        logger.error(f"Slack API error: {e.response['error']}")
     return messages
 
+def fetch_message_page(channel_id: str, days: int = 7, token=None, fields=None) -> Page:
+    """
+    Fetch one page of channel history for cursor pagination.
+
+    Args:
+        channel_id: Slack channel ID
+        days: Number of days to look back (ignored when resuming from a token)
+        token: [oldest, Slack cursor] from the previous page, or None to start
+        fields: Response fields to return (None for all)
+
+    Returns:
+        Page of message dictionaries; upstream errors are raised
+    """
+    client = get_client("slack")
+    if client is None:
+        logger.warning("Slack bot token not configured")
+        return Page([])
+    oldest, cursor = token or (_window_start(days), None)
+    params = {"channel": channel_id, "oldest": oldest, "limit": MESSAGE_PAGE_SIZE}
+    if cursor:
+        params["cursor"] = cursor
+    with observe_upstream("slack", "conversations_history"):
+        response = client.conversations_history(**params)
+    next_cursor = (response.get("response_metadata") or {}).get("next_cursor")
+    kept = [msg for msg in response.get("messages", []) or [] if msg.get("subtype") != "bot_message"]
+    upsert(_message_activity(channel_id, msg) for msg in kept)
+    return Page([_format_message(msg, fields) for msg in kept], [oldest, next_cursor] if next_cursor else None)
+
+@ttl_cached("slack_channels", lambda: settings.DIRECTORY_CACHE_TTL_SECONDS)
 def list_channels():
+    client = get_client("slack")
+    if client is None:
+        logger.warning("Slack bot token not configured")
+        return []
+    from slack_sdk.errors import SlackApiError
     try:
-        response = client.conversations_list(types="public_channel,private_channel")
+        with observe_upstream("slack", "conversations_list"):
+            response = client.conversations_list(types="public_channel,private_channel")
         return [
             {"id": ch["id"], "name": ch["name"]}
             for ch in response.get("channels", [])
         ]
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
+        logger.error(f"Slack API error: {e.response['error']}")
         return []
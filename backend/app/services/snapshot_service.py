@@ -0,0 +1,249 @@
+"""
+Per-channel activity snapshots for the Slack bot.
+
+Bot commands used to fetch Slack and GitHub data from scratch on every
+mention. The refresher keeps a rolling snapshot for each active channel (one
+the bot was mentioned in within SNAPSHOT_IDLE_HOURS, or listed in
+SNAPSHOT_CHANNELS) with its message volume, GitHub counts, the most recent
+pull requests and issues, and the last generated summary, so ``status`` and
+``summary`` answer without any upstream call. Snapshots are refreshed every
+SNAPSHOT_REFRESH_SECONDS, and immediately after ``request_refresh()`` (called
+by webhooks). A summary is only regenerated when the activity it describes
+has changed.
+
+Snapshots belong to the tenant that was served (see app/core/tenants.py):
+the store is keyed by tenant and channel, and the refresher rebuilds each
+pooled tenant's channels with that tenant's settings. Tenants that have left
+the pool are skipped; their next command rebuilds the snapshot.
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import current_tenant, settings
+from app.core.logging import get_logger
+from app.core.tenants import tenant_pool
+from app.services.ai_service import generate_summary
+from app.services.github_service import get_repository_data, repositories_configured
+from app.services.slack_service import fetch_channel_messages
+
+logger = get_logger("snapshots")
+
+# Pull requests and issues kept in a snapshot
+RECENT_ITEMS = 5
+
+class ChannelSnapshot:
+    """Rolling activity of one channel over the last SNAPSHOT_DAYS days."""
+
+    def __init__(self, channel_id: str, days: int, messages: List[Dict], github_data: Optional[Dict]):
+        self.channel_id = channel_id
+        self.days = days
+        self.refreshed_at = datetime.now(timezone.utc)
+        self.refreshed_monotonic = time.monotonic()
+        self.message_count = len(messages)
+        self.active_users = len({message.get("user") for message in messages if message.get("user")})
+        self.latest_message = max((message.get("timestamp") or "" for message in messages), default=None)
+        self.github: Optional[Dict[str, int]] = None
+        self.recent_pull_requests: List[Dict] = []
+        self.recent_issues: List[Dict] = []
+        if github_data and "error" not in github_data:
+            self.github = {section: len(github_data.get(section, []))
+                           for section in ("commits", "pull_requests", "issues", "releases")}
+            self.recent_pull_requests = github_data.get("pull_requests", [])[:RECENT_ITEMS]
+            self.recent_issues = github_data.get("issues", [])[:RECENT_ITEMS]
+        self.summary: Optional[str] = None
+        self.summary_at: Optional[datetime] = None
+        self.summary_fingerprint: Optional[Tuple] = None
+
+    @property
+    def fingerprint(self) -> Tuple:
+        """Identifies the activity; equal fingerprints need no new summary."""
+        recent = tuple((item["number"], item["state"]) for item in self.recent_pull_requests + self.recent_issues)
+        return (self.message_count, self.latest_message, tuple(sorted((self.github or {}).items())), recent)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.refreshed_monotonic
+
+    @property
+    def has_current_summary(self) -> bool:
+        return self.summary is not None and self.summary_fingerprint == self.fingerprint
+
+    def set_summary(self, summary: str) -> None:
+        # Failed generations are retried on the next command instead of cached
+        if summary.startswith("Error"):
+            return
+        self.summary = summary
+        self.summary_at = datetime.now(timezone.utc)
+        self.summary_fingerprint = self.fingerprint
+
+    def as_dict(self) -> Dict:
+        return {
+            "channel_id": self.channel_id,
+            "days": self.days,
+            "refreshed_at": self.refreshed_at.isoformat(),
+            "message_count": self.message_count,
+            "active_users": self.active_users,
+            "github": self.github,
+            "recent_pull_requests": self.recent_pull_requests,
+            "recent_issues": self.recent_issues,
+            "summary": self.summary,
+            "summary_at": self.summary_at.isoformat() if self.summary_at else None,
+        }
+
+class SnapshotStore:
+    """Thread-safe snapshots by tenant and channel, plus the channels to keep fresh."""
+
+    def __init__(self):
+        self._snapshots: Dict[Tuple[Optional[str], str], ChannelSnapshot] = {}
+        self._mentioned: Dict[Tuple[Optional[str], str], float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, channel_id: str) -> Optional[ChannelSnapshot]:
+        """The current tenant's snapshot of a channel."""
+        with self._lock:
+            return self._snapshots.get((current_tenant(), channel_id))
+
+    def put(self, snapshot: ChannelSnapshot) -> None:
+        with self._lock:
+            self._snapshots[(current_tenant(), snapshot.channel_id)] = snapshot
+
+    def touch(self, channel_id: str) -> None:
+        """Mark a channel active because the bot was mentioned there."""
+        with self._lock:
+            self._mentioned[(current_tenant(), channel_id)] = time.monotonic()
+
+    def active_channels(self) -> List[str]:
+        """The current tenant's configured and recently mentioned channels; forgets idle channels."""
+        idle_after = settings.SNAPSHOT_IDLE_HOURS * 3600
+        now = time.monotonic()
+        tenant = current_tenant()
+        with self._lock:
+            for key, mentioned in list(self._mentioned.items()):
+                if now - mentioned > idle_after:
+                    del self._mentioned[key]
+                    self._snapshots.pop(key, None)
+            channels = [channel.strip() for channel in settings.SNAPSHOT_CHANNELS.split(",") if channel.strip()]
+            mentioned = [channel_id for owner, channel_id in self._mentioned if owner == tenant]
+            return list(dict.fromkeys(channels + mentioned))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+            self._mentioned.clear()
+
+snapshots = SnapshotStore()
+
+def _fetch_github(days: int) -> Optional[Dict]:
+    if not (settings.GITHUB_TOKEN and repositories_configured()):
+        return None
+    return get_repository_data(days)
+
+def _build_snapshot(channel_id: str, github_data: Optional[Dict], summarize: bool) -> ChannelSnapshot:
+    days = settings.SNAPSHOT_DAYS
+    messages = fetch_channel_messages(channel_id, days)
+    snapshot = ChannelSnapshot(channel_id, days, messages, github_data)
+    previous = snapshots.get(channel_id)
+    if previous is not None and previous.summary_fingerprint == snapshot.fingerprint:
+        snapshot.summary = previous.summary
+        snapshot.summary_at = previous.summary_at
+        snapshot.summary_fingerprint = previous.summary_fingerprint
+    elif summarize:
+        snapshot.set_summary(generate_summary(messages, github_data))
+    snapshots.put(snapshot)
+    return snapshot
+
+def refresh_channel(channel_id: str, summarize: bool = False) -> ChannelSnapshot:
+    """
+    Rebuild one channel's snapshot from the upstreams.
+
+    Args:
+        channel_id: Slack channel ID
+        summarize: Generate a summary if the stored one no longer matches
+
+    Returns:
+        The new snapshot
+    """
+    return _build_snapshot(channel_id, _fetch_github(settings.SNAPSHOT_DAYS), summarize)
+
+def refresh_snapshots(channel_ids: Optional[Iterable[str]] = None) -> Dict[str, ChannelSnapshot]:
+    """
+    Rebuild the snapshots of the active channels (or of ``channel_ids``).
+
+    The repository is shared by every channel, so GitHub is fetched once.
+
+    Returns:
+        Snapshots by channel ID
+    """
+    channel_ids = list(snapshots.active_channels() if channel_ids is None else channel_ids)
+    if not channel_ids:
+        return {}
+    github_data = _fetch_github(settings.SNAPSHOT_DAYS)
+    refreshed = {}
+    for channel_id in channel_ids:
+        try:
+            refreshed[channel_id] = _build_snapshot(channel_id, github_data, settings.SNAPSHOT_SUMMARIES)
+        except Exception as e:
+            logger.error(f"Snapshot refresh of {channel_id} failed: {e}")
+    return refreshed
+
+def refresh_all_snapshots() -> Dict[Tuple[Optional[str], str], ChannelSnapshot]:
+    """
+    Rebuild the deployment's active channels, then each pooled tenant's with its settings.
+
+    Returns:
+        Snapshots by tenant (None for the deployment) and channel ID
+    """
+    refreshed = {(None, channel_id): snapshot for channel_id, snapshot in refresh_snapshots().items()}
+    for tenant_id in tenant_pool.tenants():
+        with tenant_pool.serve(tenant_id) as pooled:
+            if pooled:
+                refreshed.update({(tenant_id, channel_id): snapshot
+                                  for channel_id, snapshot in refresh_snapshots().items()})
+    return refreshed
+
+def current_snapshot(channel_id: str) -> Optional[ChannelSnapshot]:
+    """The channel's snapshot, unless the refresher has fallen behind."""
+    snapshot = snapshots.get(channel_id)
+    if snapshot is None or snapshot.age_seconds > 2 * settings.SNAPSHOT_REFRESH_SECONDS:
+        return None
+    return snapshot
+
+_refresh_requested: Optional[asyncio.Event] = None
+_refresher_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def request_refresh() -> None:
+    """Wake the refresher now; safe to call from any thread."""
+    if _refresher_loop is not None and _refresh_requested is not None:
+        _refresher_loop.call_soon_threadsafe(_refresh_requested.set)
+
+async def run_refresher(interval: Optional[float] = None) -> None:
+    """
+    Refresh the active channels' snapshots until cancelled.
+
+    Args:
+        interval: Seconds between refreshes (defaults to SNAPSHOT_REFRESH_SECONDS)
+    """
+    global _refresh_requested, _refresher_loop
+    _refresh_requested = asyncio.Event()
+    _refresher_loop = asyncio.get_running_loop()
+    interval = settings.SNAPSHOT_REFRESH_SECONDS if interval is None else interval
+    try:
+        while True:
+            _refresh_requested.clear()
+            start = time.perf_counter()
+            try:
+                refreshed = await asyncio.to_thread(refresh_all_snapshots)
+                if refreshed:
+                    logger.info(f"Refreshed {len(refreshed)} channel snapshots in {(time.perf_counter() - start) * 1000:.0f}ms")
+            except Exception as e:
+                logger.error(f"Snapshot refresh failed: {e}")
+            try:
+                await asyncio.wait_for(_refresh_requested.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _refresher_loop = None
+        _refresh_requested = None
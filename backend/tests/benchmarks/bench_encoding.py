@@ -0,0 +1,124 @@
+"""
+Response encoding benchmark for the large list endpoints.
+
+Builds payloads shaped like the service output of /api/github/repository,
+/api/jira/issues, /api/calendar/events and /api/slack/messages for several
+window sizes, then times
+
+- FastAPI's default path (``jsonable_encoder`` + stdlib ``JSONResponse``),
+- ``FastJSONResponse`` returned directly (orjson, no ``jsonable_encoder``),
+- gzip and brotli compression of the result at the configured levels.
+
+Usage (from the backend directory):
+    python -m tests.benchmarks.bench_encoding --days 7 30 90
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WORDS = ("sprint deploy review merge refactor cache latency summary fix test release "
+         "ticket blocker backlog retro standup design api client upstream").split()
+
+def _text(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+def build_payloads(days: int, seed: int = 0) -> Dict[str, Dict]:
+    """Service-shaped payloads for a window of ``days`` days of a busy team."""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+
+    def when(i: int) -> str:
+        return (now - timedelta(minutes=i * 7)).isoformat()
+
+    github = {
+        "pull_requests": [{"number": i, "title": _text(rng, 8), "state": "open", "created_at": when(i),
+                           "user": f"dev{i % 12}", "url": f"https://github.com/bench/repo/pull/{i}"}
+                          for i in range(days * 15)],
+        "issues": [{"number": i, "title": _text(rng, 8), "state": "closed", "created_at": when(i),
+                    "user": f"dev{i % 12}", "url": f"https://github.com/bench/repo/issues/{i}"}
+                   for i in range(days * 15)],
+        "commits": [{"sha": f"{i:040x}", "message": _text(rng, 10), "author": f"dev{i % 12}",
+                     "date": when(i), "url": f"https://github.com/bench/repo/commit/{i:040x}"}
+                    for i in range(days * 40)],
+        "releases": [],
+    }
+    jira = {"issues": [{"key": f"BENCH-{i}", "summary": _text(rng, 10), "status": "In Progress",
+                        "priority": "High", "assignee": f"Dev {i % 12}", "reporter": f"PM {i % 3}",
+                        "created": when(i), "updated": when(i), "issue_type": "Story",
+                        "url": f"https://bench.atlassian.net/browse/BENCH-{i}"} for i in range(days * 30)]}
+    calendar = {"events": [{"id": f"evt{i}", "summary": _text(rng, 4), "description": _text(rng, 20),
+                            "start": when(i), "end": when(i - 4), "attendees": [f"dev{j}@bench.dev" for j in range(6)],
+                            "location": "Room 1", "organizer": "pm@bench.dev"} for i in range(days * 12)]}
+    slack = {"messages": [{"user": f"U{i % 40:04d}", "text": _text(rng, 25), "ts": f"{1767225600 + i * 60}.000100"}
+                          for i in range(days * 200)]}
+    return {"github_repository": github, "jira_issues": jira, "calendar_events": calendar, "slack_messages": slack}
+
+def _time_ms(func: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+def benchmark_payload(payload: Dict, repeat: int) -> Dict:
+    """Time each encoding path for one payload; the best of ``repeat`` runs."""
+    body = FastJSONResponse(payload).body
+    result = {
+        "bytes": len(body),
+        "stdlib_ms": _time_ms(lambda: JSONResponse(jsonable_encoder(payload)).body, repeat),
+        "orjson_ms": _time_ms(lambda: FastJSONResponse(payload).body, repeat),
+        "gzip_ms": _time_ms(lambda: gzip.compress(body, settings.GZIP_COMPRESSION_LEVEL), repeat),
+        "gzip_bytes": len(gzip.compress(body, settings.GZIP_COMPRESSION_LEVEL)),
+    }
+    if brotli is not None:
+        result["br_ms"] = _time_ms(lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY), repeat)
+        result["br_bytes"] = len(brotli.compress(body, quality=settings.BROTLI_QUALITY))
+    return result
+
+def format_report(results: Dict[int, Dict[str, Dict]]) -> str:
+    header = (f"{'endpoint':<18} {'days':>4} {'bytes':>10} {'stdlib ms':>10} {'orjson ms':>10} "
+              f"{'gzip ms':>8} {'gzip bytes':>10} {'br ms':>8} {'br bytes':>10}")
+    lines = [header, "-" * len(header)]
+    for days, endpoints in results.items():
+        for name, row in endpoints.items():
+            lines.append(f"{name:<18} {days:>4} {row['bytes']:>10} {row['stdlib_ms']:>10.1f} {row['orjson_ms']:>10.1f} "
+                         f"{row['gzip_ms']:>8.1f} {row['gzip_bytes']:>10} {row.get('br_ms', 0):>8.1f} "
+                         f"{row.get('br_bytes', 0):>10}")
+    return "\n".join(lines)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--days", nargs="+", type=int, default=[7, 30, 90])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = {days: {name: benchmark_payload(payload, args.repeat) for name, payload in build_payloads(days).items()}
+               for days in args.days}
+    print(format_report(results))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
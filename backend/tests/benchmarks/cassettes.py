@@ -0,0 +1,307 @@
+"""
+Record/replay cassettes of upstream traffic.
+
+Recording runs a local proxy in front of each upstream. The integration
+clients are pointed at the proxies through the same base-URL settings the
+fakes use, so every client library is covered without patching it. Each
+proxied exchange is sanitized (credentials and secrets removed, sizes
+preserved) and written with its upstream latency to one JSON cassette per
+upstream.
+
+Replay serves the cassettes from local servers with the original latencies
+(optionally scaled). Request timestamps are masked when matching, and
+response timestamps are shifted forward by the time since recording so
+windowed queries still see the recorded data.
+
+Usage (from the backend directory):
+    # Record real traffic; prints the settings to point SprintLens at
+    python -m tests.benchmarks.cassettes record --out-dir cassettes \\
+        --target github=https://api.github.com --target slack=https://slack.com
+
+    # Regenerate the cassettes used by the performance tests
+    python -m tests.benchmarks.cassettes record-fakes --out-dir tests/cassettes
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler
+from itertools import count
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import httpx
+
+from tests.benchmarks.fake_upstreams import FakeUpstream
+
+BASE_URL_PLACEHOLDER = "{{base_url}}"
+SENSITIVE_PARAMS = {"token", "access_token", "client_secret", "key", "api_key"}
+RECORDED_RESPONSE_HEADERS = ("content-type", "link", "retry-after")
+HOP_BY_HOP_HEADERS = {"host", "content-length", "connection", "accept-encoding", "transfer-encoding"}
+
+# Timestamps that differ between recording and replay
+VOLATILE_VALUE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?|\b\d{10}(?:\.\d+)?\b")
+ISO_DATETIME = re.compile(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})((?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?)")
+SLACK_TS = re.compile(r'("(?:ts|thread_ts|latest_reply)":\s*")(\d{10})(\.\d+)?"')
+SECRETS = re.compile(r"xox[abposr]-[A-Za-z0-9-]+|gh[pousr]_[A-Za-z0-9]{20,}|sk-[A-Za-z0-9_-]{16,}|[\w.+-]+@[\w-]+\.[\w.-]+")
+
+# Upstream name -> (setting, suffix appended to the proxy/replay URL)
+UPSTREAM_SETTINGS = {
+    "slack": ("SLACK_API_URL", "/api/"),
+    "github": ("GITHUB_API_URL", ""),
+    "jira": ("JIRA_SERVER", ""),
+    "calendar": ("GOOGLE_CALENDAR_API_URL", "/calendar/v3/"),
+    "openai": ("OPENAI_BASE_URL", "/v1"),
+}
+
+def request_key(method: str, path: str, query: str, body: bytes, content_type: str) -> str:
+    """Match key for a request: method, path and parameters with timestamps masked."""
+    params = parse_qsl(query, keep_blank_values=True)
+    if "application/x-www-form-urlencoded" in content_type and body:
+        params += parse_qsl(body.decode("utf-8", errors="replace"), keep_blank_values=True)
+    normalized = sorted(
+        (name, VOLATILE_VALUE.sub("<ts>", value)) for name, value in params if name.lower() not in SENSITIVE_PARAMS
+    )
+    return f"{method} {path}?{urlencode(normalized)}"
+
+def mask_secrets(text: str) -> str:
+    """Replace tokens and email addresses with same-length masks."""
+    return SECRETS.sub(lambda match: "x" * len(match.group(0)), text)
+
+def shift_timestamps(text: str, delta: timedelta) -> str:
+    """Move ISO datetimes and Slack message timestamps forward by ``delta``."""
+    def shift_iso(match):
+        shifted = datetime.strptime(match.group(1), "%Y-%m-%dT%H:%M:%S") + delta
+        return shifted.strftime("%Y-%m-%dT%H:%M:%S") + match.group(2)
+
+    def shift_ts(match):
+        return f'{match.group(1)}{int(match.group(2)) + int(delta.total_seconds())}{match.group(3) or ""}"'
+
+    return SLACK_TS.sub(shift_ts, ISO_DATETIME.sub(shift_iso, text))
+
+class Cassette:
+    """Recorded interactions of one upstream."""
+
+    def __init__(self, upstream: str, interactions: Optional[List[Dict]] = None, recorded_at: Optional[str] = None):
+        self.upstream = upstream
+        self.interactions = interactions or []
+        self.recorded_at = recorded_at or datetime.now(timezone.utc).isoformat()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["upstream"], data["interactions"], data["recorded_at"])
+
+    def deduplicated(self) -> "Cassette":
+        """Keep the first interaction for every request key."""
+        seen = set()
+        interactions = []
+        for interaction in self.interactions:
+            if interaction["request"]["key"] not in seen:
+                seen.add(interaction["request"]["key"])
+                interactions.append(interaction)
+        return Cassette(self.upstream, interactions, self.recorded_at)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"upstream": self.upstream, "recorded_at": self.recorded_at,
+                       "interactions": self.interactions}, f, indent=1)
+
+class RecordingProxy(FakeUpstream):
+    """Forward requests to an upstream and record sanitized interactions."""
+
+    def __init__(self, name: str, target: str, **kwargs):
+        self.name = name
+        self.target = target.rstrip("/")
+        self.cassette = Cassette(name)
+        self._client = httpx.Client(base_url=self.target, timeout=120)
+        super().__init__(**kwargs)
+
+    def register_routes(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        super().stop()
+        self._client.close()
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        parsed = urlparse(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS}
+        headers["Accept-Encoding"] = "identity"
+
+        start = time.perf_counter()
+        response = self._client.request(method, request.path, headers=headers, content=body)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        text = response.content.decode("utf-8", errors="replace")
+        response_headers = {k: v for k, v in response.headers.items() if k.lower() in RECORDED_RESPONSE_HEADERS}
+        content_type = request.headers.get("Content-Type", "")
+        with self._lock:
+            self.request_count += 1
+            self.request_log.append((method, parsed.path))
+            self.cassette.interactions.append({
+                "request": {
+                    "method": method,
+                    "path": parsed.path,
+                    "key": request_key(method, parsed.path, parsed.query, body, content_type),
+                    "body_bytes": len(body),
+                },
+                "response": {
+                    "status": response.status_code,
+                    "headers": {k: mask_secrets(v.replace(self.target, BASE_URL_PLACEHOLDER))
+                                for k, v in response_headers.items()},
+                    "body": mask_secrets(text.replace(self.target, BASE_URL_PLACEHOLDER)),
+                },
+                "latency_ms": round(latency_ms, 2),
+            })
+
+        # Absolute URLs (pagination links, resource urls) must point back at the proxy
+        out_headers = {k: v.replace(self.target, self.url) for k, v in response_headers.items()}
+        self._send_raw(request, response.status_code, text.replace(self.target, self.url).encode(), out_headers)
+
+class ReplayServer(FakeUpstream):
+    """Serve a cassette, matching requests by key and cycling through repeats."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 1.0, shift_to_now: bool = True, **kwargs):
+        self.name = cassette.upstream
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.unmatched: List[str] = []
+        self._by_key: Dict[str, List[Dict]] = {}
+        for interaction in cassette.interactions:
+            self._by_key.setdefault(interaction["request"]["key"], []).append(interaction)
+        self._cursors: Dict[str, count] = {key: count() for key in self._by_key}
+        recorded_at = datetime.fromisoformat(cassette.recorded_at)
+        self._shift = datetime.now(timezone.utc) - recorded_at if shift_to_now else timedelta(0)
+        super().__init__(**kwargs)
+
+    def register_routes(self) -> None:
+        pass
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.request_count = 0
+            self.request_log.clear()
+            self.unmatched.clear()
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        parsed = urlparse(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        key = request_key(method, parsed.path, parsed.query, body, request.headers.get("Content-Type", ""))
+        with self._lock:
+            self.request_count += 1
+            self.request_log.append((method, parsed.path))
+            candidates = self._by_key.get(key)
+            if not candidates:
+                self.unmatched.append(key)
+            else:
+                interaction = candidates[next(self._cursors[key]) % len(candidates)]
+
+        if not candidates:
+            self._send(request, 404, {"error": "no_recorded_interaction", "key": key})
+            return
+
+        time.sleep(interaction["latency_ms"] * self.latency_scale / 1000)
+        response = interaction["response"]
+        body_text = shift_timestamps(response["body"], self._shift).replace(BASE_URL_PLACEHOLDER, self.url)
+        headers = {k: v.replace(BASE_URL_PLACEHOLDER, self.url) for k, v in response["headers"].items()}
+        self._send_raw(request, response["status"], body_text.encode(), headers)
+
+def upstream_environment(servers: Dict[str, FakeUpstream]) -> Dict[str, str]:
+    """Settings that point each integration at its proxy or replay server."""
+    return {
+        UPSTREAM_SETTINGS[name][0]: f"{server.url}{UPSTREAM_SETTINGS[name][1]}"
+        for name, server in servers.items()
+    }
+
+def load_replay_servers(cassette_dir: str, latency_scale: float = 1.0) -> Dict[str, ReplayServer]:
+    """Start one replay server per cassette in a directory."""
+    servers = {}
+    for filename in sorted(os.listdir(cassette_dir)):
+        if filename.endswith(".json"):
+            cassette = Cassette.load(os.path.join(cassette_dir, filename))
+            servers[cassette.upstream] = ReplayServer(cassette, latency_scale=latency_scale).start()
+    return servers
+
+def _parse_targets(values: List[str]) -> Dict[str, str]:
+    targets = {}
+    for value in values:
+        name, _, url = value.partition("=")
+        if name not in UPSTREAM_SETTINGS or not url:
+            raise SystemExit(f"Invalid --target {value!r}; use one of {sorted(UPSTREAM_SETTINGS)}=<url>")
+        targets[name] = url
+    return targets
+
+def record(targets: Dict[str, str], out_dir: str) -> None:
+    """Run recording proxies until interrupted, then write the cassettes."""
+    proxies = {name: RecordingProxy(name, url).start() for name, url in targets.items()}
+    print("Point SprintLens at the recording proxies with:")
+    for setting, value in upstream_environment(proxies).items():
+        print(f"  {setting}={value}")
+    print("Press Ctrl-C to stop recording.")
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    stop.wait()
+    for name, proxy in proxies.items():
+        proxy.stop()
+        proxy.cassette.save(os.path.join(out_dir, f"{name}.json"))
+        print(f"Wrote {len(proxy.cassette.interactions)} {name} interactions")
+
+def record_fakes(out_dir: str, latency_ms: float) -> None:
+    """Record cassettes by driving every benchmarked endpoint against the fakes."""
+    from tests.benchmarks.run_benchmarks import ENDPOINTS, configure_environment, parse_args, running_fakes
+
+    args = parse_args(["--messages", "40", "--prs", "45", "--issues", "35", "--commits", "40",
+                       "--events", "12", "--latency-ms", str(latency_ms), "--jitter-ms", str(latency_ms / 2),
+                       "--completion-ms", "100"])
+    out_dir = os.path.abspath(out_dir)
+    sys.path.insert(0, os.getcwd())
+    with tempfile.TemporaryDirectory() as workdir, running_fakes(args) as fakes:
+        proxies = {name: RecordingProxy(name, fake.url).start() for name, fake in fakes.items()}
+        configure_environment(fakes, workdir)
+        os.environ.update(upstream_environment(proxies))
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        client = TestClient(app)
+        for method, path, payload in ENDPOINTS.values():
+            response = client.request(method, path, json=payload)
+            response.raise_for_status()
+        for name, proxy in proxies.items():
+            proxy.stop()
+            cassette = proxy.cassette.deduplicated()
+            cassette.save(os.path.join(out_dir, f"{name}.json"))
+            print(f"Wrote {len(cassette.interactions)} {name} interactions")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Record upstream traffic cassettes")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="Record real upstream traffic through local proxies")
+    record_parser.add_argument("--target", action="append", default=[], help="name=url, e.g. github=https://api.github.com")
+    record_parser.add_argument("--out-dir", default="cassettes")
+    fakes_parser = commands.add_parser("record-fakes", help="Record the performance-test cassettes from the fakes")
+    fakes_parser.add_argument("--out-dir", default="tests/cassettes")
+    fakes_parser.add_argument("--latency-ms", type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        record(_parse_targets(args.target), args.out_dir)
+    else:
+        record_fakes(args.out_dir, args.latency_ms)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
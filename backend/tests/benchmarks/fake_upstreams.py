@@ -0,0 +1,583 @@
+"""
+Local stand-in servers for the SprintLens upstreams.
+
+Each fake speaks just enough of its upstream's HTTP API for the SprintLens
+services (and their client libraries) to run unmodified against it. Data
+volume, response latency and the rate of injected 429/5xx responses are
+configurable per fake. Everything is generated deterministically from a seed.
+"""
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+@dataclass
+class FaultProfile:
+    """Latency and error injection applied to every request of a fake."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+
+Route = Tuple[str, "re.Pattern[str]", Callable]
+
+class FakeUpstream:
+    """Threaded HTTP server dispatching requests to regex routes."""
+
+    name = "upstream"
+
+    def __init__(self, faults: Optional[FaultProfile] = None, seed: int = 0):
+        self.faults = faults or FaultProfile()
+        self.random = random.Random(seed)
+        self.request_count = 0
+        self.request_log: List[Tuple[str, str]] = []
+        self.query_log: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+        self._routes: List[Route] = []
+        self.register_routes()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # delayed ACKs add ~40ms to every keep-alive response.
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                fake._dispatch(self, "GET")
+
+            def do_POST(self):
+                fake._dispatch(self, "POST")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, name=f"fake-{self.name}", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeUpstream":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def route(self, method: str, pattern: str, handler: Callable) -> None:
+        self._routes.append((method, re.compile(f"^{pattern}$"), handler))
+
+    def register_routes(self) -> None:
+        raise NotImplementedError
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        parsed = urlparse(request.path)
+        length = int(request.headers.get("Content-Length") or 0)
+        raw_body = request.rfile.read(length) if length else b""
+        query = {key: ",".join(values) for key, values in parse_qs(parsed.query).items()}
+        with self._lock:
+            self.request_count += 1
+            self.request_log.append((method, parsed.path))
+            self.query_log.append(query)
+            roll = self.random.random()
+            delay = self.faults.latency_ms + self.random.uniform(0, self.faults.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+
+        if roll < self.faults.rate_429:
+            self._send(request, 429, {"error": "rate_limited", "message": "Too Many Requests"}, {"Retry-After": "1"})
+            return
+        if roll < self.faults.rate_429 + self.faults.rate_5xx:
+            self._send(request, 503, {"error": "unavailable", "message": "Service Unavailable"})
+            return
+
+        body = self._parse_body(request, raw_body)
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(parsed.path)
+            if route_method == method and match:
+                result = handler(query=query, body=body, **match.groupdict())
+                status, payload, headers = result if isinstance(result, tuple) else (200, result, {})
+                self._send(request, status, payload, headers)
+                return
+        self._send(request, 404, {"error": "not_found", "message": f"No fake route for {method} {parsed.path}"})
+
+    @staticmethod
+    def _parse_body(request: BaseHTTPRequestHandler, raw_body: bytes) -> Dict:
+        if not raw_body:
+            return {}
+        content_type = request.headers.get("Content-Type", "")
+        if "application/x-www-form-urlencoded" in content_type:
+            return {key: values[-1] for key, values in parse_qs(raw_body.decode()).items()}
+        try:
+            return json.loads(raw_body)
+        except ValueError:
+            return {}
+
+    @classmethod
+    def _send(cls, request: BaseHTTPRequestHandler, status: int, payload, headers: Optional[Dict[str, str]] = None) -> None:
+        headers = {"Content-Type": "application/json; charset=utf-8", **(headers or {})}
+        cls._send_raw(request, status, json.dumps(payload).encode(), headers)
+
+    @staticmethod
+    def _send_raw(request: BaseHTTPRequestHandler, status: int, data: bytes, headers: Dict[str, str]) -> None:
+        request.send_response(status)
+        for key, value in headers.items():
+            request.send_header(key, value)
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+def _timestamps(count: int, window_days: int, seed: int) -> List[datetime]:
+    """Deterministic timestamps spread over the window, newest first."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    span = timedelta(days=window_days).total_seconds()
+    return sorted((now - timedelta(seconds=rng.uniform(0, span * 0.95)) for _ in range(count)), reverse=True)
+
+def _iso(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+WORDS = ("deploy", "review", "payment", "timeout", "release", "flaky", "test", "migration",
+         "api", "latency", "dashboard", "sprint", "blocker", "fix", "refactor", "cache")
+
+def _sentence(rng: random.Random, length: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(length)).capitalize()
+
+class FakeSlack(FakeUpstream):
+    """Slack Web API: conversations.history/list and chat.postMessage."""
+
+    name = "slack"
+
+    def __init__(self, messages: int = 200, channels: int = 20, window_days: int = 7, **kwargs):
+        self.channels = [{"id": f"C{index:06d}", "name": f"channel-{index}"} for index in range(channels)]
+        rng = random.Random(1)
+        self.messages = [
+            {"type": "message", "user": f"U{rng.randrange(50):04d}", "ts": f"{ts.timestamp():.6f}", "text": _sentence(rng)}
+            for ts in _timestamps(messages, window_days, seed=1)
+        ]
+        super().__init__(**kwargs)
+
+    def register_routes(self) -> None:
+        self.route("POST", r"/api/conversations\.history", self._history)
+        self.route("POST", r"/api/conversations\.list", self._list)
+        self.route("POST", r"/api/chat\.postMessage", self._post_message)
+        self.route("POST", r"/api/auth\.test", lambda **_: {"ok": True, "user_id": "UBOT", "team_id": "TBENCH"})
+
+    def _history(self, query, body, **_):
+        params = {**query, **body}
+        oldest = float(params.get("oldest") or 0)
+        limit = int(params.get("limit") or 100)
+        start = int(params.get("cursor") or 0)
+        matching = [m for m in self.messages if float(m["ts"]) >= oldest]
+        page = matching[start:start + limit]
+        next_cursor = str(start + limit) if start + limit < len(matching) else ""
+        return {"ok": True, "messages": page, "has_more": bool(next_cursor),
+                "response_metadata": {"next_cursor": next_cursor}}
+
+    def _list(self, query, body, **_):
+        return {"ok": True, "channels": self.channels, "response_metadata": {"next_cursor": ""}}
+
+    def _post_message(self, query, body, **_):
+        params = {**query, **body}
+        return {"ok": True, "channel": params.get("channel"), "ts": f"{time.time():.6f}"}
+
+class FakeGitHub(FakeUpstream):
+    """
+    GitHub REST API for a repository with Link-header pagination.
+
+    ``others`` are served as copies of the repository, and with it listed
+    as the repositories of their organizations, carrying ``topics``.
+    """
+
+    name = "github"
+
+    def __init__(self, repo: str = "bench/repo", pull_requests: int = 100, issues: int = 100,
+                 commits: int = 200, releases: int = 5, window_days: int = 7, others: Sequence[str] = (),
+                 topics: Optional[Dict[str, List[str]]] = None, **kwargs):
+        self.repo = repo
+        self.names = [repo, *others]
+        self.topics = topics or {}
+        rng = random.Random(2)
+        self.pull_requests = []
+        for number, ts in enumerate(_timestamps(pull_requests, window_days, seed=2), start=1):
+            merged = rng.random() < 0.6
+            self.pull_requests.append({
+                "number": number, "title": _sentence(rng, 6), "state": "closed" if merged else "open",
+                "created_at": _iso(ts), "updated_at": _iso(ts),
+                "merged_at": _iso(ts + timedelta(hours=rng.uniform(1, 48))) if merged else None,
+                "user": {"login": f"dev{rng.randrange(20)}"}, "body": _sentence(rng, 40),
+                "html_url": f"https://github.com/{repo}/pull/{number}",
+            })
+        self.issues = [
+            {"number": 10000 + index, "title": _sentence(rng, 6), "state": rng.choice(["open", "closed"]),
+             "created_at": _iso(ts), "updated_at": _iso(ts), "user": {"login": f"dev{rng.randrange(20)}"},
+             "labels": [{"name": rng.choice(["bug", "feature", "chore"])}], "body": _sentence(rng, 30),
+             "html_url": f"https://github.com/{repo}/issues/{10000 + index}"}
+            for index, ts in enumerate(_timestamps(issues, window_days, seed=3))
+        ]
+        self.commits = [
+            {"sha": f"{rng.getrandbits(160):040x}", "html_url": f"https://github.com/{repo}/commit/{index}",
+             "commit": {"message": _sentence(rng, 8) + "\n\n" + _sentence(rng, 20),
+                        "author": {"name": f"Dev {rng.randrange(20)}", "email": "dev@example.com", "date": _iso(ts)}}}
+            for index, ts in enumerate(_timestamps(commits, window_days, seed=4))
+        ]
+        # Each merged pull request lands as the last commit before its merge time
+        for pr in self.pull_requests:
+            if pr["merged_at"] and self.commits:
+                merge = next((c for c in self.commits if c["commit"]["author"]["date"] <= pr["merged_at"]), self.commits[-1])
+                pr["merge_commit_sha"] = merge["sha"]
+                pr["merged_at"] = pr["updated_at"] = merge["commit"]["author"]["date"]
+        # Most pull requests get a first review within a day (before any merge),
+        # some after a comment from their author
+        review_rng = random.Random(7)
+        self.reviews = {}
+        for pr in self.pull_requests:
+            created = datetime.strptime(pr["created_at"], "%Y-%m-%dT%H:%M:%SZ")
+            reviewed = _iso(created + timedelta(hours=review_rng.uniform(0.5, 24)))
+            if review_rng.random() < 0.2 or (pr["merged_at"] and reviewed > pr["merged_at"]):
+                continue
+            reviews = [{"id": pr["number"] * 10 + 1, "user": {"login": f"dev{review_rng.randrange(20, 30)}"},
+                        "state": "APPROVED", "submitted_at": reviewed}]
+            if review_rng.random() < 0.3:
+                reviews.insert(0, {"id": pr["number"] * 10, "user": pr["user"], "state": "COMMENTED",
+                                   "submitted_at": _iso(created + timedelta(minutes=10))})
+            self.reviews[pr["number"]] = reviews
+            if not pr["merged_at"]:
+                pr["updated_at"] = max(pr["updated_at"], reviewed)
+        for pr in self.pull_requests:
+            pr["closed_at"] = pr["merged_at"]
+        for issue in self.issues:
+            issue["closed_at"] = issue["updated_at"] if issue["state"] == "closed" else None
+        self.releases = [
+            {"id": index, "tag_name": f"v1.{releases - index}.0", "name": f"Release 1.{releases - index}.0",
+             "body": _sentence(rng, 50), "created_at": _iso(ts), "published_at": _iso(ts),
+             "html_url": f"https://github.com/{repo}/releases/{index}"}
+            for index, ts in enumerate(_timestamps(releases, window_days, seed=5))
+        ]
+        # Release tags point at evenly spaced commits, newest release first
+        self.tags = {release["tag_name"]: self.commits[index * len(self.commits) // (releases + 1)]["sha"]
+                     for index, release in enumerate(self.releases)} if self.commits else {}
+        super().__init__(**kwargs)
+
+    def register_routes(self) -> None:
+        repo = "(?P<repo>" + "|".join(re.escape(name) for name in self.names) + ")"
+        self.route("GET", f"/repos/{repo}", self._repository)
+        self.route("GET", f"/repos/{repo}/pulls", self._pulls)
+        self.route("GET", f"/repos/{repo}/pulls/(?P<number>\\d+)/reviews", self._reviews)
+        self.route("GET", f"/repos/{repo}/issues", lambda query, repo, **_: self._page(f"repos/{repo}/issues", self.issues, query))
+        self.route("GET", f"/repos/{repo}/commits", self._commits)
+        self.route("GET", f"/repos/{repo}/releases", lambda query, repo, **_: self._page(f"repos/{repo}/releases", self.releases, query))
+        self.route("GET", f"/repos/{repo}/compare/(?P<base>.+?)\\.\\.\\.(?P<head>.+)", self._compare)
+        self.route("GET", f"/repos/{repo}/git/(?:refs/)?tags/(?P<tag>.+)", self._tag_ref)
+        self.route("GET", r"/orgs/(?P<org>[^/]+)", lambda org, **_: {"login": org, "url": f"{self.url}/orgs/{org}"})
+        self.route("GET", r"/orgs/(?P<org>[^/]+)/repos", self._org_repositories)
+
+    def _repository(self, repo, **_):
+        return {"id": self.names.index(repo) + 1, "name": repo.split("/")[-1], "full_name": repo,
+                "description": "Benchmark repository", "html_url": f"https://github.com/{repo}",
+                "url": f"{self.url}/repos/{repo}", "default_branch": "main", "archived": False,
+                "topics": self.topics.get(repo, [])}
+
+    def _org_repositories(self, query, org, **_):
+        repositories = [self._repository(name) for name in self.names if name.split("/")[0] == org]
+        return self._page(f"orgs/{org}/repos", repositories, query)
+
+    def _pulls(self, query, repo, **_):
+        pulls = [{**pr, "url": f"{self.url}/repos/{repo}/pulls/{pr['number']}"} for pr in self.pull_requests]
+        return self._page(f"repos/{repo}/pulls", pulls, query)
+
+    def _reviews(self, query, repo, number, **_):
+        return self._page(f"repos/{repo}/pulls/{number}/reviews", self.reviews.get(int(number), []), query)
+
+    def _commits(self, query, repo, **_):
+        commits = self.commits
+        if query.get("since"):
+            since = query["since"].replace("Z", "")[:19]
+            commits = [c for c in commits if c["commit"]["author"]["date"][:19] >= since]
+        return self._page(f"repos/{repo}/commits", commits, query)
+
+    def _resolve(self, ref: str) -> Optional[int]:
+        """Index in the newest-first commit list of a branch, tag or SHA."""
+        if ref == "main":
+            return 0
+        sha = self.tags.get(ref, ref)
+        return next((index for index, commit in enumerate(self.commits) if commit["sha"] == sha), None)
+
+    def _compare(self, base, head, **_):
+        base_index, head_index = self._resolve(base), self._resolve(head)
+        if base_index is None or head_index is None:
+            return 404, {"message": "Not Found"}, {}
+        commits = list(reversed(self.commits[head_index:base_index]))
+        return {"status": "ahead" if commits else "identical", "ahead_by": len(commits), "behind_by": 0,
+                "total_commits": len(commits), "base_commit": self.commits[base_index],
+                "merge_base_commit": self.commits[base_index], "commits": commits, "files": []}
+
+    def _tag_ref(self, tag, **_):
+        if tag not in self.tags:
+            return 404, {"message": "Not Found"}, {}
+        return {"ref": f"refs/tags/{tag}", "object": {"sha": self.tags[tag], "type": "commit"}}
+
+    def _page(self, path: str, items: List[Dict], query: Dict):
+        items = list(items)
+        if query.get("labels"):
+            wanted = set(query["labels"].split(","))
+            items = [item for item in items if wanted <= {label["name"] for label in item.get("labels", [])}]
+        if query.get("sort") == "updated":
+            items.sort(key=lambda item: item["updated_at"], reverse=True)
+        if query.get("direction") == "asc":
+            items.reverse()
+        per_page = int(query.get("per_page") or 30)
+        page = int(query.get("page") or 1)
+        chunk = items[(page - 1) * per_page: page * per_page]
+        headers = {}
+        if page * per_page < len(items):
+            next_query = urlencode({**query, "page": page + 1, "per_page": per_page})
+            headers["Link"] = f'<{self.url}/{path}?{next_query}>; rel="next"'
+        return 200, chunk, headers
+
+class FakeJira(FakeUpstream):
+    """Jira REST and Agile APIs: server info, search, projects, boards, sprints."""
+
+    name = "jira"
+
+    def __init__(self, project_key: str = "BENCH", issues: int = 100, sprints: int = 6, window_days: int = 7, **kwargs):
+        self.project_key = project_key
+        rng = random.Random(6)
+        self.issues = [
+            {"id": str(10000 + index), "key": f"{project_key}-{index + 1}", "self": "",
+             "fields": {
+                 "summary": _sentence(rng, 6),
+                 "status": {"name": rng.choice(["To Do", "In Progress", "In Review", "Done"])},
+                 "priority": {"name": rng.choice(["Low", "Medium", "High"])},
+                 "assignee": {"displayName": f"Dev {rng.randrange(20)}"},
+                 "reporter": {"displayName": f"PM {rng.randrange(3)}"},
+                 "created": ts.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                 "updated": ts.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                 "issuetype": {"name": rng.choice(["Story", "Bug", "Task"])},
+                 "customfield_10016": rng.choice([1, 2, 3, 5, 8]),
+                 "description": _sentence(rng, 40),
+             }}
+            for index, ts in enumerate(_timestamps(issues, window_days, seed=6))
+        ]
+        self.sprints = [
+            {"id": index + 1, "name": f"Sprint {index + 1}", "state": "closed" if index < sprints - 1 else "active",
+             "startDate": _iso(datetime.now(timezone.utc) - timedelta(days=14 * (sprints - index))),
+             "endDate": _iso(datetime.now(timezone.utc) - timedelta(days=14 * (sprints - index - 1))),
+             "goal": _sentence(rng, 5)}
+            for index in range(sprints)
+        ]
+        for issue in self.issues:
+            name = issue["fields"]["status"]["name"]
+            issue["fields"]["status"].update({"id": self.STATUS_IDS[name], "statusCategory": {"key": self.STATUS_CATEGORIES[name]}})
+        self.changelogs = self._changelogs() if sprints else {}
+        super().__init__(**kwargs)
+
+    STATUS_IDS = {"To Do": "1", "In Progress": "3", "In Review": "4", "Done": "5"}
+    STATUS_CATEGORIES = {"To Do": "new", "In Progress": "indeterminate", "In Review": "indeterminate", "Done": "done"}
+
+    def _changelogs(self) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Creation time and changelog of each issue, consistent with its sprint.
+
+        Most issues are created before their sprint and planned into it just
+        before it starts; some are added mid-sprint and a few removed. Status
+        transitions walk To Do -> In Progress -> In Review -> Done up to the
+        issue's current status within the sprint.
+        """
+        rng = random.Random(61)
+        now = datetime.now(timezone.utc)
+        path = ["To Do", "In Progress", "In Review", "Done"]
+        changelogs = {}
+        for index, issue in enumerate(self.issues):
+            sprint = self.sprints[index % len(self.sprints)]
+            start = datetime.fromisoformat(sprint["startDate"].replace("Z", "+00:00"))
+            end = min(datetime.fromisoformat(sprint["endDate"].replace("Z", "+00:00")), now)
+            span = (end - start).total_seconds()
+            histories = []
+            roll = rng.random()
+            if roll < 0.15:
+                # Added mid-sprint, straight into the sprint
+                created = start + timedelta(seconds=rng.uniform(0.1, 0.5) * span)
+            else:
+                created = start - timedelta(days=rng.uniform(1, 10))
+                histories.append((start - timedelta(hours=1), {"field": "Sprint", "from": "", "to": str(sprint["id"])}))
+            moment = max(created, start)
+            target = path.index(issue["fields"]["status"]["name"])
+            for step in range(target):
+                moment = moment + timedelta(seconds=rng.uniform(0.02, 0.25) * span)
+                histories.append((min(moment, end), {
+                    "field": "status", "from": self.STATUS_IDS[path[step]], "fromString": path[step],
+                    "to": self.STATUS_IDS[path[step + 1]], "toString": path[step + 1]}))
+            if roll > 0.95:
+                histories.append((start + timedelta(seconds=0.9 * span), {"field": "Sprint", "from": str(sprint["id"]), "to": ""}))
+            histories.sort(key=lambda history: history[0])
+            changelogs[issue["key"]] = (
+                created.strftime("%Y-%m-%dT%H:%M:%S.000+0000"),
+                {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": [
+                    {"id": str(number), "created": when.strftime("%Y-%m-%dT%H:%M:%S.000+0000"), "items": [item]}
+                    for number, (when, item) in enumerate(histories)]},
+            )
+        return changelogs
+
+    def register_routes(self) -> None:
+        self.route("GET", r"/rest/api/2/serverInfo", lambda **_: {
+            "baseUrl": self.url, "version": "1001.0.0", "versionNumbers": [1001, 0, 0],
+            "deploymentType": "Cloud", "buildNumber": 100000, "serverTitle": "Jira"})
+        self.route("GET", r"/rest/api/2/field", lambda **_: [
+            {"id": "customfield_10016", "name": "Story Points", "custom": True,
+             "schema": {"type": "number", "custom": "com.atlassian.jira.plugin.system.customfieldtypes:float"}}])
+        self.route("GET", r"/rest/api/2/project", lambda **_: [
+            {"id": "10000", "key": self.project_key, "name": "Benchmark", "projectTypeKey": "software"}])
+        self.route("GET", r"/rest/api/2/status", lambda **_: [
+            {"id": status_id, "name": name, "statusCategory": {"key": self.STATUS_CATEGORIES[name]}}
+            for name, status_id in self.STATUS_IDS.items()])
+        self.route("GET", r"/rest/api/2/search", self._search)
+        self.route("POST", r"/rest/api/2/search", self._search)
+        self.route("GET", r"/rest/agile/1\.0/board", self._boards)
+        self.route("GET", r"/rest/agile/1\.0/board/(?P<board_id>\d+)/sprint", self._sprints)
+        self.route("GET", r"/rest/agile/1\.0/sprint/(?P<sprint_id>\d+)", self._sprint)
+
+    def _search(self, query, body, **_):
+        params = {**query, **body}
+        start = int(params.get("startAt") or 0)
+        max_results = int(params.get("maxResults") or 50)
+        jql = str(params.get("jql") or "")
+        issues = self.issues
+        sprint = re.search(r"sprint\s*=\s*(\d+)", jql)
+        if sprint:
+            sprint_id = int(sprint.group(1))
+            issues = [issue for index, issue in enumerate(issues) if index % len(self.sprints) + 1 == sprint_id]
+        page = issues[start:start + max_results]
+        if "changelog" in str(params.get("expand") or ""):
+            # Changelog timestamps are sprint-relative, so creation times are too
+            page = [{**issue, "fields": {**issue["fields"], "created": self.changelogs[issue["key"]][0]},
+                     "changelog": self.changelogs[issue["key"]][1]} for issue in page]
+        return {"startAt": start, "maxResults": max_results, "total": len(issues), "issues": page}
+
+    def _boards(self, query, **_):
+        boards = [{"id": 1, "name": f"{self.project_key} board", "type": "scrum"}]
+        return {"startAt": 0, "maxResults": 50, "total": 1, "isLast": True, "values": boards}
+
+    def _sprints(self, query, board_id, **_):
+        start = int(query.get("startAt") or 0)
+        max_results = int(query.get("maxResults") or 50)
+        page = self.sprints[start:start + max_results]
+        return {"startAt": start, "maxResults": max_results, "isLast": start + max_results >= len(self.sprints),
+                "values": page}
+
+    def _sprint(self, sprint_id, **_):
+        for sprint in self.sprints:
+            if sprint["id"] == int(sprint_id):
+                return sprint
+        return 404, {"errorMessages": ["Sprint not found"]}, {}
+
+class FakeCalendar(FakeUpstream):
+    """Google Calendar v3: events.list, calendarList.list and freebusy.query."""
+
+    name = "calendar"
+
+    def __init__(self, events: int = 50, window_days: int = 7, people: int = 20, **kwargs):
+        rng = random.Random(7)
+        self.people = [f"dev{index}@example.com" for index in range(people)]
+        now = datetime.now(timezone.utc)
+        self.events = []
+        for index in range(events):
+            start = now + timedelta(hours=rng.uniform(-window_days * 12, window_days * 12))
+            end = start + timedelta(minutes=rng.choice([15, 30, 45, 60]))
+            self.events.append({
+                "id": f"evt{index}", "summary": _sentence(rng, 4), "description": _sentence(rng, 20),
+                "start": {"dateTime": _iso(start)}, "end": {"dateTime": _iso(end)},
+                "attendees": [{"email": f"dev{rng.randrange(people)}@example.com"} for _ in range(rng.randrange(1, 6))],
+                "organizer": {"email": "pm@example.com"}, "htmlLink": f"https://calendar.google.com/event?eid={index}",
+            })
+        self.events.sort(key=lambda event: event["start"]["dateTime"])
+        super().__init__(**kwargs)
+
+    def register_routes(self) -> None:
+        self.route("GET", r"/calendar/v3/calendars/(?P<calendar_id>[^/]+)/events", self._events)
+        self.route("GET", r"/calendar/v3/users/me/calendarList", lambda **_: {"items": [
+            {"id": "primary", "summary": "Benchmark", "primary": True, "accessRole": "owner"}]})
+        self.route("POST", r"/calendar/v3/freeBusy", self._freebusy)
+
+    def _events(self, query, calendar_id, **_):
+        time_min = query.get("timeMin", "")[:19]
+        time_max = query.get("timeMax", "9999")[:19]
+        events = [e for e in self.events if time_min <= e["start"]["dateTime"][:19] <= time_max]
+        max_results = int(query.get("maxResults") or 250)
+        start = int(query.get("pageToken") or 0)
+        result = {"items": events[start:start + max_results]}
+        if start + max_results < len(events):
+            result["nextPageToken"] = str(start + max_results)
+        return result
+
+    def _freebusy(self, body, **_):
+        items = body.get("items", [])
+        if len(items) > 50:
+            return 400, {"error": {"code": 400, "message": "Too many calendars requested",
+                                   "errors": [{"reason": "tooManyCalendarsRequested"}]}}, {}
+        time_min = (body.get("timeMin") or "")[:19]
+        time_max = (body.get("timeMax") or "9999")[:19]
+        in_window = [e for e in self.events if e["end"]["dateTime"][:19] > time_min and e["start"]["dateTime"][:19] < time_max]
+        calendars = {}
+        for item in items:
+            calendar_id = item["id"]
+            if calendar_id == "primary":
+                events = in_window
+            elif calendar_id in self.people:
+                events = [e for e in in_window if any(a["email"] == calendar_id for a in e["attendees"])]
+            else:
+                calendars[calendar_id] = {"busy": [], "errors": [{"domain": "global", "reason": "notFound"}]}
+                continue
+            calendars[calendar_id] = {"busy": [{"start": e["start"]["dateTime"], "end": e["end"]["dateTime"]} for e in events]}
+        return {"kind": "calendar#freeBusy", "timeMin": body.get("timeMin"), "timeMax": body.get("timeMax"),
+                "calendars": calendars}
+
+class FakeOpenAI(FakeUpstream):
+    """OpenAI-compatible chat completions endpoint with token accounting."""
+
+    name = "openai"
+
+    def __init__(self, completion_ms: float = 0.0, ms_per_token: float = 0.0,
+                 model_completion_ms: Optional[Dict[str, float]] = None, failing_models: Tuple[str, ...] = (),
+                 **kwargs):
+        self.completion_ms = completion_ms
+        self.ms_per_token = ms_per_token
+        # Per-model overrides of completion_ms, and models that answer with a 500
+        self.model_completion_ms = dict(model_completion_ms or {})
+        self.failing_models = set(failing_models)
+        super().__init__(**kwargs)
+
+    def register_routes(self) -> None:
+        self.route("POST", r"/v1/chat/completions", self._completion)
+        self.route("GET", r"/v1/models", lambda **_: {"object": "list", "data": [
+            {"id": "gpt-3.5-turbo", "object": "model", "created": 0, "owned_by": "bench"}]})
+
+    def _completion(self, body, **_):
+        prompt = " ".join(message.get("content", "") for message in body.get("messages", []))
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = min(int(body.get("max_tokens") or 500), 120)
+        model = body.get("model", "gpt-3.5-turbo")
+        if model in self.failing_models:
+            return 500, {"error": {"message": f"{model} is unavailable", "type": "server_error"}}, {}
+        delay = self.model_completion_ms.get(model, self.completion_ms) + self.ms_per_token * completion_tokens
+        if delay:
+            time.sleep(delay / 1000)
+        text = "**Key Accomplishments**\n- Benchmark summary generated by the fake completion endpoint."
+        return {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
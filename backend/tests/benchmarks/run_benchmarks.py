@@ -0,0 +1,214 @@
+"""
+Hermetic throughput and latency benchmark for the SprintLens API.
+
+Starts the fake upstreams, points the services at them through settings
+(environment variables read when ``app.main`` is imported), serves the app
+with uvicorn on a local port and drives each endpoint at several
+concurrency levels, reporting p50/p95/p99 latency and requests per second.
+
+Usage (from the backend directory):
+    python -m tests.benchmarks.run_benchmarks --concurrency 1 4 16 --requests 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import pickle
+import socket
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+from tests.benchmarks.fake_upstreams import (
+    FakeCalendar, FakeGitHub, FakeJira, FakeOpenAI, FakeSlack, FakeUpstream, FaultProfile,
+)
+
+BENCH_CHANNEL = "C000001"
+BENCH_PROJECT = "BENCH"
+BENCH_REPO = "bench/repo"
+
+ENDPOINTS = {
+    "summary": ("POST", "/api/summary/generate", {
+        "channel_id": BENCH_CHANNEL, "days": 7, "include_github": True, "include_jira": True,
+        "include_calendar": True, "jira_project_key": BENCH_PROJECT}),
+    "github_repository": ("GET", "/api/github/repository?days=7", None),
+    "jira_issues": ("GET", f"/api/jira/issues?project_key={BENCH_PROJECT}&days=7", None),
+    "bot_respond": ("POST", "/api/bot/respond", {"channel_id": BENCH_CHANNEL, "user_id": "U0001", "text": "summary"}),
+}
+
+@contextmanager
+def running_fakes(args: argparse.Namespace) -> Iterator[Dict[str, FakeUpstream]]:
+    """Start one fake per upstream with the requested volume and faults."""
+    faults = FaultProfile(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          rate_429=args.rate_429, rate_5xx=args.rate_5xx)
+    fakes = {
+        "slack": FakeSlack(messages=args.messages, faults=faults),
+        "github": FakeGitHub(repo=BENCH_REPO, pull_requests=args.prs, issues=args.issues,
+                             commits=args.commits, faults=faults),
+        "jira": FakeJira(project_key=BENCH_PROJECT, issues=args.issues, faults=faults),
+        "calendar": FakeCalendar(events=args.events, faults=faults),
+        "openai": FakeOpenAI(completion_ms=args.completion_ms, faults=faults),
+    }
+    for fake in fakes.values():
+        fake.start()
+    try:
+        yield fakes
+    finally:
+        for fake in fakes.values():
+            fake.stop()
+
+def configure_environment(fakes: Dict[str, FakeUpstream], workdir: str) -> None:
+    """Point every integration at its fake through the settings environment."""
+    os.environ.update({
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "SLACK_API_URL": f"{fakes['slack'].url}/api/",
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"{fakes['openai'].url}/v1",
+        "GITHUB_TOKEN": "ghp-bench",
+        "GITHUB_REPO": BENCH_REPO,
+        "GITHUB_API_URL": fakes["github"].url,
+        "JIRA_SERVER": fakes["jira"].url,
+        "JIRA_EMAIL": "bench@example.com",
+        "JIRA_API_TOKEN": "jira-bench",
+        "GOOGLE_CLIENT_ID": "bench",
+        "GOOGLE_CLIENT_SECRET": "bench",
+        "GOOGLE_CALENDAR_API_URL": f"{fakes['calendar'].url}/calendar/v3/",
+        "LOG_LEVEL": "WARNING",
+    })
+    # The Calendar service reads credentials.json and token.pickle from the
+    # working directory; a non-expiring token keeps the OAuth flow out of it.
+    from google.oauth2.credentials import Credentials
+    with open(os.path.join(workdir, "credentials.json"), "w") as f:
+        json.dump({"installed": {"client_id": "bench", "client_secret": "bench"}}, f)
+    with open(os.path.join(workdir, "token.pickle"), "wb") as f:
+        pickle.dump(Credentials(token="calendar-bench"), f)
+    os.chdir(workdir)
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def running_app() -> Iterator[str]:
+    """Serve app.main with uvicorn in a background thread."""
+    import uvicorn
+    from app.main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, name="bench-uvicorn", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+async def run_level(client: httpx.AsyncClient, method: str, path: str, payload: Optional[Dict],
+                    concurrency: int, total: int) -> Dict:
+    """Send ``total`` requests with ``concurrency`` in flight and collect latencies."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=payload)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+async def run_benchmarks(base_url: str, endpoints: List[str], levels: List[int], total: int,
+                         warmup: int) -> Dict[str, List[Dict]]:
+    results: Dict[str, List[Dict]] = {}
+    limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        for name in endpoints:
+            method, path, payload = ENDPOINTS[name]
+            for _ in range(warmup):
+                await client.request(method, path, json=payload)
+            results[name] = [await run_level(client, method, path, payload, level, total) for level in levels]
+    return results
+
+def format_report(results: Dict[str, List[Dict]]) -> str:
+    header = f"{'endpoint':<20} {'conc':>5} {'reqs':>6} {'errs':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    lines = [header, "-" * len(header)]
+    for name, rows in results.items():
+        for row in rows:
+            lines.append(f"{name:<20} {row['concurrency']:>5} {row['requests']:>6} {row['errors']:>5} "
+                         f"{row['rps']:>9.1f} {row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+    return "\n".join(lines)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark SprintLens against local fake upstreams")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=list(ENDPOINTS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--prs", type=int, default=100)
+    parser.add_argument("--issues", type=int, default=100)
+    parser.add_argument("--commits", type=int, default=200)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Injected latency per upstream request")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--completion-ms", type=float, default=300.0, help="Extra latency of the fake completion")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    # Make the app importable after switching to the scratch directory
+    sys.path.insert(0, os.getcwd())
+    with tempfile.TemporaryDirectory() as workdir, running_fakes(args) as fakes:
+        configure_environment(fakes, workdir)
+        with running_app() as base_url:
+            results = asyncio.run(run_benchmarks(base_url, args.endpoints, args.concurrency,
+                                                 args.requests, args.warmup))
+        upstream_requests = {name: fake.request_count for name, fake in fakes.items()}
+    print(format_report(results))
+    print("upstream requests: " + ", ".join(f"{name}={count}" for name, count in upstream_requests.items()))
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({"results": results, "upstream_requests": upstream_requests}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Shared fixtures for SprintLens API tests.
+"""
+import json
+import pickle
+import pytest
+from app.core.cache import clear_caches
+from app.core.clients import reset_clients
+from app.core.config import settings
+from app.services.activity_store import reset_activity_store
+from app.services.flow_metrics_service import reset_flow_metrics
+from app.services.jira_service import reset_jira_index
+from tests.benchmarks.fake_upstreams import FakeCalendar, FakeGitHub, FakeJira, FakeSlack
+
+@pytest.fixture(scope="session", autouse=True)
+def activity_store_path(tmp_path_factory):
+    """Keep the activity store out of the working tree."""
+    mp = pytest.MonkeyPatch()
+    mp.setattr(settings, "ACTIVITY_STORE_PATH", str(tmp_path_factory.mktemp("store") / "activity.db"))
+    yield
+    mp.undo()
+    reset_activity_store()
+
+@pytest.fixture(scope="module")
+def fake_upstreams(tmp_path_factory):
+    """Fake Slack, Jira, Calendar and GitHub upstreams wired into the settings."""
+    from google.oauth2.credentials import Credentials
+    fakes = {
+        "slack": FakeSlack(messages=450).start(),
+        "jira": FakeJira(issues=230).start(),
+        "calendar": FakeCalendar(events=600).start(),
+        "github": FakeGitHub(pull_requests=75, issues=40, commits=65, releases=3).start(),
+    }
+    workdir = tmp_path_factory.mktemp("upstreams")
+    with open(workdir / "credentials.json", "w") as f:
+        json.dump({"installed": {"client_id": "test", "client_secret": "test"}}, f)
+    with open(workdir / "token.pickle", "wb") as f:
+        pickle.dump(Credentials(token="test"), f)
+    mp = pytest.MonkeyPatch()
+    for name, value in {
+        "SLACK_BOT_TOKEN": "xoxb-test", "SLACK_API_URL": f"{fakes['slack'].url}/api/",
+        "JIRA_SERVER": fakes["jira"].url, "JIRA_EMAIL": "test@example.com", "JIRA_API_TOKEN": "test",
+        "GOOGLE_CALENDAR_API_URL": f"{fakes['calendar'].url}/calendar/v3/",
+        "GITHUB_TOKEN": "ghp-test", "GITHUB_REPO": "bench/repo", "GITHUB_API_URL": fakes["github"].url,
+        "ACTIVITY_STORE_PATH": str(workdir / "activity.db"),
+    }.items():
+        mp.setattr(settings, name, value)
+    mp.chdir(workdir)
+    reset_clients()
+    clear_caches()
+    reset_flow_metrics()
+    reset_jira_index()
+    try:
+        yield fakes
+    finally:
+        mp.undo()
+        reset_clients()
+        reset_flow_metrics()
+        reset_jira_index()
+        for fake in fakes.values():
+            fake.stop()
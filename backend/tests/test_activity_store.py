@@ -0,0 +1,78 @@
+"""
+Activity store tests for SprintLens API.
+"""
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers import summary as summary_router
+from app.services.activity_store import Activity, _connection, query_activity, upsert
+
+def activity(external_id, timestamp, source="github", kind="commit", author="dev1", container="bench/repo", title="Fix"):
+    return Activity(source, kind, external_id, timestamp, author, container, title, None, None, None, {"id": external_id})
+
+def test_upsert_updates_in_place(fake_upstreams):
+    """Test re-ingesting a record updates it instead of duplicating it."""
+    now = time.time()
+    assert upsert([activity("abc", now - 10), activity("def", now - 5)]) == 2
+    assert upsert([activity("abc", now - 10, title="Fix flaky test")]) == 1
+    stored = query_activity(source="github", kind="commit", container="bench/repo", since=now - 60)
+    assert [record["id"] for record in stored] == ["def", "abc"]
+    assert stored[1]["title"] == "Fix flaky test"
+
+@pytest.mark.parametrize("filters, index", [
+    ({"source": "slack"}, "activity_source_time"),
+    ({"author": "dev1"}, "activity_author_time"),
+    ({"container": "C000001"}, "activity_container_time"),
+])
+def test_window_queries_use_indexes(fake_upstreams, filters, index):
+    """Test window queries are range scans on the matching index."""
+    column, value = next(iter(filters.items()))
+    plan = _connection().execute(
+        f"EXPLAIN QUERY PLAN SELECT * FROM activity WHERE {column} = ? AND timestamp >= ? AND timestamp <= ? "
+        "ORDER BY timestamp DESC", (value, 0, 1)).fetchall()
+    assert any(index in row[-1] for row in plan)
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+def test_fetched_records_are_ingested(client, fake_upstreams):
+    """Test records fetched through the list endpoints can be queried without upstream calls."""
+    assert client.get("/api/slack/messages", params={"channel_id": "C000001", "days": 7}).status_code == 200
+    repository = client.get("/api/github/repository", params={"days": 7}).json()
+    assert client.get("/api/jira/issues", params={"project_key": "BENCH", "days": 7}).status_code == 200
+    for fake in fake_upstreams.values():
+        fake.request_log.clear()
+
+    pulls = client.get("/api/activity", params={"source": "github", "kind": "pull_request", "limit": 1000}).json()["activity"]
+    assert sorted(pull["record"]["number"] for pull in pulls) == sorted(pr["number"] for pr in repository["pull_requests"])
+    messages = client.get("/api/activity", params={"source": "slack", "container": "C000001", "limit": 1000}).json()["activity"]
+    assert messages and all(message["url"].startswith("https://slack.com/archives/C000001/p") for message in messages)
+    jira = client.get("/api/activity", params={"source": "jira", "limit": 1000}).json()["activity"]
+    assert jira and all(issue["container"] == "BENCH" for issue in jira)
+    author = pulls[0]["author"]
+    by_author = client.get("/api/activity", params={"author": author, "limit": 1000}).json()["activity"]
+    assert by_author and all(record["author"] == author for record in by_author)
+    assert all(fake.request_log == [] for fake in fake_upstreams.values())
+
+def test_summary_reuses_fetched_windows(client, fake_upstreams, monkeypatch):
+    """Test a repeated summary reads Slack, GitHub and calendar events from the store."""
+    generated = []
+    monkeypatch.setattr(summary_router, "generate_summary",
+                        lambda messages, github_data=None, jira_data=None, calendar_data=None: generated.append(
+                            (len(messages), len(github_data["pull_requests"]), len(jira_data["issues"]),
+                             len(calendar_data["events"]))) or "Summary")
+    # A day of the fake's Slack history fits in one call, so that window is held in full; the fake Jira's
+    # search spans more than one page whatever the JQL, so its window is never held and is fetched again
+    payload = {"channel_id": "C000001", "days": 1, "include_github": True, "include_jira": True,
+               "include_calendar": True, "jira_project_key": "BENCH"}
+    assert client.post("/api/summary/generate", json=payload).status_code == 200
+    for fake in fake_upstreams.values():
+        fake.request_log.clear()
+    assert client.post("/api/summary/generate", json=payload).status_code == 200
+
+    assert generated[0] == generated[1]
+    assert fake_upstreams["slack"].request_log == []
+    assert not any("/pulls" in path or "/commits" in path for _, path in fake_upstreams["github"].request_log)
+    assert not any(path.endswith("/events") for _, path in fake_upstreams["calendar"].request_log)
@@ -0,0 +1,135 @@
+"""
+Sprint analytics tests for SprintLens API.
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.analytics_service import compute_sprint_analytics
+
+CATEGORIES = {"1": "new", "3": "indeterminate", "5": "done"}
+NAMES = {"1": "To Do", "3": "In Progress", "5": "Done"}
+SPRINT = {"id": 7, "name": "Sprint 7", "state": "closed",
+          "start_date": "2026-01-05T00:00:00.000Z", "end_date": "2026-01-09T00:00:00.000Z"}
+
+def status(from_id, to_id):
+    return {"field": "status", "from": from_id, "fromString": NAMES[from_id], "to": to_id, "toString": NAMES[to_id]}
+
+def sprint_change(from_ids, to_ids):
+    return {"field": "Sprint", "from": from_ids, "fromString": "", "to": to_ids, "toString": ""}
+
+def issue(key, points, created, status_id, *history):
+    return {"key": key, "fields": {
+        "created": f"{created}.000+0000", "customfield_10016": points,
+        "status": {"id": status_id, "name": NAMES[status_id]}},
+        "changelog": {"histories": [{"created": f"{when}.000+0000", "items": [item]} for when, item in history]}}
+
+def test_hand_built_sprint():
+    """Test scope, completion, scope change and cycle time of a small known sprint."""
+    issues = [
+        issue("A-1", 3, "2026-01-01T00:00:00", "5",
+              ("2026-01-04T23:00:00", sprint_change("", "7")),
+              ("2026-01-05T10:00:00", status("1", "3")), ("2026-01-06T10:00:00", status("3", "5"))),
+        issue("A-2", 5, "2026-01-02T00:00:00", "1"),
+        issue("A-3", 2, "2026-01-06T12:00:00", "5", ("2026-01-07T12:00:00", status("1", "5"))),
+        issue("A-4", 8, "2026-01-01T00:00:00", "3",
+              ("2026-01-04T23:00:00", sprint_change("", "7")), ("2026-01-05T12:00:00", status("1", "3")),
+              ("2026-01-07T00:00:00", sprint_change("7", "8"))),
+    ]
+    result = compute_sprint_analytics(SPRINT, issues, CATEGORIES)
+    assert result["series"]["scope"] == [16, 16, 10, 10, 10]
+    assert result["series"]["completed"] == [0, 0, 3, 5, 5]
+    assert result["series"]["remaining"] == [16, 16, 7, 5, 5]
+    assert result["series"]["ideal"][0] == 16 and result["series"]["ideal"][-1] == 0
+    change = result["scope_change"]
+    assert (change["committed"], change["added"]) == (16, 2) and "removed" not in change and change["note"]
+    assert [(event["key"], event["points"]) for event in change["events"]] == [("A-3", 2), ("A-4", -8)]
+    assert result["completed"] == 5
+    assert result["cycle_time_days"] == {"count": 1, "mean": 1.0, "p50": 1.0, "p85": 1.0}
+
+def naive_state(raw, sprint_id, at):
+    """Scope and done points of one issue at a time, by replaying its history."""
+    def sprint_ids(value):
+        return str(sprint_id) in [part.strip() for part in value.split(",")]
+
+    created = datetime.fromisoformat(raw["fields"]["created"]).timestamp()
+    if created > at:
+        return 0.0, 0.0
+    histories = sorted(raw["changelog"]["histories"], key=lambda history: history["created"])
+    sprint_items = [item for history in histories for item in history["items"] if item["field"] == "Sprint"]
+    status_items = [item for history in histories for item in history["items"] if item["field"] == "status"]
+    in_sprint = sprint_ids(sprint_items[0]["from"]) if sprint_items else True
+    done = CATEGORIES[status_items[0]["from"]] == "done" if status_items else CATEGORIES[raw["fields"]["status"]["id"]] == "done"
+    for history in histories:
+        if datetime.fromisoformat(history["created"]).timestamp() > at:
+            break
+        for item in history["items"]:
+            if item["field"] == "Sprint":
+                in_sprint = sprint_ids(item["to"])
+            elif item["field"] == "status":
+                done = CATEGORIES[item["to"]] == "done"
+    points = raw["fields"]["customfield_10016"] or 0
+    return points * in_sprint, points * (in_sprint and done)
+
+def random_sprint(count, seed=0):
+    """Issues with random creation, sprint moves and status walks around SPRINT."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    fmt = "%Y-%m-%dT%H:%M:%S"
+    issues = []
+    for index in range(count):
+        created = start + timedelta(hours=rng.uniform(-72, 72))
+        history, moment, state = [], created, "1"
+        for _ in range(rng.randrange(6)):
+            moment += timedelta(hours=rng.uniform(1, 30))
+            if rng.random() < 0.3:
+                history.append((moment.strftime(fmt), sprint_change(rng.choice(["", "7", "6, 7"]), rng.choice(["", "7", "7, 8"]))))
+            else:
+                target = rng.choice([code for code in NAMES if code != state])
+                history.append((moment.strftime(fmt), status(state, target)))
+                state = target
+        issues.append(issue(f"R-{index}", rng.choice([None, 1, 2, 3, 5, 8]), created.strftime(fmt), state, *history))
+    return issues
+
+def test_vectorized_matches_replay():
+    """Test the array computation agrees with replaying every issue's history."""
+    issues = random_sprint(300)
+    result = compute_sprint_analytics(SPRINT, issues, CATEGORIES)
+    for date, scope, done in zip(result["series"]["dates"], result["series"]["scope"], result["series"]["completed"]):
+        at = datetime.fromisoformat(date).timestamp()
+        states = [naive_state(raw, 7, at) for raw in issues]
+        assert scope == pytest.approx(sum(state[0] for state in states))
+        assert done == pytest.approx(sum(state[1] for state in states))
+
+def test_large_sprint_under_budget():
+    """Test thousands of issues are analysed well under a second once local."""
+    issues = random_sprint(5000, seed=1)
+    start = time.perf_counter()
+    compute_sprint_analytics(SPRINT, issues, CATEGORIES)
+    assert time.perf_counter() - start < 0.5
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+def test_changelogs_fetched_in_bulk(client, fake_upstreams):
+    """Test the endpoint pages through expanded searches instead of fetching each issue."""
+    jira = fake_upstreams["jira"]
+    jira.request_log.clear()
+    jira.query_log.clear()
+    response = client.get("/api/jira/sprints/2/analytics")
+    assert response.status_code == 200
+    body = response.json()
+    searches = [query for query in jira.query_log if "jql" in query]
+    assert len(searches) == -(-body["issue_count"] // 100)
+    assert all(query["expand"] == "changelog" for query in searches)
+    assert not any("/issue/" in path for _, path in jira.request_log)
+    assert body["series"]["scope"][0] == body["scope_change"]["committed"] > 0
+
+def test_velocity(client):
+    """Test velocity covers the most recent closed sprints, oldest first."""
+    body = client.get("/api/jira/velocity", params={"project_key": "BENCH", "sprints": 3}).json()
+    assert [sprint["id"] for sprint in body["sprints"]] == [3, 4, 5]
+    assert body["average_completed"] == pytest.approx(sum(s["completed"] for s in body["sprints"]) / 3, abs=0.01)
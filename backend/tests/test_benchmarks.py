@@ -0,0 +1,29 @@
+"""
+Smoke test for the hermetic benchmark suite.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.slow
+def test_benchmark_suite_runs_against_fakes(tmp_path):
+    """Test every benchmarked endpoint succeeds against the fake upstreams."""
+    output = tmp_path / "bench.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "tests.benchmarks.run_benchmarks",
+         "--concurrency", "1", "2", "--requests", "2", "--warmup", "0",
+         "--latency-ms", "0", "--jitter-ms", "0", "--completion-ms", "0",
+         "--json", str(output)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == {"summary", "github_repository", "jira_issues", "bot_respond"}
+    for rows in report["results"].values():
+        assert [row["concurrency"] for row in rows] == [1, 2]
+        assert all(row["errors"] == 0 for row in rows)
+    assert all(count > 0 for count in report["upstream_requests"].values())
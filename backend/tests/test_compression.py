@@ -0,0 +1,95 @@
+"""
+Response serialization and compression tests for SprintLens API.
+"""
+import gzip
+import json
+from datetime import datetime
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+from app.core.responses import FastJSONResponse
+from app.main import app
+
+LARGE = {"issues": [{"key": f"BENCH-{i}", "summary": "Compressible issue summary"} for i in range(500)]}
+
+class Item(BaseModel):
+    name: str
+
+def build_app() -> FastAPI:
+    test_app = FastAPI(default_response_class=FastJSONResponse)
+    test_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @test_app.get("/large")
+    def large():
+        return FastJSONResponse(LARGE)
+
+    @test_app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @test_app.get("/image")
+    def image():
+        return Response(b"\x89PNG" + b"\0" * 4096, media_type="image/png")
+
+    @test_app.get("/stream")
+    def stream():
+        lines = (json.dumps({"n": i}) + "\n" for i in range(200))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    return test_app
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate_encoding(header, expected):
+    """Test Accept-Encoding negotiation honours q-values and prefers brotli on ties."""
+    assert negotiate_encoding(header) == expected
+
+@pytest.mark.parametrize("encoding, decompress", [("gzip", gzip.decompress), ("br", brotli.decompress)])
+def test_large_response_compressed(encoding, decompress):
+    """Test large JSON responses are compressed with the negotiated coding."""
+    client = TestClient(build_app())
+    response = client.get("/large", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == LARGE
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE)) // 4
+
+def test_small_and_binary_responses_untouched():
+    """Test responses under the threshold and non-text types are sent as is."""
+    client = TestClient(build_app())
+    for path in ("/small", "/image"):
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+    assert client.get("/small", headers={"Accept-Encoding": "gzip"}).json() == {"ok": True}
+
+def test_streaming_response_compressed_incrementally():
+    """Test streamed NDJSON is compressed without buffering the whole body."""
+    client = TestClient(build_app())
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = response.text.splitlines()
+    assert len(lines) == 200 and json.loads(lines[-1]) == {"n": 199}
+
+def test_fast_json_response_falls_back_for_unknown_types():
+    """Test orjson rendering handles datetimes natively and models via jsonable_encoder."""
+    body = FastJSONResponse({"at": datetime(2026, 1, 1, 10), "item": Item(name="x"), 1: "one"}).body
+    assert json.loads(body) == {"at": "2026-01-01T10:00:00", "item": {"name": "x"}, "1": "one"}
+
+def test_app_reports_compress_stage():
+    """Test the app compresses large responses and reports the compress stage."""
+    client = TestClient(app)
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert "compress;dur=" in response.headers["server-timing"]
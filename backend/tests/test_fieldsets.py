@@ -0,0 +1,100 @@
+"""
+Sparse fieldset tests for SprintLens API.
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.core.fieldsets import parse_fields, project
+from app.main import app
+from app.models.schemas import GitHubIssue, GitHubPullRequest
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+def test_parse_fields_validates_against_models():
+    """Test field names are checked against the union of the record models."""
+    assert parse_fields(None, GitHubIssue) is None
+    assert parse_fields(" , ", GitHubIssue) is None
+    assert parse_fields("title, labels", GitHubIssue) == {"title", "labels"}
+    assert parse_fields("labels,merged_at", GitHubIssue, GitHubPullRequest) == {"labels", "merged_at"}
+    with pytest.raises(Exception) as excinfo:
+        parse_fields("title,secret", GitHubIssue)
+    assert excinfo.value.status_code == 400
+    assert "secret" in excinfo.value.detail
+
+def test_project_keeps_record_type():
+    """Test projection keeps the type tag of mixed record streams."""
+    record = {"type": "issue", "title": "t", "url": "u"}
+    assert project(record, {"title"}) == {"type": "issue", "title": "t"}
+    assert project(record, None) is record
+
+ENDPOINTS = {
+    "slack": ("/api/slack/messages?channel_id=C000001&days=7", "messages", "user,text"),
+    "jira": ("/api/jira/issues?project_key=BENCH&days=7", "issues", "key,status"),
+    "calendar": ("/api/calendar/events?days=14", "events", "id,start,end"),
+}
+
+@pytest.mark.parametrize("name", sorted(ENDPOINTS))
+def test_unknown_field_rejected(client, name):
+    """Test an unknown field name is a 400 listing the allowed fields."""
+    path, _, _ = ENDPOINTS[name]
+    response = client.get(path, params={"fields": "nope"})
+    assert response.status_code == 400
+    assert "nope" in response.json()["detail"]
+
+@pytest.mark.parametrize("name", sorted(ENDPOINTS))
+@pytest.mark.parametrize("paged", [False, True])
+def test_records_pruned_to_fields(client, name, paged):
+    """Test records carry exactly the requested fields, in full and paged responses."""
+    path, key, fields = ENDPOINTS[name]
+    params = {"limit": 50} if paged else {}
+    full = client.get(path, params=params).json()[key]
+    sparse = client.get(path, params={"fields": fields, **params}).json()[key]
+    wanted = fields.split(",")
+    assert sparse and all(sorted(record) == sorted(wanted) for record in sparse)
+    assert sparse == [{field: record[field] for field in wanted} for record in full]
+
+def test_ndjson_stream_pruned(client):
+    """Test streamed records are pruned too."""
+    path, _, _ = ENDPOINTS["jira"]
+    lines = client.get(path, params={"fields": "key", "format": "ndjson"}).text.splitlines()
+    assert len(lines) == 230
+    assert all(list(json.loads(line)) == ["key"] for line in lines)
+
+def test_projection_pushed_upstream(client, fake_upstreams):
+    """Test the Jira search and Calendar events requests ask only for the needed fields."""
+    jira, calendar = fake_upstreams["jira"], fake_upstreams["calendar"]
+    jira.query_log.clear()
+    calendar.query_log.clear()
+    client.get(ENDPOINTS["jira"][0], params={"fields": "key,status,assignee"})
+    client.get(ENDPOINTS["calendar"][0], params={"fields": "id,attendees"})
+    searches = [query for query in jira.query_log if "jql" in query]
+    assert searches and all(query["fields"] == "status,assignee" for query in searches)
+    assert calendar.query_log[-1]["fields"] == "nextPageToken,items(id,attendees(email))"
+
+def test_github_skips_unrequested_sections(client, fake_upstreams):
+    """Test sections with none of the requested fields are not fetched or returned."""
+    github = fake_upstreams["github"]
+    github.request_log.clear()
+    full = client.get("/api/github/repository?days=7").json()
+    full_requests = len(github.request_log)
+    github.request_log.clear()
+    sparse = client.get("/api/github/repository?days=7", params={"fields": "tag_name"}).json()
+    assert set(sparse) == {"releases", "repository"}
+    assert sparse["releases"] == [{"tag_name": release["tag_name"]} for release in full["releases"]]
+    assert len(github.request_log) < full_requests
+    assert not any(path.endswith(("/pulls", "/issues", "/commits")) for _, path in github.request_log)
+
+    lines = client.get("/api/github/repository?days=7",
+                       params={"fields": "labels", "format": "ndjson"}).text.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert {record["type"] for record in records} == {"issue"}
+    assert len(records) == len(full["issues"])
+
+def test_sparse_payload_smaller(client):
+    """Test a sparse response is a fraction of the full one."""
+    path, _, _ = ENDPOINTS["calendar"]
+    full = client.get(path, headers={"Accept-Encoding": "identity"}).content
+    sparse = client.get(path, params={"fields": "id,start"}, headers={"Accept-Encoding": "identity"}).content
+    assert len(sparse) * 3 < len(full)
@@ -0,0 +1,130 @@
+"""
+Pull request flow metrics tests for SprintLens API.
+"""
+import math
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import deployment_settings, tenant_settings
+from app.main import app
+from app.services.ai_service import build_summary_prompt
+from app.services.flow_metrics_service import compute_flow_metrics, get_flow_metrics, mark_stale
+
+NOW = datetime(2026, 3, 2, tzinfo=timezone.utc).timestamp()
+HOUR = 3600.0
+DAY = 86400.0
+NAN = math.nan
+
+def columns(*rows):
+    """(created, first review, merged, closed) arrays from hours before NOW."""
+    table = np.array([[NOW - value * HOUR if value is not None else NAN for value in row] for row in rows]).reshape(-1, 4)
+    return tuple(table[:, column] for column in range(4))
+
+def test_hand_built_window():
+    """Test each metric of a few known pull requests."""
+    result = compute_flow_metrics(*columns(
+        (100, 90, 40, 40),          # reviewed after 10h, merged 50h after the review
+        (50, 48, 30, 30),           # reviewed after 2h, merged 18h after the review
+        (30, None, 10, 10),         # merged without review
+        (20, 19, None, None),       # open, reviewed after 1h
+        (24 * 40, None, None, None),  # open since before the window
+        (60, None, None, 5),        # closed without merging
+        (24 * 20, None, 24 * 15, 24 * 15),  # merged before the window
+    ), NOW, 14)
+    assert (result["opened"], result["merged"], result["closed_unmerged"]) == (5, 3, 1)
+    assert result["lead_time_hours"] == {"count": 3, "p50": 20.0, "p90": 52.0}
+    assert result["time_to_first_review_hours"] == {"count": 3, "p50": 2.0, "p90": 8.4}
+    assert result["time_to_merge_hours"] == {"count": 2, "p50": 34.0, "p90": 46.8}
+    assert [week["merged"] for week in result["throughput"]["weeks"]] == [0, 3]
+    assert result["throughput"]["per_week"] == 1.5
+    assert result["open_pull_requests"] == {"count": 2, "age_days_p50": 20.42, "age_days_p90": 36.08, "oldest_days": 40.0}
+
+def test_empty_window():
+    """Test a repository without pull requests reports empty distributions."""
+    result = compute_flow_metrics(*columns(), NOW, 7)
+    assert result["merged"] == 0
+    assert result["lead_time_hours"] == {"count": 0, "p50": None, "p90": None}
+    assert result["open_pull_requests"]["count"] == 0
+
+def test_tens_of_thousands_under_budget():
+    """Test a 90-day window of 50k pull requests is computed in milliseconds."""
+    rng = np.random.default_rng(0)
+    count = 50_000
+    created = NOW - rng.uniform(0, 90 * DAY, count)
+    first_review = np.where(rng.random(count) < 0.8, created + rng.uniform(0, 2 * DAY, count), NAN)
+    merged = np.where(rng.random(count) < 0.7, created + rng.uniform(DAY, 5 * DAY, count), NAN)
+    merged[merged > NOW] = NAN
+    start = time.perf_counter()
+    result = compute_flow_metrics(created, first_review, merged, merged.copy(), NOW, 90)
+    assert time.perf_counter() - start < 0.1
+    assert sum(week["merged"] for week in result["throughput"]["weeks"]) == result["merged"]
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+def parse(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+
+def test_endpoint_matches_fake_repository(client, fake_upstreams):
+    """Test the endpoint's metrics agree with the fake's pull requests and reviews."""
+    github = fake_upstreams["github"]
+    response = client.get("/api/github/metrics", params={"days": 14})
+    assert response.status_code == 200
+    body = response.json()
+    merged = [pr for pr in github.pull_requests if pr["merged_at"]]
+    assert body["merged"] == len(merged)
+    assert body["opened"] == len(github.pull_requests)
+    lead = [(parse(pr["merged_at"]) - parse(pr["created_at"])) / HOUR for pr in merged]
+    assert body["lead_time_hours"]["p50"] == pytest.approx(np.percentile(lead, 50), abs=0.01)
+    # The author's own comment is not a review
+    first_reviews = [(parse(reviews[-1]["submitted_at"]) - parse(github.pull_requests[number - 1]["created_at"])) / HOUR
+                     for number, reviews in github.reviews.items()]
+    assert body["time_to_first_review_hours"]["count"] == len(first_reviews)
+    assert body["time_to_first_review_hours"]["p90"] == pytest.approx(np.percentile(first_reviews, 90), abs=0.01)
+    assert body["open_pull_requests"]["count"] == len(github.pull_requests) - len(merged)
+
+def test_sync_is_incremental(client, fake_upstreams):
+    """Test a re-sync lists only changed pull requests and their missing reviews."""
+    github = fake_upstreams["github"]
+    assert client.get("/api/github/metrics").status_code == 200
+    github.request_log.clear()
+    assert client.get("/api/github/metrics").status_code == 200
+    assert github.request_log == []
+
+    now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    number = len(github.pull_requests) + 1
+    github.pull_requests.append({**github.pull_requests[0], "number": number, "state": "open", "created_at": now,
+                                 "updated_at": now, "merged_at": None, "closed_at": None})
+    try:
+        mark_stale()
+        body = client.get("/api/github/metrics").json()
+        paths = [path for _, path in github.request_log]
+        assert len([path for path in paths if path == "/repos/bench/repo/pulls"]) == 1
+        assert [path for path in paths if "/reviews" in path] == [f"/repos/bench/repo/pulls/{number}/reviews"]
+        assert body["opened"] == number
+    finally:
+        github.pull_requests.pop()
+
+def test_tenants_sync_their_own_tables(client, fake_upstreams):
+    """Test a tenant's metrics read syncs with GitHub even when another tenant's table of the repository is fresh."""
+    github = fake_upstreams["github"]
+    assert client.get("/api/github/metrics").status_code == 200
+    github.request_log.clear()
+    with tenant_settings("payments", deployment_settings()):
+        assert "error" not in get_flow_metrics()
+    assert "/repos/bench/repo/pulls" in [path for _, path in github.request_log]
+
+def test_days_beyond_window_rejected(client):
+    """Test windows longer than the synced one are a 400."""
+    assert client.get("/api/github/metrics", params={"days": 365}).status_code == 400
+
+def test_summary_prompt_includes_flow():
+    """Test the summary prompt describes the flow metrics."""
+    flow = compute_flow_metrics(*columns((100, 90, 40, 40), (20, 19, None, None)), NOW, 7)
+    _, user_prompt = build_summary_prompt([], {"pull_requests": [{}], "flow_metrics": flow})
+    assert "Pull Request Flow (last 7 days)" in user_prompt
+    assert "Lead time: median 60.0h" in user_prompt
+    assert "Open PRs: 1" in user_prompt
@@ -0,0 +1,134 @@
+"""
+Multi-repository GitHub tests for SprintLens API.
+"""
+import time
+import pytest
+from fastapi.testclient import TestClient
+from github import RateLimitExceededException
+from app.core.cache import clear_caches
+from app.core.clients import reset_clients
+from app.core.config import settings
+from app.main import app
+from app.routers import summary
+from app.services import github_service
+from app.services.ai_service import build_summary_prompt
+from app.services.flow_metrics_service import get_flow_metrics
+from app.services.github_service import configured_repositories, get_repository_data
+from tests.benchmarks.fake_upstreams import FakeGitHub, FaultProfile
+
+REPOSITORIES = ["team/api", "team/web", "team/ops", "team/docs"]
+
+@pytest.fixture(scope="module")
+def github(fake_upstreams):
+    fake = FakeGitHub(repo=REPOSITORIES[0], others=REPOSITORIES[1:], pull_requests=30, issues=30, commits=30,
+                      releases=2, topics={"team/api": ["payments"], "team/web": ["payments", "frontend"]},
+                      faults=FaultProfile(latency_ms=25)).start()
+    mp = pytest.MonkeyPatch()
+    for key, value in {"GITHUB_API_URL": fake.url, "GITHUB_REPO": "team/api",
+                       "GITHUB_REPOS": ",".join(REPOSITORIES[:3])}.items():
+        mp.setattr(settings, key, value)
+    reset_clients("github")
+    clear_caches()
+    yield fake
+    fake.stop()
+    mp.undo()
+    reset_clients("github")
+    clear_caches()
+
+@pytest.fixture(scope="module")
+def client(github):
+    return TestClient(app)
+
+def test_repositories_are_aggregated(client):
+    """Test every configured repository's records are returned, tagged, with per-repository and total counts."""
+    data = client.get("/api/github/repository", params={"days": 7}).json()
+    assert [entry["repository"]["full_name"] for entry in data["repositories"]] == REPOSITORIES[:3]
+    for section in ("pull_requests", "issues", "commits", "releases"):
+        assert data["totals"][section] == len(data[section]) == sum(entry["counts"][section] for entry in data["repositories"])
+        assert {record["repo"] for record in data[section]} == set(REPOSITORIES[:3])
+    assert data["totals"]["pull_requests"] == 90
+
+    single = client.get("/api/github/repository", params={"days": 7, "repos": "team/ops"}).json()
+    assert single["repository"]["full_name"] == "team/ops" and "repositories" not in single
+    response = client.get("/api/github/repository", params={"days": 7, "repos": "team/api,team/web", "limit": 10})
+    assert response.status_code == 400
+
+def test_pagination_defaults_to_a_configured_repository(client, monkeypatch):
+    """Test pages come from the first configured repository without GITHUB_REPO, and 400 without any."""
+    monkeypatch.setattr(settings, "GITHUB_REPO", "")
+    response = client.get("/api/github/repository", params={"days": 7, "limit": 10})
+    assert response.status_code == 200 and response.json()["repository"]["full_name"] == "team/api"
+    monkeypatch.setattr(settings, "GITHUB_REPOS", "")
+    assert client.get("/api/github/repository", params={"days": 7, "limit": 10}).status_code == 400
+
+def test_latency_tracks_the_slowest_repository(github):
+    """Test four repositories are fetched (and stored) in well under four times one repository's fetch time."""
+    start = time.perf_counter()
+    assert "error" not in get_repository_data(7, repositories=["team/api"], refresh=True)
+    single = time.perf_counter() - start
+    github.request_log.clear()
+    start = time.perf_counter()
+    data = get_repository_data(7, repositories=REPOSITORIES, refresh=True)
+    elapsed = time.perf_counter() - start
+    assert len(data["repositories"]) == 4 and not any("error" in entry for entry in data["repositories"])
+    assert {path for _, path in github.request_log} >= {f"/repos/{name}/pulls" for name in REPOSITORIES}
+    assert elapsed < 2 * single
+    # Every concurrent fetch was stored, so the window is now read without GitHub calls
+    github.request_log.clear()
+    assert get_repository_data(7, repositories=REPOSITORIES)["totals"] == data["totals"]
+    assert github.request_log == []
+
+def test_failed_repositories_are_reported(client):
+    """Test a repository that cannot be fetched is reported without failing the others."""
+    data = get_repository_data(7, repositories=["team/api", "team/missing"])
+    failed = [entry for entry in data["repositories"] if "error" in entry]
+    assert [entry["repository"]["full_name"] for entry in failed] == ["team/missing"]
+    assert {record["repo"] for record in data["pull_requests"]} == {"team/api"}
+    assert "error" in get_repository_data(7, repositories=["team/missing", "team/gone"])
+    assert client.get("/api/github/repository", params={"repos": "team/missing"}).status_code == 400
+
+def test_organization_repositories_by_topic(github, monkeypatch):
+    """Test GITHUB_ORG and GITHUB_TOPIC select the organization's repositories with the topic."""
+    monkeypatch.setattr(settings, "GITHUB_REPOS", "")
+    monkeypatch.setattr(settings, "GITHUB_ORG", "team")
+    monkeypatch.setattr(settings, "GITHUB_TOPIC", "payments")
+    assert configured_repositories() == ["team/api", "team/web"]
+    monkeypatch.setattr(settings, "GITHUB_TOPIC", "")
+    assert configured_repositories() == REPOSITORIES
+
+def test_exhausted_rate_limit_fails_fast(github, monkeypatch):
+    """Test a rate limit reported by GitHub stops further fetches until its reset."""
+    monkeypatch.setattr(github_service, "_rate_limited_until", {})
+    reset = time.time() + 120
+    github_service._note_rate_limit(RateLimitExceededException(403, {"message": "API rate limit exceeded"},
+                                                               {"X-RateLimit-Reset": str(int(reset))}))
+    assert github_service._rate_limited_until == {None: int(reset)}
+    github.request_log.clear()
+    data = get_repository_data(7, repositories=REPOSITORIES[:2], refresh=True)
+    assert "rate limit" in data["error"] and github.request_log == []
+
+def test_summary_prompt_names_repositories(github):
+    """Test the summary prompt breaks activity down by repository and names each item's repository."""
+    data = get_repository_data(7)
+    _, prompt = build_summary_prompt([], data)
+    assert "**Repositories:**" in prompt and "- team/web: 30 PRs, 30 issues, 30 commits" in prompt
+    assert any(f"{name}#" in prompt for name in REPOSITORIES[:3])
+
+def test_summary_flow_metrics_cover_the_aggregated_repositories(client, monkeypatch):
+    """Test a summary over several repositories pools their pull requests' flow metrics, without GITHUB_REPO."""
+    single = [get_flow_metrics(7, [name]) for name in REPOSITORIES[:2]]
+    monkeypatch.setattr(settings, "GITHUB_REPO", "")
+    assert "error" in get_flow_metrics(7)
+    captured = {}
+
+    def generate_summary(messages, github_data=None, *args):
+        captured.update(github_data)
+        return "Summary"
+    monkeypatch.setattr(summary, "generate_summary", generate_summary)
+    response = client.post("/api/summary/generate", json={"channel_id": "C000001", "include_github": True,
+                                                          "github_repos": REPOSITORIES[:2]})
+    assert response.status_code == 200
+    flow = captured["flow_metrics"]
+    assert flow["repositories"] == REPOSITORIES[:2]
+    assert flow["opened"] == sum(metrics["opened"] for metrics in single)
+    assert "2 repositories" in build_summary_prompt([], captured)[1]
@@ -0,0 +1,148 @@
+"""
+GitHub webhook ingestion tests for SprintLens API.
+"""
+import hashlib
+import hmac
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services import activity_store, github_webhook_service
+from app.services.activity_store import _connection, query_activity, record_coverage
+from app.services.github_webhook_service import reconcile
+
+SECRET = "webhook-secret"
+REPOSITORY = {"name": "repo", "full_name": "bench/repo", "description": "Bench repository",
+              "html_url": "https://github.com/bench/repo", "default_branch": "main"}
+
+def iso(delta=timedelta()):
+    return (datetime.now(timezone.utc) - delta).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def pull_request(number, title, state="open", merged_at=None, updated=timedelta(hours=1)):
+    return {"number": number, "title": title, "state": state, "created_at": iso(timedelta(hours=1)),
+            "updated_at": iso(updated), "merged_at": merged_at, "user": {"login": "octocat"}, "body": "Adds retries",
+            "html_url": f"https://github.com/bench/repo/pull/{number}"}
+
+def issue(number, title, updated=timedelta(hours=2), **extra):
+    return {"number": number, "title": title, "state": "open", "created_at": iso(timedelta(hours=2)),
+            "updated_at": iso(updated),
+            "user": {"login": "octocat"}, "labels": [{"name": "bug"}], "body": "Steps to reproduce",
+            "html_url": f"https://github.com/bench/repo/issues/{number}", **extra}
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    mp = pytest.MonkeyPatch()
+    mp.setattr(settings, "GITHUB_WEBHOOK_SECRET", SECRET)
+    yield TestClient(app)
+    mp.undo()
+
+def deliver(client, event, payload, secret=SECRET, delivery_id=None):
+    body = json.dumps({"repository": REPOSITORY, **payload}).encode()
+    signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    headers = {"X-GitHub-Event": event, "X-Hub-Signature-256": signature, "Content-Type": "application/json"}
+    if delivery_id:
+        headers["X-GitHub-Delivery"] = delivery_id
+    return client.post("/api/github/webhook", content=body, headers=headers)
+
+def test_unsigned_deliveries_are_rejected(client, monkeypatch):
+    """Test deliveries with a wrong or missing signature are refused, as is any delivery without a secret."""
+    assert deliver(client, "issues", {"action": "opened", "issue": issue(1, "x")}, secret="wrong").status_code == 401
+    response = client.post("/api/github/webhook", content=b"{}", headers={"X-GitHub-Event": "ping"})
+    assert response.status_code == 401
+    monkeypatch.setattr(settings, "GITHUB_WEBHOOK_SECRET", "")
+    assert deliver(client, "ping", {"zen": "Keep it simple."}).status_code == 400
+
+def test_deliveries_are_served_without_github_calls(client, fake_upstreams):
+    """Test records delivered after a fetch appear in repository reads that make no GitHub call."""
+    assert client.get("/api/github/repository", params={"days": 7}).status_code == 200
+    fake_upstreams["github"].request_log.clear()
+
+    pr = pull_request(9001, "Retry gateway refunds")
+    assert deliver(client, "pull_request", {"action": "opened", "pull_request": pr}).json()["stored"] == 1
+    merged = {**pr, "state": "closed", "merged_at": iso(), "updated_at": iso()}
+    assert deliver(client, "pull_request", {"action": "closed", "pull_request": merged}).json()["stored"] == 1
+    assert deliver(client, "issues", {"action": "opened", "issue": issue(9002, "Refunds time out")}).status_code == 200
+    push = {"ref": "refs/heads/main", "commits": [
+        {"id": "f" * 40, "message": "Retry refunds\n\nWith backoff", "timestamp": iso(timedelta(minutes=5)),
+         "author": {"name": "Octo Cat"}, "url": "https://github.com/bench/repo/commit/" + "f" * 40}]}
+    assert deliver(client, "push", push).json()["stored"] == 1
+    release = {"tag_name": "v9.0.0", "name": "Release 9.0.0", "body": "Refund retries",
+               "created_at": iso(), "html_url": "https://github.com/bench/repo/releases/9"}
+    assert deliver(client, "release", {"action": "published", "release": release}).json()["stored"] == 1
+
+    data = client.get("/api/github/repository", params={"days": 7}).json()
+    assert fake_upstreams["github"].request_log == []
+    delivered = next(item for item in data["pull_requests"] if item["number"] == 9001)
+    assert delivered["state"] == "closed" and delivered["merged_at"] and delivered["user"] == "octocat"
+    assert sorted(delivered) == sorted(data["pull_requests"][-1])
+    assert any(item["number"] == 9002 for item in data["issues"])
+    assert data["commits"][0]["sha"] == "fffffff" and data["commits"][0]["author"] == "Octo Cat"
+    assert data["releases"][0]["tag_name"] == "v9.0.0"
+    assert data["repository"]["full_name"] == "bench/repo"
+
+def test_deletions_and_ignored_events(client):
+    """Test deleted issues leave the store and other branches, PR issues and unknown events are ignored."""
+    deliver(client, "issues", {"action": "opened", "issue": issue(9003, "Flaky checkout test")})
+    assert deliver(client, "issues", {"action": "deleted", "issue": issue(9003, "Flaky checkout test")}).json()["deleted"] == 1
+    assert not [record for record in query_activity(source="github", kind="issue") if record["id"] == "bench/repo#9003"]
+
+    feature = {"ref": "refs/heads/feature", "commits": [
+        {"id": "e" * 40, "message": "WIP", "timestamp": iso(), "author": {"name": "Octo Cat"}, "url": "x"}]}
+    assert "ignored" in deliver(client, "push", feature).json()
+    pr_issue = issue(9001, "Retry gateway refunds", pull_request={"url": "x"})
+    assert "ignored" in deliver(client, "issues", {"action": "edited", "issue": pr_issue}).json()
+    assert "ignored" in deliver(client, "ping", {"zen": "Design for failure."}).json()
+
+def test_late_and_failed_deliveries(client, monkeypatch):
+    """Test older changes delivered late are skipped, and a delivery that failed is applied when redelivered."""
+    newer = pull_request(9006, "Retry refunds with backoff", updated=timedelta(minutes=1))
+    older = pull_request(9006, "Retry refunds", updated=timedelta(minutes=10))
+    assert deliver(client, "pull_request", {"action": "edited", "pull_request": newer}).json()["stored"] == 1
+    assert deliver(client, "pull_request", {"action": "edited", "pull_request": older}).json()["stored"] == 0
+    [stored] = [record for record in query_activity(source="github", kind="pull_request") if record["id"] == "bench/repo#9006"]
+    assert stored["title"] == "Retry refunds with backoff"
+
+    deliver(client, "issues", {"action": "deleted", "issue": issue(9007, "Flaky refunds test")})
+    late = issue(9007, "Flaky refunds test", updated=timedelta(minutes=1))
+    assert deliver(client, "issues", {"action": "edited", "issue": late}).json()["stored"] == 0
+
+    payload = {"action": "opened", "issue": issue(9008, "Refund emails missing")}
+    monkeypatch.setattr(activity_store, "_connection", lambda: sqlite3.connect(":memory:"))
+    assert deliver(client, "issues", payload, delivery_id="delivery-1").status_code == 500
+    monkeypatch.undo()
+    assert deliver(client, "issues", payload, delivery_id="delivery-1").json()["stored"] == 1
+    assert deliver(client, "issues", payload, delivery_id="delivery-1").json()["ignored"] == "duplicate delivery"
+
+def test_deliveries_invalidate_derived_state(client, monkeypatch):
+    """Test pull request events make flow metrics sync and wake the snapshot refresher."""
+    stale, refreshed = [], []
+    monkeypatch.setattr(github_webhook_service, "mark_stale", stale.append)
+    monkeypatch.setattr(github_webhook_service, "request_refresh", lambda: refreshed.append(True))
+    deliver(client, "pull_request", {"action": "edited", "pull_request": pull_request(9004, "Cache refunds")})
+    deliver(client, "issues", {"action": "opened", "issue": issue(9005, "Cache misses")})
+    assert stale == ["bench/repo"] and len(refreshed) == 2
+
+def test_reconciliation_refetches_the_window(client, fake_upstreams, monkeypatch):
+    """Test reconciliation fetches from GitHub even when the window is held, and records coverage."""
+    fake_upstreams["github"].request_log.clear()
+    data = reconcile()
+    assert "error" not in data and data["pull_requests"]
+    assert any(path.endswith("/pulls") for _, path in fake_upstreams["github"].request_log)
+    fake_upstreams["github"].request_log.clear()
+    assert client.get("/api/github/repository", params={"days": settings.GITHUB_RECONCILE_DAYS}).status_code == 200
+    assert fake_upstreams["github"].request_log == []
+
+def test_reconciled_windows_outlive_other_coverage(client, fake_upstreams):
+    """Test a reconciled window stays served from the store after other sources record coverage."""
+    assert "error" not in reconcile()
+    # Older than ACTIVITY_STORE_MAX_AGE_SECONDS, but within the webhook max age
+    _connection().execute("UPDATE coverage SET fetched_at = fetched_at - ? WHERE source = 'github'",
+                          (settings.ACTIVITY_STORE_MAX_AGE_SECONDS + 60,))
+    record_coverage("slack", "C000001", time.time() - 3600, time.time())
+    fake_upstreams["github"].request_log.clear()
+    assert client.get("/api/github/repository", params={"days": 7}).status_code == 200
+    assert fake_upstreams["github"].request_log == []
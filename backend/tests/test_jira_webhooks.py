@@ -0,0 +1,152 @@
+"""
+Jira webhook ingestion tests for SprintLens API.
+"""
+import hashlib
+import hmac
+import json
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services import activity_store, jira_webhook_service
+from app.services.activity_store import _connection, read_window, record_coverage
+from app.services.jira_service import reconcile_project, store_max_age, tracked_projects
+from app.services.jira_webhook_service import reconcile
+
+SECRET = "jira-webhook-secret"
+
+def jira_time(delta=timedelta()):
+    return (datetime.now(timezone.utc) - delta).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+def issue(key, summary, updated=timedelta()):
+    return {"id": key.split("-")[1], "key": key, "self": "", "fields": {
+        "summary": summary, "status": {"name": "In Progress"}, "priority": {"name": "High"},
+        "assignee": {"displayName": "Dev 1"}, "reporter": {"displayName": "PM 1"},
+        "created": jira_time(timedelta(hours=3)), "updated": jira_time(updated),
+        "issuetype": {"name": "Bug"}, "project": {"key": "BENCH"}, "description": "Refunds time out"}}
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    mp = pytest.MonkeyPatch()
+    mp.setattr(settings, "JIRA_WEBHOOK_SECRET", SECRET)
+    jira_webhook_service.deliveries.clear()
+    yield TestClient(app)
+    mp.undo()
+
+def deliver(client, payload, delivery_id=None, secret=SECRET, sent=timedelta()):
+    body = json.dumps({"timestamp": int((time.time() - sent.total_seconds()) * 1000), **payload}).encode()
+    headers = {"X-Hub-Signature": "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest(),
+               "Content-Type": "application/json"}
+    if delivery_id:
+        headers["X-Atlassian-Webhook-Identifier"] = delivery_id
+    return client.post("/api/jira/webhook", content=body, headers=headers)
+
+def issues(client):
+    response = client.get("/api/jira/issues", params={"project_key": "BENCH", "days": 7})
+    assert response.status_code == 200
+    return {item["key"]: item for item in response.json()["issues"]}
+
+def test_unsigned_deliveries_are_rejected(client, monkeypatch):
+    """Test deliveries with a wrong signature are refused, as is any delivery without a secret."""
+    payload = {"webhookEvent": "jira:issue_created", "issue": issue("BENCH-9001", "x")}
+    assert deliver(client, payload, secret="wrong").status_code == 401
+    monkeypatch.setattr(settings, "JIRA_WEBHOOK_SECRET", "")
+    assert deliver(client, payload).status_code == 400
+
+def test_deliveries_are_served_without_jira_calls(client, fake_upstreams):
+    """Test issues delivered after a reconciliation appear in issue reads that make no search."""
+    issues(client)
+    assert reconcile()["BENCH"] == len(fake_upstreams["jira"].issues)
+    fake_upstreams["jira"].request_log.clear()
+
+    created = {"webhookEvent": "jira:issue_created", "issue": issue("BENCH-9001", "Refunds time out")}
+    assert deliver(client, created, "delivery-1").json() == {"event": "jira:issue_created", "applied": True}
+    updated = {"webhookEvent": "jira:issue_updated", "issue": issue("BENCH-1", "Retry gateway refunds")}
+    assert deliver(client, updated, "delivery-2").json()["applied"]
+
+    indexed = issues(client)
+    assert fake_upstreams["jira"].request_log == []
+    assert indexed["BENCH-9001"]["summary"] == "Refunds time out" and indexed["BENCH-9001"]["assignee"] == "Dev 1"
+    assert indexed["BENCH-1"]["summary"] == "Retry gateway refunds"
+    assert sorted(indexed["BENCH-9001"]) == sorted(indexed["BENCH-2"])
+
+def test_stale_and_duplicate_deliveries_are_skipped(client):
+    """Test an older change delivered late, or a retried delivery, does not overwrite the index."""
+    newer = {"webhookEvent": "jira:issue_updated", "issue": issue("BENCH-9002", "Cache refunds", timedelta(minutes=1))}
+    older = {"webhookEvent": "jira:issue_updated", "issue": issue("BENCH-9002", "Cache", timedelta(minutes=5))}
+    assert deliver(client, newer, "delivery-3").json()["applied"]
+    assert deliver(client, older, "delivery-4").json()["applied"] is False
+    assert issues(client)["BENCH-9002"]["summary"] == "Cache refunds"
+
+    assert deliver(client, newer, "delivery-3").json()["ignored"] == "duplicate delivery"
+    assert "ignored" in deliver(client, {"webhookEvent": "comment_created"}).json()
+
+def test_failed_deliveries_are_applied_when_retried(client, monkeypatch):
+    """Test a delivery the store failed to write is answered 500 and applied when Jira retries it."""
+    payload = {"webhookEvent": "jira:issue_created", "issue": issue("BENCH-9004", "Retry refunds")}
+    monkeypatch.setattr(activity_store, "_connection", lambda: sqlite3.connect(":memory:"))
+    assert deliver(client, payload, "delivery-5").status_code == 500
+    monkeypatch.undo()
+    assert deliver(client, payload, "delivery-5").json()["applied"]
+    assert issues(client)["BENCH-9004"]["summary"] == "Retry refunds"
+
+def test_issues_without_reporter(client):
+    """Test an issue with no reporter is indexed and listed along with the project's other issues."""
+    orphan = issue("BENCH-9005", "Imported refund bug")
+    orphan["fields"]["reporter"] = None
+    assert deliver(client, {"webhookEvent": "jira:issue_created", "issue": orphan}).json()["applied"]
+    listed = issues(client)
+    assert listed["BENCH-9005"]["reporter"] is None and len(listed) > 1
+
+def test_deleted_issues_stay_deleted(client):
+    """Test a deleted issue leaves the index and an update delivered after the deletion does not restore it."""
+    change = issue("BENCH-9003", "Flaky checkout test", timedelta(minutes=10))
+    deliver(client, {"webhookEvent": "jira:issue_created", "issue": change})
+    assert deliver(client, {"webhookEvent": "jira:issue_deleted", "issue": change}).json()["applied"]
+    assert "BENCH-9003" not in issues(client)
+
+    late = {"webhookEvent": "jira:issue_updated", "issue": issue("BENCH-9003", "Flaky", timedelta(minutes=2))}
+    assert deliver(client, late, sent=timedelta(minutes=1)).json()["applied"] is False
+    assert "BENCH-9003" not in issues(client)
+
+def test_sprint_events_update_the_sprint_index(client, fake_upstreams):
+    """Test sprint deliveries change the sprints listing without Jira calls, in delivery order."""
+    listed = client.get("/api/jira/sprints", params={"project_key": "BENCH"}).json()["sprints"]
+    fake_upstreams["jira"].request_log.clear()
+    active = {**fake_upstreams["jira"].sprints[-1], "originBoardId": 1}
+
+    closed = {**active, "state": "closed", "completeDate": jira_time()}
+    assert deliver(client, {"webhookEvent": "sprint_closed", "sprint": closed}).json()["applied"]
+    started = {**active, "id": 99, "name": "Sprint 99", "state": "active"}
+    assert deliver(client, {"webhookEvent": "sprint_started", "sprint": started}).json()["applied"]
+    assert deliver(client, {"webhookEvent": "sprint_updated", "sprint": active}, sent=timedelta(minutes=1)).json()["applied"] is False
+    assert deliver(client, {"webhookEvent": "sprint_deleted", "sprint": listed[0] | {"originBoardId": 1}}).json()["applied"]
+
+    sprints = {sprint["id"]: sprint for sprint in client.get("/api/jira/sprints", params={"project_key": "BENCH"}).json()["sprints"]}
+    assert fake_upstreams["jira"].request_log == []
+    assert sprints[active["id"]]["state"] == "closed" and sprints[99]["state"] == "active"
+    assert listed[0]["id"] not in sprints and len(sprints) == len(listed)
+
+def test_reconciliation_extends_coverage(client, fake_upstreams):
+    """Test later reconciliations search for updated issues and keep the window covered up to now."""
+    assert "BENCH" in tracked_projects()
+    fake_upstreams["jira"].request_log.clear()
+    assert reconcile_project("BENCH") > 0
+    assert any(path == "/rest/api/2/search" for _, path in fake_upstreams["jira"].request_log)
+    since = time.time() - settings.JIRA_RECONCILE_DAYS * 86400 + 60
+    assert read_window("jira", "BENCH", since, time.time(), store_max_age()) is not None
+
+def test_indexed_issues_outlive_other_coverage(client, fake_upstreams):
+    """Test reconciled issues stay served from the index after other sources record coverage."""
+    issues(client)
+    assert reconcile()["BENCH"] > 0
+    # Older than ACTIVITY_STORE_MAX_AGE_SECONDS, but within the webhook max age
+    _connection().execute("UPDATE coverage SET fetched_at = fetched_at - ? WHERE source = 'jira'",
+                          (settings.ACTIVITY_STORE_MAX_AGE_SECONDS + 60,))
+    record_coverage("calendar", "primary", time.time() - 3600, time.time())
+    fake_upstreams["jira"].request_log.clear()
+    assert issues(client)
+    assert fake_upstreams["jira"].request_log == []
@@ -0,0 +1,30 @@
+"""
+Logging pipeline tests for SprintLens API.
+"""
+import logging
+from app.core.logging import DebugSamplingFilter, RequestContextFilter, get_logger
+from app.core.timing import start_request_timings
+
+def _record(level: int, lineno: int = 1) -> logging.LogRecord:
+    return logging.LogRecord("sprintlens.test", level, "test.py", lineno, "msg", None, None)
+
+def test_debug_sampling_per_call_site():
+    """Test DEBUG records are sampled per call site and other levels pass."""
+    sampling = DebugSamplingFilter(every=5)
+    kept = sum(sampling.filter(_record(logging.DEBUG)) for _ in range(20))
+    assert kept == 4
+    assert sampling.filter(_record(logging.DEBUG, lineno=2))
+    assert all(sampling.filter(_record(logging.ERROR)) for _ in range(5))
+
+def test_request_id_attached():
+    """Test records emitted during a request carry its request id."""
+    timings = start_request_timings("req-1")
+    record = _record(logging.INFO)
+    RequestContextFilter().filter(record)
+    assert record.request_id == timings.request_id == "req-1"
+
+def test_integration_logger_merges_extra():
+    """Test integration loggers tag records and keep caller extras."""
+    adapter = get_logger("github")
+    _, kwargs = adapter.process("msg", {"extra": {"repo": "a/b"}})
+    assert kwargs["extra"] == {"integration": "github", "repo": "a/b"}
@@ -0,0 +1,136 @@
+"""
+Team meeting load tests for SprintLens API.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.services.meeting_load_service import compute_meeting_load
+
+UTC = ZoneInfo("UTC")
+MONDAY = date(2026, 1, 5)
+
+def at(day, hour, minute=0):
+    moment = datetime.combine(MONDAY + timedelta(days=day), datetime.min.time(), timezone.utc)
+    return (moment + timedelta(hours=hour, minutes=minute)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def busy(*intervals):
+    return [{"start": start, "end": end} for start, end in intervals]
+
+def test_hand_built_day():
+    """Test merging, focus blocks, shared focus and the heatmap on a known day."""
+    result = compute_meeting_load({
+        "a@example.com": busy((at(0, 9), at(0, 10)), (at(0, 9, 30), at(0, 10, 30)), (at(0, 14), at(0, 15)),
+                              (at(0, 18), at(0, 19))),
+        "b@example.com": busy((at(0, 10), at(0, 11)), (at(0, 16, 30), at(0, 17, 30))),
+    }, MONDAY, 1, UTC)
+    a, b = result["people"]
+    assert (a["meeting_hours"], a["meeting_hours_outside_work"], a["focus_hours"], a["working_hours"]) == (2.5, 1.0, 5.5, 8.0)
+    assert (b["meeting_hours"], b["meeting_hours_outside_work"], b["focus_hours"]) == (1.5, 0.5, 5.5)
+    assert result["team"]["shared_focus_hours"] == 3.0
+    assert result["team"]["meeting_hours"] == 4.0
+    monday = result["heatmap"]["busy_share"][0]
+    assert (monday[8], monday[9], monday[10], monday[18]) == (0.0, 0.5, 0.75, 0.5)
+    assert result["heatmap"]["max_concurrent"] == 2
+
+def random_team(people, days, seed=0):
+    rng = random.Random(seed)
+    team = {}
+    for person in range(people):
+        intervals = []
+        for _ in range(days * 6):
+            start = rng.randrange(-60, days * 24 * 60)
+            intervals.append((start, start + rng.choice([15, 30, 45, 60, 90, 120])))
+        team[f"dev{person}@example.com"] = intervals
+    return team
+
+def as_busy(team):
+    return {calendar_id: busy(*[(at(0, 0, start), at(0, 0, end)) for start, end in intervals])
+            for calendar_id, intervals in team.items()}
+
+def naive_minutes(team, days, focus_minutes=120):
+    """Meeting and focus minutes per person from a minute-by-minute grid."""
+    total = days * 24 * 60
+    work = [False] * total
+    for day in range(days):
+        if (MONDAY + timedelta(days=day)).weekday() < 5:
+            for minute in range(day * 1440 + 9 * 60, day * 1440 + 17 * 60):
+                work[minute] = True
+    results = []
+    for intervals in list(team.values()) + [[interval for intervals in team.values() for interval in intervals]]:
+        grid = [False] * total
+        for start, end in intervals:
+            for minute in range(max(start, 0), min(end, total)):
+                grid[minute] = True
+        meeting = sum(1 for minute in range(total) if grid[minute] and work[minute])
+        focus, run = 0, 0
+        for minute in range(total + 1):
+            if minute < total and work[minute] and not grid[minute]:
+                run += 1
+            else:
+                focus += run if run >= focus_minutes else 0
+                run = 0
+        results.append((meeting, focus))
+    return results
+
+def test_sweep_matches_minute_grid():
+    """Test the sweep agrees with a brute-force minute grid, including shared focus."""
+    team = random_team(6, 8)
+    result = compute_meeting_load(as_busy(team), MONDAY, 8, UTC)
+    expected = naive_minutes(team, 8)
+    for person, (meeting, focus) in zip(result["people"], expected):
+        assert person["meeting_hours"] == pytest.approx(meeting / 60, abs=0.01)
+        assert person["focus_hours"] == pytest.approx(focus / 60, abs=0.01)
+    assert result["team"]["shared_focus_hours"] == pytest.approx(expected[-1][1] / 60, abs=0.01)
+
+def test_focus_blocks_span_touching_windows(monkeypatch):
+    """Test a free stretch across touching work windows counts as one focus block."""
+    monkeypatch.setattr(settings, "WORK_DAY_START_HOUR", 0)
+    monkeypatch.setattr(settings, "WORK_DAY_END_HOUR", 24)
+    team = {
+        "a@example.com": busy((at(0, 0), at(0, 22)), (at(1, 2), at(2, 0))),
+        "b@example.com": busy((at(0, 0), at(0, 23)), (at(1, 1), at(2, 0))),
+    }
+    monkeypatch.setattr(settings, "FOCUS_BLOCK_MINUTES", 180)
+    result = compute_meeting_load(team, MONDAY, 2, UTC)
+    assert [person["focus_hours"] for person in result["people"]] == [4.0, 0.0]
+    assert result["team"]["shared_focus_hours"] == 0.0
+    monkeypatch.setattr(settings, "FOCUS_BLOCK_MINUTES", 60)
+    result = compute_meeting_load(team, MONDAY, 2, UTC)
+    assert [person["focus_hours"] for person in result["people"]] == [4.0, 2.0]
+    assert result["team"]["shared_focus_hours"] == 2.0
+
+def test_fifty_people_month_under_budget():
+    """Test a 50-person team over 30 days is analysed in milliseconds once fetched."""
+    team = as_busy(random_team(50, 30, seed=1))
+    start = time.perf_counter()
+    result = compute_meeting_load(team, MONDAY, 30, ZoneInfo("Europe/Berlin"))
+    assert time.perf_counter() - start < 0.25
+    assert result["team"]["people"] == 50
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+def test_freebusy_batched_and_chunked(client, fake_upstreams):
+    """Test 60 calendars take two freebusy calls and unreadable calendars are reported."""
+    calendar = fake_upstreams["calendar"]
+    members = calendar.people
+    ghosts = [f"ghost{index}@example.com" for index in range(60 - len(members))]
+    calendar.request_log.clear()
+    response = client.get("/api/calendar/meeting-load", params={
+        "days": 7, "start": (date.today() - timedelta(days=3)).isoformat(), "calendars": ",".join(members + ghosts)})
+    assert response.status_code == 200
+    body = response.json()
+    assert [path for _, path in calendar.request_log].count("/calendar/v3/freeBusy") == 2
+    assert set(body["errors"]) == set(ghosts)
+    assert [person["calendar_id"] for person in body["people"]] == members
+    assert body["team"]["meeting_hours"] > 0
+
+def test_no_calendars_rejected(client):
+    """Test a request without calendars (and none configured) is a 400."""
+    assert client.get("/api/calendar/meeting-load").status_code == 400
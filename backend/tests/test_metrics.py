@@ -0,0 +1,38 @@
+"""
+Metrics endpoint tests for SprintLens API.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.metrics import Histogram, observe_upstream, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
+client = TestClient(app)
+
+def test_metrics_endpoint():
+    """Test metrics endpoint exposes request latency per route."""
+    client.get("/health/live")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE sprintlens_http_request_duration_seconds histogram" in response.text
+    assert 'route="/health/live"' in response.text
+
+def test_observe_upstream_counts_errors():
+    """Test upstream errors are counted and timed."""
+    before = UPSTREAM_LATENCY.get_count("test", "fail")
+    with pytest.raises(RuntimeError):
+        with observe_upstream("test", "fail"):
+            raise RuntimeError("boom")
+    assert UPSTREAM_ERRORS.get("test", "fail") >= 1
+    assert UPSTREAM_LATENCY.get_count("test", "fail") == before + 1
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram rendering uses cumulative bucket counts."""
+    histogram = Histogram("test_render_seconds", "Test histogram", ("kind",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    lines = histogram.render()
+    assert 'test_render_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'test_render_seconds_bucket{kind="a",le="1"} 2' in lines
+    assert 'test_render_seconds_bucket{kind="a",le="+Inf"} 2' in lines
+    assert 'test_render_seconds_count{kind="a"} 2' in lines
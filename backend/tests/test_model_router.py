@@ -0,0 +1,140 @@
+"""
+Summary model routing tests for SprintLens API.
+"""
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.clients import reset_clients
+from app.core.config import deployment_settings, settings, tenant_settings
+from app.core.metrics import LLM_LATENCY
+from app.services.ai_service import LOCAL_MODEL, generate_summary
+from app.services.model_router import attempt_timeout, model_stats, record_call, reset_model_stats, route
+from app.main import app
+from tests.benchmarks.fake_upstreams import FakeOpenAI
+
+MESSAGES = [{"user": "U1", "timestamp": str(index), "text": text} for index, text in enumerate([
+    "Rolled back the payment-api deploy after the latency alert",
+    "Checkout refunds are failing for EU customers, looking into the gateway retries",
+    "Release 2.4 is blocked on the schema migration review",
+])]
+
+@pytest.fixture
+def openai(monkeypatch):
+    """A fake OpenAI with a slow and a failing model, wired into the settings."""
+    fake = FakeOpenAI(model_completion_ms={"slow-model": 3000}, failing_models=("broken-model",)).start()
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "OPENAI_BASE_URL", f"{fake.url}/v1")
+    reset_clients()
+    reset_model_stats()
+    try:
+        yield fake
+    finally:
+        fake.stop()
+        reset_clients()
+        reset_model_stats()
+
+def completions(fake):
+    return sum(1 for _, path in fake.request_log if path.endswith("/chat/completions"))
+
+def test_route_by_context_and_latency(monkeypatch):
+    """Test models too small for the prompt are skipped and slow ones give way to faster fallbacks."""
+    monkeypatch.setattr(settings, "SUMMARY_MODELS", "large:128000,small:16385,tiny:4096")
+    reset_model_stats()
+    assert route(2000, 500, 30.0) == ["large", "small", "tiny"]
+    assert route(10000, 500, 30.0) == ["large", "small"]
+    assert route(200000, 500, 30.0) == []
+    for latency in (40.0, 45.0, 50.0):
+        record_call("large", latency, 2000, 400, True)
+    record_call("small", 4.0, 2000, 400, True)
+    # large misses the objective: small is chosen, and large is tried last
+    assert route(2000, 500, 30.0) == ["small", "tiny", "large"]
+    for _ in range(3):
+        record_call("small", 2.0, 2000, 0, False)
+    assert route(2000, 500, 30.0) == ["tiny", "large", "small"]
+    assert model_stats()["small"]["error_rate"] == 0.75
+    reset_model_stats()
+
+def test_stats_are_kept_per_tenant(monkeypatch):
+    """Test one tenant's slow or failing calls do not change another tenant's routing."""
+    monkeypatch.setattr(settings, "SUMMARY_MODELS", "large:128000,small:16385")
+    reset_model_stats()
+    with tenant_settings("payments", deployment_settings()):
+        for _ in range(3):
+            record_call("large", 40.0, 2000, 0, False)
+        assert route(2000, 500, 30.0) == ["small", "large"]
+        assert model_stats()["large"]["calls"] == 3
+    assert route(2000, 500, 30.0) == ["large", "small"]
+    assert model_stats()["large"]["calls"] == 0
+    reset_model_stats()
+
+def test_attempt_timeout_keeps_time_for_the_fallback():
+    """Test an attempt leaves the fallback its p90 latency, half the time if unknown, and nothing if failing."""
+    reset_model_stats()
+    assert attempt_timeout(30.0, None) == 30.0
+    assert attempt_timeout(30.0, "unknown") == 15.0
+    record_call("fast", 4.0, 100, 50, True)
+    assert attempt_timeout(30.0, "fast") == 26.0
+    record_call("down", 1.0, 100, 0, False)
+    assert attempt_timeout(30.0, "down") == 30.0
+    assert attempt_timeout(1.5, "fast") == 1.0
+    reset_model_stats()
+
+def test_failing_model_falls_back(openai, monkeypatch):
+    """Test a model answering with errors is followed by the next one, and its failures are recorded."""
+    monkeypatch.setattr(settings, "SUMMARY_MODELS", "broken-model,gpt-3.5-turbo")
+    summary = generate_summary(MESSAGES)
+    assert summary and not summary.startswith("Error") and "extractive" not in summary
+    assert completions(openai) == 2
+    stats = model_stats()
+    assert stats["broken-model"]["error_rate"] == 1.0
+    assert stats["gpt-3.5-turbo"]["calls"] == 1 and stats["gpt-3.5-turbo"]["error_rate"] == 0.0
+    # The failing model is now routed around
+    assert route(100, 500, 30.0) == ["gpt-3.5-turbo", "broken-model"]
+
+def test_slow_model_gives_way_within_the_deadline(openai, monkeypatch):
+    """Test a model running past its share of the deadline is abandoned for the fallback in time."""
+    monkeypatch.setattr(settings, "SUMMARY_MODELS", "slow-model,gpt-3.5-turbo")
+    monkeypatch.setattr(settings, "SUMMARY_LATENCY_SLO_SECONDS", 3.0)
+    start = time.perf_counter()
+    summary = generate_summary(MESSAGES)
+    assert time.perf_counter() - start < 3.0
+    assert not summary.startswith("Error") and "extractive" not in summary
+    assert model_stats()["slow-model"]["error_rate"] == 1.0
+    assert route(100, 500, 3.0)[0] == "gpt-3.5-turbo"
+
+def test_local_fallback_when_every_model_fails(openai, monkeypatch):
+    """Test an extractive summary is returned, or the error if the local fallback is off."""
+    monkeypatch.setattr(settings, "SUMMARY_MODELS", "broken-model")
+    before = LLM_LATENCY.get_count(LOCAL_MODEL, "ok")
+    summary = generate_summary(MESSAGES, jira_data={"issues": [
+        {"key": "PAY-12", "status": "In Progress", "summary": "Retry gateway refunds"}]})
+    assert summary.startswith("**Key Activity**")
+    assert "Rolled back the payment-api deploy" in summary and "PAY-12" in summary
+    assert LLM_LATENCY.get_count(LOCAL_MODEL, "ok") == before + 1
+    monkeypatch.setattr(settings, "SUMMARY_LOCAL_FALLBACK", False)
+    assert generate_summary(MESSAGES).startswith("Error generating summary: broken-model")
+
+def test_local_fallback_without_openai_key(monkeypatch):
+    """Test a summary is extracted locally when no OpenAI key is configured."""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "")
+    reset_clients("openai")
+    try:
+        summary = generate_summary(MESSAGES)
+        assert summary.startswith("**Key Activity**") and "Release 2.4 is blocked" in summary
+        monkeypatch.setattr(settings, "SUMMARY_LOCAL_FALLBACK", False)
+        assert generate_summary(MESSAGES) == "Error generating summary: OpenAI API key not configured"
+    finally:
+        reset_clients("openai")
+
+def test_models_endpoint(openai, monkeypatch):
+    """Test the models endpoint lists configured models with their statistics."""
+    monkeypatch.setattr(settings, "SUMMARY_MODELS", "gpt-3.5-turbo:16385,broken-model:8192")
+    generate_summary(MESSAGES)
+    response = TestClient(app).get("/api/summary/models")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["latency_slo_seconds"] == settings.SUMMARY_LATENCY_SLO_SECONDS
+    models = {model["name"]: model for model in body["models"]}
+    assert models["broken-model"]["context_tokens"] == 8192
+    assert models["gpt-3.5-turbo"]["calls"] == 1
+    assert models["broken-model"]["calls"] == 0
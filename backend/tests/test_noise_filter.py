@@ -0,0 +1,87 @@
+"""
+Summary prompt noise filtering tests for SprintLens API.
+"""
+import random
+import time
+from app.core.config import settings
+from app.core.metrics import PROMPT_TOKENS_SAVED
+from app.services.ai_service import build_summary_prompt
+from app.services.noise_filter import filter_messages, is_low_information
+
+TRACE = """Traceback (most recent call last):
+  File "/app/payments/client.py", line 88, in charge
+    resp = session.post(url, timeout=30)
+  File "/usr/lib/python3.12/site-packages/requests/api.py", line 115, in post
+requests.exceptions.ReadTimeout: HTTPSConnectionPool(host='pay.example.com', port=443): Read timed out."""
+
+VOCABULARY = ("deploy review payment timeout release flaky test migration api latency dashboard sprint blocker "
+              "fix refactor cache gateway retry backoff checkout refund invoice queue worker schema index rollback "
+              "alert metric budget customer ticket design spike pairing standup demo").split()
+
+def messages(*texts):
+    return [{"user": "U1", "timestamp": str(index), "text": text} for index, text in enumerate(texts)]
+
+def test_low_information_messages():
+    """Test joins, acknowledgements and bare emoji/mentions are low-information and real updates are not."""
+    for text in ("+1", "Thanks!", ":tada: :tada:", "<@U0001> lgtm", "<@U0001> has joined the channel",
+                 "https://example.com/x", "Sounds good."):
+        assert is_low_information(text), text
+    for text in ("Deployed", "lgtm but the migration needs a second look", "+1 on moving the standup to 10"):
+        assert not is_low_information(text), text
+
+def test_repeats_are_folded_with_counts():
+    """Test alerts differing in numbers and near-duplicate traces are kept once with a count."""
+    kept, stats = filter_messages(messages(
+        "[ALERT] payment-api p99 latency 2310ms > 2000ms (host ip-10-0-3-17)",
+        "Rolled back the payment-api deploy",
+        "[ALERT] payment-api p99 latency 2544ms > 2000ms (host ip-10-0-4-2)",
+        TRACE, "+1",
+        TRACE.replace("in charge", "in charge_card"),
+        "[ALERT] checkout-api error rate 4.1% > 1%",
+    ))
+    assert [(message["text"][:20], message.get("repeats", 1)) for message in kept] == [
+        ("[ALERT] payment-api ", 2), ("Rolled back the paym", 1), ("Traceback (most rece", 2), ("[ALERT] checkout-api", 1)]
+    assert (stats["low_information"], stats["duplicates"]) == (1, 2)
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"] > 0
+
+def test_distinct_messages_are_kept():
+    """Test different messages over the same vocabulary are not taken for near-duplicates."""
+    rng = random.Random(3)
+    texts = [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randrange(4, 30))) for _ in range(2000)]
+    kept, stats = filter_messages(messages(*texts))
+    assert stats["duplicates"] == len(texts) - len(set(texts))
+
+def noisy_channel(size, rng):
+    """An incident channel: alerts, acknowledgements, pasted traces and some real discussion."""
+    texts = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.4:
+            texts.append(f"[ALERT] payment-api p99 latency {rng.randrange(2000, 5000)}ms > 2000ms "
+                         f"(host ip-10-0-{rng.randrange(9)}-{rng.randrange(250)}, incident #{rng.randrange(9999)})")
+        elif roll < 0.6:
+            texts.append(rng.choice(["+1", "thanks", "on it", ":eyes:", "ack", "<@U0002> lgtm"]))
+        elif roll < 0.75:
+            texts.append(TRACE.replace("line 88", f"line {rng.randrange(80, 99)}"))
+        else:
+            texts.append(" ".join(rng.choice(VOCABULARY) for _ in range(rng.randrange(8, 25))))
+    return messages(*texts)
+
+def test_noisy_channel_prompt_shrinks(monkeypatch):
+    """Test the prompt of a noisy incident channel shrinks by most of its size and savings are counted."""
+    monkeypatch.setattr(settings, "PROMPT_TARGET_TOKENS", 0)
+    channel = noisy_channel(1000, random.Random(5))
+    before = PROMPT_TOKENS_SAVED.get()
+    _, prompt = build_summary_prompt(channel)
+    unfiltered = sum(len(message["text"]) + 3 for message in channel)
+    assert len(prompt) < 0.4 * unfiltered
+    assert "(posted" in prompt
+    assert PROMPT_TOKENS_SAVED.get() > before
+
+def test_filter_is_linear():
+    """Test 20k messages are filtered well within the prompt-build budget."""
+    channel = noisy_channel(20000, random.Random(6))
+    start = time.perf_counter()
+    kept, _ = filter_messages(channel)
+    assert time.perf_counter() - start < 2.0
+    assert len(kept) < len(channel) / 3
@@ -0,0 +1,108 @@
+"""
+Cursor pagination and NDJSON streaming tests for SprintLens API.
+"""
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.core.pagination import Page, Paginator
+from app.main import app
+
+def fake_pages(sizes):
+    """fetch_page over pages of consecutive integers, recording the tokens fetched."""
+    fetched = []
+    starts = [sum(sizes[:index]) for index in range(len(sizes))]
+
+    def fetch_page(token):
+        index = token or 0
+        fetched.append(index)
+        items = [{"n": n} for n in range(starts[index], starts[index] + sizes[index])]
+        return Page(items, index + 1 if index + 1 < len(sizes) else None)
+    return fetch_page, fetched
+
+def test_paginator_resumes_across_page_boundaries():
+    """Test walking with a cursor returns every record exactly once, in order."""
+    fetch_page, _ = fake_pages([5, 0, 7, 3])
+    seen, cursor = [], None
+    while True:
+        paginator = Paginator(fetch_page, cursor, limit=4)
+        seen.extend(record["n"] for record in paginator)
+        cursor = paginator.next_cursor
+        if cursor is None:
+            break
+    assert seen == list(range(15))
+
+def test_paginator_fetches_lazily():
+    """Test only the upstream pages needed for the records consumed are fetched."""
+    fetch_page, fetched = fake_pages([10, 10, 10])
+    records = iter(Paginator(fetch_page))
+    assert [next(records)["n"] for _ in range(12)][-1] == 11
+    assert fetched == [0, 1]
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+ENDPOINTS = {
+    "slack": ("/api/slack/messages?channel_id=C000001&days=7", "messages"),
+    "jira": ("/api/jira/issues?project_key=BENCH&days=7", "issues"),
+    "calendar": ("/api/calendar/events?days=14", "events"),
+}
+
+@pytest.mark.parametrize("name", sorted(ENDPOINTS))
+def test_cursor_pages_match_ndjson_stream(client, name):
+    """Test paging with limit/cursor and streaming NDJSON return the same records."""
+    path, key = ENDPOINTS[name]
+    paged, cursor, pages = [], None, 0
+    while True:
+        response = client.get(path, params={"limit": 97, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        assert len(body[key]) <= 97
+        paged.extend(body[key])
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    response = client.get(path, headers={"Accept": "application/x-ndjson"})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == paged
+    assert pages == -(-len(paged) // 97) and len(paged) > 200
+
+def test_ndjson_limit_ends_with_cursor(client):
+    """Test a limited stream ends with a next_cursor line that resumes it."""
+    path, _ = ENDPOINTS["jira"]
+    lines = client.get(path, params={"format": "ndjson", "limit": 150}).text.splitlines()
+    assert len(lines) == 151
+    cursor = json.loads(lines[-1])["next_cursor"]
+    rest = client.get(path, params={"format": "ndjson", "cursor": cursor}).text.splitlines()
+    keys = [json.loads(line)["key"] for line in lines[:-1] + rest]
+    assert len(keys) == len(set(keys)) == 230
+
+def test_github_repository_pages_by_section(client):
+    """Test repository records page across sections and regroup into the full document."""
+    full = client.get("/api/github/repository?days=7").json()
+    grouped = {section: [] for section in ("pull_requests", "issues", "commits", "releases")}
+    cursor = None
+    while True:
+        params = {"limit": 50, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/github/repository?days=7", params=params).json()
+        for section in grouped:
+            grouped[section].extend(body[section])
+        assert body["repository"] == full["repository"]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    for section in grouped:
+        assert grouped[section] == full[section]
+
+    lines = client.get("/api/github/repository?days=7&format=ndjson").text.splitlines()
+    types = [json.loads(line)["type"] for line in lines]
+    assert types == sorted(types, key=["pull_request", "issue", "commit", "release"].index)
+    assert len(lines) == sum(len(full[section]) for section in grouped)
+
+def test_invalid_cursor_rejected(client):
+    """Test a malformed cursor is a 400, not a 500."""
+    response = client.get("/api/jira/issues", params={"project_key": "BENCH", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
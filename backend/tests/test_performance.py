@@ -0,0 +1,108 @@
+"""
+Performance regression tests replaying recorded upstream cassettes.
+
+Each endpoint must stay within a budget of upstream calls per request and a
+latency budget at the recorded upstream latencies. An N+1 regression (for
+example a lazy per-PR request in get_repository_data) shows up as extra
+upstream calls and fails here.
+"""
+import json
+import os
+import pickle
+import statistics
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.main import app
+from app.core.clients import reset_clients
+from datetime import timedelta
+from tests.benchmarks.cassettes import (
+    UPSTREAM_SETTINGS, load_replay_servers, request_key, shift_timestamps, upstream_environment,
+)
+
+CASSETTE_DIR = os.path.join(os.path.dirname(__file__), "cassettes")
+LATENCY_SCALE = float(os.environ.get("CASSETTE_LATENCY_SCALE", "1.0"))
+RUNS = 3
+
+# endpoint -> (method, path, payload, max upstream calls per request, p50 latency budget in ms)
+BUDGETS = {
+    "summary": ("POST", "/api/summary/generate", {
+        "channel_id": "C000001", "days": 7, "include_github": True, "include_jira": True,
+        "include_calendar": True, "jira_project_key": "BENCH"},
+        {"slack": 1, "github": 8, "jira": 4, "calendar": 2, "openai": 1}, 2000),
+    "github_repository": ("GET", "/api/github/repository?days=7", None, {"github": 8}, 1500),
+    "jira_issues": ("GET", "/api/jira/issues?project_key=BENCH&days=7", None, {"jira": 2}, 500),
+    "bot_respond": ("POST", "/api/bot/respond", {"channel_id": "C000001", "user_id": "U0001", "text": "summary"},
+                    {"slack": 1, "github": 8, "openai": 1}, 1500),
+}
+
+@pytest.fixture(scope="module")
+def replay(tmp_path_factory):
+    """Serve the cassettes and point every integration client at them."""
+    servers = load_replay_servers(CASSETTE_DIR, latency_scale=LATENCY_SCALE)
+    workdir = tmp_path_factory.mktemp("calendar")
+    from google.oauth2.credentials import Credentials
+    with open(workdir / "credentials.json", "w") as f:
+        json.dump({"installed": {"client_id": "replay", "client_secret": "replay"}}, f)
+    with open(workdir / "token.pickle", "wb") as f:
+        pickle.dump(Credentials(token="replay"), f)
+
+    overrides = {
+        **upstream_environment(servers),
+        "SLACK_BOT_TOKEN": "xoxb-replay", "OPENAI_API_KEY": "sk-replay",
+        "GITHUB_TOKEN": "ghp-replay", "GITHUB_REPO": "bench/repo",
+        "JIRA_EMAIL": "replay@example.com", "JIRA_API_TOKEN": "replay",
+        "ACTIVITY_STORE_PATH": str(workdir / "activity.db"),
+    }
+    mp = pytest.MonkeyPatch()
+    for name, value in overrides.items():
+        mp.setattr(settings, name, value)
+    mp.chdir(workdir)
+    # Rebuild the integration clients against the replay servers
+    reset_clients()
+    try:
+        yield servers
+    finally:
+        mp.undo()
+        reset_clients()
+        for server in servers.values():
+            server.stop()
+
+def test_cassettes_cover_all_upstreams():
+    """Test a cassette exists for every upstream."""
+    names = {filename[:-5] for filename in os.listdir(CASSETTE_DIR) if filename.endswith(".json")}
+    assert names == set(UPSTREAM_SETTINGS)
+
+def test_replay_matching_ignores_timestamps():
+    """Test request keys mask timestamps and replayed timestamps move forward."""
+    first = request_key("GET", "/search", "jql=created+%3E%3D+%272026-01-01%27&startAt=0", b"", "")
+    second = request_key("GET", "/search", "jql=created+%3E%3D+%272026-03-04%27&startAt=0", b"", "")
+    assert first == second
+    body = '{"created": "2026-01-01T10:00:00.000+0000", "ts": "1767261600.000100"}'
+    assert shift_timestamps(body, timedelta(days=1)) == '{"created": "2026-01-02T10:00:00.000+0000", "ts": "1767348000.000100"}'
+
+@pytest.mark.parametrize("endpoint", sorted(BUDGETS))
+def test_endpoint_within_budget(replay, endpoint):
+    """Test upstream call counts and latency stay within the endpoint budget."""
+    method, path, payload, call_budget, latency_budget_ms = BUDGETS[endpoint]
+    client = TestClient(app)
+    # Warm up once so one-off client handshakes don't count against the budget
+    assert client.request(method, path, json=payload).status_code == 200
+
+    for server in replay.values():
+        server.reset_counts()
+    latencies = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        response = client.request(method, path, json=payload)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+
+    calls = {name: server.request_count / RUNS for name, server in replay.items() if server.request_count}
+    unmatched = {name: server.unmatched for name, server in replay.items() if server.unmatched}
+    assert not unmatched, f"requests missing from cassettes: {unmatched}"
+    for name, count in calls.items():
+        assert count <= call_budget.get(name, 0), f"{endpoint}: {count:g} {name} calls per request, budget {call_budget.get(name, 0)}"
+    p50 = statistics.median(latencies)
+    assert p50 <= latency_budget_ms * max(LATENCY_SCALE, 0.01) + 250, f"{endpoint}: p50 {p50:.0f}ms over budget"
@@ -0,0 +1,87 @@
+"""
+Extractive pre-summarization tests for SprintLens API.
+"""
+import random
+import time
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services.ai_service import build_summary_prompt
+from app.services.noise_filter import estimate_tokens, normalized_words
+from app.services.presummarizer import DAMPING, STOP_WORDS, select_lines, textrank
+
+VOCABULARY = ("deploy review payment timeout release flaky test migration api latency dashboard sprint blocker "
+              "fix refactor cache gateway retry backoff checkout refund invoice queue worker schema index rollback "
+              "alert metric budget customer ticket design spike pairing standup demo").split()
+
+def dense_textrank(texts):
+    """TextRank over an explicit similarity matrix, for reference."""
+    documents = [{word for word in normalized_words(text) if len(word) > 1 and word not in STOP_WORDS} for text in texts]
+    vocabulary = sorted(set().union(*documents))
+    matrix = np.array([[1.0 if word in document else 0.0 for word in vocabulary] for document in documents])
+    idf = np.log((1 + len(texts)) / (1 + matrix.sum(axis=0))) + 1.0
+    matrix = matrix * idf
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-300)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    degree = similarity.sum(axis=1)
+    transition = np.where(degree[:, None] > 0, similarity / np.where(degree > 0, degree, 1.0)[:, None], 1.0 / len(texts))
+    scores = np.full(len(texts), 1.0 / len(texts))
+    for _ in range(200):
+        scores = (1 - DAMPING) / len(texts) + DAMPING * transition.T @ scores
+    return scores
+
+def test_matches_dense_textrank():
+    """Test the matrix-free iteration agrees with TextRank over the full similarity matrix."""
+    rng = random.Random(1)
+    texts = [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randrange(3, 12))) for _ in range(150)]
+    texts += ["the and of", "completely unrelated words here"]
+    scores = textrank(texts)
+    assert scores.sum() == pytest.approx(1.0)
+    assert scores == pytest.approx(dense_textrank(texts), abs=1e-6)
+
+def test_central_lines_rank_first():
+    """Test a line sharing words with the rest outranks an off-topic one."""
+    scores = textrank([
+        "Payment gateway timeout during checkout",
+        "Checkout retries hit the payment gateway timeout again",
+        "Raised the payment gateway timeout and added retries",
+        "Lunch menu for Friday",
+        "Gateway timeout fixed in checkout, payment retries green",
+    ])
+    assert int(np.argmax(scores)) in (1, 4)
+    assert int(np.argmin(scores)) == 3
+
+def test_selection_fits_budget_in_order():
+    """Test selection stays within the token budget and keeps lines in their original order."""
+    rng = random.Random(2)
+    sections = {name: [f"- {name} {index} " + " ".join(rng.choice(VOCABULARY) for _ in range(10)) for index in range(200)]
+                for name in ("slack", "github", "jira")}
+    selected = select_lines(sections, 1000)
+    lines = [line for section in selected.values() for line in section]
+    assert 0 < sum(estimate_tokens(line) for line in lines) <= 1000
+    for name, section in selected.items():
+        assert section == [line for line in sections[name] if line in section]
+    assert select_lines({"slack": ["- short"]}, 1000) == {"slack": ["- short"]}
+
+def test_prompt_is_bounded(monkeypatch):
+    """Test a large window's prompt is cut to the budget, with notable GitHub and Jira items."""
+    monkeypatch.setattr(settings, "PROMPT_TARGET_TOKENS", 1500)
+    rng = random.Random(3)
+    sentence = lambda length: " ".join(rng.choice(VOCABULARY) for _ in range(length))
+    messages = [{"text": sentence(20)} for _ in range(3000)]
+    github = {"pull_requests": [{"number": number, "title": sentence(6), "state": "open"} for number in range(500)],
+              "issues": [], "commits": [{"sha": f"{number:07x}", "message": sentence(8)} for number in range(500)]}
+    jira = {"issues": [{"key": f"PAY-{number}", "summary": sentence(6), "status": "Done"} for number in range(500)]}
+    _, prompt = build_summary_prompt(messages, github, jira)
+    assert estimate_tokens(prompt) < 1500 + 400
+    assert "**Notable GitHub Activity:**" in prompt and "**Notable Jira Issues:**" in prompt
+    assert "**Pull Requests:** 500 PRs" in prompt
+
+def test_large_window_under_budget():
+    """Test 20k lines are ranked in well under a second."""
+    rng = random.Random(4)
+    texts = [" ".join(rng.choice(VOCABULARY) for _ in range(rng.randrange(5, 30))) for _ in range(20000)]
+    start = time.perf_counter()
+    textrank(texts)
+    assert time.perf_counter() - start < 1.0
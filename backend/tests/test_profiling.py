@@ -0,0 +1,48 @@
+"""
+Request profiling tests for SprintLens API.
+"""
+import json
+import os
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core import profiling
+from app.core.config import settings
+from app.core.profiling import ProfilingMiddleware
+
+def _slow_handler():
+    time.sleep(0.05)
+    return {"ok": True}
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_api_route("/slow", _slow_handler, methods=["GET"])
+    app.add_middleware(ProfilingMiddleware)
+    return app
+
+def test_unflagged_request_not_profiled(tmp_path, monkeypatch):
+    """Test requests without the flag pass straight through."""
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    response = TestClient(_build_app()).get("/slow")
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+def test_flagged_request_stores_collapsed_stacks(tmp_path, monkeypatch):
+    """Test a flagged request stores collapsed stacks covering threadpool work."""
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(profiling, "APP_DIR", os.path.dirname(__file__))
+    response = TestClient(_build_app()).get("/slow?profile=1&days=7&token=secret")
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    with open(tmp_path / f"{profile_id}.collapsed") as f:
+        collapsed = f.read()
+    assert "_slow_handler (test_profiling.py:" in collapsed
+    with open(tmp_path / f"{profile_id}.json") as f:
+        metadata = json.load(f)
+    assert metadata["route"] == "/slow"
+    # Parameter names only: values (and bodies) can hold tokens and user content
+    assert metadata["query_parameters"] == ["days", "profile", "token"]
+    assert "secret" not in json.dumps(metadata)
@@ -0,0 +1,96 @@
+"""
+Release notes tests for SprintLens API.
+"""
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi.testclient import TestClient
+from app.core.cache import clear_caches
+from app.core.config import settings
+from app.main import app
+from app.services.github_service import generate_release_notes
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_caches("release_notes")
+
+def notes(client, **params):
+    response = client.get("/api/github/release-notes", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["release_notes"]
+
+def test_notes_between_tags(client, fake_upstreams):
+    """Test notes cover exactly the PRs merged and commits made between two tags."""
+    github = fake_upstreams["github"]
+    newest, previous = github.releases[0]["tag_name"], github.releases[1]["tag_name"]
+    text = notes(client, base=previous, head=newest)
+
+    start, end = github._resolve(newest), github._resolve(previous)
+    shas = {commit["sha"] for commit in github.commits[start:end]}
+    merged = [pr for pr in github.pull_requests if pr.get("merge_commit_sha") in shas]
+    others = [pr for pr in github.pull_requests if pr["merged_at"] and pr not in merged]
+    assert merged and others
+    assert all(f"(#{pr['number']})" in text for pr in merged)
+    assert not any(f"(#{pr['number']})" in text for pr in others)
+    assert github.commits[start]["sha"][:7] in text
+    assert github.commits[end]["sha"][:7] not in text
+
+def test_tag_range_memoized(client, fake_upstreams, monkeypatch):
+    """Test notes between tags are served from the cache without upstream calls."""
+    github = fake_upstreams["github"]
+    params = {"base": github.releases[2]["tag_name"], "head": github.releases[0]["tag_name"]}
+    first = notes(client, **params)
+    github.request_log.clear()
+    assert notes(client, **params) == first
+    assert github.request_log == []
+    # Another repository's tags of the same name are not served from the cache
+    monkeypatch.setattr(settings, "GITHUB_REPO", "bench/other")
+    assert generate_release_notes(**params) != first
+
+def test_branch_range_expires_with_directory_ttl(client, fake_upstreams, monkeypatch):
+    """Test notes up to a branch are only kept for the short directory TTL."""
+    github = fake_upstreams["github"]
+    monkeypatch.setattr(settings, "DIRECTORY_CACHE_TTL_SECONDS", 0.0)
+    notes(client, base=github.releases[0]["tag_name"])
+    github.request_log.clear()
+    notes(client, base=github.releases[0]["tag_name"])
+    assert any("/compare/" in path for _, path in github.request_log)
+
+def test_date_windows(client, fake_upstreams):
+    """Test rolling windows are recomputed and windows that ended are memoized."""
+    github = fake_upstreams["github"]
+    notes(client, days=7)
+    github.request_log.clear()
+    text = notes(client, days=7)
+    assert github.request_log
+    assert "## New Features" in text and "## Bug Fixes" in text
+
+    until = (datetime.now(timezone.utc) - timedelta(days=2)).replace(microsecond=0).isoformat()
+    notes(client, days=3, until=until)
+    github.request_log.clear()
+    notes(client, days=3, until=until)
+    assert github.request_log == []
+
+def test_invalid_ranges_rejected(client):
+    """Test head without base and unknown refs are client errors."""
+    assert client.get("/api/github/release-notes", params={"head": "main"}).status_code == 400
+    assert client.get("/api/github/release-notes", params={"base": "v0.0.0"}).status_code == 400
+
+def test_open_window_is_not_memoized_ahead_of_utc(client, fake_upstreams, monkeypatch):
+    """Test a window ending after now (UTC) is recomputed when the local time zone is ahead of UTC."""
+    github = fake_upstreams["github"]
+    monkeypatch.setenv("TZ", "Pacific/Auckland")
+    time.tzset()
+    try:
+        until = (datetime.now(timezone.utc) + timedelta(hours=1)).replace(microsecond=0).isoformat()
+        notes(client, days=3, until=until)
+        github.request_log.clear()
+        notes(client, days=3, until=until)
+        assert github.request_log
+    finally:
+        monkeypatch.undo()
+        time.tzset()
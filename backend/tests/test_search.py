@@ -0,0 +1,111 @@
+"""
+Full-text search tests for SprintLens API.
+"""
+import sqlite3
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.services.activity_store import (Activity, match_expression, reset_activity_store, search_activity,
+                                         upsert)
+
+def activity(external_id, title, body=None, source="jira", kind="issue", container="PAY", timestamp=None):
+    return Activity(source, kind, external_id, timestamp or time.time(), "dev1", container, title, body,
+                    f"https://example.com/{external_id}", None, {"id": external_id})
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """An empty activity store of its own."""
+    monkeypatch.setattr(settings, "ACTIVITY_STORE_PATH", str(tmp_path / "search.db"))
+    yield
+    reset_activity_store()
+
+def test_index_follows_upserts(store):
+    """Test the index is updated when a record is inserted and when it is updated."""
+    upsert([activity("PAY-1", "Checkout fails", "The payment gateway returns a timeout after 30s")])
+    [result] = search_activity("payment timeout")
+    assert (result["id"], result["url"]) == ("PAY-1", "https://example.com/PAY-1")
+    assert "[payment] gateway returns a [timeout]" in result["snippet"]
+
+    upsert([activity("PAY-1", "Checkout fails", "Card declined for some customers")])
+    assert search_activity("timeout") == []
+    assert [result["id"] for result in search_activity("declined")] == ["PAY-1"]
+
+def test_ranking_and_filters(store):
+    """Test title matches rank first, stemming applies and filters narrow the results."""
+    upsert([
+        activity("PAY-2", "Retry logic", "Mentions a timeout once among many other words in the description"),
+        activity("PAY-3", "Payment timeouts", "Raise the timeout"),
+        activity("C1:1.0", None, "seeing timeouts on payment again", source="slack", kind="message", container="C1"),
+    ])
+    assert [result["id"] for result in search_activity("timeout")][0] == "PAY-3"
+    assert [result["id"] for result in search_activity("timeout", source="slack")] == ["C1:1.0"]
+    assert [result["id"] for result in search_activity("retr*", container="PAY")] == ["PAY-2"]
+
+def test_only_newest_matches_ranked(store, monkeypatch):
+    """Test the ranking is bounded to the newest SEARCH_MAX_CANDIDATES matches, filters applied first."""
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 2)
+    upsert([activity("PAY-6", "Timeout timeout timeout"), activity("PAY-7", "Timeout", "in checkout"),
+            activity("C1:2.0", None, "timeout", source="slack", kind="message", container="C1"),
+            activity("PAY-8", "Timeout", "in refunds")])
+    assert sorted(result["id"] for result in search_activity("timeout", source="jira")) == ["PAY-7", "PAY-8"]
+
+def test_only_newest_matches_in_window_ranked(store, monkeypatch):
+    """Test the newest SEARCH_MAX_CANDIDATES matches are counted within the time window."""
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 2)
+    upsert([activity("PAY-9", "Timeout", timestamp=1000.0)] +
+           [activity(f"PAY-{n}", "Timeout") for n in (10, 11, 12)])
+    assert [result["id"] for result in search_activity("timeout", until=2000.0)] == ["PAY-9"]
+
+def test_words_match_text_only(store):
+    """Test query words match titles and bodies, not the source, kind, author or container."""
+    upsert([activity("PAY-13", "Checkout fails", "The issue is in the jira sync"),
+            activity("PAY-14", "Refunds slow", "Nothing to see")])
+    assert [result["id"] for result in search_activity("issue")] == ["PAY-13"]
+    assert [result["id"] for result in search_activity("jira", source="jira")] == ["PAY-13"]
+    assert search_activity("dev1") == [] and search_activity("pay") == []
+
+def test_query_syntax_is_escaped(store):
+    """Test punctuation and FTS5 keywords in user input are matched as words."""
+    upsert([activity("PAY-4", "NOT a timeout", "payment-service (v2) OR gateway")])
+    assert match_expression('payment-service "(v2)" OR') == '"payment" "service" "v2" "OR"'
+    assert match_expression("!!") is None
+    assert [result["id"] for result in search_activity('payment-service "(v2)" OR')] == ["PAY-4"]
+    assert search_activity("NOT") and search_activity("!!") == []
+
+def test_existing_store_is_indexed(store):
+    """Test a store created before the search index is indexed when opened."""
+    connection = sqlite3.connect(settings.ACTIVITY_STORE_PATH)
+    connection.executescript("""
+        CREATE TABLE activity (id INTEGER PRIMARY KEY, source TEXT NOT NULL, kind TEXT NOT NULL,
+            external_id TEXT NOT NULL, timestamp REAL NOT NULL, author TEXT, container TEXT, title TEXT, body TEXT,
+            url TEXT, state TEXT, record TEXT NOT NULL, ingested_at REAL NOT NULL, UNIQUE (source, kind, external_id));
+        INSERT INTO activity VALUES (1, 'jira', 'issue', 'PAY-5', 0, NULL, 'PAY', 'Old payment outage', NULL, NULL,
+            NULL, '{}', 0);
+    """)
+    connection.close()
+    assert [result["id"] for result in search_activity("outage")] == ["PAY-5"]
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+def test_search_endpoint(client, fake_upstreams):
+    """Test fetched Slack, GitHub, Jira and calendar records are searchable with links."""
+    assert client.get("/api/slack/messages", params={"channel_id": "C000001", "days": 7}).status_code == 200
+    assert client.get("/api/github/repository", params={"days": 7}).status_code == 200
+    assert client.get("/api/jira/issues", params={"project_key": "BENCH", "days": 7}).status_code == 200
+    assert client.get("/api/calendar/events", params={"days": 7}).status_code == 200
+    for fake in fake_upstreams.values():
+        fake.request_log.clear()
+
+    for source in ("slack", "github", "jira", "calendar"):
+        response = client.get("/api/search", params={"q": "payment timeout", "source": source, "limit": 5})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results and all(result["source"] == source and result["url"] for result in results)
+        assert all("[" in result["snippet"] for result in results)
+        assert results == sorted(results, key=lambda result: -result["score"])
+    assert all(fake.request_log == [] for fake in fake_upstreams.values())
+    assert client.get("/api/search", params={"q": ""}).status_code == 422
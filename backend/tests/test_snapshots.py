@@ -0,0 +1,138 @@
+"""
+Bot activity snapshot tests for SprintLens API.
+"""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.tenants import TenantConfig, tenant_pool
+from app.main import app
+from app.services import snapshot_service
+from app.services.snapshot_service import (refresh_all_snapshots, refresh_snapshots, run_refresher, request_refresh,
+                                           snapshots)
+
+CHANNEL = "C000001"
+
+@pytest.fixture(scope="module")
+def client(fake_upstreams):
+    return TestClient(app)
+
+@pytest.fixture(autouse=True)
+def summaries(monkeypatch):
+    """Stand-in for the LLM, recording each summary generated."""
+    generated = []
+
+    def generate_summary(messages, github_data=None):
+        generated.append(len(messages))
+        return f"Summary of {len(messages)} messages"
+    monkeypatch.setattr(snapshot_service, "generate_summary", generate_summary)
+    snapshots.clear()
+    yield generated
+    snapshots.clear()
+
+def mention(client, text):
+    response = client.post("/api/bot/respond", json={"channel_id": CHANNEL, "user_id": "U0001", "text": text})
+    assert response.status_code == 200
+    return response.json()["response"]
+
+def test_commands_answer_from_snapshot(client, fake_upstreams, summaries):
+    """Test status and summary make no upstream calls once the snapshot is built."""
+    snapshots.touch(CHANNEL)
+    assert list(refresh_snapshots()) == [CHANNEL]
+    assert summaries == [len(fake_upstreams["slack"].messages[:200])]
+
+    for fake in fake_upstreams.values():
+        fake.request_log.clear()
+    start = time.perf_counter()
+    status = mention(client, "status")
+    summary = mention(client, "summary")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert all(fake.request_log == [] for fake in fake_upstreams.values())
+    assert elapsed_ms < 200
+    assert "pull requests" in status and "messages from" in status
+    assert summary.endswith(f"Summary of {summaries[0]} messages")
+    assert len(summaries) == 1
+
+def test_summary_regenerated_only_on_change(summaries):
+    """Test a refresh keeps the summary while the activity is unchanged."""
+    snapshots.touch(CHANNEL)
+    refresh_snapshots()
+    refresh_snapshots()
+    assert len(summaries) == 1
+    snapshot = snapshots.get(CHANNEL)
+    assert snapshot.has_current_summary
+
+def test_cold_mention_builds_snapshot(client, summaries):
+    """Test a mention in a channel without a snapshot fetches live and stores it."""
+    assert "messages from" in mention(client, "status")
+    assert snapshots.get(CHANNEL) is not None and summaries == []
+    assert CHANNEL in snapshots.active_channels()
+
+def test_idle_channels_forgotten(monkeypatch):
+    """Test channels not mentioned within the idle window stop being refreshed."""
+    snapshots.touch(CHANNEL)
+    monkeypatch.setattr(settings, "SNAPSHOT_CHANNELS", "C000002, C000003")
+    assert snapshots.active_channels() == ["C000002", "C000003", CHANNEL]
+    monkeypatch.setattr(settings, "SNAPSHOT_IDLE_HOURS", 0.0)
+    assert snapshots.active_channels() == ["C000002", "C000003"]
+
+def test_request_refresh_wakes_refresher(fake_upstreams):
+    """Test request_refresh triggers a refresh before the interval elapses."""
+    async def scenario():
+        task = asyncio.create_task(run_refresher(interval=60))
+        await asyncio.sleep(0.2)
+        assert snapshots.get(CHANNEL) is None
+        snapshots.touch(CHANNEL)
+        await asyncio.to_thread(request_refresh)
+        for _ in range(100):
+            if snapshots.get(CHANNEL) is not None:
+                break
+            await asyncio.sleep(0.05)
+        task.cancel()
+        return snapshots.get(CHANNEL)
+
+    assert asyncio.run(scenario()) is not None
+
+def test_refresher_survives_failed_refreshes(fake_upstreams, monkeypatch):
+    """Test a refresh that raises is logged and the refresher keeps refreshing."""
+    calls = []
+
+    def refresh_all_snapshots():
+        calls.append(True)
+        if len(calls) == 1:
+            raise TimeoutError("Slack timed out")
+        return {}
+    monkeypatch.setattr(snapshot_service, "refresh_all_snapshots", refresh_all_snapshots)
+
+    async def scenario():
+        task = asyncio.create_task(run_refresher(interval=0.05))
+        for _ in range(100):
+            if len(calls) >= 2:
+                break
+            await asyncio.sleep(0.05)
+        failed = task.done()
+        task.cancel()
+        return failed
+
+    assert asyncio.run(scenario()) is False and len(calls) >= 2
+
+def test_snapshots_are_kept_per_tenant(fake_upstreams, monkeypatch):
+    """Test each pooled tenant's channels are refreshed with its settings and read only by that tenant."""
+    monkeypatch.setattr(settings, "SNAPSHOT_SUMMARIES", False)
+    tenant = tenant_pool.checkout(TenantConfig("payments", {"GITHUB_REPO": "bench/missing"}))
+    tenant_pool.release(tenant)
+    try:
+        snapshots.touch(CHANNEL)
+        assert list(refresh_all_snapshots()) == [(None, CHANNEL)]
+        with tenant.scope():
+            assert snapshots.get(CHANNEL) is None
+            snapshots.touch(CHANNEL)
+        refreshed = refresh_all_snapshots()
+        assert refreshed[(None, CHANNEL)].github and refreshed[("payments", CHANNEL)].github is None
+        assert snapshots.get(CHANNEL) is refreshed[(None, CHANNEL)]
+        with tenant.scope():
+            assert snapshots.get(CHANNEL) is refreshed[("payments", CHANNEL)]
+    finally:
+        tenant_pool.clear()
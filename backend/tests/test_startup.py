@@ -0,0 +1,50 @@
+"""
+Startup cost tests for SprintLens API.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app.core.clients import ClientRegistry, ClientSpec
+from app.core.config import Settings
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_LIBRARIES = ["slack_sdk", "openai", "github", "jira", "googleapiclient", "google_auth_oauthlib"]
+IMPORT_BUDGET_S = float(os.environ.get("IMPORT_BUDGET_S", "3.0"))
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {CLIENT_LIBRARIES!r} if m in sys.modules]}}))
+"""
+
+def test_import_skips_client_libraries(tmp_path):
+    """Test importing the app with no integrations configured loads no client library."""
+    # A scratch working directory keeps any local .env or credentials.json out of it
+    env = {"PATH": os.environ.get("PATH", ""), "PYTHONPATH": BACKEND_DIR, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60, check=True)
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["loaded"] == []
+    assert report["seconds"] < IMPORT_BUDGET_S
+
+def test_registry_builds_clients_once():
+    """Test clients are built on first use, cached, and rebuilt after a reset."""
+    built = []
+    specs = {
+        "fake": ClientSpec(lambda config: built.append(config) or object(), lambda config: True),
+        "missing": ClientSpec(lambda config: pytest.fail("built unconfigured client"), lambda config: False),
+    }
+    registry = ClientRegistry(Settings(), specs)
+    assert not registry.is_loaded("fake")
+    first = registry.get("fake")
+    assert registry.get("fake") is first
+    assert len(built) == 1
+    assert registry.get("missing") is None
+    assert registry.configured() == ["fake"]
+    registry.reset("fake")
+    assert registry.get("fake") is not first
+    assert len(built) == 2
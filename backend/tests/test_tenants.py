@@ -0,0 +1,130 @@
+"""
+Multi-tenant workspace tests for SprintLens API.
+"""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+from app.core.config import current_tenant, settings
+from app.core.tenants import Tenant, TenantConfig, TenantMiddleware, TenantPool, tenant_pool
+from app.main import app
+from app.routers import summary
+
+TENANTS = {
+    "payments": {"api_key": "payments-key",
+                 "settings": {"SLACK_BOT_TOKEN": "xoxb-payments", "GITHUB_TOKEN": "ghp-payments",
+                              "GITHUB_REPO": "bench/missing"}},
+    "ops": {"api_key": "ops-key", "max_concurrency": 1, "settings": {"SLACK_BOT_TOKEN": "xoxb-ops"}},
+    "bad id": {"api_key": "bad-key"},
+}
+
+@pytest.fixture
+def tenants_file(tmp_path, monkeypatch):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps(TENANTS))
+    monkeypatch.setattr(settings, "TENANTS_FILE", str(path))
+    yield path
+    tenant_pool.clear()
+
+def test_tenants_are_served_with_their_settings(fake_upstreams, tenants_file):
+    """Test a tenant's requests use its own settings and clients, never the deployment's credentials."""
+    client = TestClient(app)
+    assert client.get("/api/github/repository", params={"days": 7}).status_code == 200
+    assert client.get("/api/github/repository", params={"days": 7},
+                      headers={"X-Tenant-Key": "payments-key"}).status_code == 400
+
+    assert client.get("/api/jira/projects").json()["projects"]
+    assert client.get("/api/jira/projects", headers={"X-Tenant-Key": "ops-key"}).json() == {"projects": []}
+    assert tenant_pool.tenants() == ["payments", "ops"]
+
+    payments = tenant_pool.checkout(TenantConfig("payments", TENANTS["payments"]["settings"]))
+    tenant_pool.release(payments)
+    assert payments.settings.ACTIVITY_STORE_PATH.endswith("activity-payments.db")
+    assert payments.settings.SLACK_BOT_TOKEN == "xoxb-payments" and settings.SLACK_BOT_TOKEN == "xoxb-test"
+    # Credentials and integrations the entry does not set are left empty; tuning settings are inherited
+    assert (payments.settings.JIRA_SERVER, payments.settings.JIRA_API_TOKEN, payments.settings.GITHUB_REPOS) == ("", "", "")
+    assert payments.settings.GITHUB_API_URL == settings.GITHUB_API_URL
+    assert payments.clients.configured() == ["slack", "github"] and not payments.clients.is_configured("calendar")
+
+def test_unknown_keys_are_refused(fake_upstreams, tenants_file):
+    """Test unknown keys and invalid entries get 401 and the file is re-read when it changes."""
+    client = TestClient(app)
+    assert client.get("/api/jira/projects", headers={"X-Tenant-Key": "nobody"}).status_code == 401
+    assert client.get("/api/jira/projects", headers={"X-Tenant-Key": "bad-key"}).status_code == 401
+
+    tenants_file.write_text(json.dumps({"nobody": {"api_key": "nobody"}}))
+    assert client.get("/api/jira/projects", headers={"X-Tenant-Key": "nobody"}).status_code == 200
+    assert client.get("/api/jira/projects", headers={"X-Tenant-Key": "ops-key"}).status_code == 401
+
+def test_pool_evicts_least_recently_used_and_idle_tenants(monkeypatch):
+    """Test the pool keeps TENANT_POOL_SIZE tenants, never evicting busy ones, and closes idle ones."""
+    closed = []
+    monkeypatch.setattr(Tenant, "close", lambda self: closed.append(self.config.id))
+    monkeypatch.setattr(settings, "TENANT_POOL_SIZE", 2)
+    pool = TenantPool()
+
+    def serve(tenant_id):
+        tenant = pool.checkout(TenantConfig(tenant_id, {}))
+        pool.release(tenant)
+        return tenant
+
+    first = serve("a")
+    serve("b")
+    assert serve("a") is first and first.settings.ACTIVITY_STORE_PATH.endswith("-a.db")
+    serve("c")
+    assert pool.tenants() == ["a", "c"] and closed == ["b"]
+
+    busy = pool.checkout(TenantConfig("a", {}))
+    serve("d")
+    assert pool.tenants() == ["a", "d"] and closed == ["b", "c"]
+    pool.release(busy)
+
+    monkeypatch.setattr(settings, "TENANT_IDLE_SECONDS", 0.05)
+    time.sleep(0.1)
+    serve("e")
+    assert pool.tenants() == ["e"] and closed == ["b", "c", "a", "d"]
+    # A changed entry is rebuilt with its new settings
+    changed = serve("e") is not pool.checkout(TenantConfig("e", {"GITHUB_REPO": "team/other"}))
+    assert changed and pool.tenants() == ["e"] and closed[-1] == "e"
+
+def test_tenant_concurrency_is_limited(tenants_file, monkeypatch):
+    """Test a tenant's requests beyond its limit get 429 without holding up other tenants."""
+    monkeypatch.setattr(settings, "TENANT_QUEUE_SECONDS", 0.05)
+
+    async def slow(scope, receive, send):
+        tenant = current_tenant()
+        await asyncio.sleep(0.3)
+        await JSONResponse({"tenant": tenant})(scope, receive, send)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=TenantMiddleware(slow))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.get("/", headers={"X-Tenant-Key": key} if key else {})
+                                          for key in ("ops-key", "ops-key", "payments-key", None)))
+
+    responses = asyncio.run(scenario())
+    assert sorted(response.status_code for response in responses[:2]) == [200, 429]
+    assert [response.json() for response in responses[2:]] == [{"tenant": "payments"}, {"tenant": None}]
+    assert "Retry-After" in next(response for response in responses if response.status_code == 429).headers
+
+def test_summaries_do_not_block_other_tenants(fake_upstreams, tenants_file, monkeypatch):
+    """Test summaries of two tenants run concurrently rather than one after the other on the event loop."""
+    def generate_summary(*args):
+        time.sleep(0.3)
+        return "Summary"
+    monkeypatch.setattr(summary, "generate_summary", generate_summary)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/api/summary/generate", json={"channel_id": "C000001"},
+                                                      headers={"X-Tenant-Key": key})
+                                          for key in ("payments-key", "ops-key")))
+
+    start = time.perf_counter()
+    responses = asyncio.run(scenario())
+    assert [response.json() for response in responses] == [{"summary": "Summary"}] * 2
+    assert time.perf_counter() - start < 0.55
@@ -0,0 +1,33 @@
+"""
+Request timing tests for SprintLens API.
+"""
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.timing import start_request_timings, timed_stage, get_request_timings
+
+client = TestClient(app)
+
+def test_server_timing_header():
+    """Test every response carries Server-Timing and X-Request-ID headers."""
+    response = client.get("/health/live", headers={"X-Request-ID": "abc123"})
+    assert response.status_code == 200
+    assert "total;dur=" in response.headers["server-timing"]
+    assert response.headers["x-request-id"] == "abc123"
+
+def test_timed_stage_accumulates():
+    """Test repeated stages are summed into the request timing context."""
+    timings = start_request_timings()
+
+    @timed_stage("jira_fetch")
+    def fetch():
+        return 1
+
+    fetch()
+    fetch()
+    with timed_stage("llm"):
+        pass
+    assert get_request_timings() is timings
+    assert set(timings.stages) == {"jira_fetch", "llm"}
+    header = timings.server_timing_header()
+    assert header.startswith("jira_fetch;dur=")
+    assert header.split(", ")[-1].startswith("total;dur=")
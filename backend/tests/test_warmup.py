@@ -0,0 +1,126 @@
+"""
+Startup warm-up and directory cache tests for SprintLens API.
+"""
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core import warmup
+from app.core.cache import PRUNE_MIN_ENTRIES, TTLCache, clear_caches, ttl_cached
+from app.core.clients import registry, reset_clients
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+from app.main import app
+from tests.benchmarks.fake_upstreams import FakeJira, FakeSlack
+
+def test_ttl_cached_skips_empty_results():
+    """Test results are cached by argument, empty results are retried and refresh bypasses the cache."""
+    calls = []
+
+    @ttl_cached("test_directory", lambda: 60)
+    def lookup(key):
+        calls.append(key)
+        return [key] if key != "empty" else []
+
+    hits = CACHE_REQUESTS.get("test_directory", "hit")
+    assert lookup("a") == ["a"]
+    assert lookup("a") == ["a"]
+    assert lookup("empty") == [] and lookup("empty") == []
+    lookup.refresh("a")
+    assert calls == ["a", "empty", "empty", "a"]
+    assert CACHE_REQUESTS.get("test_directory", "hit") == hits + 1
+    clear_caches("test_directory")
+    lookup("a")
+    assert calls[-1] == "a" and len(calls) == 5
+
+def test_expired_entries_are_pruned():
+    """Test entries that expire are dropped as new ones are stored, so the cache does not grow without bound."""
+    cache = TTLCache("test_pruned", 60)
+    for key in range(PRUNE_MIN_ENTRIES * 4):
+        cache.set(key, key, ttl=0)
+    cache.set("kept", "value")
+    assert len(cache) < PRUNE_MIN_ENTRIES
+    assert cache.get("kept") == (True, "value")
+
+def test_github_warmup_covers_every_repository(monkeypatch):
+    """Test the GitHub warm-up opens each aggregated repository and GITHUB_REPO."""
+    opened = []
+
+    class Client:
+        def get_repo(self, name):
+            opened.append(name)
+    monkeypatch.setattr(warmup, "get_client", lambda name: Client())
+    monkeypatch.setattr(settings, "GITHUB_REPOS", "acme/api, acme/web")
+    monkeypatch.setattr(settings, "GITHUB_REPO", "acme/api")
+    warmup.WARMUP_TASKS["github"]()
+    assert sorted(opened) == ["acme/api", "acme/web"]
+
+def test_warmup_reports_each_integration(monkeypatch):
+    """Test warm-up runs configured integrations concurrently and records failures and timeouts."""
+    def failing():
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(warmup, "WARMUP_TASKS", {
+        "fast": lambda: time.sleep(0.3), "other": lambda: time.sleep(0.3),
+        "broken": failing, "slow": lambda: time.sleep(1), "unconfigured": failing,
+    })
+    monkeypatch.setattr(registry, "configured", lambda: ["fast", "other", "broken", "slow"])
+    state = warmup.WarmupState()
+    assert not state.ready
+    asyncio.run(warmup.run_warmup(state, timeout=0.5))
+    assert state.ready
+    statuses = {name: info["status"] for name, info in state.integrations.items()}
+    # Run one after the other, the two 300ms tasks would not fit in the timeout
+    assert statuses == {"fast": "ok", "other": "ok", "broken": "error", "slow": "timeout"}
+
+def test_readiness_waits_for_warmup(monkeypatch):
+    """Test /health/ready is 503 until warm-up completes."""
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(settings, "SLACK_BOT_TOKEN", "xoxb-test")
+    state = warmup.WarmupState()
+    monkeypatch.setattr(warmup, "warmup_state", state)
+    monkeypatch.setattr("app.routers.health.warmup_state", state)
+    client = TestClient(app)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    warmup.skip_warmup(state)
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["warmup"]["status"] == "complete"
+
+@pytest.fixture
+def fake_upstreams(monkeypatch):
+    slack, jira = FakeSlack().start(), FakeJira().start()
+    for name, value in {
+        "SLACK_BOT_TOKEN": "xoxb-test", "SLACK_API_URL": f"{slack.url}/api/",
+        "JIRA_SERVER": jira.url, "JIRA_EMAIL": "test@example.com", "JIRA_API_TOKEN": "test",
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    state = warmup.WarmupState()
+    monkeypatch.setattr(warmup, "warmup_state", state)
+    monkeypatch.setattr("app.routers.health.warmup_state", state)
+    reset_clients()
+    clear_caches()
+    try:
+        yield slack, jira
+    finally:
+        reset_clients()
+        clear_caches()
+        slack.stop()
+        jira.stop()
+
+def test_lifespan_warms_clients_and_directories(fake_upstreams):
+    """Test startup builds clients and fills directory caches before the app reports ready."""
+    slack, jira = fake_upstreams
+    with TestClient(app) as client:
+        deadline = time.monotonic() + 10
+        while not warmup.warmup_state.ready and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert warmup.warmup_state.integrations["slack"]["status"] == "ok"
+        assert warmup.warmup_state.integrations["jira"]["status"] == "ok"
+        assert registry.is_loaded("slack") and registry.is_loaded("jira")
+        slack_calls, jira_calls = slack.request_count, jira.request_count
+        assert client.get("/api/slack/channels").json()["channels"]
+        assert client.get("/api/jira/projects").json()
+        # Served from the warmed caches without touching the upstreams
+        assert (slack.request_count, jira.request_count) == (slack_calls, jira_calls)